@@ -0,0 +1,20 @@
+"""Runs the whole bot offline and measures it under scripted load.
+
+Run with `python -m benchmarks.bot`, see ``--help``.
+
+The bot is the real :class:`core.Parrot` with every extension loaded. Only
+what is outside of the process is faked: the Discord gateway and REST API
+(:mod:`.discord_api`), Mongo and Redis (:mod:`.database`) and the aiohttp
+session (:mod:`.session`). The results are JSON, a run can be compared with
+an earlier one with ``--compare``. ``--replay`` plays back gateway traffic
+recorded in production instead of the scripted workloads (:mod:`.replay`).
+"""
+
+from __future__ import annotations
+
+from .database import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
+from .discord_api import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
+from .harness import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
+from .replay import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
+from .session import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
+from .workloads import *  # noqa: F401  # pylint: disable=wildcard-import,unused-import
@@ -0,0 +1,144 @@
+"""Runs the bot against the fakes under scripted workloads and reports what it cost."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from typing import Any
+
+from .harness import Harness
+from .replay import Replay
+from .workloads import WORKLOADS, Workload
+
+EVENTS = {"message_flood": 2000, "reaction_storm": 2000, "member_raid": 500, "timer_burst": 200}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bot", description=__doc__)
+    parser.add_argument(
+        "workloads",
+        nargs="*",
+        metavar="workload",
+        help=f"any of {', '.join(WORKLOADS)}, all by default unless --replay is given",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the number of events of every workload")
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--members", type=int, default=50, help="members per guild")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="milliseconds slept on every Mongo/Redis operation")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="milliseconds slept on every HTTP request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", metavar="PATH", help="a traffic recording, a file or the directory of its files")
+    parser.add_argument("--speed", type=float, default=1.0, help="how many times faster than recorded to replay")
+    parser.add_argument("--limit", type=int, help="replay at most this many events")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the bot to finish a workload")
+    parser.add_argument("--json", metavar="PATH", help="write the results there, - for stdout")
+    parser.add_argument("--compare", metavar="PATH", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    parser.add_argument("--verbose", action="store_true", help="keep the logs of the bot")
+    args = parser.parse_args(argv)
+    if unknown := [name for name in args.workloads if name not in WORKLOADS]:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if not args.workloads and not args.replay:
+        args.workloads = list(WORKLOADS)
+    return args
+
+
+def workloads(args: argparse.Namespace) -> dict[str, Workload]:
+    selected: dict[str, Workload] = {
+        name: WORKLOADS[name](max(int(EVENTS[name] * args.scale), 1), seed=args.seed) for name in args.workloads
+    }
+    if args.replay:
+        selected[f"replay@{args.speed:g}x"] = Replay(args.replay, speed=args.speed, limit=args.limit)
+    return selected
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {"workloads": {}}
+    async with Harness(
+        guilds=args.guilds,
+        members=args.members,
+        db_latency=args.db_latency / 1000,
+        http_latency=args.http_latency / 1000,
+        timeout=args.timeout,
+    ) as harness:
+        results["meta"] = {**harness.meta(), "seed": args.seed, "scale": args.scale}
+        for name, workload in workloads(args).items():
+            results["workloads"][name] = await harness.measure(workload)
+    return results
+
+
+def summary(results: dict[str, Any]) -> None:
+    meta = results["meta"]
+    print(f"{meta['extensions']} extensions loaded, {len(meta['failed_extensions'])} failed")
+    for name, result in results["workloads"].items():
+        print(
+            f"\n{name}: {result['events']} events in {result['seconds']:.2f}s, {result['throughput']:.0f}/s, "
+            f"cpu {result['cpu_seconds']:.2f}s, mongo {result['mongo']['calls']}, "
+            f"discord http {sum(result['http']['discord'].values())}, loop lag p99 {result['loop_lag_p99_ms']}ms",
+        )
+        if extra := result.get("workload"):
+            print("  " + ", ".join(f"{key} {value}" for key, value in extra.items()))
+        for listener, histogram in list(result["listeners"].items())[:8]:
+            print(
+                f"  {listener[:60]:60} {histogram['calls']:6} calls  p50 {histogram['p50_ms']:8.3f}ms  "
+                f"p99 {histogram['p99_ms']:8.3f}ms  errors {histogram['errors']}",
+            )
+        for operation, calls in list(result["mongo"]["by_operation"].items())[:5]:
+            print(f"  mongo {operation:54} {calls:6}")
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """What got worse than in ``baseline`` by more than ``threshold``."""
+    regressions = []
+    for name, result in results["workloads"].items():
+        if (old := baseline.get("workloads", {}).get(name)) is None:
+            continue
+        if result["throughput"] < old["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {old['throughput']} -> {result['throughput']}/s")
+        counts = (
+            ("mongo calls", old["mongo"]["calls"], result["mongo"]["calls"]),
+            ("discord http calls", sum(old["http"]["discord"].values()), sum(result["http"]["discord"].values())),
+        )
+        for key, before, calls in counts:
+            if calls > before * (1 + threshold):
+                regressions.append(f"{name}: {key} {before} -> {calls}")
+        for listener, histogram in result["listeners"].items():
+            if (previous := old["listeners"].get(listener)) is None:
+                continue
+            # below a tenth of a millisecond it's noise
+            if histogram["p99_ms"] > max(previous["p99_ms"] * (1 + threshold), previous["p99_ms"] + 0.1):
+                regressions.append(f"{name}: {listener} p99 {previous['p99_ms']} -> {histogram['p99_ms']}ms")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.CRITICAL)
+
+    results = asyncio.run(run(args))
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        summary(results)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
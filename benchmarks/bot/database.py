@@ -0,0 +1,776 @@
+"""In memory stand-ins for motor and aioredis, good enough to run the bot on.
+
+They speak the subset of the query and update language the bot uses and
+report every operation to :class:`core.metrics.Metrics`, so the Mongo
+counters of the harness are the same ones production exposes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import fnmatch
+import re
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from core.cluster import RELEASE_LEASE, RENEW_LEASE
+from core.metrics import Metrics, current_site
+
+__all__ = ("InMemoryCollection", "InMemoryCursor", "InMemoryDatabase", "InMemoryMongo", "InMemoryPubSub", "InMemoryRedis", "matches")
+
+_MISSING = object()
+
+
+def _get(document: Any, path: str) -> Any:
+    for part in path.split("."):
+        if isinstance(document, Mapping):
+            document = document.get(part, _MISSING)
+        elif isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        elif isinstance(document, list):
+            values = [value for value in (_get(item, part) for item in document) if value is not _MISSING]
+            return values or _MISSING
+        else:
+            return _MISSING
+        if document is _MISSING:
+            return _MISSING
+    return document
+
+
+def _candidates(value: Any) -> list[Any]:
+    """The value and, for arrays, every element of it, as Mongo compares them."""
+    if value is _MISSING:
+        return []
+    return [value, *value] if isinstance(value, list) else [value]
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+
+def _match_operators(value: Any, conditions: Mapping[str, Any]) -> bool:
+    candidates = _candidates(value)
+    for operator, operand in conditions.items():
+        if operator == "$eq":
+            ok = operand in candidates if operand is not None else value in (_MISSING, None)
+        elif operator == "$ne":
+            ok = not _match_operators(value, {"$eq": operand})
+        elif operator in ("$gt", "$gte", "$lt", "$lte"):
+            ok = any(_compare(candidate, operator, operand) for candidate in candidates)
+        elif operator == "$in":
+            ok = any(candidate in operand for candidate in candidates) or (value is _MISSING and None in operand)
+        elif operator == "$nin":
+            ok = not _match_operators(value, {"$in": operand})
+        elif operator == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif operator == "$size":
+            ok = isinstance(value, list) and len(value) == operand
+        elif operator == "$regex":
+            flags = re.IGNORECASE if "i" in conditions.get("$options", "") else 0
+            ok = any(isinstance(candidate, str) and re.search(operand, candidate, flags) for candidate in candidates)
+        elif operator == "$options":
+            continue
+        elif operator == "$elemMatch":
+            ok = isinstance(value, list) and any(
+                matches(item, operand) if isinstance(item, Mapping) else _match_operators(item, operand) for item in value
+            )
+        elif operator == "$not":
+            ok = not _match_operators(value, operand)
+        else:
+            msg = f"Unsupported query operator {operator}"
+            raise NotImplementedError(msg)
+        if not ok:
+            return False
+    return True
+
+
+def _is_operators(condition: Any) -> bool:
+    return isinstance(condition, Mapping) and bool(condition) and all(str(key).startswith("$") for key in condition)
+
+
+def matches(document: Mapping[str, Any], query: Mapping[str, Any] | None) -> bool:
+    """Whether ``document`` matches the Mongo ``query``."""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, sub) for sub in condition):
+                return False
+        elif _is_operators(condition):
+            if not _match_operators(_get(document, key), condition):
+                return False
+        elif not _match_operators(_get(document, key), {"$eq": condition}):
+            return False
+    return True
+
+
+def _parent(document: dict, path: str, *, create: bool) -> tuple[Any, str]:
+    *parents, last = path.split(".")
+    for part in parents:
+        if isinstance(document, list) and part.isdigit():
+            document = document[int(part)]
+            continue
+        if part not in document or not isinstance(document[part], dict | list):
+            if not create:
+                return None, last
+            document[part] = {}
+        document = document[part]
+    return document, last
+
+
+def _set(document: dict, path: str, value: Any) -> None:
+    parent, last = _parent(document, path, create=True)
+    if isinstance(parent, list):
+        parent[int(last)] = value
+    else:
+        parent[last] = value
+
+
+def _unset(document: dict, path: str) -> None:
+    parent, last = _parent(document, path, create=False)
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+
+
+def _each(operand: Any) -> list[Any]:
+    return list(operand["$each"]) if isinstance(operand, Mapping) and "$each" in operand else [operand]
+
+
+def _apply(document: dict, update: Mapping[str, Any], *, inserting: bool = False) -> None:
+    if not any(str(key).startswith("$") for key in update):
+        document_id = document.get("_id")
+        document.clear()
+        document.update(copy.deepcopy(dict(update)))
+        if document_id is not None:
+            document.setdefault("_id", document_id)
+        return
+
+    for operator, fields in update.items():
+        for path, operand in fields.items():
+            current = _get(document, path)
+            if operator == "$set" or (operator == "$setOnInsert" and inserting):
+                _set(document, path, copy.deepcopy(operand))
+            elif operator == "$setOnInsert":
+                continue
+            elif operator == "$unset":
+                _unset(document, path)
+            elif operator == "$inc":
+                _set(document, path, (0 if current is _MISSING else current) + operand)
+            elif operator == "$mul":
+                _set(document, path, (0 if current is _MISSING else current) * operand)
+            elif operator in ("$min", "$max"):
+                if current is _MISSING or (operand < current if operator == "$min" else operand > current):
+                    _set(document, path, operand)
+            elif operator == "$push":
+                _set(document, path, [*([] if current is _MISSING else current), *copy.deepcopy(_each(operand))])
+            elif operator == "$addToSet":
+                values = [] if current is _MISSING else list(current)
+                values.extend(value for value in copy.deepcopy(_each(operand)) if value not in values)
+                _set(document, path, values)
+            elif operator == "$pull":
+                if isinstance(current, list):
+                    if _is_operators(operand):
+                        kept = [item for item in current if not _match_operators(item, operand)]
+                    elif isinstance(operand, Mapping):
+                        kept = [item for item in current if not (isinstance(item, Mapping) and matches(item, operand))]
+                    else:
+                        kept = [item for item in current if item != operand]
+                    _set(document, path, kept)
+            elif operator == "$pullAll":
+                if isinstance(current, list):
+                    _set(document, path, [item for item in current if item not in operand])
+            elif operator == "$pop":
+                if isinstance(current, list) and current:
+                    _set(document, path, current[1:] if operand < 0 else current[:-1])
+            elif operator == "$rename":
+                if current is not _MISSING:
+                    _unset(document, path)
+                    _set(document, operand, current)
+            else:
+                msg = f"Unsupported update operator {operator}"
+                raise NotImplementedError(msg)
+
+
+def _project(document: dict, projection: Mapping[str, Any] | Iterable[str] | None) -> dict:
+    document = copy.deepcopy(document)
+    if not projection:
+        return document
+    if not isinstance(projection, Mapping):
+        projection = dict.fromkeys(projection, 1)
+    included = {key for key, value in projection.items() if value and key != "_id"}
+    if included:
+        projected = {"_id": document["_id"]} if projection.get("_id", 1) and "_id" in document else {}
+        for path in included:
+            if (value := _get(document, path)) is not _MISSING:
+                _set(projected, path, value)
+        return projected
+    for key, value in projection.items():
+        if not value:
+            _unset(document, key)
+    return document
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    # missing and null sort first, then by type the way Mongo roughly does
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (3, value)
+    if isinstance(value, int | float):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (4, str(value))
+
+
+def _sort(documents: list[dict], sort: Any) -> None:
+    if isinstance(sort, str):
+        sort = [(sort, 1)]
+    for key, direction in reversed(list(sort)):
+        documents.sort(key=lambda document: _sort_key(_get(document, key)), reverse=direction < 0)
+
+
+class InMemoryCursor:
+    def __init__(
+        self,
+        collection: InMemoryCollection,
+        query: Mapping[str, Any] | None,
+        projection: Any = None,
+        *,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> None:
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = sort
+        self._skip = skip
+        self._limit = limit
+        self._documents: list[dict] | None = None
+
+    def sort(self, key: Any, direction: int | None = None) -> InMemoryCursor:
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else key
+        return self
+
+    def skip(self, skip: int) -> InMemoryCursor:
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> InMemoryCursor:
+        self._limit = limit
+        return self
+
+    async def _load(self) -> list[dict]:
+        if self._documents is None:
+            self._documents = await self.collection._op(
+                "find",
+                lambda: self.collection._find(self.query, self.projection, self._sort, self._skip, self._limit),
+            )
+        return self._documents
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        documents = await self._load()
+        return documents[:length] if length is not None else list(documents)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in await self._load():
+            yield document
+
+
+class InMemoryCollection:
+    """A motor collection kept in a dict, keyed by ``_id``."""
+
+    def __init__(self, database: InMemoryDatabase, name: str) -> None:
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self.documents: dict[Any, dict] = {}
+
+    def __repr__(self) -> str:
+        return f"<InMemoryCollection {self.full_name} documents={len(self.documents)}>"
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.database[f"{self.name}.{name}"]
+
+    async def _op(self, operation: str, func: Any) -> Any:
+        client = self.database.client
+        start = time.perf_counter()
+        failed = False
+        try:
+            if client.latency:
+                await asyncio.sleep(client.latency)
+            else:
+                await asyncio.sleep(0)
+            return func()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            client.metrics.count_mongo(self.name, operation, current_site.get(), time.perf_counter() - start, failed=failed)
+
+    def _find(self, query: Any, projection: Any = None, sort: Any = None, skip: int = 0, limit: int = 0) -> list[dict]:
+        if isinstance(query, Mapping) and set(query) == {"_id"} and not _is_operators(query["_id"]):
+            document = self.documents.get(query["_id"])
+            found = [document] if document is not None else []
+        else:
+            found = [document for document in self.documents.values() if matches(document, query)]
+        if sort:
+            _sort(found, sort)
+        found = found[skip:]
+        if limit:
+            found = found[:limit]
+        return [_project(document, projection) for document in found]
+
+    def _insert(self, document: dict) -> Any:
+        document = copy.deepcopy(dict(document))
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.documents:
+            msg = f"E11000 duplicate key error collection: {self.full_name} dup key: {{ _id: {document['_id']!r} }}"
+            raise DuplicateKeyError(msg, 11000)
+        self.documents[document["_id"]] = document
+        return document["_id"]
+
+    def _update(self, query: Any, update: Mapping[str, Any], *, upsert: bool = False, many: bool = False) -> dict[str, Any]:
+        found = self._find_raw(query, many=many)
+        for document in found:
+            _apply(document, update)
+        if found or not upsert:
+            return {"n": len(found), "nModified": len(found)}
+        document = {
+            key: value for key, value in (query or {}).items() if not key.startswith("$") and not _is_operators(value)
+        }
+        _apply(document, update, inserting=True)
+        return {"n": 1, "nModified": 0, "upserted": self._insert(document)}
+
+    def _find_raw(self, query: Any, *, many: bool) -> list[dict]:
+        if isinstance(query, Mapping) and set(query) == {"_id"} and not _is_operators(query["_id"]):
+            document = self.documents.get(query["_id"])
+            return [document] if document is not None else []
+        found = (document for document in self.documents.values() if matches(document, query))
+        return list(found) if many else [document for document, _ in zip(found, range(1))]
+
+    def _delete(self, query: Any, *, many: bool) -> int:
+        found = self._find_raw(query, many=many)
+        for document in found:
+            del self.documents[document["_id"]]
+        return len(found)
+
+    def find(self, filter: Mapping[str, Any] | None = None, projection: Any = None, **kwargs: Any) -> InMemoryCursor:
+        return InMemoryCursor(
+            self,
+            filter,
+            projection,
+            sort=kwargs.get("sort"),
+            skip=kwargs.get("skip", 0),
+            limit=kwargs.get("limit", 0),
+        )
+
+    async def find_one(self, filter: Any = None, projection: Any = None, **kwargs: Any) -> dict | None:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {"_id": filter}
+        found = await self._op("find", lambda: self._find(filter, projection, kwargs.get("sort"), 0, 1))
+        return found[0] if found else None
+
+    async def insert_one(self, document: dict, **kwargs: Any) -> InsertOneResult:
+        inserted_id = await self._op("insert", lambda: self._insert(document))
+        document.setdefault("_id", inserted_id)
+        return InsertOneResult(inserted_id, True)
+
+    async def insert_many(self, documents: Iterable[dict], **kwargs: Any) -> InsertManyResult:
+        documents = list(documents)
+        ids = await self._op("insert", lambda: [self._insert(document) for document in documents])
+        return InsertManyResult(ids, True)
+
+    async def update_one(self, filter: Any, update: Mapping[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return UpdateResult(await self._op("update", lambda: self._update(filter, update, upsert=upsert)), True)
+
+    async def update_many(self, filter: Any, update: Mapping[str, Any], upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return UpdateResult(await self._op("update", lambda: self._update(filter, update, upsert=upsert, many=True)), True)
+
+    async def replace_one(self, filter: Any, replacement: dict, upsert: bool = False, **kwargs: Any) -> UpdateResult:
+        return UpdateResult(await self._op("update", lambda: self._update(filter, replacement, upsert=upsert)), True)
+
+    async def delete_one(self, filter: Any, **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": await self._op("delete", lambda: self._delete(filter, many=False))}, True)
+
+    async def delete_many(self, filter: Any, **kwargs: Any) -> DeleteResult:
+        return DeleteResult({"n": await self._op("delete", lambda: self._delete(filter, many=True))}, True)
+
+    async def find_one_and_update(
+        self,
+        filter: Any,
+        update: Mapping[str, Any],
+        projection: Any = None,
+        *,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        **kwargs: Any,
+    ) -> dict | None:
+        def run() -> dict | None:
+            found = self._find_raw(filter, many=False)
+            before = copy.deepcopy(found[0]) if found else None
+            result = self._update(filter, update, upsert=upsert)
+            if return_document == ReturnDocument.BEFORE:
+                return _project(before, projection) if before is not None else None
+            document_id = before["_id"] if before is not None else result.get("upserted")
+            after = self.documents.get(document_id)
+            return _project(after, projection) if after is not None else None
+
+        return await self._op("findAndModify", run)
+
+    async def find_one_and_delete(self, filter: Any, projection: Any = None, **kwargs: Any) -> dict | None:
+        def run() -> dict | None:
+            found = self._find_raw(filter, many=False)
+            if not found:
+                return None
+            del self.documents[found[0]["_id"]]
+            return _project(found[0], projection)
+
+        return await self._op("findAndModify", run)
+
+    async def count_documents(self, filter: Any = None, **kwargs: Any) -> int:
+        return await self._op("count", lambda: len(self._find_raw(filter, many=True)))
+
+    async def estimated_document_count(self, **kwargs: Any) -> int:
+        return await self._op("count", lambda: len(self.documents))
+
+    async def distinct(self, key: str, filter: Any = None, **kwargs: Any) -> list[Any]:
+        def run() -> list[Any]:
+            values: list[Any] = []
+            for document in self._find_raw(filter, many=True):
+                value = _get(document, key)
+                for candidate in value if isinstance(value, list) else [value]:
+                    if candidate is not _MISSING and candidate not in values:
+                        values.append(candidate)
+            return values
+
+        return await self._op("distinct", run)
+
+    async def bulk_write(self, requests: Iterable[Any], ordered: bool = True, **kwargs: Any) -> BulkWriteResult:
+        def run() -> dict[str, Any]:
+            result = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+            for request in requests:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, UpdateOne | UpdateMany | ReplaceOne):
+                    many = isinstance(request, UpdateMany)
+                    outcome = self._update(request._filter, request._doc, upsert=bool(request._upsert), many=many)
+                    if "upserted" in outcome:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": 0, "_id": outcome["upserted"]})
+                    else:
+                        result["nMatched"] += outcome["n"]
+                        result["nModified"] += outcome["nModified"]
+                elif isinstance(request, DeleteOne | DeleteMany):
+                    result["nRemoved"] += self._delete(request._filter, many=isinstance(request, DeleteMany))
+            return result
+
+        return BulkWriteResult(await self._op("bulkWrite", run), True)
+
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        return kwargs.get("name") or str(keys)
+
+    async def create_indexes(self, indexes: Iterable[Any], **kwargs: Any) -> list[str]:
+        return [str(index.document.get("name", index.document["key"])) for index in indexes]
+
+    async def drop(self) -> None:
+        self.documents.clear()
+
+
+class InMemoryDatabase:
+    def __init__(self, client: InMemoryMongo, name: str) -> None:
+        self.client = client
+        self.name = name
+        self._collections: dict[str, InMemoryCollection] = {}
+
+    def __repr__(self) -> str:
+        return f"<InMemoryDatabase {self.name} collections={len(self._collections)}>"
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        try:
+            return self._collections[name]
+        except KeyError:
+            collection = self._collections[name] = InMemoryCollection(self, name)
+            return collection
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self, **kwargs: Any) -> list[str]:
+        return [name for name, collection in self._collections.items() if collection.documents]
+
+
+class InMemoryMongo:
+    """Stands in for :class:`motor.motor_asyncio.AsyncIOMotorClient`.
+
+    ``latency`` seconds are slept on every operation, to play a server that
+    isn't on the same machine.
+    """
+
+    def __init__(self, metrics: Metrics, *, latency: float = 0.0) -> None:
+        self.metrics = metrics
+        self.latency = latency
+        self._databases: dict[str, InMemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        try:
+            return self._databases[name]
+        except KeyError:
+            database = self._databases[name] = InMemoryDatabase(self, name)
+            return database
+
+    def __getattr__(self, name: str) -> InMemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_database_names(self) -> list[str]:
+        return list(self._databases)
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryRedis:
+    """The parts of an ``aioredis.Redis`` client the bot may call, ``calls`` counts them by command."""
+
+    def __init__(self, *, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._subscribers: defaultdict[str, set[InMemoryPubSub]] = defaultdict(set)
+        # cursor -> keys a SCAN has yet to return, every key there at its start is returned once
+        self._scans: dict[int, list[str]] = {}
+
+    async def _command(self, name: str) -> None:
+        self.calls[name] += 1
+        await asyncio.sleep(self.latency)
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _expire_in(self, key: str, ex: float | None = None, px: float | None = None) -> None:
+        if ex is not None or px is not None:
+            self._expires[key] = time.monotonic() + (ex if ex is not None else px / 1000)
+        else:
+            self._expires.pop(key, None)
+
+    async def ping(self) -> bool:
+        await self._command("PING")
+        return True
+
+    async def get(self, key: str) -> Any:
+        await self._command("GET")
+        return self._data[key] if self._alive(key) else None
+
+    async def mget(self, keys: Iterable[str], *args: str) -> list[Any]:
+        await self._command("MGET")
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        return [self._data[key] if self._alive(key) else None for key in [*keys, *args]]
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ex: float | None = None,
+        px: float | None = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> bool | None:
+        await self._command("SET")
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._data[key] = value
+        self._expire_in(key, ex, px)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        await self._command("DEL")
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                deleted += 1
+                self._data.pop(key)
+                self._expires.pop(key, None)
+        return deleted
+
+    async def exists(self, *keys: str) -> int:
+        await self._command("EXISTS")
+        return sum(self._alive(key) for key in keys)
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        await self._command("EXPIRE")
+        if not self._alive(key):
+            return False
+        self._expire_in(key, seconds)
+        return True
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        """Runs the Lua scripts of the bot, nothing else runs in between as with Redis."""
+        await self._command("EVAL")
+        key, identity, *args = keys_and_args
+        if numkeys != 1 or script not in (RENEW_LEASE, RELEASE_LEASE):
+            msg = f"unknown script {script!r}"
+            raise NotImplementedError(msg)
+        if not self._alive(key) or self._data[key] != identity:
+            return 0
+        if script == RENEW_LEASE:
+            self._expire_in(key, int(args[0]))
+        else:
+            self._data.pop(key)
+            self._expires.pop(key, None)
+        return 1
+
+    async def ttl(self, key: str) -> int:
+        await self._command("TTL")
+        if not self._alive(key):
+            return -2
+        expires = self._expires.get(key)
+        return -1 if expires is None else max(int(expires - time.monotonic()), 0)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        await self._command("INCR")
+        value = int(self._data[key]) + amount if self._alive(key) else amount
+        self._data[key] = value
+        return value
+
+    async def hget(self, key: str, field: str) -> Any:
+        await self._command("HGET")
+        return self._data[key].get(field) if self._alive(key) else None
+
+    async def hset(self, key: str, field: str | None = None, value: Any = None, mapping: Mapping | None = None) -> int:
+        await self._command("HSET")
+        hash_ = self._data[key] if self._alive(key) else {}
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(item not in hash_ for item in items)
+        hash_.update(items)
+        self._data[key] = hash_
+        return added
+
+    async def hgetall(self, key: str) -> dict:
+        await self._command("HGETALL")
+        return dict(self._data[key]) if self._alive(key) else {}
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        await self._command("HDEL")
+        if not self._alive(key):
+            return 0
+        return sum(self._data[key].pop(field, _MISSING) is not _MISSING for field in fields)
+
+    async def keys(self, pattern: str = "*") -> list[str]:
+        await self._command("KEYS")
+        return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def scan(self, cursor: int = 0, match: str | None = None, count: int | None = None) -> tuple[int, list[str]]:
+        await self._command("SCAN")
+        if cursor == 0:
+            pending = [key for key in list(self._data) if match is None or fnmatch.fnmatchcase(key, match)]
+        else:
+            pending = self._scans.pop(cursor)
+        # Redis returns about count keys per step, 10 by default
+        keys, pending = pending[: count or 10], pending[count or 10 :]
+        keys = [key for key in keys if self._alive(key)]
+        if not pending:
+            return 0, keys
+        cursor = max(self._scans, default=0) + 1
+        self._scans[cursor] = pending
+        return cursor, keys
+
+    async def publish(self, channel: str, message: Any) -> int:
+        await self._command("PUBLISH")
+        subscribers = self._subscribers.get(channel, set())
+        for pubsub in subscribers:
+            pubsub._deliver({"type": "message", "pattern": None, "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def flushdb(self) -> bool:
+        await self._command("FLUSHDB")
+        self._data.clear()
+        self._expires.clear()
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryPubSub:
+    """What ``InMemoryRedis.pubsub()`` returns, :meth:`listen` ends once it is closed."""
+
+    def __init__(self, redis: InMemoryRedis) -> None:
+        self.redis = redis
+        self.channels: set[str] = set()
+        self._messages: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels)
+
+    def _deliver(self, message: dict[str, Any] | None) -> None:
+        self._messages.put_nowait(message)
+
+    async def subscribe(self, *channels: str) -> None:
+        await self.redis._command("SUBSCRIBE")
+        for channel in channels:
+            self.channels.add(channel)
+            self.redis._subscribers[channel].add(self)
+            self._deliver({"type": "subscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+
+    async def unsubscribe(self, *channels: str) -> None:
+        await self.redis._command("UNSUBSCRIBE")
+        for channel in channels or list(self.channels):
+            self.channels.discard(channel)
+            self.redis._subscribers[channel].discard(self)
+            self._deliver({"type": "unsubscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        while (message := await self._messages.get()) is not None:
+            yield message
+
+    async def close(self) -> None:
+        for channel in self.channels:
+            self.redis._subscribers[channel].discard(self)
+        self.channels.clear()
+        self._deliver(None)
+
+    reset = close
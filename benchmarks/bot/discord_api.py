@@ -0,0 +1,410 @@
+"""A fake Discord: the REST API the bot calls and the gateway events it receives.
+
+:class:`FakeDiscord` keeps a small world of guilds, channels and members,
+answers the REST routes the bot uses from it, and feeds gateway payloads
+straight into the parsers of the bot's connection state, the same code a
+real websocket message ends up in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import json
+import time
+import urllib.parse
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+import yarl
+
+import discord
+
+if TYPE_CHECKING:
+    from discord.http import Route
+
+__all__ = ("FakeDiscord",)
+
+ADMINISTRATOR = "8"
+EVERYONE = "104324673"  # the default permissions of @everyone
+
+
+def _timestamp(dt: datetime.datetime | None = None) -> str:
+    return (dt or discord.utils.utcnow()).isoformat()
+
+
+class FakeDiscord:
+    """Plays Discord for one bot, ``routes`` counts the REST calls by route."""
+
+    def __init__(self, *, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.routes: Counter[str] = Counter()
+        self.events: Counter[str] = Counter()
+        self._ids = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+
+        self.bot_user = self.user("Parrot", bot=True)
+        self.owner = self.user("owner")
+        self.users: dict[int, dict[str, Any]] = {}
+        self.guilds: dict[int, dict[str, Any]] = {}
+        self.channels: dict[int, dict[str, Any]] = {}
+        self.messages: dict[int, dict[str, Any]] = {}
+        # message id -> emoji -> the users who reacted with it
+        self.reactions: dict[int, dict[str, list[dict[str, Any]]]] = {}
+        self.state: Any = None
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    # payloads
+
+    def user(self, name: str, *, bot: bool = False, user_id: int | None = None) -> dict[str, Any]:
+        user_id = user_id or self.snowflake()
+        return {
+            "id": str(user_id),
+            "username": name,
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+            "bot": bot,
+            "public_flags": 0,
+        }
+
+    def member(self, user: dict[str, Any], *, roles: list[str] | None = None) -> dict[str, Any]:
+        return {
+            "user": user,
+            "roles": roles or [],
+            "joined_at": _timestamp(),
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+            "nick": None,
+            "avatar": None,
+            "premium_since": None,
+            "pending": False,
+        }
+
+    def guild(
+        self,
+        name: str,
+        *,
+        members: int = 50,
+        channels: int = 3,
+        guild_id: int | None = None,
+        channel_ids: list[int] | None = None,
+    ) -> dict[str, Any]:
+        """A guild with ``members`` people and the bot in it, registered with the fake and returned as GUILD_CREATE.
+
+        ``guild_id`` and ``channel_ids`` are made up unless given, ``channel_ids`` replaces ``channels``.
+        """
+        guild_id = guild_id or self.snowflake()
+        admin_role = str(self.snowflake())
+        channel_ids = channel_ids or [self.snowflake() for _ in range(channels)]
+        text_channels = [
+            {
+                "id": str(channel_id),
+                "type": 0,
+                "name": f"channel-{index}",
+                "position": index,
+                "permission_overwrites": [],
+                "guild_id": str(guild_id),
+                "nsfw": False,
+                "topic": None,
+                "last_message_id": None,
+                "rate_limit_per_user": 0,
+                "parent_id": None,
+            }
+            for index, channel_id in enumerate(channel_ids)
+        ]
+        people = [self.user(f"member-{index}") for index in range(members)]
+        data = {
+            "id": str(guild_id),
+            "name": name,
+            "owner_id": self.owner["id"],
+            "unavailable": False,
+            "member_count": members + 2,
+            "large": members > 250,
+            "joined_at": _timestamp(),
+            "roles": [
+                {
+                    "id": str(guild_id),
+                    "name": "@everyone",
+                    "permissions": EVERYONE,
+                    "position": 0,
+                    "color": 0,
+                    "hoist": False,
+                    "managed": False,
+                    "mentionable": False,
+                },
+                {
+                    "id": admin_role,
+                    "name": "Parrot",
+                    "permissions": ADMINISTRATOR,
+                    "position": 1,
+                    "color": 0,
+                    "hoist": False,
+                    "managed": True,
+                    "mentionable": False,
+                },
+            ],
+            "channels": text_channels,
+            "members": [
+                self.member(self.bot_user, roles=[admin_role]),
+                self.member(self.owner),
+                *(self.member(user) for user in people),
+            ],
+            "emojis": [],
+            "stickers": [],
+            "features": [],
+            "voice_states": [],
+            "presences": [],
+            "threads": [],
+            "stage_instances": [],
+            "guild_scheduled_events": [],
+            "premium_tier": 0,
+            "preferred_locale": "en-US",
+            "system_channel_id": text_channels[0]["id"],
+            "verification_level": 0,
+            "default_message_notifications": 0,
+            "explicit_content_filter": 0,
+            "mfa_level": 0,
+            "nsfw_level": 0,
+        }
+        self.guilds[guild_id] = data
+        for channel in text_channels:
+            self.channels[int(channel["id"])] = channel
+        for user in (self.bot_user, self.owner, *people):
+            self.users[int(user["id"])] = user
+        return data
+
+    def adopt(self, guild: dict[str, Any]) -> dict[str, Any]:
+        """Registers a GUILD_CREATE payload made elsewhere, with the bot added to it as an administrator."""
+        admin_role = str(self.snowflake())
+        guild["roles"] = [
+            *guild.get("roles", []),
+            {
+                "id": admin_role,
+                "name": "Parrot",
+                "permissions": ADMINISTRATOR,
+                "position": len(guild.get("roles", [])),
+                "color": 0,
+                "hoist": False,
+                "managed": True,
+                "mentionable": False,
+            },
+        ]
+        guild["members"] = [*guild.get("members", []), self.member(self.bot_user, roles=[admin_role])]
+        guild["member_count"] = guild.get("member_count", 0) + 1
+        self.guilds[int(guild["id"])] = guild
+        for channel in guild.get("channels", []):
+            self.channels[int(channel["id"])] = {**channel, "guild_id": guild["id"]}
+        return guild
+
+    def message(
+        self,
+        channel_id: int,
+        author: dict[str, Any],
+        content: str,
+        *,
+        embeds: list[dict[str, Any]] | None = None,
+        mentions: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        channel = self.channels.get(channel_id, {})
+        data = {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": author,
+            "content": content,
+            "timestamp": _timestamp(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": mentions or [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": embeds or [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+            "components": [],
+        }
+        if guild_id := channel.get("guild_id"):
+            data["guild_id"] = guild_id
+            data["member"] = {key: value for key, value in self.member(author).items() if key != "user"}
+        self.messages[int(data["id"])] = data
+        return data
+
+    # the REST API
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:
+        """Replaces ``HTTPClient.request`` of the bot."""
+        self.routes[f"{route.method} {route.path}"] += 1
+        await asyncio.sleep(self.latency)
+        return self.respond(route.method, route.path, yarl.URL(route.url).path, kwargs)
+
+    def respond(self, method: str, template: str, path: str, kwargs: dict[str, Any]) -> Any:
+        parts = path.split("/")
+        if template == "/users/@me":
+            return self.bot_user
+        if template == "/oauth2/applications/@me":
+            return {
+                "id": self.bot_user["id"],
+                "name": self.bot_user["username"],
+                "description": "",
+                "icon": None,
+                "bot_public": True,
+                "bot_require_code_grant": False,
+                "owner": self.owner,
+                "verify_key": "0" * 64,
+                "flags": 0,
+                "rpc_origins": [],
+                "team": None,
+                "summary": "",
+            }
+        if template.endswith("/commands"):
+            return []
+        if template == "/channels/{channel_id}/messages" and method == "POST":
+            return self.message(int(parts[-2]), self.bot_user, **self._message_fields(kwargs))
+        if template == "/channels/{channel_id}/messages/{message_id}":
+            if method == "PATCH":
+                message = self.messages.get(int(parts[-1])) or self.message(int(parts[-3]), self.bot_user, "")
+                message.update(self._message_fields(kwargs))
+                return message
+            if method == "GET":
+                return self.messages.get(int(parts[-1]))
+            return None
+        if template == "/channels/{channel_id}/messages" and method == "GET":
+            return []
+        if template == "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}":
+            if method != "GET":
+                return None
+            return self.reactions.get(int(parts[-3]), {}).get(urllib.parse.unquote(parts[-1]), [])
+        if template == "/users/@me/channels":
+            recipient = self.users.get(int(kwargs.get("json", {}).get("recipient_id", 0))) or self.user("someone")
+            channel = {"id": str(self.snowflake()), "type": 1, "recipients": [recipient], "last_message_id": None}
+            self.channels[int(channel["id"])] = channel
+            return channel
+        if template == "/users/{user_id}":
+            return self.users.get(int(parts[-1])) or self.user("someone", user_id=int(parts[-1]))
+        if template == "/guilds/{guild_id}/members/{user_id}":
+            user = self.users.get(int(parts[-1]))
+            return self.member(user) if user is not None else None
+        if template == "/channels/{channel_id}/webhooks":
+            return [] if method == "GET" else self.webhook(int(parts[-2]))
+        if template.startswith("/webhooks/{webhook_id}/{webhook_token}"):
+            return self.message(0, self.bot_user, **self._message_fields(kwargs))
+        return None
+
+    def webhook(self, channel_id: int) -> dict[str, Any]:
+        return {
+            "id": str(self.snowflake()),
+            "type": 1,
+            "channel_id": str(channel_id),
+            "name": "Parrot",
+            "avatar": None,
+            "token": "token",
+            "user": self.bot_user,
+        }
+
+    def _message_fields(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        payload = kwargs.get("json")
+        if payload is None and (form := kwargs.get("form")):
+            payload = json.loads(form[0]["value"])
+        payload = payload or {}
+        return {"content": payload.get("content") or "", "embeds": payload.get("embeds") or []}
+
+    async def http_handler(self, method: str, url: yarl.URL, kwargs: dict[str, Any]) -> tuple[int, Any]:
+        """For :class:`benchmarks.bot.session.FakeSession`, webhooks are executed through the bot's own session."""
+        path = url.path.removeprefix("/api").removeprefix("/v10").removeprefix("/v9")
+        if path.startswith("/webhooks/"):
+            self.routes[f"{method} /webhooks/{{webhook_id}}/{{webhook_token}}"] += 1
+            if kwargs.get("data") is not None or kwargs.get("json") is not None:
+                return 200, self.message(0, self.bot_user, "")
+        return 200, {}
+
+    # the gateway
+
+    def attach(self, bot: discord.Client) -> None:
+        bot.http.request = self.request  # type: ignore
+        self.state = bot._connection
+        self.state.chunker = self.chunker  # type: ignore
+
+    async def chunker(self, guild_id: int, query: str = "", limit: int = 0, presences: bool = False, **kwargs: Any) -> None:
+        """Answers REQUEST_GUILD_MEMBERS, ``Guild.chunk`` waits for it, with the members the fake knows of.
+
+        The answer comes later, as from the gateway, the request is only waited for after this returns.
+        """
+        members = self.guilds.get(guild_id, {}).get("members", [])
+        if query:
+            members = [member for member in members if member["user"]["username"].startswith(query)]
+        asyncio.get_running_loop().call_later(
+            self.latency,
+            self.dispatch,
+            "GUILD_MEMBERS_CHUNK",
+            {
+                "guild_id": str(guild_id),
+                "members": members[:limit] if limit else members,
+                "chunk_index": 0,
+                "chunk_count": 1,
+                "nonce": kwargs.get("nonce"),
+            },
+        )
+
+    def dispatch(self, event: str, data: dict[str, Any]) -> None:
+        """Hands a gateway event to the bot, as ``DiscordWebSocket.received_message`` does."""
+        self.events[event] += 1
+        self.state.parsers[event](data)
+
+    def ready(self, guilds: list[dict[str, Any]], *, shard: tuple[int, int] = (0, 1)) -> None:
+        """READY for ``shard``, its id and the shard count, then GUILD_CREATE for its ``guilds``."""
+        self.dispatch(
+            "READY",
+            {
+                "v": 10,
+                "user": self.bot_user,
+                "guilds": [{"id": guild["id"], "unavailable": True} for guild in guilds],
+                "session_id": "session",
+                "resume_gateway_url": "wss://gateway.discord.gg",
+                "shard": list(shard),
+                "application": {"id": self.bot_user["id"], "flags": 0},
+            },
+        )
+        for guild in guilds:
+            self.dispatch("GUILD_CREATE", guild)
+
+    def send(self, channel_id: int, author: dict[str, Any], content: str, **kwargs: Any) -> dict[str, Any]:
+        data = self.message(channel_id, author, content, **kwargs)
+        self.dispatch("MESSAGE_CREATE", data)
+        return data
+
+    def react(self, message: dict[str, Any], user: dict[str, Any], emoji: str = "\N{THUMBS UP SIGN}") -> None:
+        data: dict[str, Any] = {
+            "user_id": user["id"],
+            "channel_id": message["channel_id"],
+            "message_id": message["id"],
+            "emoji": {"id": None, "name": emoji},
+            "type": 0,
+            "burst": False,
+            "burst_colors": [],
+        }
+        reactions = self.reactions.setdefault(int(message["id"]), {})
+        if user not in (reactors := reactions.setdefault(emoji, [])):
+            reactors.append(user)
+            message["reactions"] = [
+                {"emoji": {"id": None, "name": name}, "count": len(users), "me": False, "burst_count": 0, "me_burst": False}
+                for name, users in reactions.items()
+            ]
+        if guild_id := message.get("guild_id"):
+            data["guild_id"] = guild_id
+            data["member"] = self.member(user)
+            data["message_author_id"] = message["author"]["id"]
+        self.dispatch("MESSAGE_REACTION_ADD", data)
+
+    def join(self, guild: dict[str, Any], user: dict[str, Any] | None = None) -> dict[str, Any]:
+        user = user or self.user(f"raider-{time.perf_counter_ns() % 10_000}")
+        self.users[int(user["id"])] = user
+        member = self.member(user)
+        if (known := self.guilds.get(int(guild["id"]))) is not None:
+            known["members"].append(member)
+        self.dispatch("GUILD_MEMBER_ADD", {**member, "guild_id": guild["id"]})
+        return user
@@ -0,0 +1,284 @@
+"""Boots the real bot against the fakes and measures workloads on it."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import platform
+import time
+from collections import Counter
+from typing import Any
+
+import aiosqlite
+
+import discord
+from core import Parrot
+from core.cluster import Cluster
+from core.metrics import Histogram
+from core.pipeline import StageTiming
+from discord.ext import tasks
+from utilities.config import TOKEN
+
+from .database import InMemoryMongo, InMemoryRedis
+from .discord_api import FakeDiscord
+from .session import FakeSession
+from .workloads import Workload
+
+__all__ = ("BenchmarkParrot", "Harness")
+
+log = logging.getLogger("benchmarks.bot")
+
+# the tables of updater.init
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scam_links (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL, UNIQUE(link));
+    CREATE TABLE IF NOT EXISTS discord_tokens (id INTEGER PRIMARY KEY AUTOINCREMENT, token TEXT NOT NULL, UNIQUE(token));
+    CREATE TABLE IF NOT EXISTS nsfw_links (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL, UNIQUE(link));
+    CREATE TABLE IF NOT EXISTS nsfw_links_grouped (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL UNIQUE, type TEXT
+    );
+"""
+
+
+class BenchmarkParrot(Parrot):
+    """Parrot without the parts that go to the internet on their own."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.HAS_TOP_GG = False
+        # the log lines of a run aren't kept
+        self.log_sink.database = ":memory:"
+
+    @tasks.loop(hours=1)
+    async def update_scam_link_db(self):
+        # downloads the scam list from GitHub with a session of its own
+        return
+
+
+def _histogram(histogram: Histogram) -> dict[str, float]:
+    return {
+        "calls": histogram.count,
+        "errors": histogram.errors,
+        "total_ms": round(histogram.sum * 1e3, 3),
+        "p50_ms": round(histogram.quantile(0.5) * 1e3, 3),
+        "p99_ms": round(histogram.quantile(0.99) * 1e3, 3),
+        "max_ms": round(histogram.slowest * 1e3, 3),
+    }
+
+
+class Harness:
+    """One bot, its fakes and the guilds it sits in.
+
+    ``db_latency`` and ``http_latency`` are slept on every Mongo/Redis
+    operation and REST call, leave them at 0 to measure the bot alone.
+    ``startup_concurrency`` is handed to :class:`core.startup.Startup`.
+    ``cluster`` boots the bot as that cluster, its guilds are on the shards
+    of the cluster. Harnesses given the same ``redis`` share it, as the
+    clusters of the bot do.
+    """
+
+    def __init__(
+        self,
+        *,
+        guilds: int = 3,
+        members: int = 50,
+        db_latency: float = 0.0,
+        http_latency: float = 0.0,
+        timeout: float = 60.0,
+        startup_concurrency: int | None = None,
+        cluster: Cluster | None = None,
+        redis: InMemoryRedis | None = None,
+    ) -> None:
+        self.guild_count = guilds
+        self.member_count = members
+        self.db_latency = db_latency
+        self.http_latency = http_latency
+        self.timeout = timeout
+        self.startup_concurrency = startup_concurrency
+        self.cluster = cluster or Cluster()
+        self.shared_redis = redis
+        self.guilds: list[dict[str, Any]] = []
+        self.bot: BenchmarkParrot
+        self.discord: FakeDiscord
+        self.redis: InMemoryRedis
+
+    async def __aenter__(self) -> Harness:
+        try:
+            await self.start()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if not hasattr(self, "bot"):
+            return
+        if not hasattr(self.bot, "sql"):
+            # Parrot.close closes it
+            self.bot.sql = await aiosqlite.connect(":memory:")
+        await self.bot.close()
+
+    async def start(self, *, settle: bool = True) -> None:
+        """Boots the bot into its guilds, with ``settle`` waits for what it started on ready as well."""
+        bot = self.bot = BenchmarkParrot(cluster=self.cluster)
+        if self.startup_concurrency is not None:
+            bot.startup.concurrency = self.startup_concurrency
+        await bot.__aenter__()
+
+        self.discord = FakeDiscord(latency=self.http_latency)
+        self.discord.attach(bot)
+        session = FakeSession(bot.metrics, latency=self.http_latency)
+        for host in ("discord.com", "discordapp.com"):
+            session.handlers[host] = self.discord.http_handler
+        session.handlers["anti-fish.bitflow.dev"] = self._scam_check
+        bot.http_session = session  # type: ignore
+
+        bot.sql = await aiosqlite.connect(":memory:")
+        await bot.sql.executescript(SCHEMA)
+        bot.mongo = InMemoryMongo(bot.metrics, latency=self.db_latency)  # type: ignore
+        bot.redis = self.redis = self.shared_redis or InMemoryRedis(latency=self.db_latency)  # type: ignore
+        webhook = f"https://discord.com/api/webhooks/{self.discord.snowflake()}/{'t' * 68}"
+        bot._error_log_token = bot._startup_log_token = bot._vote_log_token = bot._join_leave_log_token = webhook
+        await bot.init_db()
+
+        bot._connection.guild_ready_timeout = 0.05
+        bot._connection.shard_ids = self.cluster.shard_ids
+        bot._connection.shard_count = self.cluster.shard_count
+        await bot.login(str(TOKEN))
+
+        self.guilds = [
+            self.discord.guild(f"guild-{index}", members=self.member_count, guild_id=self._guild_id(index))
+            for index in range(self.guild_count)
+        ]
+        before = self._tasks()
+        for shard in self.cluster.shard_ids:
+            guilds = [guild for guild in self.guilds if (int(guild["id"]) >> 22) % self.cluster.shard_count == shard]
+            self.discord.ready(guilds, shard=(shard, self.cluster.shard_count))
+        await asyncio.wait_for(bot.wait_until_ready(), timeout=self.timeout)
+        if settle:
+            await self.drain(before)
+
+    def _guild_id(self, index: int) -> int | None:
+        """An id on the ``index``-th shard of the cluster, round robin, made up by the fake with a single shard."""
+        if self.cluster.shard_count == 1:
+            return None
+        shards = self.cluster.shard_ids
+        timestamp = self.discord.snowflake() >> 22
+        timestamp += (shards[index % len(shards)] - timestamp) % self.cluster.shard_count
+        return timestamp << 22 | index
+
+    async def _scam_check(self, method: str, url: Any, kwargs: dict[str, Any]) -> tuple[int, Any]:
+        return 200, {"match": False, "matches": []}
+
+    def _tasks(self) -> set[asyncio.Task[Any]]:
+        return asyncio.all_tasks()
+
+    async def drain(self, before: set[asyncio.Task[Any]]) -> int:
+        """Waits for the tasks started since ``before``, returns how many were still running at the timeout.
+
+        Background loops (``tasks.loop``) run forever and are not waited for.
+        """
+        deadline = time.perf_counter() + self.timeout
+        current = asyncio.current_task()
+        while True:
+            pending = {
+                task
+                for task in asyncio.all_tasks()
+                if task not in before and task is not current and not task.get_name().startswith("discord-ext-tasks")
+            }
+            remaining = deadline - time.perf_counter()
+            if not pending or remaining <= 0:
+                if pending:
+                    running = Counter(getattr(task.get_coro(), "__qualname__", task.get_name()) for task in pending)
+                    log.warning("%s tasks still running after %ss: %s", len(pending), self.timeout, dict(running))
+                return len(pending)
+            await asyncio.wait(pending, timeout=remaining)
+
+    def reset(self) -> None:
+        self.bot.metrics.reset()
+        for stage in self.bot.message_pipeline.stages:
+            stage.timing = StageTiming()
+        self.discord.routes.clear()
+        self.discord.events.clear()
+        self.redis.calls.clear()
+
+    async def measure(self, workload: Workload) -> dict[str, Any]:
+        before = self._tasks()
+        await workload.setup(self)
+        await self.drain(before)
+        self.reset()
+
+        before = self._tasks()
+        start = time.perf_counter()
+        cpu = time.process_time()
+        fired = await workload.run(self)
+        unfinished = await self.drain(before)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        result = self.report(fired, elapsed, cpu, unfinished)
+        if extra := workload.report():
+            result["workload"] = extra
+        return result
+
+    def report(self, fired: int, elapsed: float, cpu: float, unfinished: int) -> dict[str, Any]:
+        metrics = self.bot.metrics
+        by_operation: dict[str, int] = {}
+        by_site: dict[str, int] = {}
+        for (collection, operation, site), count in metrics.mongo.items():
+            key = f"{collection}.{operation}"
+            by_operation[key] = by_operation.get(key, 0) + count.calls
+            by_site[site] = by_site.get(site, 0) + count.calls
+
+        def ranked(mapping: dict[str, int]) -> dict[str, int]:
+            return dict(sorted(mapping.items(), key=lambda item: item[1], reverse=True))
+
+        return {
+            "events": fired,
+            "seconds": round(elapsed, 4),
+            "cpu_seconds": round(cpu, 4),
+            "throughput": round(fired / elapsed, 1) if elapsed else 0.0,
+            "unfinished_tasks": unfinished,
+            "gateway": dict(self.discord.events),
+            "listeners": {
+                f"{event}:{name}": _histogram(histogram)
+                for (event, name), histogram in sorted(metrics.listeners.items(), key=lambda item: -item[1].sum)
+                if histogram.count
+            },
+            "commands": {name: _histogram(histogram) for name, histogram in metrics.commands.items() if histogram.count},
+            "stages": {
+                name: {
+                    "calls": timing.calls,
+                    "skipped": timing.skipped,
+                    "errors": timing.errors,
+                    "average_ms": round(timing.average * 1e3, 3),
+                }
+                for name, timing in self.bot.message_pipeline.timings().items()
+                if timing.calls or timing.skipped
+            },
+            "mongo": {
+                "calls": sum(by_operation.values()),
+                "by_operation": ranked(by_operation),
+                "by_site": ranked(by_site),
+            },
+            "http": {
+                "discord": ranked(dict(self.discord.routes)),
+                "hosts": ranked({host: count.calls for host, count in metrics.http.items()}),
+            },
+            "redis": ranked(dict(self.redis.calls)),
+            "loop_lag_p99_ms": round(metrics.loop_lag.quantile(0.99) * 1e3, 3),
+        }
+
+    def meta(self) -> dict[str, Any]:
+        return {
+            "python": platform.python_version(),
+            "discord.py": discord.__version__,
+            "guilds": self.guild_count,
+            "members": self.member_count,
+            "db_latency": self.db_latency,
+            "http_latency": self.http_latency,
+            "cluster": [self.cluster.id, self.cluster.count, self.cluster.shard_count],
+            "extensions": len(self.bot.extensions),
+            "failed_extensions": sorted(self.bot._failed_to_load),
+        }
@@ -0,0 +1,126 @@
+"""Replays gateway traffic recorded with ``RECORD_TRAFFIC`` (see :mod:`core.traffic`).
+
+The events are handed to the bot at the pace they were recorded at, divided
+by ``speed``. The replayer shares the event loop with the bot, when the bot
+can't keep up the replay falls behind its schedule, ``behind_*`` in the
+report says by how much.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Any
+
+from core.metrics import Histogram
+from core.traffic import RecordedEvent, read_recording
+
+from .workloads import Workload
+
+if TYPE_CHECKING:
+    from .harness import Harness
+
+__all__ = ("Replay",)
+
+log = logging.getLogger("benchmarks.bot")
+
+# would reset or confuse the connection state of the running bot
+SKIPPED_EVENTS = frozenset({"READY", "RESUMED"})
+
+
+class Replay(Workload):
+    """A recording played back at ``speed`` times the recorded pace, ``limit`` events at most."""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        speed: float = 1.0,
+        limit: int | None = None,
+        batch: int = 100,
+    ) -> None:
+        super().__init__(0, batch=batch)
+        self.path = path
+        self.speed = speed
+        self.limit = limit
+        self.recording: list[RecordedEvent] = []
+        self.behind = Histogram("replay")
+        self.skipped = 0
+        self.failed = 0
+
+    async def setup(self, harness: Harness) -> None:
+        for event in read_recording(self.path):
+            if self.limit is not None and len(self.recording) >= self.limit:
+                break
+            self.recording.append(event)
+        self.events = len(self.recording)
+
+        # the guilds the recording started without, as far as its events tell
+        created: set[int] = set()
+        channels: dict[int, set[int]] = {}
+        for event in self.recording:
+            data = event.data if isinstance(event.data, dict) else {}
+            if event.event == "GUILD_CREATE":
+                # the bot of the recording is someone else after anonymizing
+                harness.discord.adopt(data)
+                created.add(int(data["id"]))
+            elif guild_id := data.get("guild_id"):
+                guild_channels = channels.setdefault(int(guild_id), set())
+                if channel_id := data.get("channel_id"):
+                    guild_channels.add(int(channel_id))
+
+        before = asyncio.all_tasks()
+        for guild_id, channel_ids in channels.items():
+            if guild_id in created or harness.bot.get_guild(guild_id) is not None:
+                continue
+            guild = harness.discord.guild(
+                f"recorded-{guild_id}",
+                members=0,
+                guild_id=guild_id,
+                channel_ids=sorted(channel_ids),
+            )
+            harness.discord.dispatch("GUILD_CREATE", guild)
+        await harness.drain(before)
+
+    async def run(self, harness: Harness) -> int:
+        if not self.recording:
+            return 0
+        loop = asyncio.get_running_loop()
+        first = self.recording[0].at
+        start = loop.time()
+        fired = 0
+        for event in self.recording:
+            if event.event in SKIPPED_EVENTS or event.event not in harness.discord.state.parsers:
+                self.skipped += 1
+                continue
+
+            delay = (event.at - first) / self.speed - (loop.time() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.behind.observe(-delay)
+
+            try:
+                harness.discord.dispatch(event.event, event.data)
+            except Exception:
+                # a parser that chokes on an anonymized payload, the gateway would drop it too
+                log.debug("Failed to replay %s", event.event, exc_info=True)
+                self.failed += 1
+            fired += 1
+            await self.pause(fired)
+        return fired
+
+    def report(self) -> dict[str, Any]:
+        recorded = self.recording[-1].at - self.recording[0].at if self.recording else 0.0
+        return {
+            "speed": self.speed,
+            "recorded_seconds": round(recorded, 3),
+            "scheduled_seconds": round(recorded / self.speed, 3),
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "behind_p99_ms": round(self.behind.quantile(0.99) * 1e3, 3),
+            "behind_max_ms": round(self.behind.slowest * 1e3, 3),
+        }
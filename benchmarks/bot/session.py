@@ -0,0 +1,154 @@
+"""An ``aiohttp.ClientSession`` stand-in that never leaves the machine.
+
+Every request is answered from the handlers registered by host, an empty
+JSON object otherwise, and is counted in :class:`core.metrics.Metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import yarl
+from multidict import CIMultiDict
+
+from core.metrics import Metrics
+
+__all__ = ("FakeResponse", "FakeSession", "Handler")
+
+# (method, url, keyword arguments of the request) -> (status, body)
+Handler = Callable[[str, yarl.URL, dict[str, Any]], Awaitable[tuple[int, Any]]]
+
+
+class FakeResponse:
+    """Awaitable and usable with ``async with``, as the response of ``session.get(...)`` is."""
+
+    def __init__(self, session: FakeSession, method: str, url: str, kwargs: dict[str, Any]) -> None:
+        self.session = session
+        self.method = method
+        self.url = yarl.URL(url)
+        if params := kwargs.get("params"):
+            self.url = self.url.update_query(params)
+        self._kwargs = kwargs
+        self.status = 200
+        self.reason = "OK"
+        self.headers: CIMultiDict[str] = CIMultiDict()
+        self._body = b""
+        self._sent = False
+
+    async def _send(self) -> FakeResponse:
+        if self._sent:
+            return self
+        self._sent = True
+        start = time.perf_counter()
+        failed = False
+        try:
+            await asyncio.sleep(self.session.latency)
+            handler = self.session.handlers.get(self.url.host or "", self.session.default)
+            status, body = await handler(self.method, self.url, self._kwargs)
+            self.status = status
+            if isinstance(body, bytes):
+                self._body = body
+                self.headers["content-type"] = "application/octet-stream"
+            elif isinstance(body, str):
+                self._body = body.encode()
+                self.headers["content-type"] = "text/plain"
+            else:
+                self._body = json.dumps(body).encode()
+                self.headers["content-type"] = "application/json"
+            failed = status >= 500
+            return self
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.session.metrics.count_http(self.url.host or "", time.perf_counter() - start, failed=failed)
+
+    def __await__(self):
+        return self._send().__await__()
+
+    async def __aenter__(self) -> FakeResponse:
+        return await self._send()
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.release()
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "application/octet-stream")
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str | None = None, **kwargs: Any) -> str:
+        return self._body.decode(encoding or "utf-8")
+
+    async def json(
+        self,
+        *,
+        content_type: str | None = "application/json",
+        loads: Callable = json.loads,
+        **kwargs: Any,
+    ) -> Any:
+        return loads(self._body) if self._body else None
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            msg = f"{self.status}, message={self.reason!r}, url={self.url}"
+            raise RuntimeError(msg)
+
+    def release(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+async def _empty(method: str, url: yarl.URL, kwargs: dict[str, Any]) -> tuple[int, Any]:
+    return 200, {}
+
+
+class FakeSession:
+    def __init__(self, metrics: Metrics, *, latency: float = 0.0) -> None:
+        self.metrics = metrics
+        self.latency = latency
+        self.handlers: dict[str, Handler] = {}
+        self.default: Handler = _empty
+        self.closed = False
+
+    def request(self, method: str, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return FakeResponse(self, method.upper(), str(url), kwargs)
+
+    def get(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("DELETE", url, **kwargs)
+
+    def head(self, url: str | yarl.URL, **kwargs: Any) -> FakeResponse:
+        return self.request("HEAD", url, **kwargs)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aenter__(self) -> FakeSession:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -0,0 +1,168 @@
+"""The scripted workloads, each a burst of gateway events or timers.
+
+A workload gets the :class:`benchmarks.bot.harness.Harness` it runs in.
+``setup`` runs before the measurements start, ``run`` fires the events and
+returns how many it fired, the harness waits for the bot to finish with
+them and collects the numbers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+if TYPE_CHECKING:
+    from .harness import Harness
+
+__all__ = ("WORKLOADS", "MemberRaid", "MessageFlood", "ReactionStorm", "TimerBurst", "Workload")
+
+CHAT = (
+    "hey what is everyone doing today lol i just got home from school and want to play some games "
+    "did you see the new update it broke everything again gg"
+).split()
+
+
+class Workload:
+    name: str = "workload"
+
+    def __init__(self, events: int, *, seed: int = 0, batch: int = 1) -> None:
+        self.events = events
+        self.random = random.Random(seed)
+        # events fired between two yields to the event loop
+        self.batch = batch
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} events={self.events}>"
+
+    async def setup(self, harness: Harness) -> None:
+        pass
+
+    async def run(self, harness: Harness) -> int:
+        raise NotImplementedError
+
+    def report(self) -> dict[str, Any]:
+        """What the workload itself measured, reported next to the numbers of the harness."""
+        return {}
+
+    async def pause(self, fired: int) -> None:
+        if fired % self.batch == 0:
+            await asyncio.sleep(0)
+
+
+class MessageFlood(Workload):
+    """Chat from the members of every guild, some with links, mentions, emojis or commands."""
+
+    name = "message_flood"
+    # the first of these that is loaded, extensions may fail to load without their optional dependencies
+    COMMANDS = ("ping", "choose heads,tails")
+
+    async def setup(self, harness: Harness) -> None:
+        # the first message of a guild creates its config, the prefix is read from that
+        before = asyncio.all_tasks()
+        for guild in harness.guilds:
+            harness.discord.send(int(guild["channels"][0]["id"]), guild["members"][1]["user"], "hello")
+        await harness.drain(before)
+        self.prefixes = {guild["id"]: await harness.bot.get_guild_prefixes(int(guild["id"])) for guild in harness.guilds}
+        self.command = next((name for name in self.COMMANDS if harness.bot.get_command(name.split()[0])), self.COMMANDS[0])
+
+    def content(self, guild: dict[str, Any]) -> str:
+        roll = self.random.random()
+        if roll < 0.02:
+            return f"{self.prefixes[guild['id']]}{self.command}"
+        content = " ".join(self.random.choice(CHAT) for _ in range(self.random.randint(2, 25)))
+        if roll < 0.1:
+            return f"{content} https://example.com/{self.random.randint(0, 100)}"
+        if roll < 0.15:
+            return f"{content} <@{self.random.choice(guild['members'])['user']['id']}>"
+        if roll < 0.2:
+            return f"{content} \N{FACE WITH TEARS OF JOY} <:pog:123456789012345678>"
+        return content
+
+    async def run(self, harness: Harness) -> int:
+        discord_ = harness.discord
+        for fired in range(1, self.events + 1):
+            guild = self.random.choice(harness.guilds)
+            channel = self.random.choice(guild["channels"])
+            author = self.random.choice(guild["members"][1:])["user"]
+            discord_.send(int(channel["id"]), author, self.content(guild))
+            await self.pause(fired)
+        return self.events
+
+
+class ReactionStorm(Workload):
+    """Everyone piling reactions onto the last few messages of a channel."""
+
+    name = "reaction_storm"
+    EMOJIS = ("\N{THUMBS UP SIGN}", "\N{FIRE}", "\N{FACE WITH TEARS OF JOY}", "\N{WHITE MEDIUM STAR}")
+
+    async def setup(self, harness: Harness) -> None:
+        guild = harness.guilds[0]
+        channel = int(guild["channels"][0]["id"])
+        author = guild["members"][1]["user"]
+        self.messages = [harness.discord.send(channel, author, f"react to me {index}") for index in range(10)]
+        self.members = [member["user"] for member in guild["members"][1:]]
+
+    async def run(self, harness: Harness) -> int:
+        for fired in range(1, self.events + 1):
+            harness.discord.react(
+                self.random.choice(self.messages),
+                self.random.choice(self.members),
+                self.random.choice(self.EMOJIS),
+            )
+            await self.pause(fired)
+        return self.events
+
+
+class MemberRaid(Workload):
+    """Freshly made accounts joining one guild as fast as the gateway delivers them."""
+
+    name = "member_raid"
+
+    async def run(self, harness: Harness) -> int:
+        guild = harness.guilds[0]
+        for fired in range(1, self.events + 1):
+            harness.discord.join(guild, harness.discord.user(f"raider-{fired}"))
+            await self.pause(fired)
+        return self.events
+
+
+class TimerBurst(Workload):
+    """Timers created together and all due at once, through ``Parrot.create_timer`` and the timer task."""
+
+    name = "timer_burst"
+    EVENT = "benchmark"
+
+    async def setup(self, harness: Harness) -> None:
+        self.completed = 0
+        self.done = asyncio.Event()
+
+        async def on_benchmark_timer_complete(**data: Any) -> None:
+            self.completed += 1
+            if self.completed >= self.events:
+                self.done.set()
+
+        harness.bot.add_listener(on_benchmark_timer_complete)
+        self.listener = on_benchmark_timer_complete
+
+    async def run(self, harness: Harness) -> int:
+        now = discord.utils.utcnow().timestamp()
+        for fired in range(1, self.events + 1):
+            await harness.bot.create_timer(
+                expires_at=now + fired / 1000,
+                _event_name=self.EVENT,
+                message=harness.discord.snowflake(),
+                content="benchmark",
+            )
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout=harness.timeout)
+        finally:
+            harness.bot.remove_listener(self.listener)
+        return self.completed
+
+
+WORKLOADS: dict[str, type[Workload]] = {
+    workload.name: workload for workload in (MessageFlood, ReactionStorm, MemberRaid, TimerBurst)
+}
@@ -0,0 +1,151 @@
+"""Compare the numpy audio captcha engine with the previous byte-by-byte implementation.
+
+Run with `python -m benchmarks.captcha_audio`.
+"""
+
+from __future__ import annotations
+
+import copy
+import random
+import time
+
+from utilities.captcha import audio
+from utilities.captcha.audio import WAVE_SAMPLE_RATE, AudioCaptcha, patch_wave_header
+
+ROUNDS = 5
+
+
+def legacy_change_speed(body, speed=1):
+    if speed == 1:
+        return body
+
+    length = int(len(body) * speed)
+    rv = bytearray(length)
+
+    step = 0
+    for v in body:
+        i = int(step)
+        while i < int(step + speed) and i < length:
+            rv[i] = v
+            i += 1
+        step += speed
+    return rv
+
+
+def legacy_create_noise(length, level=4):
+    noise = bytearray(length)
+    adjust = 128 - int(level / 2)
+    i = 0
+    while i < length:
+        v = random.randint(0, 256)
+        noise[i] = v % level + adjust
+        i += 1
+    return noise
+
+
+def legacy_change_sound(body, level=1):
+    if level == 1:
+        return body
+
+    body = copy.copy(body)
+    for i, v in enumerate(body):
+        if v > 128:
+            v = (v - 128) * level + 128
+            v = max(int(v), 128)
+            v = min(v, 255)
+        elif v < 128:
+            v = 128 - (128 - v) * level
+            v = min(int(v), 128)
+            v = max(v, 0)
+        body[i] = v
+    return body
+
+
+def legacy_mix_wave(src, dst):
+    if len(src) > len(dst):
+        dst, src = src, dst
+
+    for i, sv in enumerate(src):
+        dv = dst[i]
+        if sv < 128 and dv < 128:
+            dst[i] = int(sv * dv / 128)
+        else:
+            dst[i] = min(int(2 * (sv + dv) - sv * dv / 128 - 256), 255)
+    return dst
+
+
+class LegacyAudioCaptcha(AudioCaptcha):
+    """The previous generation path, working on bytearrays."""
+
+    def load(self):
+        super().load()
+        self._cache = {key: [bytearray(voice.tobytes()) for voice in voices] for key, voices in self._cache.items()}
+
+    def _twist_pick(self, key):
+        voice = random.choice(self._cache[key])
+        voice = legacy_change_speed(voice, random.randrange(90, 120) / 100.0)
+        return legacy_change_sound(voice, random.randrange(80, 120) / 100.0)
+
+    def _noise_pick(self):
+        voice = copy.copy(random.choice(self._cache[random.choice(self.choices)]))
+        voice.reverse()
+        voice = legacy_change_speed(voice, random.randrange(8, 16) / 10.0)
+        return legacy_change_sound(voice, random.randrange(2, 6) / 10.0)
+
+    def create_background_noise(self, length, chars):
+        noise = legacy_create_noise(length, 4)
+        pos = 0
+        while pos < length:
+            sound = self._noise_pick()
+            end = pos + len(sound) + 1
+            noise[pos:end] = legacy_mix_wave(sound, noise[pos:end])
+            pos = end + random.randint(0, int(WAVE_SAMPLE_RATE / 10))
+        return noise
+
+    def create_wave_body(self, chars):
+        voices = []
+        inters = []
+        for key in chars:
+            voices.append(self._twist_pick(key))
+            inters.append(random.randint(WAVE_SAMPLE_RATE, WAVE_SAMPLE_RATE * 3))
+
+        length = max(len(a) for a in voices) * len(chars) + sum(inters)
+        bg = self.create_background_noise(length, chars)
+
+        pos = inters[0]
+        for i, v in enumerate(voices):
+            end = pos + len(v) + 1
+            bg[pos:end] = legacy_mix_wave(v, bg[pos:end])
+            pos = end + inters[i]
+
+        beep = bytearray(audio.BEEP.tobytes())
+        silence = bytearray(audio.SILENCE.tobytes())
+        return beep + silence + beep + silence + beep + bg + bytearray(audio.END_BEEP.tobytes())
+
+    def generate(self, chars):
+        if not self._cache:
+            self.load()
+        return patch_wave_header(self.create_wave_body(chars))
+
+
+def timeit(captcha: AudioCaptcha, chars: str) -> float:
+    start = time.perf_counter()
+    captcha.generate(chars)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    legacy, vectorized = LegacyAudioCaptcha(), AudioCaptcha()
+    legacy.load()
+    vectorized.load()
+
+    chars = "".join(vectorized.random(6))
+    old = [timeit(legacy, chars) for _ in range(ROUNDS)]
+    new = [timeit(vectorized, chars) for _ in range(ROUNDS)]
+
+    print(f"legacy     : {min(old):9.2f} ms per captcha")
+    print(f"vectorized : {min(new):9.2f} ms per captcha ({min(old) / min(new):.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Two clusters of the bot in one process, sharing a Redis: a stats request across them and the leader failing over.
+
+Run with `python -m benchmarks.cluster`.
+
+Both are booted with :class:`benchmarks.bot.Harness`, each in the guilds of
+its shards. The failover is timed once with the leader stopping cleanly,
+which gives up the lead, and once with it going away without a word, after
+which the other cluster waits for the lease to run out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+from time import perf_counter
+
+from benchmarks.bot import Harness, InMemoryRedis
+from core.cluster import Cluster
+
+CLUSTERS = 2
+SHARDS = 4
+GUILDS = 8
+# seconds, the default is 15
+LEASE = 3
+ROUNDS = 50
+
+
+async def failover(harnesses: list[Harness], *, clean: bool) -> float:
+    leader = next(harness for harness in harnesses if harness.bot.ipc.leader)
+    other = next(harness for harness in harnesses if harness is not leader)
+    started = perf_counter()
+    if clean:
+        await leader.bot.ipc.stop()
+    else:
+        # a process that was killed, the lease stays until it runs out
+        leader.bot.ipc._task.cancel()
+        leader.bot.ipc.leader = False
+    while not other.bot.ipc.leader:
+        await asyncio.sleep(0.01)
+    took = perf_counter() - started
+    await leader.bot.ipc.start()
+    return took
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    redis = InMemoryRedis()
+    harnesses = [
+        Harness(guilds=GUILDS // CLUSTERS, members=20, cluster=Cluster(index, CLUSTERS, SHARDS), redis=redis)
+        for index in range(CLUSTERS)
+    ]
+    try:
+        for harness in harnesses:
+            await harness.start()
+        for harness in harnesses:
+            harness.bot.ipc.lease = LEASE
+        # the election loops pick the lease up once they renewed
+        await asyncio.sleep(LEASE)
+
+        bot = harnesses[-1].bot
+        timings: list[float] = []
+        for _ in range(ROUNDS):
+            started = perf_counter()
+            answers = await bot.ipc.request("stats")
+            timings.append(perf_counter() - started)
+        for cluster, stats in sorted(answers.items()):
+            print(f"cluster {cluster}: shards {stats['shards']}, {stats['guilds']} guilds, leader {stats['leader']}")
+        print(f"total: {sum(stats['guilds'] for stats in answers.values())} guilds")
+        print(f"stats request: {statistics.median(timings) * 1e3:.2f}ms median of {ROUNDS}")
+
+        print(f"failover, leader stopped: {await failover(harnesses, clean=True):.2f}s")
+        print(f"failover, leader gone: {await failover(harnesses, clean=False):.2f}s with a {LEASE}s lease")
+    finally:
+        for harness in harnesses:
+            await harness.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Compare the bitboard Connect Four engine with the old heuristic computer player.
+
+Run with `python -m benchmarks.connect_four`.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from interactions.buttons.__connect_four import Bitboard, Engine
+
+SIZE = 7
+GAMES = 20
+
+
+class LegacyAI:
+    """The previous computer player: win if possible, else block, else random, over a list-of-lists grid."""
+
+    def __init__(self, grid: list[list[int]], rng: random.Random) -> None:
+        self.grid = grid
+        self.size = len(grid)
+        self.rng = rng
+        self.nodes = 0
+
+    def check_win(self, coords: tuple[int, int], player_num: int) -> bool:
+        self.nodes += 1
+        for axis in ([(-1, 0), (1, 0)], [(0, 1), (0, -1)], [(-1, 1), (1, -1)], [(-1, -1), (1, 1)]):
+            counters_in_a_row = 1
+            for row_incr, column_incr in axis:
+                row, column = coords
+                row += row_incr
+                column += column_incr
+                while 0 <= row < self.size and 0 <= column < self.size and self.grid[row][column] == player_num:
+                    counters_in_a_row += 1
+                    row += row_incr
+                    column += column_incr
+            if counters_in_a_row >= 4:
+                return True
+        return False
+
+    def possible(self) -> list[tuple[int, int]]:
+        coords = []
+        for column_num in range(self.size):
+            for row_num in reversed(range(self.size)):
+                if not self.grid[row_num][column_num]:
+                    coords.append((row_num, column_num))
+                    break
+        return coords
+
+    def play(self, me: int) -> tuple[int, int] | None:
+        possible = self.possible()
+        if not possible:
+            return None
+        win = None if self.rng.randint(1, 10) == 1 else next((c for c in possible if self.check_win(c, me)), None)
+        block = None if self.rng.randint(1, 4) == 1 else next((c for c in possible if self.check_win(c, 3 - me)), None)
+        return win or block or self.rng.choice(possible)
+
+
+def drop(grid: list[list[int]], column: int, player: int) -> tuple[int, int]:
+    row = max(r for r in range(len(grid)) if not grid[r][column])
+    grid[row][column] = player
+    return row, column
+
+
+def match(difficulty: str, seed: int) -> str:
+    """One game, the engine plays second like it does in the bot."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    grid = [[0] * SIZE for _ in range(SIZE)]
+    legacy = LegacyAI(grid, rng)
+    engine = Engine(SIZE, SIZE)
+    for turn in range(SIZE * SIZE):
+        player = 1 + turn % 2
+        if player == 1:
+            coords = legacy.play(1)
+        else:
+            position = Bitboard.from_grid(grid, player=2)
+            column = engine.play(position, difficulty)
+            coords = (position.row_of(column), column)
+        if coords is None:
+            break
+        grid[coords[0]][coords[1]] = player
+        if legacy.check_win(coords, player):
+            return "engine" if player == 2 else "legacy"
+    return "draw"
+
+
+def nodes_per_second() -> tuple[float, float]:
+    rng = random.Random(0)
+    legacy_nodes = engine_nodes = 0
+    legacy_time = engine_time = 0.0
+    for _ in range(10):
+        grid = [[0] * SIZE for _ in range(SIZE)]
+        for turn in range(12):
+            drop(grid, rng.choice([c for c in range(SIZE) if not grid[0][c]]), 1 + turn % 2)
+
+        legacy = LegacyAI([row[:] for row in grid], rng)
+        start = time.perf_counter()
+        for _ in range(200):
+            legacy.play(2)
+        legacy_time += time.perf_counter() - start
+        legacy_nodes += legacy.nodes
+
+        engine = Engine(SIZE, SIZE)
+        start = time.perf_counter()
+        engine.best_move(Bitboard.from_grid(grid, player=1), depth=7)
+        engine_time += time.perf_counter() - start
+        engine_nodes += engine.nodes
+    return legacy_nodes / legacy_time, engine_nodes / engine_time
+
+
+def main() -> None:
+    legacy_nps, engine_nps = nodes_per_second()
+    print(f"legacy AI      : {legacy_nps:12,.0f} positions/s (one check_win call per position)")
+    print(f"bitboard engine: {engine_nps:12,.0f} nodes/s")
+
+    for difficulty in ("easy", "medium", "hard"):
+        start = time.perf_counter()
+        results = [match(difficulty, seed) for seed in range(GAMES)]
+        elapsed = time.perf_counter() - start
+        print(
+            f"{difficulty:<7} vs legacy: {results.count('engine'):2} won, {results.count('legacy'):2} lost, "
+            f"{results.count('draw'):2} drawn in {elapsed:6.1f} s",
+        )
+
+
+if __name__ == "__main__":
+    main()
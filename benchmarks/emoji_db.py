@@ -0,0 +1,85 @@
+"""Compare the indexed emoji database and trie tokenizer with the old linear scans and regexes.
+
+Run with `python -m benchmarks.emoji_db`.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+from collections.abc import Callable
+
+import emojis
+from emojis import db
+from emojis.db.db import EMOJI_DB
+from emojis.emojis import ALIAS_TO_EMOJI, EMOJI_TO_ALIAS
+
+ROUNDS = 200
+
+# the previous implementation: one alternation of every emoji, longest first, and one of every alias
+LEGACY_EMOJI_RE = re.compile(
+    "({})".format("|".join(re.escape(emoji) for emoji in sorted(ALIAS_TO_EMOJI.values(), key=len, reverse=True))),
+)
+LEGACY_ALIAS_RE = re.compile("({})".format("|".join(re.escape(alias) for alias in ALIAS_TO_EMOJI)))
+
+
+def legacy_count(msg: str) -> int:
+    return len([match.group() for match in LEGACY_EMOJI_RE.finditer(msg)])
+
+
+def legacy_decode(msg: str) -> str:
+    return LEGACY_EMOJI_RE.sub(lambda match: EMOJI_TO_ALIAS[match.group(0)], msg)
+
+
+def legacy_encode(msg: str) -> str:
+    return LEGACY_ALIAS_RE.sub(lambda match: ALIAS_TO_EMOJI[match.group(0)], msg)
+
+
+def legacy_by_alias(alias: str) -> db.Emoji | None:
+    return next(filter(lambda emoji: alias in emoji.aliases, EMOJI_DB), None)
+
+
+def legacy_by_tag(tag: str) -> list[db.Emoji]:
+    return list(filter(lambda emoji: tag.lower() in emoji.tags, EMOJI_DB))
+
+
+def messages(rng: random.Random) -> dict[str, str]:
+    codes = [emoji.emoji for emoji in EMOJI_DB]
+    words = "the quick brown fox jumps over the lazy dog".split()
+    return {
+        "plain": " ".join(rng.choice(words) for _ in range(150)),
+        "mixed": " ".join(rng.choice(words + codes[:50]) for _ in range(150)),
+        "emoji only": "".join(rng.choice(codes) for _ in range(300)),
+        "skin tones and ZWJ": "👍🏽👩🏽‍💻👨‍👩‍👧 ok " * 40,
+    }
+
+
+def timeit(func: Callable, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def compare(name: str, legacy: Callable, new: Callable, *args) -> None:
+    old, now = timeit(legacy, *args), timeit(new, *args)
+    print(f"{name:36}: {old:10.1f} us -> {now:8.1f} us ({old / now:6.1f}x)")
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for name, text in messages(rng).items():
+        compare(f"count  {name}", legacy_count, emojis.count, text)
+        compare(f"decode {name}", legacy_decode, emojis.decode, text)
+
+    aliases = " ".join(f":{rng.choice(EMOJI_DB).aliases[0]}: hello" for _ in range(50))
+    compare("encode aliases", legacy_encode, emojis.encode, aliases)
+
+    last = EMOJI_DB[-1].aliases[0]
+    compare("alias lookup (last entry)", legacy_by_alias, db.get_emoji_by_alias, last)
+    compare("tag lookup", legacy_by_tag, lambda tag: list(db.get_emojis_by_tag(tag)), "happy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure what debugging the gateway costs per received payload.
+
+Run with `python -m benchmarks.gateway_events`.
+
+``DiscordWebSocket.received_message`` is fed the same MESSAGE_CREATE over
+and over with a parser that does nothing. ``debug events`` is what
+``enable_debug_events=True`` did so that ``on_socket_raw_receive`` could
+keep the last ten payloads: a dispatch, and with it a task, per payload.
+The other rows are :class:`core.gateway.GatewayEventRing` with the shard
+untraced, traced, and traced with the payloads captured.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+
+from discord.gateway import DiscordWebSocket
+
+from core.gateway import GatewayEventRing
+
+ROUNDS = 5
+EVENTS = 50_000
+
+PAYLOAD = json.dumps(
+    {
+        "op": 0,
+        "t": "MESSAGE_CREATE",
+        "s": 1,
+        "d": {
+            "id": "1161633702442482882",
+            "channel_id": "1161633702444719151",
+            "guild_id": "1161633702444620361",
+            "author": {"id": "1161633702442084648", "username": "someone", "discriminator": "0", "avatar": None},
+            "content": "hey what is everyone doing today",
+            "timestamp": "2024-01-01T00:00:00.000000+00:00",
+            "mentions": [],
+            "attachments": [],
+            "embeds": [],
+        },
+    },
+)
+
+
+def websocket(dispatch) -> DiscordWebSocket:
+    ws = DiscordWebSocket(None, loop=asyncio.get_running_loop())  # type: ignore
+    ws._discord_parsers = {"MESSAGE_CREATE": lambda data: None}
+    ws._dispatch = dispatch
+    ws.shard_id = 0
+    ws.sequence = None
+    return ws
+
+
+async def run(mode: str) -> float:
+    kept: deque[str] = deque(maxlen=10)
+
+    async def on_socket_raw_receive(message: str) -> None:
+        kept.append(message)
+
+    def dispatch(event: str, *args: object) -> None:
+        # Client.dispatch schedules a task for every listener of the event
+        if event == "socket_raw_receive":
+            asyncio.create_task(on_socket_raw_receive(*args))
+
+    ws = websocket(dispatch)
+    ring = GatewayEventRing()
+    if mode == "debug events":
+        ws.log_receive = ws.debug_log_receive  # type: ignore
+    elif mode != "untraced":
+        ring.enable(0, capture=mode == "captured", websocket=ws)
+
+    start = time.perf_counter()
+    for index in range(EVENTS):
+        await ws.received_message(PAYLOAD)
+        if index % 100 == 0:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    baseline = None
+    for mode in ("untraced", "traced", "captured", "debug events"):
+        elapsed = min(asyncio.run(run(mode)) for _ in range(ROUNDS)) / EVENTS * 1e6
+        baseline = baseline or elapsed
+        print(f"{mode:12} {elapsed:6.2f} us/payload  overhead {elapsed - baseline:5.2f} us")
+
+
+if __name__ == "__main__":
+    main()
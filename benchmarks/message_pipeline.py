@@ -0,0 +1,273 @@
+"""Compare the message pipeline with one ``on_message`` listener per feature, on a synthetic message stream.
+
+Run with `python -m benchmarks.message_pipeline`.
+
+Only CPU spent in the bot is measured. The database round trips some of the
+old listeners made for every message (suggestion channel lookup, global chat
+lookup, AFK refresh, scam API call) are gone as well but are not counted here.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import time
+from types import SimpleNamespace
+
+import emojis
+from core.pipeline import MessagePipeline, Stage
+
+ROUNDS = 5
+MESSAGES = 2000
+BOT_ID = 1
+GUILD_ID = 10
+
+TRIGGER = ("ok google,", "ok google ", "hey google,", "hey google ")
+OP = ["+", "-", "*", "/", "sin", "cos", "tan", "cot", "sec", "csc", "log", "ln", "sqrt", "^"]
+SCAM_RE = r"(?:[A-z0-9](?:[A-z0-9-]{0,61}[A-z0-9])?\.)+[A-z0-9][A-z0-9-]{0,61}[A-z0-9]"
+TOKEN_REGEX = re.compile(r"[a-zA-Z0-9_-]{23,28}\.[a-zA-Z0-9_-]{6,7}\.[a-zA-Z0-9_-]{27,}")
+GITHUB_RE = re.compile(r"https://github\.com/(?P<repo>[a-zA-Z0-9-]+/[\w.-]+)/blob/(?P<path>[^#>]+)", re.IGNORECASE)
+SNIPPET_HOSTS = frozenset({"github.com", "gist.github.com", "gitlab.com", "bitbucket.org"})
+
+CONFIG = {
+    GUILD_ID: {
+        "opts": {"gitlink_enabled": True, "equation_enabled": True},
+        "leveling": {"enable": True, "ignore_role": [], "ignore_channel": []},
+        "global_chat": {"enable": False, "channel_id": None},
+        "suggestion_channel": 500,
+    },
+}
+HIGHLIGHT_WORDS = {user_id: [{"guild_id": GUILD_ID, "word": f"word{user_id}"}] for user_id in range(50)}
+AFK_USERS = {7, 8}
+
+CHAT = "hey what is everyone doing today lol i just got home from school and want to play some games".split()
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, content: str, *, bot: bool = False) -> None:
+        self.id = message_id
+        self.content = content
+        self.author = SimpleNamespace(id=100 + message_id % 40, bot=bot)
+        self.guild = SimpleNamespace(id=GUILD_ID)
+        self.channel = SimpleNamespace(id=200 + message_id % 3)
+        self.webhook_id = None
+
+    @property
+    def raw_mentions(self) -> list[int]:
+        return [int(x) for x in re.findall(r"<@!?([0-9]{15,20})>", self.content)]
+
+
+def message_stream() -> list[FakeMessage]:
+    rng = random.Random(0)
+    messages = []
+    for message_id in range(MESSAGES):
+        content = " ".join(rng.choice(CHAT) for _ in range(rng.randint(2, 25)))
+        roll = rng.random()
+        if roll < 0.1:
+            content += " https://example.com/some/page"
+        elif roll < 0.15:
+            content += " <@123456789012345678>"
+        elif roll < 0.2:
+            content += " \N{FACE WITH TEARS OF JOY}\N{FACE WITH TEARS OF JOY} <:pog:123456789012345678>"
+        messages.append(FakeMessage(message_id, content, bot=roll > 0.95))
+    return messages
+
+
+async def nothing() -> None:
+    return None
+
+
+def legacy_listeners() -> list:
+    """The checks each old listener ran on its own, up to where a typical message stopped."""
+
+    async def bot_on_message(message):
+        if message.guild is None or message.author.bot:
+            return
+        CONFIG[message.guild.id]  # noqa: B018
+        re.fullmatch(rf"<@!?{BOT_ID}>", message.content)
+
+    async def snippets(message):
+        if message.guild.id == BOT_ID:
+            return
+        GITHUB_RE.findall(message.content)
+
+    async def scam(message):
+        if message.author.id == BOT_ID:
+            return
+        re.findall(SCAM_RE, message.content)
+
+    async def equation(message):
+        message.content.replace("\N{MULTIPLICATION SIGN}", "*").replace("\N{DIVISION SIGN}", "/")
+        if message.author.bot or len(message.content) < 3:
+            return
+        if all(i not in message.content for i in OP):
+            return
+        CONFIG[message.guild.id]["opts"]["equation_enabled"]  # noqa: B018
+
+    async def quick_answer(message):
+        message.content.lower().startswith(TRIGGER)
+
+    async def afk(message):
+        if message.author.id in AFK_USERS:
+            return
+        for user_id in message.raw_mentions:
+            if user_id in AFK_USERS:
+                return
+
+    async def global_chat(message):
+        if not message.content:
+            return
+        CONFIG[message.guild.id].get("global_chat")
+
+    async def message_cache(message):
+        if message.author.id in {}:
+            return
+
+    async def automod(message):
+        if message.guild is None or message.author.id == BOT_ID:
+            return
+        {}.get(message.guild.id)
+
+    async def leveling(message):
+        if message.guild is None or message.author.bot:
+            return
+        CONFIG[message.guild.id]["leveling"]["enable"]  # noqa: B018
+
+    async def highlight(message):
+        if message.author.bot:
+            return
+        possible = []
+        for user_id, words in HIGHLIGHT_WORDS.items():
+            possible.extend({**word, "user_id": user_id} for word in words if word["guild_id"] == message.guild.id)
+        for word in possible:
+            re.match(rf"(.*)({re.escape(word['word'])})(.*)", message.content, re.IGNORECASE | re.DOTALL | re.MULTILINE)
+
+    async def highlight_activity(message):
+        return
+
+    async def autoresponder(message):
+        if message.guild is None or message.author.bot or not {}.get(message.guild.id):
+            return
+
+    async def suggestion(message):
+        if message.author.bot or message.guild is None:
+            return
+        if CONFIG[message.guild.id].get("suggestion_channel") != message.channel.id:
+            return
+
+    async def token_scan(message):
+        [token for token in TOKEN_REGEX.findall(message.content)]  # noqa: C416
+
+    async def anagram(message):
+        if message.author.bot:
+            return
+        {}.get(message.channel.id)
+
+    async def easter(message):
+        return
+
+    return [
+        bot_on_message,
+        snippets,
+        scam,
+        equation,
+        quick_answer,
+        afk,
+        global_chat,
+        message_cache,
+        automod,
+        leveling,
+        highlight,
+        highlight_activity,
+        autoresponder,
+        suggestion,
+        token_scan,
+        anagram,
+        easter,
+    ]
+
+
+def pipeline() -> MessagePipeline:
+    """The same listeners as stages, with the checks they were migrated with."""
+    words = [(word["word"].lower(), word) for words in HIGHLIGHT_WORDS.values() for word in words]
+
+    async def highlight(features):
+        for lowered, _ in words:
+            if lowered in features.lowered:
+                pass
+
+    pipeline = MessagePipeline(bot_id=BOT_ID)
+    stages = [
+        Stage("snippets", lambda f: nothing(), ignore_bots=False, check=lambda f: f.domains & SNIPPET_HOSTS),
+        Stage("scam_detection", lambda f: nothing(), ignore_bots=False, check=lambda f: f.domains),
+        Stage(
+            "equation_solver",
+            lambda f: nothing(),
+            check=lambda f: len(f.content) >= 3 and (f.config or {}).get("opts", {}).get("equation_enabled"),
+        ),
+        Stage("quick_answer", lambda f: nothing(), ignore_bots=False, check=lambda f: f.lowered.startswith(TRIGGER)),
+        Stage(
+            "afk",
+            lambda f: nothing(),
+            ignore_bots=False,
+            check=lambda f: f.author.id in AFK_USERS or not AFK_USERS.isdisjoint(f.mentions),
+        ),
+        Stage("global_chat", lambda f: nothing(), ignore_bots=False, check=lambda f: f.config["global_chat"]["enable"]),
+        Stage("message_cache", lambda f: nothing(), guild_only=False, ignore_bots=False, ignore_self=False),
+        Stage("automod", lambda f: nothing(), ignore_bots=False, check=lambda f: {}.get(f.guild.id)),
+        Stage("leveling", lambda f: nothing(), after=("automod",), check=lambda f: f.config["leveling"]["enable"]),
+        Stage("highlight", highlight, check=lambda f: words),
+        Stage("highlight_activity", lambda f: nothing(), guild_only=False, ignore_bots=False, ignore_self=False),
+        Stage("autoresponder", lambda f: nothing(), check=lambda f: {}.get(f.guild.id)),
+        Stage("suggestion", lambda f: nothing(), check=lambda f: f.config.get("suggestion_channel") == f.channel.id),
+        Stage("token_scan", lambda f: nothing(), ignore_bots=False, check=lambda f: f.content.count(".") >= 2),
+        Stage("anagram", lambda f: nothing(), check=lambda f: f.channel.id in {}),
+        Stage("easter_riddle", lambda f: nothing(), ignore_bots=False, check=lambda f: None),
+    ]
+    for stage in stages:
+        pipeline.add(stage)
+    return pipeline
+
+
+async def run_legacy(messages: list[FakeMessage]) -> float:
+    listeners = legacy_listeners()
+    start = time.process_time()
+    for message in messages:
+        # what Client.dispatch does: a task per listener
+        tasks = [asyncio.create_task(listener(message)) for listener in listeners]
+        await asyncio.gather(*tasks)
+    return time.process_time() - start
+
+
+async def run_pipeline(messages: list[FakeMessage]) -> float:
+    pipe = pipeline()
+    start = time.process_time()
+    for message in messages:
+        tasks = pipe.run(pipe.features(message, config=CONFIG.get(message.guild.id)))
+        if tasks:
+            await asyncio.gather(*tasks.values())
+    return time.process_time() - start
+
+
+def main() -> None:
+    messages = message_stream()
+    emojis.count("warm up")
+    legacy = min(asyncio.run(run_legacy(messages)) for _ in range(ROUNDS)) / MESSAGES * 1e6
+    new = min(asyncio.run(run_pipeline(messages)) for _ in range(ROUNDS)) / MESSAGES * 1e6
+    print(f"{MESSAGES} messages  listeners {legacy:7.1f} us/message  pipeline {new:7.1f} us/message ({legacy / new:4.1f}x)")
+
+    pipe = pipeline()
+
+    async def timed() -> None:
+        for message in messages:
+            tasks = pipe.run(pipe.features(message, config=CONFIG.get(message.guild.id)))
+            await asyncio.gather(*tasks.values())
+
+    asyncio.run(timed())
+    for name, timing in pipe.timings().items():
+        print(f"  {name:20} ran {timing.calls:5}  skipped {timing.skipped:5}  avg {timing.average * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure what the instrumentation costs per listener call, command and Mongo command.
+
+Run with `python -m benchmarks.metrics`.
+
+Every listener is awaited through ``Client._run_event`` and then through
+``Parrot._run_event``, the difference is the price of the histogram. The
+listener does nothing, so the numbers are the overhead alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import discord
+from core import Parrot
+from core.metrics import Metrics, MongoCommandListener, current_site
+
+ROUNDS = 5
+EVENTS = 100_000
+
+
+class Listeners:
+    async def on_message(self, message: object) -> None:
+        return None
+
+
+async def on_error(event: str, *args: object, **kwargs: object) -> None:
+    return None
+
+
+async def run(run_event, bot: SimpleNamespace) -> float:
+    listener = Listeners().on_message
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        await run_event(bot, listener, "message", None)
+    return time.perf_counter() - start
+
+
+def events(request_id: int) -> tuple[SimpleNamespace, SimpleNamespace]:
+    return (
+        SimpleNamespace(command_name="find", command={"find": "x"}, database_name="mainDB", request_id=request_id),
+        SimpleNamespace(request_id=request_id, duration_micros=800),
+    )
+
+
+def main() -> None:
+    bot = SimpleNamespace(metrics=Metrics(), on_error=on_error)
+    plain = min(asyncio.run(run(discord.Client._run_event, bot)) for _ in range(ROUNDS)) / EVENTS * 1e6
+    timed = min(asyncio.run(run(Parrot._run_event, bot)) for _ in range(ROUNDS)) / EVENTS * 1e6
+    print(f"listener   plain {plain:5.2f} us/event  timed {timed:5.2f} us/event  overhead {timed - plain:5.2f} us")
+
+    listener = MongoCommandListener(Metrics())
+    prepared = [events(request_id) for request_id in range(EVENTS)]
+    current_site.set("listener:Automod.on_message")
+    start = time.perf_counter()
+    for started, succeeded in prepared:
+        listener.started(started)
+        listener.succeeded(succeeded)
+    per_command = (time.perf_counter() - start) / EVENTS * 1e6
+    print(f"mongo      {per_command:5.2f} us/command")
+
+    histogram = bot.metrics.listener("message", Listeners.on_message.__qualname__)
+    print(f"recorded   {histogram.count} calls, {histogram.average * 1e6:5.2f} us on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare the bounded, incremental isometric renderer with the old full-canvas one.
+
+Run with `python -m benchmarks.minecraft`.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from interactions.buttons.__constants import MINECRAFT_ASSETS, SELECTOR_BACK, SELECTOR_FRONT, TILE_FILES
+from interactions.buttons.__minecraft import IsometricRenderer, get_atlas
+
+ROUNDS = 20
+
+
+def legacy_render(cells: dict[tuple[int, int, int], str], selector: tuple[int, int, int]) -> tuple[BytesIO, int]:
+    """The previous implementation: a 5120x5120 canvas, every 64x64 tile pasted, then cropped."""
+    t = 4
+    resx = resy = 1024 * 5
+    canvas = Image.new("RGBA", (resx, resy), (25, 25, 25, 0))
+    mid = round(resx / 2)
+
+    tiles = {key: Image.open(f"{MINECRAFT_ASSETS}/{file}").convert("RGBA") for key, file in TILE_FILES.items()}
+    back = Image.open(f"{MINECRAFT_ASSETS}/{SELECTOR_BACK}").convert("RGBA")
+    front = Image.open(f"{MINECRAFT_ASSETS}/{SELECTOR_FRONT}").convert("RGBA")
+
+    for lvl, i, j in sorted(cells.keys() | {selector}):
+        fx = mid + j * t * 7 - i * t * 7
+        fy = mid + j * t * 4 + i * t * 4 - lvl * t * 7
+        if (lvl, i, j) == selector:
+            canvas.paste(back, (fx, fy), back)
+        if img := tiles.get(cells.get((lvl, i, j), "")):
+            canvas.paste(img, (fx, fy), img)
+        if (lvl, i, j) == selector:
+            canvas.paste(front, (fx, fy), front)
+
+    crop = canvas.crop(canvas.getbbox())
+    buf = BytesIO()
+    crop.save(buf, "PNG")
+    buf.seek(0)
+    return buf, len(cells)
+
+
+def world(size: int = 10) -> dict[tuple[int, int, int], str]:
+    rng = random.Random(0)
+    blocks = list(TILE_FILES)
+    return {(0, i, j): rng.choice(blocks) for i in range(size) for j in range(size)}
+
+
+def timeit(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    get_atlas()  # decoded once per process, not per render
+    cells = world(20)
+    selector = (1, 5, 5)
+    rng = random.Random(1)
+
+    legacy = [timeit(legacy_render, cells, selector) for _ in range(3)]
+    full = [timeit(IsometricRenderer().render, cells, list(selector)) for _ in range(ROUNDS)]
+
+    renderer = IsometricRenderer()
+    renderer.render(cells, list(selector))
+    incremental = []
+    for _ in range(ROUNDS):
+        cell = (1, rng.randrange(1, 19), rng.randrange(1, 19))
+        edited = {**cells, cell: rng.choice(list(TILE_FILES))}
+        incremental.append(timeit(renderer.render, edited, list(selector)))
+
+    # compositing alone, without the PNG encoding shared by every strategy
+    layers = {cell: (code, False) for cell, code in cells.items()}
+    composite_full = [timeit(IsometricRenderer()._composite, layers) for _ in range(ROUNDS)]
+    composite_incremental = []
+    for _ in range(ROUNDS):
+        cell = (1, rng.randrange(1, 19), rng.randrange(1, 19))
+        composite_incremental.append(timeit(renderer._composite, {**layers, cell: (rng.choice(list(TILE_FILES)), False)}))
+
+    frame = renderer._frame
+    assert frame is not None
+    print(f"legacy render         : {min(legacy):8.2f} ms  canvas {5120 * 5120 * 4 / 2**20:8.2f} MiB")
+    print(f"bounded full render   : {min(full):8.2f} ms  canvas {frame.width * frame.height * 4 / 2**20:8.2f} MiB")
+    print(f"incremental render    : {min(incremental):8.2f} ms")
+    print(f"full composite        : {min(composite_full):8.2f} ms")
+    print(f"incremental composite : {min(composite_incremental):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare the compiled profanity filter with the old word by word check of global chat.
+
+The adversarial texts are runs of leet symbols that a pattern with unbounded
+repeats backtracks on at every position, they should take as long as plain text.
+
+Run with `python -m benchmarks.profanity`.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from collections.abc import Callable
+
+from utilities.profanity import ProfanityFilter
+
+ROUNDS = 200
+WORDS = "the quick brown fox jumps over the lazy dog, some classic assassin hello world".split()
+ADVERSARIAL = {
+    "plain": "x" * 4000,
+    "$ * 4000": "$" * 4000,
+    "+ * 4000": "+" * 4000,
+    "@ * 4000": "@" * 4000,
+    "1| * 2000": "1|" * 2000,
+    "as * 2000": "as" * 2000,
+}
+
+
+def legacy_refrain(msg: str, bad_words: dict[str, bool]) -> bool:
+    """The previous check: every listed word against the message split on spaces."""
+    if "chod" in msg.replace(",", "").split(" "):
+        return False
+    return all(bad_word.lower() not in msg.replace(",", "").split(" ") for bad_word in bad_words)
+
+
+def timeit(func: Callable, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main() -> None:
+    with open("extra/profanity.json", encoding="utf-8") as f:
+        bad_words: dict[str, bool] = json.load(f)
+    whole = ProfanityFilter(bad_words)
+    anywhere = ProfanityFilter(bad_words, whole_words=False)
+
+    rng = random.Random(0)
+    for length in (10, 100, 400, 2000):
+        clean = " ".join(rng.choice(WORDS) for _ in range(length))
+        dirty = f"{clean} sh1t"
+        assert legacy_refrain(clean.lower(), bad_words) and whole.contains(dirty)
+
+        old = timeit(legacy_refrain, clean.lower(), bad_words)
+        new = timeit(whole.contains, clean)
+        print(f"{length:5} words  legacy {old:9.1f} us  whole words {new:8.1f} us ({old / new:5.1f}x)", end="")
+        print(f"  substring {timeit(anywhere.contains, clean):8.1f} us  mask {timeit(whole.mask, dirty):8.1f} us")
+
+    for name, text in ADVERSARIAL.items():
+        print(f"{name:>11}  whole words {timeit(whole.contains, text):8.1f} us  mask {timeit(whole.mask, text):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time to the first command after a cold start, extensions loaded one at a time against concurrently.
+
+Run with `python -m benchmarks.startup`.
+
+The bot is booted against the fakes of :mod:`benchmarks.bot`, every Mongo
+operation sleeping ``DB_LATENCY`` like a database over the network would.
+Once it is ready a member sends a command, the clock stops when the reply
+is posted. Every round is a new interpreter, so every import is a cold one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+ROUNDS = 3
+DB_LATENCY = 0.02
+# the first of these that loaded, as in benchmarks.bot.workloads.MessageFlood
+COMMANDS = ("ping", "choose heads,tails")
+REPLY = "POST /channels/{channel_id}/messages"
+
+
+async def boot(concurrency: int) -> dict[str, float]:
+    import logging
+
+    from benchmarks.bot.harness import Harness
+
+    logging.disable(logging.CRITICAL)
+    harness = Harness(guilds=3, members=20, db_latency=DB_LATENCY, startup_concurrency=concurrency)
+    began = perf_counter()
+    try:
+        await harness.start(settle=False)
+        ready = perf_counter() - began
+
+        bot, discord_ = harness.bot, harness.discord
+        guild = harness.guilds[0]
+        command = next((name for name in COMMANDS if bot.get_command(name.split()[0])), COMMANDS[0])
+        replies = discord_.routes[REPLY]
+        discord_.send(int(guild["channels"][0]["id"]), guild["members"][1]["user"], f"<@{bot.user.id}> {command}")
+        while discord_.routes[REPLY] == replies:
+            await asyncio.sleep(0.001)
+        return {
+            "loaded": bot.startup.loaded_at or 0.0,
+            "ready": ready,
+            "first_command": perf_counter() - began,
+        }
+    finally:
+        await harness.close()
+
+
+def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(asyncio.run(boot(int(sys.argv[2])))))
+        return
+
+    results: dict[int, list[dict[str, float]]] = {1: [], 16: []}
+    for _ in range(ROUNDS):
+        for concurrency, rounds in results.items():
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", "--child", str(concurrency)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            rounds.append(json.loads(child.stdout.splitlines()[-1]))
+
+    for concurrency, rounds in results.items():
+        medians = {key: statistics.median(result[key] for result in rounds) for key in rounds[0]}
+        print(
+            f"concurrency {concurrency:2}  extensions loaded {medians['loaded']:6.3f}s  "
+            f"ready {medians['ready']:6.3f}s  first command {medians['first_command']:6.3f}s",
+        )
+
+
+if __name__ == "__main__":
+    main()
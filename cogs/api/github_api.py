@@ -11,6 +11,7 @@ import yarl
 
 import discord
 from core import Cog, Context, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands
 
 TOKEN_REGEX = re.compile(r"[a-zA-Z0-9_-]{23,28}\.[a-zA-Z0-9_-]{6,7}\.[a-zA-Z0-9_-]{27,}")
@@ -116,12 +117,14 @@ class Gist(Cog, command_attrs={"hidden": True}):
     def get_tokens(self, argument: str) -> list[str]:
         return [token for token in TOKEN_REGEX.findall(argument) if validate_token(token)]
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
-        if not message.guild or message.guild.id == DISCORD_PY_ID:
-            return
-
+    @Cog.stage(
+        "token_scan",
+        ignore_bots=False,
+        ignore_self=False,
+        check=lambda self, f: f.guild.id != DISCORD_PY_ID and f.content.count(".") >= 2,
+    )
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         tokens = self.get_tokens(message.content)
         if not tokens:
             return
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import json
-from typing import TypedDict
+from typing import Any, TypedDict
 
 import discord
 from core import Cog, Context, Parrot
+from core.cache import SharedCache
+from core.pipeline import HALT, MessageFeatures
 from discord.ext import commands
 
 from .parsers import Action, Condition, Trigger
@@ -28,9 +30,16 @@ class AutomaticModeration(Cog):
 
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
-        self._was_ready = False
 
-        self._auto_mod: dict[int, dict[str, AutoModRawObject]] = {}
+        # shared with the other processes, they compile the rules again when these change
+        self._auto_mod: SharedCache[int, dict[str, AutoModRawObject]] = bot.caches.cache(
+            "automod_configurations",
+            size=None,
+            ttl=24 * 60 * 60,
+            loader=self.__load_configuration,
+            refresh=True,
+        )
+        self._auto_mod.listeners.append(self.__configuration_changed)
         # {
         #     guild_id: {
         #         "rule_name": {
@@ -54,7 +63,11 @@ class AutomaticModeration(Cog):
         #     ...
         # }
 
-        self._voilations: dict[int, dict[str, dict[str, int]]] = {}
+        self._voilations: SharedCache[int, dict[str, dict[str, int]]] = bot.caches.cache(
+            "automod_voilations",
+            size=None,
+            ttl=24 * 60 * 60,
+        )
         # {
         #     guild_id: {
         #         "u_{user_id}": {
@@ -89,7 +102,36 @@ class AutomaticModeration(Cog):
         data.pop("_id")
         guild_id = data.pop("guild_id")
 
-        self._auto_mod[guild_id] = data
+        await self._auto_mod.set(guild_id, data)
+
+    async def __load_configuration(self, guild_id: int) -> dict[str, AutoModRawObject] | None:
+        data = await self.bot.automod_configurations.find_one({"guild_id": guild_id})
+        if not data:
+            return None
+        data.pop("_id")
+        data.pop("guild_id")
+        return data
+
+    async def __configuration_changed(self, guild_id: int) -> None:
+        self.__compile(guild_id)
+
+    def __compile(self, guild_id: int) -> None:
+        rules = self._auto_mod.get(guild_id)
+        if rules is None:
+            self.auto_mod.pop(guild_id, None)
+            return
+
+        self.auto_mod[guild_id] = {}
+        for rule_name, rule_data in rules.items():
+            trigger = Trigger(self.bot, rule_data["trigger"])
+            condition = Condition(self.bot, rule_data["condition"])
+            action = Action(self.bot, rule_data["action"])
+
+            self.auto_mod[guild_id][rule_name] = {
+                "trigger": trigger,
+                "condition": condition,
+                "action": action,
+            }
 
     async def ensure_voilations_cache(self, guild_id: int) -> None:
         data = await self.bot.automod_voilations.find_one({"guild_id": guild_id})
@@ -112,64 +154,47 @@ class AutomaticModeration(Cog):
         data.pop("_id")
         guild_id = data.pop("guild_id")
 
-        self._voilations[guild_id] = data
+        await self._voilations.set(guild_id, data)
 
     @property
     def display_emoji(self) -> discord.PartialEmoji:
         return discord.PartialEmoji(name="\N{SHIELD}")
 
-    async def cog_load(self) -> None:
-        if self._was_ready:
-            return
-
-        self._was_ready = True
-        await self.bot.loop.create_task(self.__cache_build())
+    async def cog_warmup(self) -> None:
+        # the guilds are only known once the bot is ready
+        await self.__cache_build()
 
     async def __cache_build(self):
-        for guild in self.bot.guilds:
-            await self.ensure_configuration_cache(guild.id)
-            await self.ensure_voilations_cache(guild.id)
+        # every process reads them on its own
+        guild_ids = [guild.id for guild in self.bot.guilds]
+        async for data in self.bot.automod_configurations.find({"guild_id": {"$in": guild_ids}}):
+            data.pop("_id")
+            self._auto_mod.fill(data.pop("guild_id"), data)
+
+        async for data in self.bot.automod_voilations.find({"guild_id": {"$in": guild_ids}}):
+            data.pop("_id")
+            self._voilations.fill(data.pop("guild_id"), data)
 
         for guild_id in self._auto_mod:
-            self.auto_mod[guild_id] = {}
-            for rule_name, rule_data in self._auto_mod[guild_id].items():
-                trigger = Trigger(self.bot, rule_data["trigger"])
-                condition = Condition(self.bot, rule_data["condition"])
-                action = Action(self.bot, rule_data["action"])
-
-                self.auto_mod[guild_id][rule_name] = {
-                    "trigger": trigger,
-                    "condition": condition,
-                    "action": action,
-                }
+            self.__compile(guild_id)
 
     async def __build_cache_specific(self, guild_id: int) -> None:
         await self.ensure_configuration_cache(guild_id)
         await self.ensure_voilations_cache(guild_id)
 
-        self.auto_mod[guild_id] = {}
-        for rule_name, rule_data in self._auto_mod[guild_id].items():
-            trigger = Trigger(self.bot, rule_data["trigger"])
-            condition = Condition(self.bot, rule_data["condition"])
-            action = Action(self.bot, rule_data["action"])
-
-            self.auto_mod[guild_id][rule_name] = {
-                "trigger": trigger,
-                "condition": condition,
-                "action": action,
-            }
+        self.__compile(guild_id)
 
     async def refresh_cache(self) -> None:
-        self._auto_mod = {}
+        self._auto_mod.clear()
         self.auto_mod = {}
-        self._voilations = {}
+        self._voilations.clear()
 
         await self.__cache_build()
 
     async def refresh_cache_specific(self, guild_id: int) -> None:
-        self._auto_mod.pop(guild_id, None)
+        await self._auto_mod.invalidate(guild_id)
         self.auto_mod.pop(guild_id, None)
-        self._voilations.pop(guild_id, None)
+        await self._voilations.invalidate(guild_id)
 
         await self.__build_cache_specific(guild_id)
 
@@ -178,10 +203,12 @@ class AutomaticModeration(Cog):
         if after.guild is None and after.author.id == self.bot.user.id:
             return
 
-        return await self.on_message(after)
+        await self.on_message(self.bot.message_features(after))
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+    @Cog.stage("automod", ignore_bots=False, check=lambda self, f: self.auto_mod.get(f.guild.id))
+    async def on_message(self, features: MessageFeatures) -> Any:
+        """Runs the rules of the guild, the stages after this one are skipped once a rule acted."""
+        message = features.message
         if message.guild is None or message.author.id == self.bot.user.id:
             return
 
@@ -189,6 +216,7 @@ class AutomaticModeration(Cog):
         if not data:
             return
 
+        acted = False
         for _rule_name, rule_data in data.items():
             trigger: Trigger = rule_data["trigger"]
             condition: Condition = rule_data["condition"]
@@ -199,6 +227,9 @@ class AutomaticModeration(Cog):
                 action: Action = rule_data["action"]
 
                 await action.execute(message=message, member=message.author)
+                acted = True
+
+        return HALT if acted else None
 
     @Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
@@ -7,6 +7,7 @@ from discord.utils import maybe_coroutine
 
 from discord import Member, Message
 from discord.ext import commands
+from utilities.profanity import get_filter
 from utilities.regex import INVITE_RE, LINKS_RE
 
 if TYPE_CHECKING:
@@ -205,12 +206,12 @@ class Trigger:
     def word_blacklist(self, *, message: Message | None, words: list[str] = None, **kw) -> bool:
         if words is None:
             words = []
-        return any(word in message.content for word in words) if message else False
+        return get_filter(tuple(words), whole_words=False).contains(message.content) if message else False
 
     def word_whitelist(self, *, message: Message | None = None, words: list[str] = None, **kw) -> bool:
         if words is None:
             words = []
-        return all(word not in message.content for word in words) if message else False
+        return not get_filter(tuple(words), whole_words=False).contains(message.content) if message else False
 
     def server_invites(self, *, message: Message | None = None, **kw) -> bool:
         return bool(INVITE_RE.search(message.content)) if message else False
@@ -228,10 +229,10 @@ class Trigger:
         return not bool(re.search(regex, member.display_name))
 
     def nickname_word_blacklist(self, *, member: Member, words: list[str], **kw) -> bool:
-        return any(word in member.display_name for word in words)
+        return get_filter(tuple(words), whole_words=False).contains(member.display_name)
 
     def nickname_word_whitelist(self, *, member: Member, words: list[str], **kw) -> bool:
-        return all(word not in member.display_name for word in words)
+        return not get_filter(tuple(words), whole_words=False).contains(member.display_name)
 
     def join_username_match_regex(self, *, member: Member, regex: str, **kw) -> bool:
         return bool(re.search(regex, member.display_name)) or bool(re.search(regex, member.name))
@@ -240,10 +241,12 @@ class Trigger:
         return not (bool(re.search(regex, member.display_name)) or bool(re.search(regex, member.name)))
 
     def join_username_word_blacklist(self, *, member: Member, words: list[str], **kw) -> bool:
-        return any(word in member.display_name for word in words) or any(word in member.name for word in words)
+        matcher = get_filter(tuple(words), whole_words=False)
+        return matcher.contains(member.display_name) or matcher.contains(member.name)
 
     def join_username_word_whitelist(self, *, member: Member, words: list[str], **kw) -> bool:
-        return all(word not in member.display_name for word in words) and all(word not in member.name for word in words)
+        matcher = get_filter(tuple(words), whole_words=False)
+        return not (matcher.contains(member.display_name) or matcher.contains(member.name))
 
     def join_username_invite(self, *, member: Member, **kw) -> bool:
         return bool(INVITE_RE.search(member.display_name)) or bool(INVITE_RE.search(member.name))
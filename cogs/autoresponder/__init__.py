@@ -10,6 +10,8 @@ from jinja2.sandbox import SandboxedEnvironment
 
 import discord
 from core import Cog, Context, Parrot
+from core.cache import SharedCache
+from core.pipeline import MessageFeatures
 from discord.ext import commands, tasks
 
 from .jinja_help import TOPICS
@@ -32,7 +34,13 @@ class AutoResponders(Cog):
 
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
-        self.cache = {}
+        # shared with the other processes, every command that changes it publishes the guild in after_invoke
+        self.cache: SharedCache[int, dict[str, dict]] = bot.caches.cache(
+            "autoresponders",
+            size=None,
+            ttl=24 * 60 * 60,
+            refresh=True,
+        )
         self.cooldown = commands.CooldownMapping.from_cooldown(3, 10, commands.BucketType.channel)
         self.exceeded_cooldown = commands.CooldownMapping.from_cooldown(3, 10, commands.BucketType.channel)
 
@@ -54,7 +62,8 @@ class AutoResponders(Cog):
     async def cog_load(self):
         self.check_autoresponders.start()
         async for guild_data in self.bot.guild_configurations.find({"autoresponder": {"$exists": True}}):
-            self.cache[guild_data["_id"]] = guild_data["autoresponder"]
+            # every process reads them on its own
+            self.cache.fill(guild_data["_id"], guild_data["autoresponder"])
 
     async def cog_unload(self):
         self.check_autoresponders.cancel()
@@ -322,12 +331,22 @@ class AutoResponders(Cog):
     @autoresponder_disable.before_invoke
     async def ensure_cache(self, ctx: Context) -> None:
         if ctx.guild.id not in self.cache:
-            self.cache[ctx.guild.id] = self.bot.guild_configurations_cache[ctx.guild.id].get("autoresponder", {})
-
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        if message.guild is None or message.author.bot or not self.cache.get(message.guild.id):
-            return
+            self.cache.fill(ctx.guild.id, self.bot.guild_configurations_cache[ctx.guild.id].get("autoresponder", {}))
+
+    @autoresponder_ignore.after_invoke
+    @autoresponder_add.after_invoke
+    @autoresponder_remove.after_invoke
+    @autoresponder_edit.after_invoke
+    @autoresponder_enable.after_invoke
+    @autoresponder_disable.after_invoke
+    async def publish_cache(self, ctx: Context) -> None:
+        # the commands change the autoresponders in place
+        if (data := self.cache.get(ctx.guild.id)) is not None:
+            await self.cache.set(ctx.guild.id, data)
+
+    @Cog.stage("autoresponder", check=lambda self, f: self.cache.get(f.guild.id))
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
 
         assert isinstance(message.author, discord.Member)
 
@@ -34,6 +34,7 @@ from PIL import Image, ImageColor
 
 import discord
 from core import Cog, Context, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands, tasks
 from emojis.db.db import EMOJI_DB, Emoji
 from utilities import spookifications
@@ -513,17 +514,11 @@ class Fun(Cog):
         # Game is finished, let's remove it from the dict
         self.games.pop(ctx.channel.id)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+    @Cog.stage("anagram", check=lambda self, f: f.channel.id in self.games)
+    async def on_message(self, features: MessageFeatures) -> None:
         """Check a message for an anagram attempt and pass to an ongoing game."""
-        await self.bot.wait_until_ready()
-        if message.author.bot or not message.guild:
-            return
-
-        if game := self.games.get(message.channel.id):
-            await game.message_creation(message)
-        else:
-            return
+        if game := self.games.get(features.channel.id):
+            await game.message_creation(features.message)
 
     async def __issue_trivia_token(self, ctx: Context) -> str | None:
         request_token = await self.bot.http_session.get("https://opentdb.com/api_token.php?command=request")
@@ -2421,6 +2416,7 @@ class Fun(Cog):
                 },
                 upsert=True,
             )
+        await self.bot.game_leaderboards.record(ctx.author.id, guild=ctx.guild)
 
     @commands.command(name="bottomify", aliases=["bottom"])
     async def _bottomify(self, ctx: Context, *, text: Annotated[str, commands.clean_content]):
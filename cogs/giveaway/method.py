@@ -95,28 +95,29 @@ async def end_giveaway(bot: Parrot, **kw: Any) -> list[int]:
 
 async def __check_requirements(bot: Parrot, **kw: Any) -> list[int]:
     # vars
-    real_winners: list[int] = kw.get("winners", [])
-
     current_guild: discord.Guild = bot.get_guild(kw.get("guild_id"))
     required_guild: discord.Guild | None = bot.get_guild(kw.get("required_guild", 0))
     required_role: int = kw.get("required_role", 0)
     required_level: int = kw.get("required_level", 0)
 
-    for member in kw.get("winners", []):
-        member = await bot.get_or_fetch_member(current_guild, member)
-        assert isinstance(member, discord.Member)
-        if required_guild:
-            is_member_none = await bot.get_or_fetch_member(required_guild, member.id)
-            if is_member_none is None:
-                __item__remove(real_winners, member)
+    winners: list[int] = kw.get("winners", [])
+    real_winners: list[int] = list(winners)
+    members = await bot.get_or_fetch_members(current_guild, winners)
+    in_required_guild = await bot.get_or_fetch_members(required_guild, winners) if required_guild else members
+
+    for winner, member, required_member in zip(winners, members, in_required_guild, strict=True):
+        # left the guild, or never was in the required one
+        if member is None or required_member is None:
+            __item__remove(real_winners, winner)
+            continue
 
         if required_role and not member.get_role(required_role):
-            __item__remove(real_winners, member)
+            __item__remove(real_winners, winner)
 
         if required_level:
             level = await bot.guild_level_db[f"{current_guild.id}"].find_one({"_id": member.id})
             if level < required_level:
-                __item__remove(real_winners, member)
+                __item__remove(real_winners, winner)
 
     return real_winners
 
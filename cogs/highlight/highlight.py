@@ -11,6 +11,7 @@ from pymongo.results import BulkWriteResult
 
 import discord
 from core import Cog, Context, Parrot, ParrotLinkView
+from core.pipeline import MessageFeatures
 from discord.ext import commands, tasks
 from utilities.formats import plural
 
@@ -93,7 +94,7 @@ class Highlight(Cog):
         self.bulk_insert_loop.stop()
         await self.bulk_insert()
 
-    async def cog_load(self):
+    async def cog_warmup(self):
         log.info("Getting all the highlight settings")
         async for data in self.bot.user_collections_ind.find({"highlight_settings": {"$exists": True}}):
             self.cached_settings[data["_id"]] = data["highlight_settings"]
@@ -102,12 +103,9 @@ class Highlight(Cog):
         async for data in self.bot.user_collections_ind.find({"highlight_words": {"$exists": True}}):
             self.cached_words[data["_id"]] = data["highlight_words"]
 
-    @commands.Cog.listener("on_message")
-    async def check_highlights(self, message: discord.Message):
-        await self.bot.wait_until_ready()
-        if not message.guild or message.author.bot:
-            return
-
+    @Cog.stage("highlight", check=lambda self, f: self.cached_words)
+    async def check_highlights(self, features: MessageFeatures):
+        message = features.message
         notified_users = []
         possible_words = []
 
@@ -116,6 +114,10 @@ class Highlight(Cog):
 
         # Go through all possible messages
         for possible_word in possible_words:
+            # Cheap test first, almost no message has the word
+            if possible_word["word"].lower() not in features.lowered:
+                continue
+
             # Use regex to check if the highlight word is in the message
             # And avoid any false positives
             escaped = re.escape(possible_word["word"])
@@ -132,10 +134,9 @@ class Highlight(Cog):
 
     # The following three listeners send a user activity to the on_highlight_trigger function
     # This way the user has time to indicate that they saw the message and we do not need to highlight them
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self.bot.wait_until_ready()
-        self.bot.dispatch("user_activity", message.channel, message.author)
+    @Cog.stage("highlight_activity", guild_only=False, ignore_bots=False, ignore_self=False)
+    async def on_message(self, features: MessageFeatures):
+        self.bot.dispatch("user_activity", features.channel, features.author)
 
     @commands.Cog.listener()
     async def on_typing(
@@ -11,6 +11,7 @@ from PIL import Image
 
 import discord
 from core import Cog, Context, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands
 from utilities.constants import Colours
 
@@ -226,18 +227,11 @@ class Easter(Cog, command_attrs={"hidden": True}):
         self.winners.clear()
         self.current_channel = None
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
+    @Cog.stage("easter_riddle", ignore_bots=False, check=lambda self, f: self.current_channel == f.channel)
+    async def on_message(self, features: MessageFeatures) -> None:
         """If a non-bot user enters a correct answer, their username gets added to self.winners."""
-        if self.current_channel != message.channel:
-            return
-
-        if self.bot.user == message.author:
-            return
-
-        if message.content.lower() == self.correct.lower():
-            self.winners.add(message.author.mention)
+        if features.lowered == self.correct.lower():
+            self.winners.add(features.author.mention)
 
     @commands.command(aliases=("decorateegg",))
     async def eggdecorate(self, ctx: Context, *colours: discord.Colour | str) -> Image.Image | None:
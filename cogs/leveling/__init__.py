@@ -10,6 +10,7 @@ from tabulate import tabulate
 
 import discord
 from core import Cog, Context, MongoCollection as Collection, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands
 from utilities.converters import convert_bool
 from utilities.rankcard import rank_card
@@ -95,11 +96,9 @@ class Leveling(Cog):
                 return countr
 
     async def __get_entries(self, *, collection: Collection, limit: int, guild: discord.Guild):
-        ls = []
-        async for data in collection.find({}, limit=limit, sort=[("xp", -1)]):
-            if member := await self.bot.get_or_fetch_member(guild, data["_id"]):
-                ls.append(f"{member} (`{member.id}`)")
-        return ls
+        ids = [data["_id"] async for data in collection.find({}, limit=limit, sort=[("xp", -1)])]
+        members = await self.bot.get_or_fetch_members(guild, ids)
+        return [f"{member} (`{member.id}`)" for member in members if member]
 
     @commands.group(name="leveling", aliases=["ranking"], invoke_without_command=True)
     @commands.has_permissions(administrator=True)
@@ -352,9 +351,9 @@ class Leveling(Cog):
         with suppress(discord.Forbidden, discord.HTTPException):
             await member.add_roles(role, reason=reason)
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self._on_message_leveling(message)
+    @Cog.stage("leveling", after=("automod",), check=lambda self, f: ((f.config or {}).get("leveling") or {}).get("enable"))
+    async def on_message(self, features: MessageFeatures):
+        await self._on_message_leveling(features.message)
 
     @Cog.listener()
     async def on_command(self, ctx: Context):
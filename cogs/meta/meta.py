@@ -12,6 +12,7 @@ import pygit2
 
 import discord
 from core import Cog, Context, Parrot
+from core.local_cache import LocalCache
 from discord import __version__ as discord_version
 from discord.ext import commands
 from utilities.config import SUPPORT_SERVER, SUPPORT_SERVER_ID, VERSION
@@ -31,7 +32,11 @@ class Meta(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
         self.ON_TESTING = False
-        self._audit_log_cache: dict[int, deque[discord.AuditLogEntry]] = {}
+        # guild id -> the last 100 entries, of the 256 guilds with the latest ones
+        self._audit_log_cache: LocalCache[int, deque[discord.AuditLogEntry]] = bot.local_caches.cache(
+            "audit_logs",
+            maxsize=2**8,
+        )
 
     @property
     def display_emoji(self) -> discord.PartialEmoji:
@@ -39,10 +44,10 @@ class Meta(Cog):
 
     @Cog.listener()
     async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry) -> None:
-        if entry.guild.id not in self._audit_log_cache:
-            self._audit_log_cache[entry.guild.id] = deque(maxlen=100)
-
-        self._audit_log_cache[entry.guild.id].appendleft(entry)
+        # looked up first, setdefault would build a deque for every entry
+        if (entries := self._audit_log_cache.get(entry.guild.id)) is None:
+            entries = self._audit_log_cache[entry.guild.id] = deque(maxlen=100)
+        entries.appendleft(entry)
 
     @commands.command(aliases=["auditlogs"], hidden=True)
     @commands.bot_has_permissions(view_audit_log=True)
@@ -99,8 +104,7 @@ class Meta(Cog):
 
             return all(ls) if ls else True
 
-        if self._audit_log_cache.get(guild.id) and len(self._audit_log_cache[guild.id]) == 100:
-            entries = self._audit_log_cache[guild.id]
+        if (entries := self._audit_log_cache.get(guild.id)) and len(entries) == 100:
             for entry in entries:
                 if finder(entry):
                     st = fmt(entry)
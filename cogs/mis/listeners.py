@@ -4,6 +4,7 @@ from collections import deque
 
 import discord
 from core import Cog, Context, Parrot
+from core.local_cache import LocalCache
 from discord.ext import commands
 
 
@@ -101,31 +102,38 @@ class SnipeMessageListener(Cog):
 class PingMessageListner(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
-        self.ghost_pings: dict[int, deque[discord.Message]] = {}
-        self.pings: dict[int, deque[discord.Message]] = {}
-        # dict[author_id, list[message]]
+        # author id -> the last 32 messages, of 4096 authors for a day
+        self.ghost_pings: LocalCache[int, deque[discord.Message]] = bot.local_caches.cache(
+            "ghost_pings",
+            maxsize=2**12,
+            ttl=24 * 60 * 60,
+        )
+        self.pings: LocalCache[int, deque[discord.Message]] = bot.local_caches.cache(
+            "pings",
+            maxsize=2**12,
+            ttl=24 * 60 * 60,
+        )
 
     @Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot and not message.guild:
             return
 
-        if message.author.id not in self.pings:
-            self.pings[message.author.id] = deque(maxlen=2**5)
-
         if message.author in message.mentions:
-            self.pings[message.author.id].append(message)
+            # looked up first, setdefault would build a deque for every message
+            if (pings := self.pings.get(message.author.id)) is None:
+                pings = self.pings[message.author.id] = deque(maxlen=2**5)
+            pings.append(message)
 
     @Cog.listener()
     async def on_message_delete(self, message: discord.Message):
         if message.author.bot and not message.guild:
             return
 
-        if message.author.id not in self.ghost_pings:
-            self.ghost_pings[message.author.id] = deque(maxlen=2**5)
-
         if message.author in message.mentions:
-            self.ghost_pings[message.author.id].append(message)
+            if (ghost_pings := self.ghost_pings.get(message.author.id)) is None:
+                ghost_pings = self.ghost_pings[message.author.id] = deque(maxlen=2**5)
+            ghost_pings.append(message)
 
     @Cog.listener()
     async def on_bulk_message_delete(self, messages: list[discord.Message]):
@@ -140,7 +148,7 @@ class PingMessageListner(Cog):
         await self.on_message_delete(before)
 
     def get_pings(self, user_id: int) -> list[discord.Message]:
-        return [] if user_id not in self.pings else list(self.pings[user_id])
+        return list(self.pings.get(user_id, ()))
 
     def get_ghost_pings(self, user_id: int) -> list[discord.Message]:
-        return list(self.ghost_pings[user_id]) if user_id in self.ghost_pings else []
+        return list(self.ghost_pings.get(user_id, ()))
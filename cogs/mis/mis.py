@@ -646,12 +646,17 @@ class Misc(Cog):
         **Example:**
         - `[p]truthtable --var p, q --con p and q`
         """
-        table = Truths(
-            [j.strip(" ") for j in flags.var.replace(" ", "").split(",")],
-            [i.strip(" ") for i in flags.con.split(",")],
-            ascending=flags.ascending,
-        )
-        main = table.as_tabulate(index=False, table_format=flags.table_format, align=flags.align)
+
+        def render() -> str:
+            # 2 ** len(bases) rows, built off the event loop
+            table = Truths(
+                [j.strip(" ") for j in flags.var.replace(" ", "").split(",")],
+                [i.strip(" ") for i in flags.con.split(",")],
+                ascending=flags.ascending,
+            )
+            return table.as_tabulate(index=False, table_format=flags.table_format, align=flags.align)
+
+        main = await asyncio.to_thread(render)
         await ctx.reply(f"```{flags.table_format}\n{main}\n```")
 
     @commands.command(aliases=["w"])
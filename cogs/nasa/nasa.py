@@ -10,6 +10,7 @@ import arrow
 
 import discord
 from core import Cog, Context, Parrot
+from core.local_cache import LocalCache
 from discord.ext import commands
 from utilities.paginator import PaginationView
 
@@ -60,7 +61,8 @@ class NASA(Cog):
         self.bot = bot
         self.random_agent = random.choice
         self.ON_TESTING = False
-        self._cache: dict = {}
+        # url -> the answer of the API, 64 for an hour
+        self._cache: LocalCache[str, dict] = bot.local_caches.cache("nasa", maxsize=2**6, ttl=60 * 60)
         self._api_params = {"api_key": NASA_KEY}
 
     @property
@@ -109,11 +111,11 @@ class NASA(Cog):
         """Asteroid Picture of the Day."""
         link = ENDPOINTS.APOD
 
-        r = await self.bot.http_session.get(link, params=self._api_params, headers=self.bot.GLOBAL_HEADERS)
-        if r.status == 200:
-            res = await r.json()
-        else:
-            return await ctx.reply(f"{ctx.author.mention} could not find APOD | Http status: {r.status}")
+        if (res := self._cache.get(link)) is None:
+            r = await self.bot.http_session.get(link, params=self._api_params, headers=self.bot.GLOBAL_HEADERS)
+            if r.status != 200:
+                return await ctx.reply(f"{ctx.author.mention} could not find APOD | Http status: {r.status}")
+            res = self._cache[link] = await r.json()
 
         title = res["title"]
         expln = res["explanation"]
@@ -151,7 +151,7 @@ class NSFW(Cog):
         await self.bot.update_user_cache.start(user_id)
 
     async def check_user_age(self, ctx: Context) -> bool:
-        if ctx.author.id not in self.bot._user_cache:
+        if await self.bot._user_cache.fetch(ctx.author.id) is None:
             confirm = await ctx.prompt("Are you 18+?")
             if not confirm:
                 await self._update_user_age(ctx.author.id, False)
@@ -250,4 +250,7 @@ class NSFW(Cog):
 
     @tasks.loop(minutes=30)
     async def sexdotcom_loop(self):
+        # the collection is shared, one cluster fills it
+        if not self.bot.ipc.leader:
+            return
         await self.sexdotcom_write_to_db()
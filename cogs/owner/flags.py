@@ -20,3 +20,11 @@ class SubscriptionFlag(commands.FlagConverter, case_insensitive=True, prefix="--
     guild: discord.Guild | None = None
     uses: int | None = 0
     limit: int | None = 1
+
+
+class LogsFlag(commands.FlagConverter, case_insensitive=True, prefix="--", delimiter=" "):
+    level: str | None = None
+    since: ShortTime | None = None
+    until: ShortTime | None = None
+    text: str | None = None
+    limit: int = 50
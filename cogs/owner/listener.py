@@ -29,6 +29,13 @@ class OwnerListener(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
 
+    async def cog_load(self) -> None:
+        # the emergency commands are run by every cluster
+        self.bot.ipc.handlers["emergency"] = self.run_emergency
+
+    async def cog_unload(self) -> None:
+        self.bot.ipc.handlers.pop("emergency", None)
+
     @Cog.listener("on_message")
     async def on_message(self, message: discord.Message) -> None:
         await self.bot.wait_until_ready()
@@ -69,17 +76,17 @@ class OwnerListener(Cog):
             await msg.delete()
             await sleep(10.1)
 
-            func = getattr(self, func_name)
-            if args:
-                await func(args[0])
-            else:
-                await func()
+            await self.bot.ipc.broadcast("emergency", {"name": func_name, "args": args[:1]})
 
             try:
                 await message.add_reaction("\N{WHITE HEAVY CHECK MARK}")
             except Exception:
                 pass
 
+    async def run_emergency(self, payload: dict) -> None:
+        func = getattr(self, payload["name"])
+        await func(*payload["args"])
+
     async def emergency_shutdown(self):
         log.critical("closing due to emergency")
         await self.bot.close()
@@ -100,4 +107,4 @@ class OwnerListener(Cog):
 
     async def unban_all_members(self):
         log.critical("unbanning all members")
-        self.bot.banned_users = {}
+        self.bot.banned_users.clear()
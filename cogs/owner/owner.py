@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import datetime
 import hashlib
 import io
 import json
+import logging
 import os
 import random
 import re
@@ -31,7 +33,7 @@ from utilities.time import ShortTime
 from utilities.wikihow import Parser as WikihowParser
 
 from . import fuzzy
-from .flags import BanFlag, SubscriptionFlag
+from .flags import BanFlag, LogsFlag, SubscriptionFlag
 from .utils import SphinxObjectFileReader
 from .views import MongoCollectionView, MongoView, MongoViewSelect, NitroView
 
@@ -391,9 +393,12 @@ class Owner(Cog, command_attrs={"hidden": True}):
 """,
         )
 
-    @commands.command(hidden=True)
+    @commands.group(hidden=True, invoke_without_command=True)
     async def gateway(self, ctx: Context):
         """Gateway related stats."""
+        if ctx.invoked_subcommand is not None:
+            return
+
         yesterday = arrow.utcnow().shift(days=-1).datetime
 
         # fmt: off
@@ -466,6 +471,217 @@ class Owner(Cog, command_attrs={"hidden": True}):
         embed.set_footer(text=f"{issues} warnings")
         await ctx.send(embed=embed)
 
+    @gateway.command(name="trace")
+    async def gateway_trace(self, ctx: Context, shard_id: int | None = None, capture: bool = False):
+        """Starts keeping the type, sequence and size of the dispatches of a shard, all shards if none given.
+
+        With `capture` the raw payloads are kept as well.
+        """
+        shard_ids = [shard_id] if shard_id is not None else list(self.bot.shards)
+        if unknown := [shard for shard in shard_ids if shard not in self.bot.shards]:
+            return await ctx.send(f"{ctx.author.mention} no shard {unknown[0]}")
+        for shard in shard_ids:
+            self.bot.gateway_events.enable(shard, capture=capture, websocket=self.bot._get_websocket(shard_id=shard))
+        await ctx.send(f"{ctx.author.mention} tracing shard(s) {', '.join(map(str, shard_ids))}")
+
+    @gateway.command(name="untrace")
+    async def gateway_untrace(self, ctx: Context, shard_id: int | None = None):
+        """Stops tracing a shard, all shards if none given."""
+        for shard in [shard_id] if shard_id is not None else list(self.bot.gateway_events.shards):
+            self.bot.gateway_events.disable(shard)
+        await ctx.send(f"{ctx.author.mention} tracing stopped")
+
+    @gateway.command(name="events")
+    async def gateway_events(self, ctx: Context, last: int = 10):
+        """The rates of the traced dispatches and the last few of them."""
+        ring = self.bot.gateway_events
+        if not ring.shards:
+            return await ctx.send(f"{ctx.author.mention} no shard is traced, see `{ctx.clean_prefix}gateway trace`")
+
+        last = max(1, min(last, 20))
+        overall, minute = ring.rates(), ring.rates(60)
+        rows = [
+            [event, ring.counts[event], f"{rate:.2f}", f"{minute.get(event, 0):.2f}"] for event, rate in overall.items()
+        ][:15]
+        recent = [[entry.shard_id, entry.event, entry.sequence, entry.size] for entry in list(ring.entries)[-last:]]
+
+        embed = discord.Embed(colour=self.bot.color, title="Gateway events")
+        traced = [f"{shard} (capture)" if capture else str(shard) for shard, capture in ring.shards.items()]
+        embed.description = f"Tracing shard(s) {', '.join(traced)}, `{len(ring)}` events in the ring"
+        empty = "```\nNothing yet```"
+        embed.add_field(
+            name="Rates (per second)",
+            value=f"```\n{tabulate(rows, headers=['event', 'count', 'overall', '1m'])}```" if rows else empty,
+            inline=False,
+        )
+        embed.add_field(
+            name="Last",
+            value=f"```\n{tabulate(recent, headers=['shard', 'event', 'seq', 'size'])}```" if recent else empty,
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
+    @gateway.command(name="dump")
+    async def gateway_dump(self, ctx: Context):
+        """The whole ring as JSON lines, with the payloads if they were captured."""
+        lines = [
+            json.dumps(
+                {
+                    "shard_id": entry.shard_id,
+                    "event": entry.event,
+                    "sequence": entry.sequence,
+                    "size": entry.size,
+                    "payload": entry.payload,
+                },
+            )
+            for entry in self.bot.gateway_events.entries
+        ]
+        if not lines:
+            return await ctx.send(f"{ctx.author.mention} the ring is empty")
+        await ctx.send(file=discord.File(io.BytesIO("\n".join(lines).encode()), filename="gateway.jsonl"))
+
+    @commands.group(hidden=True, invoke_without_command=True)
+    async def metrics(self, ctx: Context, top: int = 8):
+        """Where the time goes: listeners, commands, loops, event loop lag, Mongo and HTTP."""
+        if ctx.invoked_subcommand is not None:
+            return
+
+        metrics = self.bot.metrics
+        top = max(1, min(top, 10))  # embed fields fit about 10 rows
+
+        def table(histograms) -> str:
+            ranked = sorted(histograms, key=lambda histogram: histogram.sum, reverse=True)[:top]
+            if not ranked:
+                return "```\nNothing yet```"
+            rows = [
+                [
+                    histogram.name[:32],
+                    histogram.count,
+                    histogram.errors,
+                    f"{histogram.sum:.2f}s",
+                    f"{histogram.quantile(0.5) * 1e3:.1f}ms",
+                    f"{histogram.quantile(0.99) * 1e3:.1f}ms",
+                ]
+                for histogram in ranked
+            ]
+            return f"```\n{tabulate(rows, headers=['name', 'calls', 'err', 'total', 'p50', 'p99'])}```"
+
+        def counters(items) -> str:
+            ranked = sorted(items, key=lambda item: item[1].calls, reverse=True)[:top]
+            if not ranked:
+                return "```\nNothing yet```"
+            rows = [[name[:48], count.calls, count.errors, f"{count.seconds:.2f}s"] for name, count in ranked]
+            return f"```\n{tabulate(rows, headers=['name', 'calls', 'err', 'total'])}```"
+
+        lag = metrics.loop_lag
+        embed = discord.Embed(colour=self.bot.color, title="Metrics")
+        embed.description = (
+            f"Event loop lag: `{self.bot.loop_lag.last * 1e3:.1f}ms` now, "
+            f"`{lag.quantile(0.99) * 1e3:.1f}ms` p99, `{lag.slowest * 1e3:.1f}ms` worst"
+        )
+        embed.add_field(name="Listeners", value=table(metrics.listeners.values()), inline=False)
+        embed.add_field(name="Commands", value=table(metrics.commands.values()), inline=False)
+        embed.add_field(name="Loops", value=table(metrics.loops.values()), inline=False)
+        embed.add_field(
+            name="Mongo",
+            value=counters(
+                (f"{site} {collection}.{operation}", count) for (collection, operation, site), count in metrics.mongo.copy().items()
+            ),
+            inline=False,
+        )
+        embed.add_field(name="HTTP", value=counters(metrics.http.items()), inline=False)
+        await ctx.send(embed=embed)
+
+    @metrics.command(name="reset")
+    async def metrics_reset(self, ctx: Context):
+        """Starts the measurements over."""
+        self.bot.metrics.reset()
+        await ctx.send(f"{ctx.author.mention} metrics reset")
+
+    @commands.command()
+    async def startup(self, ctx: Context, top: int = 15):
+        """How long loading each extension and warming up each cog took, slowest first."""
+        report = self.bot.startup.report(top=max(1, top))
+        if len(report) > 1980:
+            return await ctx.send(file=discord.File(io.BytesIO(report.encode()), filename="startup.txt"))
+        await ctx.send(f"```\n{report}```")
+
+    @commands.command()
+    async def caches(self, ctx: Context):
+        """The caches of this process with their bounds, footprint and hit ratio, largest first."""
+        report = self.bot.local_caches.report()
+        shared = [
+            # sets have no counters
+            [name, len(cache), getattr(cache, "remote_hits", "-"), getattr(cache, "loads", "-")]
+            for name, cache in sorted(self.bot.caches.caches.items())
+        ]
+        report += "\n\n" + tabulate(shared, headers=["shared cache", "entries", "from redis", "loaded"])
+        if len(report) > 1980:
+            return await ctx.send(file=discord.File(io.BytesIO(report.encode()), filename="caches.txt"))
+        await ctx.send(f"```\n{report}```")
+
+    @commands.command()
+    async def clusters(self, ctx: Context):
+        """Every cluster, the shards it connects and what is in its cache, the leader starred."""
+        answers = await self.bot.ipc.request("stats")
+        answered = {cluster: stats for cluster, stats in sorted(answers.items()) if stats}
+        rows = [
+            [
+                f"{cluster}{'*' if stats['leader'] else ''}",
+                f"{stats['shards'][0]}-{stats['shards'][-1]}",
+                stats["guilds"],
+                stats["users"],
+                stats["messages"],
+                f"{stats['latency']}ms" if stats["latency"] is not None else "-",
+            ]
+            for cluster, stats in answered.items()
+        ]
+        rows.append(["total", "", *(sum(stats[key] for stats in answered.values()) for key in ("guilds", "users", "messages")), ""])
+        table = tabulate(rows, headers=["cluster", "shards", "guilds", "users", "messages", "latency"])
+        if missing := sorted(set(range(self.bot.cluster.count)) - set(answered)):
+            table += f"\n\nno answer from {', '.join(map(str, missing))}"
+        await ctx.send(f"```\n{table}```")
+
+    @commands.command(name="logs")
+    async def logs(self, ctx: Context, *, flags: LogsFlag):
+        """The log lines kept in the sqlite database, newest first.
+
+        `--since` and `--until` go back from now (`2h`, `1d12h`) or take a discord timestamp.
+        ```
+        [p]logs --level warning --since 1d --text shard --limit 20
+        ```
+        """
+        level = None
+        if flags.level is not None:
+            level = flags.level if flags.level.isdigit() else logging.getLevelName(flags.level.upper())
+            if not isinstance(level, int):
+                return await ctx.send(f"{ctx.author.mention} no log level named `{flags.level}`")
+
+        now = ctx.message.created_at
+
+        def ago(time: ShortTime | None) -> datetime.datetime | None:
+            if time is None:
+                return None
+            # durations come out in the future, `2h` means two hours ago
+            return now - (time.dt - now) if time.dt > now else time.dt
+
+        entries = await self.bot.log_sink.query(
+            level=int(level) if level is not None else None,
+            since=ago(flags.since),
+            until=ago(flags.until),
+            text=flags.text,
+            limit=max(1, min(flags.limit, 500)),
+        )
+        if not entries:
+            return await ctx.send(f"{ctx.author.mention} no log lines found")
+
+        lines = [
+            f"{discord.utils.format_dt(entry.created_at, 'd')} {discord.utils.format_dt(entry.created_at, 'T')} "
+            f"**{entry.level_name}** `{entry.logger}` {discord.utils.escape_markdown(entry.message[:300])}"
+            for entry in entries
+        ]
+        await ctx.paginate(lines, max_size=1980, module="JishakuPaginatorEmbedInterface")
+
     @commands.command()
     async def maintenance(
         self,
@@ -474,10 +690,13 @@ class Owner(Cog, command_attrs={"hidden": True}):
         *,
         reason: str | None = None,
     ):
-        """To toggle the bot maintenance."""
-        ctx.bot.UNDER_MAINTENANCE = not ctx.bot.UNDER_MAINTENANCE
-        ctx.bot.UNDER_MAINTENANCE_OVER = till.dt if till is not None else till
-        ctx.bot.UNDER_MAINTENANCE_REASON = reason
+        """To toggle the bot maintenance, on every cluster."""
+        payload = {
+            "on": not ctx.bot.UNDER_MAINTENANCE,
+            "over": till.dt.timestamp() if till is not None else None,
+            "reason": reason,
+        }
+        await ctx.bot.ipc.broadcast("maintenance", payload)
         await ctx.tick()
 
     @commands.command(aliases=["streaming", "listening", "watching"], hidden=True)
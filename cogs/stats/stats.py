@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-import pymongo
+from typing import Any
 
 import discord
 from core import Cog, Context, Parrot
+from core.leaderboard import LEADERBOARD_FIELDS
 from discord.ext import commands
 from utilities.robopages import SimplePages
 
 from .flag import GameCommandFlag
 
+MAX_LIMIT = 500
+SORT_ALIASES = {"win": "won", "wins": "won", "games": "played", "losses": "loss"}
+
+Ranked = list[tuple[dict[str, Any], discord.Member | discord.User | None]]
+
 
 class Stats(Cog):
     """Your stats for various things"""
@@ -16,6 +22,59 @@ class Stats(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
 
+    async def __leaderboard(
+        self,
+        ctx: Context,
+        game: str,
+        flag: GameCommandFlag,
+        *,
+        user: discord.abc.Snowflake | None = None,
+    ) -> tuple[Ranked, str, str | None] | None:
+        """The ranked documents with their users, the field sorted by and the author's rank.
+
+        Guild leaderboards come from the per guild projection, so the limit is
+        applied by the query instead of after reading every member's stats.
+        ``None`` when the flags make no sense, the author was told why.
+        """
+        stat = (flag.sort_by or "played").replace(" ", "_").lower()
+        stat = SORT_ALIASES.get(stat, stat)
+        if stat not in LEADERBOARD_FIELDS[game]:
+            options = ", ".join(f"`{option}`" for option in LEADERBOARD_FIELDS[game])
+            await ctx.send(f"{ctx.author.mention} you can only sort by {options}")
+            return None
+        if flag.me and flag._global:
+            await ctx.send(f"{ctx.author.mention} you can't use both `--me` and `--global` at the same time!")
+            return None
+
+        field = f"game_{game}_{stat}"
+        ascending = flag.order_by in {"asc", "1"}
+        leaderboards = self.bot.game_leaderboards
+        rank = None
+        if flag.me:
+            data = await self.bot.game_collections.find_one({"_id": (user or ctx.author).id, field: {"$exists": True}})
+            documents = [data] if data else []
+        else:
+            guild = None if flag._global else ctx.guild
+            limit = max(1, min(flag.limit or MAX_LIMIT, MAX_LIMIT))
+            documents = await leaderboards.top(field, guild=guild, ascending=ascending, limit=limit)
+            if guild is not None:
+                await leaderboards.prune(guild, [data["_id"] for data in documents])
+            if position := await leaderboards.rank(field, ctx.author.id, guild=guild, ascending=ascending):
+                rank = f"Your rank: #{position[0]} ({position[1]})"
+
+        users = await self.bot.get_or_fetch_members(ctx.guild, [data["_id"] for data in documents], in_guild=False)
+        return list(zip(documents, users)), field, rank
+
+    async def __paginate(self, ctx: Context, entries: list[str], rank: str | None) -> None:
+        if not entries:
+            await ctx.send(f"{ctx.author.mention} No records found")
+            return
+
+        p = SimplePages(entries, ctx=ctx)
+        if rank:
+            p.embed.title = rank
+        await p.start()
+
     @commands.group(invoke_without_command=True)
     @commands.max_concurrency(1, per=commands.BucketType.user)
     @commands.cooldown(1, 60, commands.BucketType.user)
@@ -41,37 +100,17 @@ class Stats(Cog):
         `--order_by`: Sort the list either `asc` (ascending) or `desc` (descending)
         `--limit`: To limit the search, default is 100
         """
-        user = user or ctx.author
-        col = self.bot.game_collections
-        sort_by = f"game_twenty48_{flag.sort_by.lower()}" if flag.sort_by else "game_twenty48_played"
-        order_by = pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING
-
-        FILTER: dict = {sort_by: {"$exists": True}}
-
-        if flag.me:
-            FILTER["_id"] = user.id
-        elif not flag._global:
-            FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
-        LIMIT = flag.limit or float("inf")
-        entries = []
-        i = 0
-        async for data in col.find(FILTER).sort(sort_by, order_by):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
-            entries.append(
-                f"""User: `{user or 'NA'}`
-`Games Played`: {data['game_twenty48_played']} games played
-`Total Moves `: {data['game_twenty48_moves']} moves
-""",
-            )
-            if i > LIMIT:
-                break
-            i += 1
-        if not entries:
-            await ctx.send(f"{ctx.author.mention} No results found")
+        if (ranked := await self.__leaderboard(ctx, "twenty48", flag, user=user)) is None:
             return
-
-        p = SimplePages(entries, ctx=ctx)
-        await p.start()
+        documents, _, rank = ranked
+        entries = [
+            f"""User: `{user or 'NA'}`
+`Games Played`: {data.get('game_twenty48_played', 0)} games played
+`Total Moves `: {data.get('game_twenty48_moves', 0)} moves
+"""
+            for data, user in documents
+        ]
+        await self.__paginate(ctx, entries, rank)
 
     @top.command(name="countryguess")
     async def country_guess_stats(
@@ -86,7 +125,7 @@ class Stats(Cog):
         Flag Options:
         `--me`: Only show your stats
         `--global`: Show global stats
-        `--sort_by`: Sort the list either by `moves` or `played`
+        `--sort_by`: Sort the list either by `won`, `loss` or `played`
         `--order_by`: Sort the list either `asc` (ascending) or `desc` (descending)
         `--limit`: To limit the search, default is 100
         """
@@ -118,43 +157,18 @@ class Stats(Cog):
         user: discord.User | discord.Member | None = None,
         flag: GameCommandFlag,
     ):
-        user = user or ctx.author
-        col = self.bot.game_collections
-
-        sort_by = f"game_{game_type}_{flag.sort_by or 'played'}"
-        order_by = pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING
-
-        FILTER: dict = {sort_by: {"$exists": True}}
-
-        if flag.me and flag._global:
-            return await ctx.send(f"{ctx.author.mention} you can't use both `--me` and `--global` at the same time!")
-
-        if flag.me:
-            FILTER["_id"] = user.id
-        elif not flag._global:
-            FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
-
-        LIMIT = flag.limit or float("inf")
-        entries = []
-        i = 0
-        async for data in col.find(FILTER).sort(sort_by, order_by):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
-            entries.append(
-                f"""User: `{user or 'NA'}`
-`Games Played`: {data[f'game_{game_type}_played']} games played
-`Total Wins  `: {data[f'game_{game_type}_won']} Wins
-`Total Loss  `: {data[f'game_{game_type}_loss']} Loss
-""",
-            )
-            if i > LIMIT:
-                break
-            i += 1
-        if not entries:
-            await ctx.send(f"{ctx.author.mention} No records found")
+        if (ranked := await self.__leaderboard(ctx, game_type, flag, user=user)) is None:
             return
-
-        p = SimplePages(entries, ctx=ctx)
-        await p.start()
+        documents, _, rank = ranked
+        entries = [
+            f"""User: `{user or 'NA'}`
+`Games Played`: {data.get(f'game_{game_type}_played', 0)} games played
+`Total Wins  `: {data.get(f'game_{game_type}_won', 0)} Wins
+`Total Loss  `: {data.get(f'game_{game_type}_loss', 0)} Loss
+"""
+            for data, user in documents
+        ]
+        await self.__paginate(ctx, entries, rank)
 
     @top.command(name="chess")
     async def chess_stats(
@@ -229,22 +243,11 @@ class Stats(Cog):
         await self.__test_stats("memory_test", ctx, flag)
 
     async def __test_stats(self, game_type: str, ctx: Context, flag: GameCommandFlag):
+        if (ranked := await self.__leaderboard(ctx, game_type, flag)) is None:
+            return
+        documents, sort_by, rank = ranked
         entries = []
-        i = 1
-        sort_by = f"game_{game_type}_{flag.sort_by or 'played'}".replace(" ", "_").lower()
-        FILTER: dict = {sort_by: {"$exists": True}}
-        if flag.me:
-            FILTER["_id"] = ctx.author.id
-        elif not flag._global:
-            FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
-
-        LIMIT = flag.limit or float("inf")
-        col = self.bot.game_collections
-        async for data in col.find(FILTER).sort(
-            sort_by,
-            pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING,
-        ):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
+        for data, user in documents:
             if user is None:
                 continue
 
@@ -260,16 +263,8 @@ class Stats(Cog):
 `{sort_by.replace('_', ' ').title()}`: {data[sort_by]}
 """,
                 )
-            if i >= LIMIT:
-                break
-            i += 1
 
-        if not entries:
-            await ctx.send(f"{ctx.author.mention} No records found")
-            return
-
-        p = SimplePages(entries, ctx=ctx)
-        await p.start()
+        await self.__paginate(ctx, entries, rank)
 
     @top.command("typing")
     async def top_typing(self, ctx: Context, *, flag: GameCommandFlag):
@@ -8,6 +8,7 @@ from typing import Annotated, Any
 
 import discord
 from core import Cog, Context, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands
 from utilities.checks import is_mod
 from utilities.formats import TabularData
@@ -453,21 +454,12 @@ class Suggestions(Cog):
         if payload.message_id in self.message:
             del self.message[payload.message_id]
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
-        if message.author.bot or message.guild is None:
-            return
-
-        ls = await self.bot.guild_configurations.find_one(
-            {"_id": message.guild.id, "suggestion_channel": message.channel.id},
-        )
-        if not ls:
-            return
-
-        if message.channel.id != ls["suggestion_channel"]:
-            return
-
+    @Cog.stage(
+        "suggestion",
+        check=lambda self, f: f.config is not None and f.config.get("suggestion_channel") == f.channel.id,
+    )
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         if await self.__parse_mod_action(message):
             return
 
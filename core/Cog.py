@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable, Iterable
+from functools import partial
+from time import perf_counter
+from typing import Any, TypeVar
 
 import discord
 from discord.ext import commands
 
+from .metrics import instrument_loops
+from .pipeline import Stage
+from .startup import loading
+
 __all__: tuple[str, ...] = ("Cog",)
 
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
 
 class Cog(commands.Cog):
     """A custom implementation of commands.Cog class."""
@@ -16,6 +25,19 @@ class Cog(commands.Cog):
     qualified_name: str
     ON_TESTING: bool = False
 
+    __message_stages__: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        stages: dict[str, None] = {}
+        for base in reversed(cls.__mro__):
+            for name, value in base.__dict__.items():
+                if hasattr(value, "__message_stage__"):
+                    stages[name] = None
+                else:
+                    stages.pop(name, None)
+        cls.__message_stages__ = tuple(stages)
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.display_name: str = self.qualified_name
@@ -25,3 +47,77 @@ class Cog(commands.Cog):
 
     def __repr__(self) -> str:
         return f"<Cog name={self.qualified_name} commands={len(self.__cog_commands__) + len(self.__cog_app_commands__)} listners={len(self.__cog_listeners__)}>"
+
+    @staticmethod
+    def stage(
+        name: str | None = None,
+        *,
+        after: Iterable[str] = (),
+        guild_only: bool = True,
+        ignore_bots: bool = True,
+        ignore_self: bool = True,
+        check: Callable[[Any, Any], Any] | None = None,
+    ) -> Callable[[FuncT], FuncT]:
+        """Registers the method as a stage of the message pipeline, see :class:`core.pipeline.Stage`.
+
+        The method gets the :class:`core.pipeline.MessageFeatures` of the message,
+        ``check`` gets the cog and the features. Stages are named
+        ``"Cog.method"`` unless ``name`` is given.
+        """
+
+        def decorator(func: FuncT) -> FuncT:
+            func.__message_stage__ = {  # type: ignore
+                "name": name,
+                "after": tuple(after),
+                "guild_only": guild_only,
+                "ignore_bots": ignore_bots,
+                "ignore_self": ignore_self,
+                "check": check,
+            }
+            return func
+
+        return decorator
+
+    def _message_stages(self) -> list[Stage]:
+        stages = []
+        for attr in self.__message_stages__:
+            method = getattr(self, attr)
+            options = dict(method.__message_stage__)
+            check = options.pop("check")
+            stages.append(
+                Stage(
+                    name=options.pop("name") or f"{self.qualified_name}.{attr}",
+                    callback=method,
+                    check=partial(check, self) if check is not None else None,
+                    **options,
+                ),
+            )
+        return stages
+
+    async def cog_warmup(self) -> None:
+        """Fills what the cog can do without for a moment after startup, caches mostly.
+
+        Runs once the bot is ready, next to the warmups of the other cogs,
+        see :class:`core.startup.Startup`. What must be there before the
+        first event is handled belongs in ``cog_load``.
+        """
+
+    async def _inject(self, bot: Any, *args: Any, **kwargs: Any) -> Cog:
+        started = perf_counter()
+        cog = await super()._inject(bot, *args, **kwargs)
+        if (timing := loading.get()) is not None:
+            timing.cog_load += perf_counter() - started
+        if (startup := getattr(bot, "startup", None)) is not None and type(self).cog_warmup is not Cog.cog_warmup:
+            startup.add_warmup(self)
+        if (pipeline := getattr(bot, "message_pipeline", None)) is not None:
+            for stage in self._message_stages():
+                pipeline.add(stage)
+        if (metrics := getattr(bot, "metrics", None)) is not None:
+            instrument_loops(self, metrics)
+        return cog
+
+    async def _eject(self, bot: Any, *args: Any, **kwargs: Any) -> None:
+        if (pipeline := getattr(bot, "message_pipeline", None)) is not None:
+            for stage in self._message_stages():
+                pipeline.remove(stage.name)
+        await super()._eject(bot, *args, **kwargs)
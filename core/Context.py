@@ -633,6 +633,7 @@ class Context(commands.Context[commands.Bot], Generic[BotT]):
                 upsert=True,
             )
 
+        await self.bot.game_leaderboards.record(self.author.id, guild=self.guild)
         return bool(update_result.modified_count)
 
     async def database_command_update(
@@ -5,13 +5,14 @@ import datetime
 import io
 import logging
 import logging.handlers
+import math
 import os
 import random
 import re
 import traceback
 import types
 from collections import Counter, defaultdict, deque
-from collections.abc import AsyncGenerator, Awaitable, Callable, Collection, Iterable, Mapping, Sequence
+from collections.abc import AsyncGenerator, Awaitable, Callable, Collection, Coroutine, Iterable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, Literal, TypeVar, cast, overload
 
 import aiohttp
@@ -19,7 +20,7 @@ import aioredis
 import aiosqlite
 import jishaku  # noqa: F401  # pylint: disable=unused-import
 import pymongo
-from aiohttp import ClientSession
+from aiohttp import ClientSession, web
 from pymongo.errors import ConnectionFailure, DuplicateKeyError
 from pymongo.results import DeleteResult, InsertOneResult
 
@@ -40,13 +41,23 @@ from discord.ext.commands.cooldowns import CooldownMapping
 
 from utilities.checks import can_run
 from utilities.config import (
+    CACHE_NAMESPACE,
     CASE_INSENSITIVE,
     CHANGE_LOG_CHANNEL_ID,
+    CLUSTER_COUNT,
+    CLUSTER_ID,
+    EXTENSION_REQUIRES,
     EXTENSIONS,
     GITHUB,
+    LOG_DATABASE,
+    LOG_RETENTION_DAYS,
+    LOG_RETENTION_ROWS,
     MASTER_OWNER,
+    METRICS_PORT,
     MINIMAL_BOOT,
     OWNER_IDS,
+    RECORD_TRAFFIC,
+    SHARD_COUNT,
     STRIP_AFTER_PREFIX,
     SUPPORT_SERVER,
     SUPPORT_SERVER_ID,
@@ -58,14 +69,24 @@ from utilities.config import (
     WEBHOOK_STARTUP_LOGS,
     WEBHOOK_VOTE_LOGS,
 )
-from utilities.converters import Cache
 from utilities.paste import Client
 
 from .__template import post as POST
+from .cache import CacheBus, SharedCache, SharedSet
+from .cluster import Cluster, ClusterIPC
+from .local_cache import CacheRegistry, LocalCache
 from .Cog import Cog
 from .Context import Context
+from .gateway import GatewayEventRing, ParrotConnectionState
 from .help import PaginatedHelpCommand
+from .leaderboard import GameLeaderboards
+from .logsink import LogSink, LogSinkHandler
+from .metrics import LoopLagMonitor, Metrics, current_site, instrument_loops
+from .pipeline import MessageFeatures, MessagePipeline
+from .resolver import MemberResolver
+from .startup import Startup
 from .tips import TIPS
+from .traffic import Anonymizer, TrafficRecorder
 from .types import AsyncMongoClient, MongoCollection, MongoDatabase, PostType
 from .utils import FileStreamFormatter, StreamFormatter, handler
 
@@ -146,9 +167,8 @@ class Parrot(commands.AutoShardedBot):
         topgg: topgg.client.DBLClient
         topgg_webhook: topgg.webhook.WebhookManager
 
-    recieved_logs: list[list] = []
-
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(self, *args: Any, cluster: Cluster | None = None, **kwargs: Any) -> None:
+        cluster = cluster or Cluster(CLUSTER_ID, CLUSTER_COUNT, SHARD_COUNT)
         super().__init__(
             command_prefix=self.get_prefix,
             case_insensitive=CASE_INSENSITIVE,
@@ -159,10 +179,12 @@ class Parrot(commands.AutoShardedBot):
             owner_ids=set(OWNER_IDS),
             allowed_mentions=discord.AllowedMentions(everyone=False, replied_user=False),
             member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
-            shard_count=1,
+            shard_count=cluster.shard_count,
+            shard_ids=cluster.shard_ids,
             max_messages=2**10,
             chunk_guilds_at_startup=False,
-            enable_debug_events=False,
+            # on_socket_raw_receive is only dispatched with debug events
+            enable_debug_events=bool(RECORD_TRAFFIC),
             help_command=PaginatedHelpCommand(),
             **kwargs,
         )
@@ -185,6 +207,8 @@ class Parrot(commands.AutoShardedBot):
         self._was_ready: bool = False
         self.lock: asyncio.Lock = asyncio.Lock()
         self.timer_task: asyncio.Task | None = None
+        # timers handed over to the cluster of their guild, deleted already
+        self._timer_handovers: set[asyncio.Task[None]] = set()
         self._current_timer: dict | None = {}
         self._have_data: asyncio.Event = asyncio.Event()
         self.reminder_event: asyncio.Event = asyncio.Event()
@@ -195,16 +219,65 @@ class Parrot(commands.AutoShardedBot):
         self._auto_spam_count: Counter[int] = Counter()
         self.resumes: dict[int, list[datetime.datetime]] = defaultdict(list)
         self.identifies: dict[int, list[datetime.datetime]] = defaultdict(list)
-        self._prev_events: deque[str] = deque(maxlen=10)
+        # off until a shard is traced, see core/gateway.py
+        self.gateway_events: GatewayEventRing = cast(ParrotConnectionState, self._connection).gateway_events
+        self.traffic_recorder: TrafficRecorder | None = None
+        self.startup = Startup()
+        self.log_sink = LogSink(LOG_DATABASE, max_age=LOG_RETENTION_DAYS * 24 * 60 * 60, max_rows=LOG_RETENTION_ROWS)
+        self._log_sink_handler: LogSinkHandler | None = None
 
         self.mystbin: Client = Client()
 
-        # caching variables
-        self.guild_configurations_cache: Cache[int, PostType] = Cache[int, PostType](self)
-        self.message_cache: dict[int, discord.Message] = {}
-        self.banned_users: dict[int, dict[str, int | str | bool]] = {}
-        self.afk_users: set[int] = set()
-        self.channel_message_cache: Cache[int, deque[discord.Message]] = Cache(self, cache_size=2**10)
+        # caching variables, the shared ones are kept in Redis too, see core/cache.py
+        self.caches: CacheBus = CacheBus(namespace=CACHE_NAMESPACE)
+        # those of this process only, bounded and swept, see core/local_cache.py
+        self.local_caches: CacheRegistry = CacheRegistry()
+        self.guild_configurations_cache: SharedCache[int, PostType] = self.caches.cache(
+            "guild_configurations",
+            size=2**5,
+            ttl=24 * 60 * 60,
+            loader=self.__load_server_config,
+            refresh=True,
+        )
+        # messages fetched by get_or_fetch_message, 1024 for an hour
+        self.message_cache: LocalCache[int, discord.Message] = self.local_caches.cache(
+            "messages",
+            maxsize=2**10,
+            ttl=60 * 60,
+        )
+        # not being in here is what lets a user use the bot, so nothing is evicted
+        self.banned_users: SharedCache[int, dict[str, int | str | bool]] = self.caches.cache(
+            "banned_users",
+            size=None,
+            refresh=True,
+        )
+        self.afk_users: SharedSet[int] = self.caches.set("afk_users")
+
+        # the other processes of the bot, see core/cluster.py
+        self.cluster: Cluster = cluster
+        self.ipc: ClusterIPC = ClusterIPC(self.caches, cluster)
+        self.ipc.handlers.update(
+            {
+                "stats": self.__cluster_stats,
+                "maintenance": self.__set_maintenance,
+                "timer": self.__remote_timer,
+                "timer_created": self.__remote_timer_created,
+            },
+        )
+        # the timers are dispatched by the leader
+        self.ipc.leader_listeners.append(self.__leadership_changed)
+        self.channel_message_cache: LocalCache[int, deque[discord.Message]] = self.local_caches.cache(
+            "channel_messages",
+            maxsize=2**10,
+        )
+        self.member_resolver: MemberResolver = MemberResolver(self)
+        self.message_pipeline: MessagePipeline = MessagePipeline(owner_ids=set(OWNER_IDS))
+
+        # Instrumentation, see core/metrics.py
+        self.metrics: Metrics = Metrics()
+        self.metrics.stage_timings = self.message_pipeline.timings
+        self.loop_lag: LoopLagMonitor = LoopLagMonitor(self.metrics)
+        self._metrics_runner: web.AppRunner | None = None
 
         self.before_invoke(self.__before_invoke)
 
@@ -227,8 +300,18 @@ class Parrot(commands.AutoShardedBot):
         self.__global_write_data: dict[str, list[pymongo.UpdateOne | pymongo.UpdateMany]] = {}
         # {"database.collection": [pymongo.UpdateOne(), ...]}
 
-        self.__user_timezone_cache: dict[int, str] = {}
-        self._user_cache: dict[int, dict[str, Any]] = {}
+        self.__user_timezone_cache: SharedCache[int, str] = self.caches.cache(
+            "user_timezones",
+            size=2**12,
+            ttl=24 * 60 * 60,
+            loader=self.__load_user_timezone,
+        )
+        self._user_cache: SharedCache[int, dict[str, Any]] = self.caches.cache(
+            "users",
+            size=2**12,
+            ttl=60 * 60,
+            loader=self.__load_user,
+        )
 
     async def init_db(self) -> None:
         # MongoDB Database variables
@@ -247,6 +330,11 @@ class Parrot(commands.AutoShardedBot):
         self.afk_collection: MongoCollection = self.main_db["afkCollection"]
         self.tags_collection: MongoCollection = self.main_db["tagsCollection"]
         self.auto_responders: MongoCollection = self.main_db["autoResponders"]
+        self.game_leaderboards: GameLeaderboards = GameLeaderboards(
+            self,
+            self.main_db["gameLeaderboards"],
+            self.game_collections,
+        )
 
         # User Message DB
         self.user_message_db: MongoDatabase = self.mongo["userMessageDB"]
@@ -281,8 +369,8 @@ class Parrot(commands.AutoShardedBot):
         raise AttributeError(msg)
 
     @property
-    def config(self) -> Cache[int, PostType]:
-        return cast(Cache[int, PostType], self.guild_configurations_cache)
+    def config(self) -> SharedCache[int, PostType]:
+        return self.guild_configurations_cache
 
     @property
     def server(self) -> discord.Guild:
@@ -341,23 +429,33 @@ class Parrot(commands.AutoShardedBot):
         return super().get_cog(name)
 
     async def setup_hook(self) -> None:
+        self.message_pipeline.bot_id = self.user.id
+        instrument_loops(self, self.metrics)
+        self.loop_lag.start()
+        await self.log_sink.start()
+        self._log_sink_handler = LogSinkHandler(self.log_sink)
+        logging.getLogger().addHandler(self._log_sink_handler)
+        await self.caches.start(getattr(self, "redis", None))
+        if METRICS_PORT:
+            await self.start_metrics_server(METRICS_PORT)
+        if RECORD_TRAFFIC:
+            # the command right after a prefix stays readable in the recording, replayed commands still invoke
+            self.traffic_recorder = TrafficRecorder(RECORD_TRAFFIC, anonymizer=Anonymizer(keep=self.all_commands))
+            self.traffic_recorder.start()
+
         if MINIMAL_BOOT:
             await self.load_extension("jishaku")
             return
 
-        for ext in EXTENSIONS:
-            try:
-                await self.load_extension(ext)
-                self._successfully_loaded.append(ext)
-                log.info("Loaded extension %s", ext)
-            except (commands.ExtensionFailed, commands.ExtensionNotFound) as e:
-                self._failed_to_load[ext] = str(e)
-                traceback.print_exc()
-                log.error("Failed to load extension %s", ext)
-            else:
-                if ext in UNLOAD_EXTENSIONS:
-                    await self.unload_extension(ext)
-                    log.warning("Unloaded extension %s", ext)
+        await self.startup.load(self, EXTENSIONS, requires=EXTENSION_REQUIRES)
+        self._failed_to_load.update(self.startup.failed)
+        for ext in self.startup.extensions:
+            if ext in self._failed_to_load:
+                continue
+            self._successfully_loaded.append(ext)
+            if ext in UNLOAD_EXTENSIONS:
+                await self.unload_extension(ext)
+                log.warning("Unloaded extension %s", ext)
 
         if self.HAS_TOP_GG:
             self.topgg = topgg.DBLClient(
@@ -374,12 +472,74 @@ class Parrot(commands.AutoShardedBot):
             self.ON_DOCKER = True
             log.debug("Running on docker container")
 
-        self.timer_task = self.loop.create_task(self.dispatch_timers())
+        await self.ipc.start()
+        await self.game_leaderboards.create_indexes()
 
         self.global_write_data.start()
         self.update_banned_members.start()
         self.update_scam_link_db.start()
-        self.update_user_cache.start()
+        self.sweep_local_caches.start()
+
+    async def start_metrics_server(self, port: int) -> None:
+        """Serves :meth:`core.metrics.Metrics.render_prometheus` on ``http://127.0.0.1:<port>/metrics``."""
+
+        async def metrics(request: web.Request) -> web.Response:
+            return web.Response(text=self.metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        self._metrics_runner = web.AppRunner(app, access_log=None)
+        await self._metrics_runner.setup()
+        await web.TCPSite(self._metrics_runner, "127.0.0.1", port).start()
+        log.info("Serving metrics on 127.0.0.1:%s", port)
+
+    def _get_state(self, **options: Any) -> ParrotConnectionState:
+        return ParrotConnectionState(
+            dispatch=self.dispatch,
+            handlers=self._handlers,
+            hooks=self._hooks,
+            http=self.http,
+            **options,
+        )
+
+    async def _run_event(
+        self,
+        coro: Callable[..., Coroutine[Any, Any, Any]],
+        event_name: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        # Client._run_event, timed. Every listener is dispatched through here
+        histogram = self.metrics.listener(event_name, coro.__qualname__)
+        current_site.set(histogram.site)
+        start = perf_counter()
+        try:
+            await coro(*args, **kwargs)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            histogram.observe(perf_counter() - start)
+            histogram.errors += 1
+            try:
+                await self.on_error(event_name, *args, **kwargs)
+            except asyncio.CancelledError:
+                pass
+            return
+        histogram.observe(perf_counter() - start)
+
+    async def invoke(self, ctx: Context) -> None:
+        if ctx.command is None:
+            return await super().invoke(ctx)
+
+        histogram = self.metrics.command(ctx.command.qualified_name)
+        token = current_site.set(histogram.site)
+        start = perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            histogram.observe(perf_counter() - start)
+            histogram.errors += ctx.command_failed
+            current_site.reset(token)
 
     async def db_latency(self) -> float:
         ini = perf_counter()
@@ -399,7 +559,8 @@ class Parrot(commands.AutoShardedBot):
                 del dates[index]
 
     async def on_socket_raw_receive(self, msg: str) -> None:
-        self._prev_events.append(msg)
+        if self.traffic_recorder is not None:
+            self.traffic_recorder.record(msg)
 
     async def _execute_webhook_from_scratch(
         self,
@@ -545,6 +706,21 @@ class Parrot(commands.AutoShardedBot):
         if self.update_scam_link_db.is_running():
             self.update_scam_link_db.stop()
 
+        if self.sweep_local_caches.is_running():
+            self.sweep_local_caches.stop()
+
+        self.loop_lag.stop()
+        if self.traffic_recorder is not None:
+            await self.traffic_recorder.stop()
+        if self._metrics_runner is not None:
+            await self._metrics_runner.cleanup()
+        if self._log_sink_handler is not None:
+            logging.getLogger().removeHandler(self._log_sink_handler)
+            self._log_sink_handler = None
+        await self.log_sink.close()
+        await self.ipc.stop()
+        await self.caches.stop()
+
         await self.sql.close()
 
         return await super().close()
@@ -556,6 +732,7 @@ class Parrot(commands.AutoShardedBot):
         if self._was_ready:
             return
         self._was_ready = True
+        self.startup.ready()
 
         if MINIMAL_BOOT:
             return
@@ -574,7 +751,8 @@ class Parrot(commands.AutoShardedBot):
         ls: list[int | None] = await self.afk_collection.distinct("afk.messageAuthor")
         log.debug("Got all afk users from database: %s", ls)
         if ls:
-            self.afk_users = set(ls)
+            # every process reads them on its own
+            self.afk_users.replace(ls, publish=False)
 
         content = "```css"
         if self.HAS_TOP_GG:
@@ -714,15 +892,16 @@ class Parrot(commands.AutoShardedBot):
         # sourcery skip: use-contextlib-suppress
         self._seen_messages += 1
 
-        if message.guild is None or message.author.bot:
-            return
+        if message.guild is not None and message.guild.id not in self.guild_configurations_cache:
+            await self.loop_try(self.guild_configurations_cache.fetch(message.guild.id), count=3)
 
-        try:
-            self.guild_configurations_cache[message.guild.id]
-        except KeyError:
-            await self.loop_try(self.__update_server_config_cache(message.guild.id), count=3)
+        features = self.message_features(message)
+        self.message_pipeline.run(features)
 
-        if re.fullmatch(rf"<@!?{self.user.id}>", message.content):
+        if message.guild is None or features.is_bot:
+            return
+
+        if message.content in (f"<@{self.user.id}>", f"<@!{self.user.id}>"):
             if message.channel.permissions_for(message.guild.me).send_messages:
                 await message.channel.send(f"Prefix: `{await self.get_guild_prefixes(message.guild)}`")
             else:
@@ -736,6 +915,11 @@ class Parrot(commands.AutoShardedBot):
 
         await self.process_commands(message)
 
+    def message_features(self, message: discord.Message) -> MessageFeatures:
+        """The features of ``message`` the message stages run against, with the cached guild config."""
+        config = self.guild_configurations_cache.get(message.guild.id) if message.guild is not None else None
+        return self.message_pipeline.features(message, config=config)
+
     async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
         if after.guild is None or after.author.bot:
             return
@@ -756,7 +940,7 @@ class Parrot(commands.AutoShardedBot):
 
         This is done lazily using an asynchronous iterator.
 
-        Note that the order of the resolved members is not the same as the input.
+        Lookups are batched and shared with concurrent callers, see :class:`MemberResolver`.
 
         Parameters
         ----------
@@ -770,41 +954,37 @@ class Parrot(commands.AutoShardedBot):
         Member
             The resolved members.
         """
-        needs_resolution = []
-        for member_id in member_ids:
-            member = guild.get_member(member_id)
+        for member in await self.member_resolver.resolve_many(guild, member_ids):
             if member is not None:
                 yield member
-            else:
-                needs_resolution.append(member_id)
 
-        total_need_resolution = len(needs_resolution)
-        if total_need_resolution == 1:
-            shard = self.get_shard(guild.shard_id)
+    async def get_or_fetch_members(
+        self,
+        guild: discord.Guild,
+        member_ids: Iterable[int],
+        in_guild: bool = True,
+    ) -> list[discord.Member | discord.User | None]:
+        """|coro|.
 
-            if shard and shard.is_ws_ratelimited():
-                try:
-                    member = await guild.fetch_member(needs_resolution[0])
-                except discord.HTTPException:
-                    pass
-                else:
-                    yield member
-            else:
-                members: list[discord.Member] = await guild.query_members(limit=1, user_ids=needs_resolution, cache=True)
-                if members:
-                    yield members[0]
-        elif total_need_resolution <= 100 and total_need_resolution > 1:
-            # Only a single resolution call needed here
-            resolved = await guild.query_members(limit=100, user_ids=needs_resolution, cache=True)
-            for member in resolved:
-                yield member
-        else:
-            # We need to chunk these in bits of 100...
-            for index in range(0, total_need_resolution, 100):
-                to_resolve = needs_resolution[index : index + 100]
-                members = await guild.query_members(limit=100, user_ids=to_resolve, cache=True)
-                for member in members:
-                    yield member
+        Looks up many members at once, in cache or in as few requests as possible.
+
+        Parameters
+        ----------
+        guild: Guild
+            The guild to look in.
+        member_ids: Iterable[int]
+            The member IDs to search for.
+        in_guild: bool
+            If ``False``, users who are not in the guild are fetched as users.
+
+        Returns
+        -------
+        list[Optional[Member | User]]
+            The members, in the order of ``member_ids``, None for those not found.
+        """
+        if not in_guild:
+            return await self.member_resolver.resolve_many_users(guild, member_ids)
+        return await self.member_resolver.resolve_many(guild, member_ids)
 
     @overload
     async def get_or_fetch_member(
@@ -856,20 +1036,8 @@ class Parrot(commands.AutoShardedBot):
         member_id = member_id.id if isinstance(member_id, discord.Object) else int(member_id)
 
         if not in_guild:
-            return await self.getch(self.get_user, self.fetch_user, int(member_id))
-        member = guild.get_member(member_id)
-        if member is not None:
-            return member
-
-        shard = self.get_shard(guild.shard_id)
-        if shard and shard.is_ws_ratelimited():
-            try:
-                return await guild.fetch_member(member_id)
-            except discord.HTTPException:
-                return None
-
-        members = await guild.query_members(limit=1, user_ids=[member_id], cache=True)
-        return members[0] if members else None
+            return await self.member_resolver.resolve_user(member_id)
+        return await self.member_resolver.resolve(guild, member_id)
 
     async def get_prefix(self, message: discord.Message) -> list[str]:
         """Dynamic prefixing."""
@@ -878,19 +1046,8 @@ class Parrot(commands.AutoShardedBot):
         try:
             prefix: str = self.guild_configurations_cache[message.guild.id]["prefix"]
         except KeyError:
-            if data := await self.guild_configurations.find_one({"_id": message.guild.id}):
-                prefix = data.get("prefix", DEFAULT_PREFIX)
-                post = data
-                self.guild_configurations_cache[message.guild.id] = post
-            else:
-                FAKE_POST = POST.copy()
-                FAKE_POST["_id"] = message.guild.id
-                prefix = DEFAULT_PREFIX  # default prefix
-                try:
-                    await self.guild_configurations.insert_one(FAKE_POST)
-                except DuplicateKeyError:
-                    return commands.when_mentioned_or(DEFAULT_PREFIX)(self, message)
-                self.guild_configurations_cache[message.guild.id] = FAKE_POST
+            data = await self.guild_configurations_cache.fetch(message.guild.id)
+            prefix = data.get("prefix", DEFAULT_PREFIX) if data else DEFAULT_PREFIX
 
         comp = re.compile(f"^({re.escape(prefix)}).*", flags=re.I)
         match = comp.match(message.content)
@@ -905,7 +1062,7 @@ class Parrot(commands.AutoShardedBot):
         try:
             return self.guild_configurations_cache[guild.id]["prefix"]
         except KeyError:
-            if data := await self.guild_configurations.find_one({"_id": guild.id}):
+            if data := await self.guild_configurations_cache.fetch(guild.id):
                 return data.get("prefix", DEFAULT_PREFIX)
         return DEFAULT_PREFIX
 
@@ -941,27 +1098,30 @@ class Parrot(commands.AutoShardedBot):
 
     async def __update_server_config_cache(self, guild_id: int):
         log.debug("Updating server config cache for guild %s", guild_id)
+        # the other processes read it again from Redis
+        await self.guild_configurations_cache.set(guild_id, await self.__load_server_config(guild_id))
+
+    async def __load_server_config(self, guild_id: int) -> PostType:
         if data := await self.guild_configurations.find_one({"_id": guild_id}):
-            self.guild_configurations_cache[guild_id] = data
-        else:
-            log.debug("Guild %s not found in database, creating new one", guild_id)
-            FAKE_POST = POST.copy()
-            FAKE_POST["_id"] = guild_id
-            try:
-                await self.guild_configurations.insert_one(FAKE_POST)
-            except DuplicateKeyError:
-                pass
-            finally:
-                self.guild_configurations_cache[guild_id] = FAKE_POST
+            return data
+
+        log.debug("Guild %s not found in database, creating new one", guild_id)
+        FAKE_POST = POST.copy()
+        FAKE_POST["_id"] = guild_id
+        try:
+            await self.guild_configurations.insert_one(FAKE_POST)
+        except DuplicateKeyError:
+            pass
+        return FAKE_POST
 
     @tasks.loop(count=1)
     async def update_banned_members(self):
-        self.banned_users = {}
         data = await self.extra_collections.find_one({"_id": "banned_users"})
         if data is None:
             return
         for _data in data["users"]:
-            self.banned_users[_data["user_id"]] = _data
+            # every process reads them on its own
+            self.banned_users.fill(_data["user_id"], _data)
 
     async def __before_invoke(self, ctx: Context):
         if ctx.guild is not None and not ctx.guild.chunked:
@@ -1029,11 +1189,40 @@ class Parrot(commands.AutoShardedBot):
         if deleted.deleted_count == 0:
             return
 
+        guild_id = data.get("guild")
+        if isinstance(guild_id, int) and (cluster := self.cluster.cluster_of_guild(guild_id)) != self.cluster.id:
+            # a task of its own, cancelling the timer task while waiting for the answer would lose the timer
+            task = asyncio.create_task(self.__hand_over_timer(cluster, data))
+            self._timer_handovers.add(task)
+            task.add_done_callback(self._timer_handovers.discard)
+            return
+
+        self.__dispatch_timer(data)
+
+    async def __hand_over_timer(self, cluster: int, data: dict[str, Any]) -> None:
+        # the listeners of the timer need the guild, which is in the cache of its cluster
+        if cluster in await self.ipc.request("timer", data, to=cluster):
+            return
+        log.warning("Cluster %s didn't take timer %s, dispatching it here", cluster, data["_id"])
+        self.__dispatch_timer(data)
+
+    def __dispatch_timer(self, data: dict[str, Any]) -> None:
         if data.get("_event_name"):
             self.dispatch(f"{data['_event_name']}_timer_complete", **data)
         else:
             self.dispatch("timer_complete", **data)
 
+    async def __remote_timer(self, data: dict[str, Any]) -> bool:
+        self.__dispatch_timer(data)
+        return True
+
+    async def __leadership_changed(self, leader: bool) -> None:
+        if leader and self.timer_task is None:
+            self.timer_task = self.loop.create_task(self.dispatch_timers())
+        elif not leader and self.timer_task is not None:
+            self.timer_task.cancel()
+            self.timer_task = None
+
     async def short_time_dispatcher(self, collection: MongoCollection, **data: Any):
         log.debug(
             "Sleeping for %s seconds",
@@ -1108,9 +1297,17 @@ class Parrot(commands.AutoShardedBot):
         # fmt: on
         insert_data = await collection.insert_one(post)
         log.debug("Inserted data: %s", insert_data)
+        if self.ipc.leader:
+            self.__timer_created(post)
+        else:
+            await self.ipc.broadcast("timer_created", post, include_self=False)
+
+        return insert_data
+
+    def __timer_created(self, post: dict[str, Any]) -> None:
         self._have_data.set()
 
-        if self._current_timer and self._current_timer["expires_at"] > expires_at:
+        if self._current_timer and self._current_timer["expires_at"] > post["expires_at"]:
             self._current_timer = post
 
             if self.timer_task:
@@ -1119,7 +1316,9 @@ class Parrot(commands.AutoShardedBot):
 
                 self.timer_task = self.loop.create_task(self.dispatch_timers())
 
-        return insert_data
+    async def __remote_timer_created(self, post: dict[str, Any]) -> None:
+        if self.ipc.leader:
+            self.__timer_created(post)
 
     async def get_timer(self, **kw: Any) -> dict[str, Any] | None:
         collection: MongoCollection = self.timers
@@ -1363,7 +1562,7 @@ class Parrot(commands.AutoShardedBot):
         if guild.id in self.guild_configurations_cache:
             return
 
-        await self.__update_server_config_cache(guild.id)
+        await self.guild_configurations_cache.fetch(guild.id)
 
     @tasks.loop(minutes=5)
     async def global_write_data(self):
@@ -1373,6 +1572,11 @@ class Parrot(commands.AutoShardedBot):
                 await self.mongo[db][col].bulk_write(self.__global_write_data[db_col])
             self.__global_write_data = {}
 
+    @tasks.loop(minutes=5)
+    async def sweep_local_caches(self):
+        if swept := self.local_caches.sweep():
+            log.debug("Swept %s expired entries from the local caches", swept)
+
     def add_global_write_data(
         self,
         *,
@@ -1427,24 +1631,39 @@ class Parrot(commands.AutoShardedBot):
     async def update_scam_link_db(self):
         from updater import insert_new
 
+        if not self.ipc.leader:
+            return
         async with self.lock:
             await insert_new(self.sql)
 
+    async def __cluster_stats(self, _: Any) -> dict[str, Any]:
+        return {
+            "shards": self.cluster.shard_ids,
+            "guilds": len(self.guilds),
+            "users": len(self.users),
+            "latency": round(self.latency * 1000, 1) if math.isfinite(self.latency) else None,
+            "messages": self._seen_messages,
+            "uptime": (discord.utils.utcnow() - self.uptime).total_seconds() if hasattr(self, "uptime") else None,
+            "leader": self.ipc.leader,
+        }
+
+    async def __set_maintenance(self, payload: dict[str, Any]) -> None:
+        self.UNDER_MAINTENANCE = payload["on"]
+        self.UNDER_MAINTENANCE_REASON = payload["reason"]
+        self.UNDER_MAINTENANCE_OVER = (
+            datetime.datetime.fromtimestamp(payload["over"], tz=datetime.timezone.utc) if payload["over"] else None
+        )
+
     async def get_user_timezone(self, user_id: int) -> str:
-        if tz := self.__user_timezone_cache.get(user_id):
-            return tz
+        return await self.__user_timezone_cache.fetch(user_id) or "UTC"
 
-        data = await self.user_collections_ind.find_one({"_id": user_id})
-        if data is None:
-            return "UTC"
-        try:
-            return data["timezone"]
-        except KeyError:
-            return "UTC"
+    async def __load_user_timezone(self, user_id: int) -> str | None:
+        data = await self.user_collections_ind.find_one({"_id": user_id}, {"timezone": 1})
+        return data.get("timezone") if data else None
 
     async def set_user_timezone(self, user_id: int, timezone: str) -> None:
         await self.user_collections_ind.update_one({"_id": user_id}, {"$set": {"timezone": timezone}}, upsert=True)
-        self.__user_timezone_cache[user_id] = timezone
+        await self.__user_timezone_cache.set(user_id, timezone)
 
     async def ban_user(self, *, user_id: int, reason: str, command: bool = True, send: bool = False, **kw: bool):
         # sourcery skip: use-contextlib-suppress
@@ -1466,12 +1685,15 @@ class Parrot(commands.AutoShardedBot):
         }
 
         await collection.update_one(query, update, upsert=True)
-        self.banned_users[user_id] = {
-            "user_id": user_id,
-            "reason": reason,
-            "command": command,
-            **kw,
-        }
+        await self.banned_users.set(
+            user_id,
+            {
+                "user_id": user_id,
+                "reason": reason,
+                "command": command,
+                **kw,
+            },
+        )
 
         user: discord.User | None = await self.getch(self.get_user, self.fetch_user, user_id)
         try:
@@ -1504,16 +1726,19 @@ class Parrot(commands.AutoShardedBot):
         }
 
         await collection.update_one(query, update)
-        self.banned_users.pop(user_id, None)
+        await self.banned_users.invalidate(user_id)
 
     @tasks.loop(count=1)
     async def update_user_cache(self, user_id: int | None = None):
         if user_id:
-            if data := await self.user_collections_ind.find_one({"_id": user_id}):
-                self._user_cache[user_id] = data
+            if data := await self.__load_user(user_id):
+                await self._user_cache.set(user_id, data)
             return
         async for data in self.user_collections_ind.find():
-            self._user_cache[data["_id"]] = data
+            self._user_cache.fill(data["_id"], data)
+
+    async def __load_user(self, user_id: int) -> dict[str, Any] | None:
+        return await self.user_collections_ind.find_one({"_id": user_id})
 
     async def wait_and_delete(
         self,
@@ -1545,17 +1770,9 @@ class Parrot(commands.AutoShardedBot):
                 },
             )
 
-    # CREATE TABLE IF NOT EXISTS logs (
-    #       id      INTEGER PRIMARY KEY AUTOINCREMENT,
-    #       level   INT NOT NULL,
-    #       message TEXT NOT NULL,
-    #       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    #       extra   TEXT,
-    #       UNIQUE(message, created_at)
-    # );
-
     @overload
     def log(
+        self,
         level: int | str,
         message: str,
         extra: dict[str, Any] | None = None,
@@ -1564,6 +1781,7 @@ class Parrot(commands.AutoShardedBot):
 
     @overload
     def log(
+        self,
         *,
         level: int | str,
         message: str,
@@ -1573,6 +1791,7 @@ class Parrot(commands.AutoShardedBot):
 
     @overload
     def log(
+        self,
         level: int | str,
         *,
         message: str,
@@ -1580,36 +1799,26 @@ class Parrot(commands.AutoShardedBot):
     ) -> None:
         ...
 
-    @staticmethod
     def log(
+        self,
         *args: Any,
         **kwargs: Any,
     ) -> None:
+        """Queues a line for the log sink, see :class:`core.logsink.LogSink`."""
         mapping = {
-            "debug": "DEBUG",
-            "info": "INFO",
-            "warning": "WARNING",
-            "error": "ERROR",
-            "critical": "CRITICAL",
-            "0": "DEBUG",
-            "1": "INFO",
-            "2": "WARNING",
-            "3": "ERROR",
-            "4": "CRITICAL",
+            "debug": logging.DEBUG,
+            "info": logging.INFO,
+            "warning": logging.WARNING,
+            "error": logging.ERROR,
+            "critical": logging.CRITICAL,
+            "0": logging.DEBUG,
+            "1": logging.INFO,
+            "2": logging.WARNING,
+            "3": logging.ERROR,
+            "4": logging.CRITICAL,
         }
-        level = kwargs.get("level") or args[0]
-        message = kwargs.get("message") or args[1]
-        extra = kwargs.get("extra") or args[2]
-        level = mapping.get(str(level).lower(), "INFO")
-        Parrot.recieved_logs.append([level, message or "None", extra])
-
-    async def _log(self) -> None:
-        if self.recieved_logs:
-            query = """
-                INSERT INTO logs (level, message, extra) VALUES (?, ?, ?) ON CONFLICT DO NOTHING;
-            """
-            await self.sql.executemany(query, self.recieved_logs)
-
-    @tasks.loop(minutes=1)
-    async def log_loop(self):
-        await self._log()
+        level = kwargs["level"] if "level" in kwargs else args[0]
+        message = kwargs["message"] if "message" in kwargs else args[1]
+        extra = kwargs["extra"] if "extra" in kwargs else (args[2] if len(args) > 2 else None)
+        level = mapping.get(str(level).lower(), logging.INFO)
+        self.log_sink.put(level, message or "None", logger="core.parrot", extra=extra)
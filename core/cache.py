@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from time import monotonic
+from typing import Any, Generic, TypeVar
+
+import aioredis
+from bson import json_util
+from bson.json_util import JSONMode, JSONOptions
+from lru import LRU
+
+__all__ = (
+    "CacheBus",
+    "SharedCache",
+    "SharedSet",
+    "dumps",
+    "loads",
+)
+
+log = logging.getLogger("core.cache")
+
+KT = TypeVar("KT")
+VT = TypeVar("VT")
+
+Loader = Callable[[Any], Awaitable[Any]]
+
+# keys per SCAN step of a clear, each step's keys are deleted before the next
+SCAN_COUNT = 500
+
+# what motor hands back, datetimes stay naive and ObjectIds stay ObjectIds after a round trip
+JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+
+_MISSING: Any = object()
+
+
+def dumps(value: Any) -> str:
+    return json_util.dumps(value, json_options=JSON_OPTIONS)
+
+
+def loads(raw: str | bytes) -> Any:
+    return json_util.loads(raw, json_options=JSON_OPTIONS)
+
+
+class CacheBus:
+    """Connects the shared caches of this process to Redis, and through it to the same caches in the other processes.
+
+    Whatever a cache writes is published on ``{namespace}:invalidate``, the
+    bus of every other process hands it to its cache of the same name.
+    Without Redis, before :meth:`start` or for ``retry_after`` seconds after
+    a command to it failed, the caches are only the LRU in this process.
+    Invalidations sent while the subscription was down are lost, once it is
+    back every cache drops everything it holds.
+    """
+
+    def __init__(self, *, namespace: str = "parrot", retry_after: float = 30.0) -> None:
+        self.namespace = namespace
+        self.channel = f"{namespace}:invalidate"
+        self.retry_after = retry_after
+        # tells our own invalidations apart from those of the other processes
+        self.origin = uuid.uuid4().hex
+        self.redis: aioredis.Redis | None = None
+        self.caches: dict[str, SharedCache[Any, Any] | SharedSet[Any]] = {}
+        self.channels: dict[str, Callable[[str | bytes], None]] = {self.channel: self._dispatch}
+
+        self.errors = 0
+        self.received = 0
+        self._down_until = 0.0
+        self._task: asyncio.Task[None] | None = None
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def cache(
+        self,
+        name: str,
+        *,
+        size: int | None = 2**10,
+        ttl: int | None = None,
+        loader: Loader | None = None,
+        refresh: bool = False,
+    ) -> SharedCache[Any, Any]:
+        """A new :class:`SharedCache`, it replaces the one of the same name, as when a cog is reloaded."""
+        cache: SharedCache[Any, Any] = SharedCache(self, name, size=size, ttl=ttl, loader=loader, refresh=refresh)
+        self.caches[name] = cache
+        return cache
+
+    def set(self, name: str) -> SharedSet[Any]:  # noqa: A003
+        """A new :class:`SharedSet`, it replaces the one of the same name."""
+        shared: SharedSet[Any] = SharedSet(self, name)
+        self.caches[name] = shared
+        return shared
+
+    def listen(self, channel: str, callback: Callable[[str | bytes], None]) -> None:
+        """Hands what is published on ``channel`` to ``callback``, from the next subscription on, as :meth:`start`."""
+        self.channels[channel] = callback
+
+    @property
+    def available(self) -> bool:
+        return self.redis is not None and monotonic() >= self._down_until
+
+    async def start(self, redis: aioredis.Redis | None) -> None:
+        self.redis = redis
+        if redis is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._listen(redis), name="cache:invalidations")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        # the writes still on their way to Redis
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=5)
+            for task in pending:
+                task.cancel()
+        self.redis = None
+
+    def spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def call(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Runs a Redis command, ``None`` if Redis is unavailable or the command failed."""
+        if not self.available:
+            return None
+        assert self.redis is not None
+        try:
+            return await getattr(self.redis, command)(*args, **kwargs)
+        except (aioredis.RedisError, OSError) as e:
+            self.errors += 1
+            self._down_until = monotonic() + self.retry_after
+            log.warning("Redis %s failed, caches are local for %ss: %s", command.upper(), self.retry_after, e)
+            return None
+
+    async def publish(self, name: str, key: Any = None, data: Any = None) -> None:
+        message = {"origin": self.origin, "cache": name, "key": key, "data": data}
+        await self.call("publish", self.channel, dumps(message))
+
+    async def _listen(self, redis: aioredis.Redis) -> None:
+        reconnecting = False
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(*self.channels)
+                if reconnecting:
+                    log.info("Resubscribed to %s, dropping what the caches hold", self.channel)
+                    for cache in self.caches.values():
+                        cache._missed()
+                async for message in pubsub.listen():
+                    if message["type"] == "message" and (callback := self.channels.get(message["channel"])):
+                        callback(message["data"])
+            except (aioredis.RedisError, OSError) as e:
+                self.errors += 1
+                log.warning("Lost the subscription to %s: %s", ", ".join(self.channels), e)
+            finally:
+                await pubsub.close()
+            reconnecting = True
+            await asyncio.sleep(self.retry_after)
+
+    def _dispatch(self, raw: str | bytes) -> None:
+        try:
+            message = loads(raw)
+            origin, name, key, data = message["origin"], message["cache"], message["key"], message["data"]
+        except (ValueError, TypeError, KeyError):
+            log.warning("Ignoring malformed cache invalidation %r", raw)
+            return
+        if origin == self.origin or (cache := self.caches.get(name)) is None:
+            return
+        self.received += 1
+        cache._received(key, data)
+
+
+class SharedCache(Generic[KT, VT]):
+    """Two levels, an LRU of ``size`` entries in this process in front of Redis, ``None`` for no limit.
+
+    The mapping interface reads and writes the LRU only, so reading is as
+    cheap as the dicts this replaces, writes go on to Redis in the background.
+    :meth:`fetch` falls back to Redis and then to ``loader``, whatever the
+    loader returns is kept in Redis for ``ttl`` seconds, forever if ``None``.
+
+    Every write publishes its key, the other processes drop it from their LRU
+    and, with ``refresh``, read it again from Redis right away. ``listeners``
+    are awaited with every key another process invalidated, after that.
+    :meth:`fill` keeps a value in this process only, for what every process
+    loads on its own.
+    """
+
+    def __init__(
+        self,
+        bus: CacheBus,
+        name: str,
+        *,
+        size: int | None = 2**10,
+        ttl: int | None = None,
+        loader: Loader | None = None,
+        refresh: bool = False,
+    ) -> None:
+        self.bus = bus
+        self.name = name
+        self.ttl = ttl
+        self.loader = loader
+        self.refresh = refresh
+        self.listeners: list[Callable[[KT], Awaitable[Any]]] = []
+
+        self.remote_hits = 0
+        self.loads = 0
+        self._local: LRU | dict[KT, VT] = LRU(size) if size else {}
+
+    def __repr__(self) -> str:
+        return f"<SharedCache name={self.name!r} local={len(self._local)}>"
+
+    def key(self, key: KT) -> str:
+        return f"{self.bus.namespace}:{self.name}:{key}"
+
+    # this process only
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def __iter__(self) -> Iterator[KT]:
+        return iter(self._local.keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._local
+
+    def __getitem__(self, key: KT) -> VT:
+        return self._local[key]
+
+    def get(self, key: KT, default: Any = None) -> Any:
+        return self._local.get(key, default)
+
+    def keys(self) -> list[KT]:
+        return list(self._local.keys())
+
+    def values(self) -> list[VT]:
+        return list(self._local.values())
+
+    def items(self) -> list[tuple[KT, VT]]:
+        return list(self._local.items())
+
+    def fill(self, key: KT, value: VT) -> None:
+        self._local[key] = value
+
+    # everywhere
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        self._local[key] = value
+        self.bus.spawn(self._store(key, value))
+
+    def __delitem__(self, key: KT) -> None:
+        del self._local[key]
+        self.bus.spawn(self._delete(key))
+
+    def pop(self, key: KT, default: Any = _MISSING) -> Any:
+        value = self._local.pop(key, _MISSING)
+        self.bus.spawn(self._delete(key))
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+
+    def setdefault(self, key: KT, default: VT) -> VT:
+        if key in self._local:
+            return self._local[key]
+        self[key] = default
+        return default
+
+    def update(self, items: Iterable[tuple[KT, VT]] | dict[KT, VT]) -> None:
+        for key, value in items.items() if isinstance(items, dict) else items:
+            self[key] = value
+
+    def clear(self) -> None:
+        self._local.clear()
+        self.bus.spawn(self._clear())
+
+    async def fetch(self, key: KT) -> VT | None:
+        """The value from this process, Redis or the loader, in that order, ``None`` if none of them has it."""
+        try:
+            return self._local[key]
+        except KeyError:
+            pass
+
+        raw = await self.bus.call("get", self.key(key))
+        if raw is not None:
+            self.remote_hits += 1
+            value = loads(raw)
+        elif self.loader is not None:
+            value = await self.loader(key)
+            if value is None:
+                return None
+            self.loads += 1
+            # nothing changed, the other processes would load the same
+            await self._store(key, value, publish=False)
+        else:
+            return None
+        self._local[key] = value
+        return value
+
+    async def set(self, key: KT, value: VT) -> None:  # noqa: A003
+        self._local[key] = value
+        await self._store(key, value)
+
+    async def invalidate(self, key: KT) -> None:
+        self._local.pop(key, None)
+        await self._delete(key)
+
+    async def _store(self, key: KT, value: VT, *, publish: bool = True) -> None:
+        # written before it is published, whoever reads it again gets the new value
+        await self.bus.call("set", self.key(key), dumps(value), ex=self.ttl or None)
+        if publish:
+            await self.bus.publish(self.name, key)
+
+    async def _delete(self, key: KT) -> None:
+        await self.bus.call("delete", self.key(key))
+        await self.bus.publish(self.name, key)
+
+    async def _clear(self) -> None:
+        # KEYS would block Redis while it walks every key, SCAN walks them a step at a time
+        cursor = 0
+        while (step := await self.bus.call("scan", cursor, match=self.key("*"), count=SCAN_COUNT)) is not None:
+            cursor, keys = step
+            if keys:
+                await self.bus.call("delete", *keys)
+            if not cursor:
+                break
+        await self.bus.publish(self.name)
+
+    def _received(self, key: KT | None, data: Any) -> None:
+        # no key when the whole cache was cleared
+        keys = [key] if key is not None else self.keys()
+        for key in keys:
+            self._local.pop(key, None)
+            if self.refresh or self.listeners:
+                self.bus.spawn(self._reload(key))
+
+    def _missed(self) -> None:
+        self._received(None, None)
+
+    async def _reload(self, key: KT) -> None:
+        if self.refresh:
+            await self.fetch(key)
+        for listener in self.listeners:
+            try:
+                await listener(key)
+            except Exception:
+                log.exception("Invalidation listener of cache %s failed for %r", self.name, key)
+
+
+class SharedSet(Generic[KT]):
+    """A set with the same members in every process.
+
+    What is added or discarded is published, the other processes add or
+    discard it too. It isn't kept in Redis, whoever holds the members for
+    good is meant to :meth:`replace` them on start.
+    """
+
+    def __init__(self, bus: CacheBus, name: str) -> None:
+        self.bus = bus
+        self.name = name
+        self._members: set[KT] = set()
+
+    def __repr__(self) -> str:
+        return f"<SharedSet name={self.name!r} members={len(self._members)}>"
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self) -> Iterator[KT]:
+        return iter(self._members)
+
+    def __contains__(self, member: object) -> bool:
+        return member in self._members
+
+    def isdisjoint(self, other: Iterable[Any]) -> bool:
+        return self._members.isdisjoint(other)
+
+    def add(self, member: KT) -> None:
+        self._members.add(member)
+        self.bus.spawn(self.bus.publish(self.name, data={"add": [member], "discard": []}))
+
+    def discard(self, member: KT) -> None:
+        self._members.discard(member)
+        self.bus.spawn(self.bus.publish(self.name, data={"add": [], "discard": [member]}))
+
+    def remove(self, member: KT) -> None:
+        if member not in self._members:
+            raise KeyError(member)
+        self.discard(member)
+
+    def replace(self, members: Iterable[KT], *, publish: bool = True) -> None:
+        """Makes ``members`` the members, what that added or discarded is published unless ``publish`` is False."""
+        members = set(members)
+        added, discarded = members - self._members, self._members - members
+        self._members = members
+        if publish and (added or discarded):
+            self.bus.spawn(self.bus.publish(self.name, data={"add": list(added), "discard": list(discarded)}))
+
+    def _received(self, key: Any, data: Any) -> None:
+        if not data:
+            return
+        self._members.update(data.get("add", ()))
+        self._members.difference_update(data.get("discard", ()))
+
+    def _missed(self) -> None:
+        # there is nothing to read again, the members stay as they are
+        pass
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from .cache import dumps, loads
+
+if TYPE_CHECKING:
+    from .cache import CacheBus
+
+__all__ = (
+    "RELEASE_LEASE",
+    "RENEW_LEASE",
+    "Cluster",
+    "ClusterIPC",
+    "Launcher",
+    "Worker",
+    "shard_ranges",
+)
+
+log = logging.getLogger("core.cluster")
+
+Handler = Callable[[Any], Awaitable[Any]]
+
+# the lease is only renewed or given up by the cluster holding it, checked and changed in one step
+RENEW_LEASE = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LEASE = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def shard_ranges(shard_count: int, clusters: int) -> list[range]:
+    """Splits the shards into ``clusters`` contiguous ranges, the first ones one shard larger if they don't divide."""
+    if not 0 < clusters <= shard_count:
+        msg = f"can't split {shard_count} shards into {clusters} clusters"
+        raise ValueError(msg)
+    size, larger = divmod(shard_count, clusters)
+    ranges: list[range] = []
+    start = 0
+    for index in range(clusters):
+        end = start + size + (index < larger)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+@dataclass(frozen=True, slots=True)
+class Cluster:
+    """Which of the ``count`` clusters this process is, it connects the shards of its range."""
+
+    id: int = 0  # noqa: A003
+    count: int = 1
+    shard_count: int = 1
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.id < self.count:
+            msg = f"cluster {self.id} out of {self.count} clusters"
+            raise ValueError(msg)
+        shard_ranges(self.shard_count, self.count)
+
+    @property
+    def shard_ids(self) -> list[int]:
+        return list(shard_ranges(self.shard_count, self.count)[self.id])
+
+    def cluster_of_shard(self, shard_id: int) -> int:
+        return next(index for index, shards in enumerate(shard_ranges(self.shard_count, self.count)) if shard_id in shards)
+
+    def cluster_of_guild(self, guild_id: int) -> int:
+        # https://discord.com/developers/docs/topics/gateway#sharding-sharding-formula
+        return self.cluster_of_shard((guild_id >> 22) % self.shard_count)
+
+
+class ClusterIPC:
+    """Operations across the clusters, over the Redis of a :class:`core.cache.CacheBus`.
+
+    ``handlers`` are awaited with the payload of the operation of their name
+    and return what is answered to :meth:`request`. Payloads and answers are
+    serialized as the shared caches serialize their values.
+
+    One cluster at a time is the leader, it holds ``{namespace}:cluster:leader``
+    for ``lease`` seconds and renews it every third of that, another cluster
+    takes over at most ``lease`` seconds after it stopped. What has to run once
+    runs on the leader, ``leader_listeners`` are awaited with ``True`` or
+    ``False`` whenever that changes. A single cluster is the leader without
+    Redis, without Redis none of several is.
+    """
+
+    def __init__(self, bus: CacheBus, cluster: Cluster, *, lease: int = 15, timeout: float = 5.0) -> None:
+        self.bus = bus
+        self.cluster = cluster
+        self.lease = lease
+        self.timeout = timeout
+        self.channel = f"{bus.namespace}:cluster"
+        self.leader_key = f"{bus.namespace}:cluster:leader"
+        # a restarted cluster is another one until the lease of the previous process ran out
+        self.identity = f"{cluster.id}:{bus.origin}"
+
+        self.handlers: dict[str, Handler] = {}
+        self.leader_listeners: list[Callable[[bool], Awaitable[Any]]] = []
+        self.leader = False
+
+        self._task: asyncio.Task[None] | None = None
+        self._requests: dict[str, tuple[asyncio.Future[None], dict[int, Any], set[int]]] = {}
+        bus.listen(self.channel, self._received)
+
+    async def start(self) -> None:
+        if self.cluster.count == 1:
+            await self._set_leader(True)
+        elif self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._elect(), name="cluster:election")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.leader and self.cluster.count > 1:
+            # the next one doesn't wait for the lease to run out
+            await self.bus.call("eval", RELEASE_LEASE, 1, self.leader_key, self.identity)
+        await self._set_leader(False)
+
+    async def _elect(self) -> None:
+        while True:
+            await self.campaign()
+            await asyncio.sleep(self.lease / 3)
+
+    async def campaign(self) -> bool:
+        """Takes the lead if nobody holds it, renews it if this cluster does, returns whether it is the leader."""
+        if await self.bus.call("set", self.leader_key, self.identity, ex=self.lease, nx=True):
+            leader = True
+        else:
+            leader = bool(await self.bus.call("eval", RENEW_LEASE, 1, self.leader_key, self.identity, self.lease))
+        await self._set_leader(leader)
+        return leader
+
+    async def _set_leader(self, leader: bool) -> None:
+        if leader == self.leader:
+            return
+        self.leader = leader
+        log.info("Cluster %s %s the leader", self.cluster.id, "is now" if leader else "is no longer")
+        for listener in self.leader_listeners:
+            try:
+                await listener(leader)
+            except Exception:
+                log.exception("Leader listener %r failed", listener)
+
+    async def _handle(self, op: str, payload: Any) -> Any:
+        handler = self.handlers.get(op)
+        if handler is None:
+            log.debug("No handler for cluster operation %s", op)
+            return None
+        try:
+            return await handler(payload)
+        except Exception:
+            log.exception("Cluster operation %s failed", op)
+            return None
+
+    async def _publish(self, kind: str, op: str, payload: Any, *, to: int | None = None, id: str | None = None) -> None:  # noqa: A002
+        message = {
+            "kind": kind,
+            "op": op,
+            "payload": payload,
+            "from": self.cluster.id,
+            "identity": self.identity,
+            "to": to,
+            "id": id,
+        }
+        await self.bus.call("publish", self.channel, dumps(message))
+
+    async def broadcast(self, op: str, payload: Any = None, *, include_self: bool = True) -> None:
+        """Runs ``op`` on every cluster, this one last and awaited with ``include_self``."""
+        await self._publish("broadcast", op, payload)
+        if include_self:
+            await self._handle(op, payload)
+
+    async def send(self, cluster_id: int, op: str, payload: Any = None) -> None:
+        if cluster_id == self.cluster.id:
+            await self._handle(op, payload)
+        else:
+            await self._publish("broadcast", op, payload, to=cluster_id)
+
+    async def request(
+        self,
+        op: str,
+        payload: Any = None,
+        *,
+        to: int | None = None,
+        timeout: float | None = None,
+    ) -> dict[int, Any]:
+        """Runs ``op`` on every cluster, or the one ``to``, and returns their answers by cluster.
+
+        The clusters that didn't answer within ``timeout`` seconds are missing.
+        """
+        expected = set(range(self.cluster.count)) if to is None else {to}
+        answers: dict[int, Any] = {}
+        if self.cluster.id in expected:
+            expected.discard(self.cluster.id)
+            answers[self.cluster.id] = await self._handle(op, payload)
+        if not expected or not self.bus.available:
+            return answers
+
+        id = uuid.uuid4().hex  # noqa: A001
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._requests[id] = (future, answers, expected)
+        try:
+            await self._publish("request", op, payload, to=to, id=id)
+            await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            log.debug("Clusters %s didn't answer %s in time", sorted(expected), op)
+        finally:
+            del self._requests[id]
+        return dict(answers)
+
+    def _received(self, raw: str | bytes) -> None:
+        try:
+            message = loads(raw)
+            kind, op, payload, sender, to = message["kind"], message["op"], message["payload"], message["from"], message["to"]
+        except (ValueError, TypeError, KeyError):
+            log.warning("Ignoring malformed cluster message %r", raw)
+            return
+        if message.get("identity") == self.identity or (to is not None and to != self.cluster.id):
+            return
+
+        if kind == "broadcast":
+            self.bus.spawn(self._handle(op, payload))
+        elif kind == "request":
+            self.bus.spawn(self._answer(op, payload, sender, message["id"]))
+        elif kind == "reply" and (pending := self._requests.get(message["id"])):
+            future, answers, expected = pending
+            answers[sender] = payload
+            expected.discard(sender)
+            if not expected and not future.done():
+                future.set_result(None)
+
+    async def _answer(self, op: str, payload: Any, sender: int, id: str) -> None:  # noqa: A002
+        await self._publish("reply", op, await self._handle(op, payload), to=sender, id=id)
+
+
+@dataclass(slots=True)
+class Worker:
+    cluster: int
+    process: asyncio.subprocess.Process | None = None
+    started_at: float = 0.0
+    restarts: int = 0
+    # seconds waited before the last restart
+    delay: float = 0.0
+    exit_codes: list[int] = field(default_factory=list)
+
+
+class Launcher:
+    """Runs ``command`` once per cluster and supervises the processes.
+
+    A worker learns its cluster from ``CLUSTER_ID``, ``CLUSTER_COUNT`` and
+    ``SHARD_COUNT`` in its environment. One that exits with an error is
+    started again, after ``backoff`` seconds if it ran for ``stable_after``
+    seconds, twice as long as the last time otherwise, ``max_backoff`` at
+    most. One that exits with ``0`` was shut down on purpose and stays down.
+    Workers are started ``stagger`` seconds apart, so their shards don't all
+    identify at once.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        *,
+        clusters: int,
+        shard_count: int,
+        env: Mapping[str, str] | None = None,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        stagger: float = 5.0,
+    ) -> None:
+        shard_ranges(shard_count, clusters)
+        self.command = list(command)
+        self.clusters = clusters
+        self.shard_count = shard_count
+        self.env = dict(os.environ if env is None else env)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.stagger = stagger
+        self.workers: dict[int, Worker] = {cluster: Worker(cluster) for cluster in range(clusters)}
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Supervises the workers until they all stopped for good, or :meth:`stop`."""
+        await asyncio.gather(*(self._supervise(worker) for worker in self.workers.values()))
+
+    async def stop(self, *, timeout: float = 30.0) -> None:
+        """Terminates the workers, kills those still running after ``timeout`` seconds."""
+        self._stopping.set()
+        running = [
+            worker.process for worker in self.workers.values() if worker.process and worker.process.returncode is None
+        ]
+        for process in running:
+            process.terminate()
+        if not running:
+            return
+        _, pending = await asyncio.wait([asyncio.ensure_future(process.wait()) for process in running], timeout=timeout)
+        if pending:
+            log.warning("Killing %s workers that didn't stop in %ss", len(pending), timeout)
+            for process in running:
+                if process.returncode is None:
+                    process.kill()
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleeps ``seconds``, ``False`` if the launcher stopped meanwhile."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    async def _supervise(self, worker: Worker) -> None:
+        if not await self._sleep(worker.cluster * self.stagger):
+            return
+        env = {
+            **self.env,
+            "CLUSTER_ID": str(worker.cluster),
+            "CLUSTER_COUNT": str(self.clusters),
+            "SHARD_COUNT": str(self.shard_count),
+        }
+        while not self._stopping.is_set():
+            worker.process = await asyncio.create_subprocess_exec(*self.command, env=env)
+            worker.started_at = monotonic()
+            log.info("Started cluster %s, pid %s", worker.cluster, worker.process.pid)
+            code = await worker.process.wait()
+            worker.exit_codes.append(code)
+            if self._stopping.is_set() or code == 0:
+                log.info("Cluster %s exited with %s", worker.cluster, code)
+                return
+
+            if monotonic() - worker.started_at >= self.stable_after:
+                worker.delay = self.backoff
+            else:
+                worker.delay = min(max(worker.delay * 2, self.backoff), self.max_backoff)
+            worker.restarts += 1
+            log.error("Cluster %s exited with %s, restarting it in %.1fs", worker.cluster, code, worker.delay)
+            if not await self._sleep(worker.delay):
+                return
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from discord.shard import AutoShardedConnectionState
+
+if TYPE_CHECKING:
+    from discord.gateway import DiscordWebSocket
+
+__all__ = (
+    "GatewayEvent",
+    "GatewayEventRing",
+    "ParrotConnectionState",
+)
+
+
+@dataclass(slots=True)
+class GatewayEvent:
+    at: float
+    shard_id: int
+    event: str
+    sequence: int | None
+    # characters of the decompressed payload
+    size: int
+    payload: str | None = None
+
+
+class _Shard:
+    """What the ring keeps per traced shard, and what it replaced on its websocket."""
+
+    __slots__ = ("capture", "pending", "started", "websocket", "log_receive", "parsers")
+
+    def __init__(self, *, capture: bool) -> None:
+        self.capture = capture
+        self.pending: Any = None
+        self.started = perf_counter()
+        self.websocket: DiscordWebSocket | None = None
+        self.log_receive: Callable[[Any], None] | None = None
+        self.parsers: Mapping[str, Callable[[Any], Any]] | None = None
+
+
+class _TracedParsers:
+    """Stands in for the parsers of one websocket, which looks up every dispatch in them after setting the sequence."""
+
+    __slots__ = ("ring", "shard_id", "parsers", "websocket")
+
+    def __init__(
+        self,
+        ring: GatewayEventRing,
+        shard_id: int,
+        parsers: Mapping[str, Callable[[Any], Any]],
+        websocket: DiscordWebSocket,
+    ) -> None:
+        self.ring = ring
+        self.shard_id = shard_id
+        self.parsers = parsers
+        self.websocket = websocket
+
+    def __getitem__(self, event: str) -> Callable[[Any], Any]:
+        self.ring._record(self.shard_id, event, self.websocket.sequence)
+        return self.parsers[event]
+
+
+class GatewayEventRing:
+    """The last ``size`` gateway dispatches of the traced shards, and how often each type came in.
+
+    Nothing is traced unless :meth:`enable` is called for a shard, an
+    untraced shard costs nothing. A traced one pays for an entry with the
+    event type, sequence and size, the raw payload is only kept with
+    ``capture=True``. Tracing survives reconnects, the connection state
+    hands every new websocket to :meth:`attach`.
+    """
+
+    def __init__(self, *, size: int = 1024) -> None:
+        self.entries: deque[GatewayEvent] = deque(maxlen=size)
+        self.counts: Counter[str] = Counter()
+        self._shards: dict[int, _Shard] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def shards(self) -> dict[int, bool]:
+        """The traced shards and whether their payloads are captured."""
+        return {shard_id: shard.capture for shard_id, shard in self._shards.items()}
+
+    def enable(self, shard_id: int, *, capture: bool = False, websocket: DiscordWebSocket | None = None) -> None:
+        """Starts tracing ``shard_id``, on ``websocket`` right away if it's connected, else once it connects."""
+        self.disable(shard_id)
+        self._shards[shard_id] = _Shard(capture=capture)
+        if websocket is not None:
+            self.attach(websocket)
+
+    def disable(self, shard_id: int) -> None:
+        if (shard := self._shards.pop(shard_id, None)) is not None:
+            self._detach(shard)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.counts.clear()
+        for shard in self._shards.values():
+            shard.started = perf_counter()
+
+    def attach(self, websocket: DiscordWebSocket) -> None:
+        shard_id = websocket.shard_id or 0
+        if (shard := self._shards.get(shard_id)) is None or shard.websocket is websocket:
+            return
+        self._detach(shard)
+
+        shard.websocket = websocket
+        shard.log_receive = log_receive = websocket.log_receive
+        shard.parsers = websocket._discord_parsers
+
+        def receive(message: Any, /) -> None:
+            # the raw payload of whatever comes next, dispatch or not, a reference and nothing more
+            shard.pending = message
+            log_receive(message)
+
+        websocket.log_receive = receive  # type: ignore
+        websocket._discord_parsers = _TracedParsers(self, shard_id, shard.parsers, websocket)  # type: ignore
+
+    def _detach(self, shard: _Shard) -> None:
+        if shard.websocket is None:
+            return
+        shard.websocket.log_receive = shard.log_receive  # type: ignore
+        shard.websocket._discord_parsers = shard.parsers  # type: ignore
+        shard.websocket = shard.log_receive = shard.parsers = shard.pending = None
+
+    def _record(self, shard_id: int, event: str, sequence: int | None) -> None:
+        shard = self._shards[shard_id]
+        payload, shard.pending = shard.pending, None
+        size = len(payload) if payload is not None else 0
+        if shard.capture and isinstance(payload, bytes):
+            payload = payload.decode()
+        self.entries.append(
+            GatewayEvent(perf_counter(), shard_id, event, sequence, size, payload if shard.capture else None),
+        )
+        self.counts[event] += 1
+
+    def rates(self, window: float | None = None) -> dict[str, float]:
+        """Events per second by type, over the last ``window`` seconds of the ring or since tracing started."""
+        now = perf_counter()
+        started = min((shard.started for shard in self._shards.values()), default=now)
+        if window is None:
+            counts, since = self.counts, started
+        else:
+            since = max(now - window, started)
+            if len(self.entries) == self.entries.maxlen and self.entries[0].at > since:
+                # the ring doesn't reach back the whole window
+                since = self.entries[0].at
+            counts = Counter(entry.event for entry in self.entries if entry.at >= since)
+        elapsed = now - since
+        return {event: count / elapsed for event, count in counts.most_common()} if elapsed > 0 else {}
+
+
+class ParrotConnectionState(AutoShardedConnectionState):
+    """Hands every new websocket, first connect or reconnect, to the gateway event ring."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.gateway_events = GatewayEventRing()
+
+    def _update_references(self, ws: DiscordWebSocket) -> None:
+        super()._update_references(ws)
+        self.gateway_events.attach(ws)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+from pymongo import ASCENDING, DESCENDING, DeleteOne, IndexModel, UpdateOne
+
+import discord
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+    from .types import MongoCollection
+
+__all__ = ("GameLeaderboards", "LEADERBOARD_FIELDS")
+
+log = logging.getLogger("core.leaderboard")
+
+# the stats every leaderboard can be sorted by, each gets an index
+LEADERBOARD_FIELDS: dict[str, tuple[str, ...]] = {
+    "twenty48": ("played", "moves"),
+    "country_guess": ("played", "won", "loss"),
+    "hangman": ("played", "won", "loss"),
+    "wordle": ("played", "won", "loss"),
+    "chess": ("played", "won", "draw"),
+    "reaction_test": ("played", "time"),
+    "memory_test": ("played", "time"),
+    "typing_test": ("played", "speed", "accuracy", "wpm"),
+}
+
+BACKFILL_CHUNK = 1000
+# marks a guild whose members were copied in, it has no stats so it never shows up
+BACKFILL_MARKER = 0
+
+
+def _stats(data: dict[str, Any] | None) -> dict[str, int | float]:
+    """The numbers of a game document, lists and the rest stay out of the projection."""
+    if not data:
+        return {}
+    return {
+        key: value
+        for key, value in data.items()
+        if key.startswith("game_") and isinstance(value, int | float) and not isinstance(value, bool)
+    }
+
+
+class GameLeaderboards:
+    """Game stats projected per guild, so leaderboards are indexed queries.
+
+    ``game_collections`` keeps one document per user. The projection keeps
+    one per guild member who has stats, ``{guild_id, user_id, game_...}``,
+    with an index on ``(guild_id, stat)`` for every stat in
+    :data:`LEADERBOARD_FIELDS`. Top N of a guild is then a bounded index
+    scan and a rank is a count over an index range, no matter how many
+    members the guild has.
+
+    The projection is kept up to date by :meth:`record` after every stats
+    update and by the member join and leave events. A guild's existing
+    members are copied in once, the first time its leaderboard is asked for.
+    """
+
+    def __init__(self, bot: Parrot, collection: MongoCollection, stats: MongoCollection) -> None:
+        self.bot = bot
+        self.collection = collection
+        self.stats = stats
+        self._backfilled: set[int] = set()
+
+    async def create_indexes(self) -> None:
+        fields = [f"game_{game}_{stat}" for game, stats in LEADERBOARD_FIELDS.items() for stat in stats]
+        await self.collection.create_indexes(
+            [
+                IndexModel([("guild_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+                IndexModel([("user_id", ASCENDING)]),
+                *(IndexModel([("guild_id", ASCENDING), (field, DESCENDING)]) for field in fields),
+            ],
+        )
+        await self.stats.create_indexes([IndexModel([(field, DESCENDING)], sparse=True) for field in fields])
+
+    # writes
+
+    async def record(self, user_ids: int | Iterable[int], *, guild: discord.Guild | None = None) -> None:
+        """Copies the current stats of ``user_ids`` to the guilds they are in."""
+        user_ids = [user_ids] if isinstance(user_ids, int) else list(user_ids)
+        operations = []
+        async for data in self.stats.find({"_id": {"$in": user_ids}}, {"game_chess_stat": 0, "game_chess_opponent": 0}):
+            if not (stats := _stats(data)):
+                continue
+            guild_ids = {guild.id} if guild is not None and guild.get_member(data["_id"]) is not None else set()
+            if user := self.bot.get_user(data["_id"]):
+                guild_ids.update(mutual.id for mutual in user.mutual_guilds)
+            operations.extend(
+                UpdateOne({"guild_id": guild_id, "user_id": data["_id"]}, {"$set": stats}, upsert=True)
+                for guild_id in guild_ids
+            )
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def add_member(self, member: discord.Member) -> None:
+        if member.bot:
+            return
+        if stats := _stats(await self.stats.find_one({"_id": member.id})):
+            await self.collection.update_one(
+                {"guild_id": member.guild.id, "user_id": member.id},
+                {"$set": stats},
+                upsert=True,
+            )
+
+    async def remove_member(self, guild_id: int, user_id: int) -> None:
+        await self.collection.delete_one({"guild_id": guild_id, "user_id": user_id})
+
+    async def remove_guild(self, guild_id: int) -> None:
+        self._backfilled.discard(guild_id)
+        await self.collection.delete_many({"guild_id": guild_id})
+
+    async def backfill(self, guild: discord.Guild) -> None:
+        """Copies the stats of every member in, once per guild."""
+        if guild.id in self._backfilled:
+            return
+        marker = {"guild_id": guild.id, "user_id": BACKFILL_MARKER}
+        if await self.collection.find_one(marker) is None:
+            if not guild.chunked:
+                await guild.chunk(cache=True)
+            member_ids = [member.id for member in guild.members if not member.bot]
+            log.info("Copying game stats of %s members of guild %s", len(member_ids), guild.id)
+            for index in range(0, len(member_ids), BACKFILL_CHUNK):
+                chunk = member_ids[index : index + BACKFILL_CHUNK]
+                operations = [
+                    UpdateOne({"guild_id": guild.id, "user_id": data["_id"]}, {"$set": stats}, upsert=True)
+                    async for data in self.stats.find({"_id": {"$in": chunk}}, {"game_chess_stat": 0, "game_chess_opponent": 0})
+                    if (stats := _stats(data))
+                ]
+                if operations:
+                    await self.collection.bulk_write(operations, ordered=False)
+            await self.collection.update_one(marker, {"$set": marker}, upsert=True)
+        self._backfilled.add(guild.id)
+
+    async def prune(self, guild: discord.Guild, user_ids: Iterable[int]) -> None:
+        """Drops rows of users who left while the bot was not watching."""
+        operations = [
+            DeleteOne({"guild_id": guild.id, "user_id": user_id})
+            for user_id in user_ids
+            if guild.chunked and guild.get_member(user_id) is None
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    # reads
+
+    async def top(
+        self,
+        field: str,
+        *,
+        guild: discord.Guild | None = None,
+        ascending: bool = False,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """The best ``limit`` documents for ``field``, of ``guild`` or everyone when it is ``None``.
+
+        Documents always have the user id under ``_id``, like the stats documents.
+        """
+        order = ASCENDING if ascending else DESCENDING
+        if guild is None:
+            cursor = self.stats.find({field: {"$exists": True}}).sort(field, order).limit(limit)
+            return [data async for data in cursor]
+
+        await self.backfill(guild)
+        cursor = self.collection.find({"guild_id": guild.id, field: {"$exists": True}}).sort(field, order).limit(limit)
+        return [{**data, "_id": data["user_id"]} async for data in cursor]
+
+    async def rank(
+        self,
+        field: str,
+        user_id: int,
+        *,
+        guild: discord.Guild | None = None,
+        ascending: bool = False,
+    ) -> tuple[int, int | float] | None:
+        """Position of ``user_id`` (1 is first) and their value, ``None`` without one."""
+        if guild is None:
+            collection, query = self.stats, {"_id": user_id}
+            scope: dict[str, Any] = {}
+        else:
+            await self.backfill(guild)
+            collection, query = self.collection, {"guild_id": guild.id, "user_id": user_id}
+            scope = {"guild_id": guild.id}
+
+        data = await collection.find_one({**query, field: {"$exists": True}}, {field: 1})
+        if data is None:
+            return None
+        value = data[field]
+        ahead = await collection.count_documents({**scope, field: {"$lt" if ascending else "$gt": value}})
+        return ahead + 1, value
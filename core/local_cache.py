@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterator, MutableMapping
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Generic, TypeVar
+
+from tabulate import tabulate
+
+__all__ = (
+    "CacheRegistry",
+    "CacheStats",
+    "LocalCache",
+    "sizeof",
+)
+
+KT = TypeVar("KT")
+VT = TypeVar("VT")
+
+_MISSING: Any = object()
+
+# the containers sizeof looks into, anything else is counted as its own object only
+_CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+
+
+def sizeof(value: Any, *, depth: int = 4) -> int:
+    """Roughly the bytes ``value`` takes, containers included ``depth`` levels deep.
+
+    Objects that aren't containers count as ``sys.getsizeof`` of themselves and
+    of their ``__dict__``, what they refer to is shared with the rest of the
+    bot more often than not.
+    """
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        return size + sum(sizeof(key, depth=depth - 1) + sizeof(item, depth=depth - 1) for key, item in value.items())
+    if isinstance(value, _CONTAINERS):
+        return size + sum(sizeof(item, depth=depth - 1) for item in value)
+    if hasattr(value, "__dict__"):
+        size += sys.getsizeof(value.__dict__)
+    return size
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # dropped to stay within the bounds
+    evictions: int = 0
+    # dropped once their ttl passed
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LocalCache(MutableMapping[KT, VT], Generic[KT, VT]):
+    """A mapping of this process that stays within its bounds.
+
+    ``maxsize`` entries at most, the least recently used is evicted for a new
+    one. With ``max_bytes`` the entries together take that many bytes at most,
+    as ``sizeof`` measures them when they are set, values changed in place are
+    not measured again. Entries older than ``ttl`` seconds are gone, they are
+    dropped when read or by :meth:`sweep`.
+
+    Reads through ``[]`` and ``get`` count to :attr:`stats`, iterating doesn't
+    count and doesn't make an entry recently used.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int | None = 2**10,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = sizeof,
+    ) -> None:
+        if maxsize is None and max_bytes is None:
+            msg = f"cache {name} needs maxsize or max_bytes"
+            raise ValueError(msg)
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stats = CacheStats()
+        # key -> (value, expires at, bytes)
+        self._data: OrderedDict[KT, tuple[VT, float | None, int]] = OrderedDict()
+        self._bytes = 0
+
+    def __repr__(self) -> str:
+        return f"<LocalCache {self.name} entries={len(self._data)} maxsize={self.maxsize} ttl={self.ttl}>"
+
+    def _lookup(self, key: KT) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= monotonic():
+            self._drop(key)
+            self.stats.expirations += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _drop(self, key: KT) -> VT:
+        value, _, size = self._data.pop(key)
+        self._bytes -= size
+        return value
+
+    def __getitem__(self, key: KT) -> VT:
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.stats.misses += 1
+            raise KeyError(key)
+        self.stats.hits += 1
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self._lookup(key) is not _MISSING  # type: ignore
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        if key in self._data:
+            self._drop(key)
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        expires_at = monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires_at, size)
+        self._bytes += size
+        self._evict()
+
+    def __delitem__(self, key: KT) -> None:
+        self._drop(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[KT]:
+        # a snapshot, the entries may be set or dropped meanwhile
+        return iter([key for key, _ in self._live()])
+
+    def _live(self) -> list[tuple[KT, VT]]:
+        now = monotonic()
+        return [
+            (key, value) for key, (value, expires_at, _) in self._data.items() if expires_at is None or expires_at > now
+        ]
+
+    def keys(self) -> list[KT]:  # type: ignore[override]
+        return [key for key, _ in self._live()]
+
+    def values(self) -> list[VT]:  # type: ignore[override]
+        return [value for _, value in self._live()]
+
+    def items(self) -> list[tuple[KT, VT]]:  # type: ignore[override]
+        return self._live()
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.maxsize is not None and len(self._data) > self.maxsize)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._drop(next(iter(self._data)))
+            self.stats.evictions += 1
+
+    def sweep(self) -> int:
+        """Drops the entries whose ttl passed, returns how many."""
+        if self.ttl is None:
+            return 0
+        now = monotonic()
+        expired = [key for key, (_, expires_at, _) in self._data.items() if expires_at is not None and expires_at <= now]
+        for key in expired:
+            self._drop(key)
+        self.stats.expirations += len(expired)
+        return len(expired)
+
+    def footprint(self) -> int:
+        """Roughly the bytes of the entries, as measured when they were set if the cache is bounded by bytes."""
+        if self.max_bytes is not None:
+            return self._bytes
+        return sum(sizeof(key) + self.sizeof(value) for key, (value, _, _) in self._data.items())
+
+
+class CacheRegistry:
+    """Every :class:`LocalCache` of the bot, by name.
+
+    :meth:`cache` replaces a cache of the same name, so a reloaded cog
+    starts with an empty one and the old one is forgotten.
+    """
+
+    def __init__(self) -> None:
+        self.caches: dict[str, LocalCache[Any, Any]] = {}
+
+    def cache(
+        self,
+        name: str,
+        *,
+        maxsize: int | None = 2**10,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = sizeof,
+    ) -> LocalCache[Any, Any]:
+        cache: LocalCache[Any, Any] = LocalCache(name, maxsize=maxsize, ttl=ttl, max_bytes=max_bytes, sizeof=sizeof)
+        self.caches[name] = cache
+        return cache
+
+    def sweep(self) -> int:
+        """Drops what expired from every cache, returns how many entries."""
+        return sum(cache.sweep() for cache in self.caches.values())
+
+    def report(self) -> str:
+        """The caches as a table, largest footprint first."""
+        footprints = {name: cache.footprint() for name, cache in self.caches.items()}
+        rows = [
+            [
+                name,
+                f"{len(cache)}/{cache.maxsize if cache.maxsize is not None else '-'}",
+                f"{cache.ttl:g}s" if cache.ttl is not None else "-",
+                f"{footprints[name] / 1024:.1f}KiB",
+                f"{cache.max_bytes / 1024:.0f}KiB" if cache.max_bytes is not None else "-",
+                f"{cache.stats.hit_ratio:.0%}",
+                cache.stats.evictions,
+                cache.stats.expirations,
+            ]
+            for name, cache in sorted(self.caches.items(), key=lambda item: footprints[item[0]], reverse=True)
+        ]
+        return tabulate(rows, headers=["cache", "entries", "ttl", "size", "max", "hits", "evicted", "expired"])
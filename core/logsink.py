@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import traceback
+from collections.abc import Mapping
+from dataclasses import dataclass
+from time import time
+from typing import Any
+
+import aiosqlite
+
+__all__ = (
+    "LogEntry",
+    "LogSink",
+    "LogSinkHandler",
+)
+
+log = logging.getLogger("core.logsink")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS log_entries (
+        id INTEGER PRIMARY KEY,
+        created_at REAL NOT NULL,
+        level INTEGER NOT NULL,
+        logger TEXT NOT NULL,
+        message TEXT NOT NULL,
+        extra TEXT
+    );
+    CREATE INDEX IF NOT EXISTS log_entries_created_at ON log_entries (created_at);
+    CREATE INDEX IF NOT EXISTS log_entries_level_created_at ON log_entries (level, created_at);
+"""
+
+INSERT = "INSERT INTO log_entries (created_at, level, logger, message, extra) VALUES (?, ?, ?, ?, ?)"
+
+_Row = tuple[float, int, str, str, str | None]
+
+
+@dataclass(slots=True)
+class LogEntry:
+    id: int
+    created_at: datetime.datetime
+    level: int
+    logger: str
+    message: str
+    extra: Any
+
+    @property
+    def level_name(self) -> str:
+        return logging.getLevelName(self.level)
+
+
+class LogSink:
+    """Persists log lines to the ``log_entries`` table of the sqlite database at ``database``.
+
+    The sink has a connection of its own, opened by :meth:`start` and closed
+    by :meth:`close`, its commits and rollbacks don't end a transaction of
+    the bot's ``sql`` connection.
+
+    :meth:`put` never waits, it drops the line and counts it in ``dropped``
+    once ``max_queue`` lines are waiting. A single writer task takes lines
+    off the queue and inserts them in one transaction per batch, a batch is
+    written once it has ``batch_size`` lines or ``flush_interval`` seconds
+    after its first one. Every line is written once, or counted in
+    ``failed`` if its batch couldn't be.
+
+    Lines older than ``max_age`` seconds and all but the newest ``max_rows``
+    lines are deleted on start and every ``prune_interval`` seconds, ``0``
+    turns either off.
+    """
+
+    def __init__(
+        self,
+        database: str | os.PathLike[str],
+        *,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_age: float = 14 * 24 * 60 * 60,
+        max_rows: int = 500_000,
+        prune_interval: float = 60 * 60,
+    ) -> None:
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self.prune_interval = prune_interval
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.pruned = 0
+        self.db: aiosqlite.Connection | None = None
+        self._queue: asyncio.Queue[_Row | None] = asyncio.Queue(max_queue)
+        self._task: asyncio.Task[None] | None = None
+        self._pruned_at = 0.0
+
+    def __len__(self) -> int:
+        """Lines waiting to be written."""
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self.db is None:
+            self.db = await aiosqlite.connect(self.database)
+            await self.db.executescript(SCHEMA)
+            await self.prune()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="logsink:writer")
+
+    async def stop(self) -> None:
+        """Stops the writer once it wrote whatever was queued before."""
+        if self.db is None:
+            return
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            await self._queue.put(None)
+            await task
+        # whatever came after, or everything if the writer died
+        while not self._queue.empty():
+            batch = [row for row in self._take(self.batch_size) if row is not None]
+            if batch:
+                await self._write(batch)
+
+    async def close(self) -> None:
+        """Stops the writer and closes the connection."""
+        await self.stop()
+        if self.db is not None:
+            db, self.db = self.db, None
+            await db.close()
+
+    def put(
+        self,
+        level: int,
+        message: str,
+        *,
+        logger: str = "",
+        extra: Mapping[str, Any] | None = None,
+        created_at: float | None = None,
+    ) -> bool:
+        """Queues a line, ``False`` if the queue is full and the line was dropped."""
+        row = (
+            created_at if created_at is not None else time(),
+            level,
+            logger,
+            message,
+            json.dumps(extra, default=str) if extra is not None else None,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def _take(self, count: int) -> list[_Row | None]:
+        rows: list[_Row | None] = []
+        while len(rows) < count and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch: list[_Row] = []
+            row = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+            while row is not None:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    break
+                if self._queue.empty():
+                    if (remaining := deadline - loop.time()) <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    row = self._queue.get_nowait()
+            # None is what stop() queues after the last line
+            stopping = row is None
+
+            if batch:
+                await self._write(batch)
+            if self.prune_interval and loop.time() - self._pruned_at >= self.prune_interval:
+                await self.prune()
+
+    async def _write(self, batch: list[_Row]) -> None:
+        assert self.db is not None
+        try:
+            # the connection opens a transaction before the insert, the commit ends it
+            await self.db.executemany(INSERT, batch)
+            await self.db.commit()
+        except sqlite3.Error:
+            await self.db.rollback()
+            self.failed += len(batch)
+            log.exception("Failed to write %s log lines", len(batch))
+        else:
+            self.written += len(batch)
+
+    async def prune(self) -> int:
+        """Deletes what is past retention, returns how many lines."""
+        assert self.db is not None
+        self._pruned_at = asyncio.get_running_loop().time()
+        deleted = 0
+        if self.max_age:
+            cursor = await self.db.execute("DELETE FROM log_entries WHERE created_at < ?", (time() - self.max_age,))
+            deleted += cursor.rowcount
+        if self.max_rows:
+            cursor = await self.db.execute(
+                """
+                DELETE FROM log_entries WHERE id <= (
+                    SELECT id FROM log_entries ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (self.max_rows,),
+            )
+            deleted += cursor.rowcount
+        await self.db.commit()
+        self.pruned += deleted
+        return deleted
+
+    async def query(
+        self,
+        *,
+        level: int | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        text: str | None = None,
+        limit: int = 20,
+    ) -> list[LogEntry]:
+        """The newest written lines of ``level`` or above, between ``since`` and ``until``, containing ``text``.
+
+        ``text`` is matched case insensitively. Lines still in the queue are not seen.
+        """
+        assert self.db is not None
+        conditions: list[str] = []
+        parameters: list[Any] = []
+        if level is not None:
+            conditions.append("level >= ?")
+            parameters.append(level)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(since.timestamp())
+        if until is not None:
+            conditions.append("created_at <= ?")
+            parameters.append(until.timestamp())
+        if text:
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("message LIKE ? ESCAPE '\\'")
+            parameters.append(f"%{escaped}%")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT id, created_at, level, logger, message, extra FROM log_entries
+            {where} ORDER BY created_at DESC, id DESC LIMIT ?
+        """
+        async with self.db.execute(query, (*parameters, limit)) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            LogEntry(
+                id,
+                datetime.datetime.fromtimestamp(created_at, tz=datetime.timezone.utc),
+                level,
+                logger,
+                message,
+                json.loads(extra) if extra is not None else None,
+            )
+            for id, created_at, level, logger, message, extra in rows
+        ]
+
+
+class LogSinkHandler(logging.Handler):
+    """Hands the records of :mod:`logging` to a :class:`LogSink`, from any thread."""
+
+    def __init__(self, sink: LogSink, level: int = logging.INFO) -> None:
+        super().__init__(level)
+        self.sink = sink
+        self.loop = asyncio.get_running_loop()
+        self.thread = threading.get_ident()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name == log.name:
+            # the sink failing to write would log itself into its own queue
+            return
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{''.join(traceback.format_exception(*record.exc_info)).rstrip()}"
+            extra = {"module": record.module, "line": record.lineno}
+            if threading.get_ident() == self.thread:
+                self.sink.put(record.levelno, message, logger=record.name, extra=extra, created_at=record.created)
+            elif not self.loop.is_closed():
+                put = functools.partial(self.sink.put, logger=record.name, extra=extra, created_at=record.created)
+                self.loop.call_soon_threadsafe(put, record.levelno, message)
+        except Exception:
+            self.handleError(record)
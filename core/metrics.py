@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import TraceConfig
+from pymongo import monitoring
+
+from discord.ext import tasks
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from aiohttp import ClientSession, TraceRequestEndParams, TraceRequestExceptionParams, TraceRequestStartParams
+
+    from .pipeline import StageTiming
+
+__all__ = (
+    "BUCKETS",
+    "Histogram",
+    "HttpTracer",
+    "LoopLagMonitor",
+    "Metrics",
+    "MongoCommandListener",
+    "OperationCount",
+    "current_site",
+    "instrument_loop",
+    "instrument_loops",
+)
+
+# upper bounds in seconds, the last bucket is +Inf. Most listeners return
+# within tens of microseconds, the low buckets keep their quantiles apart.
+BUCKETS: tuple[float, ...] = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# what the running task is doing, e.g. "listener:Automod.on_message", the Mongo
+# counters are split by it. Motor hands the context over to its executor threads.
+current_site: ContextVar[str] = ContextVar("current_site", default="unknown")
+
+
+class Histogram:
+    """Latencies in fixed buckets, Prometheus style."""
+
+    __slots__ = ("name", "site", "counts", "count", "sum", "errors", "slowest")
+
+    def __init__(self, name: str, site: str = "unknown") -> None:
+        self.name = name
+        self.site = site
+        self.clear()
+
+    def __repr__(self) -> str:
+        return f"<Histogram name={self.name!r} count={self.count} sum={self.sum:.3f}>"
+
+    def clear(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.slowest = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+
+    @property
+    def average(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimated ``q`` quantile, interpolated inside the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                # nothing observed was slower than ``slowest``, whatever the bucket says
+                upper = min(BUCKETS[index], self.slowest) if index < len(BUCKETS) else self.slowest
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.slowest
+
+    def cumulative(self) -> list[int]:
+        total = 0
+        buckets = []
+        for count in self.counts:
+            total += count
+            buckets.append(total)
+        return buckets
+
+
+@dataclass
+class OperationCount:
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+class Metrics:
+    """Everything the bot measures about itself, see :meth:`render_prometheus`."""
+
+    def __init__(self) -> None:
+        self.listeners: dict[tuple[str, str], Histogram] = {}
+        self.commands: dict[str, Histogram] = {}
+        self.loops: dict[str, Histogram] = {}
+        self.loop_lag = Histogram("loop_lag")
+        self.mongo: dict[tuple[str, str, str], OperationCount] = {}
+        self.http: dict[str, OperationCount] = {}
+        self.stage_timings: Callable[[], Mapping[str, StageTiming]] | None = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<Metrics listeners={len(self.listeners)} commands={len(self.commands)} loops={len(self.loops)}>"
+
+    def listener(self, event: str, name: str) -> Histogram:
+        try:
+            return self.listeners[event, name]
+        except KeyError:
+            histogram = self.listeners[event, name] = Histogram(name, f"listener:{name}")
+            return histogram
+
+    def command(self, name: str) -> Histogram:
+        try:
+            return self.commands[name]
+        except KeyError:
+            histogram = self.commands[name] = Histogram(name, f"command:{name}")
+            return histogram
+
+    def loop(self, name: str) -> Histogram:
+        try:
+            return self.loops[name]
+        except KeyError:
+            histogram = self.loops[name] = Histogram(name, f"loop:{name}")
+            return histogram
+
+    def count_mongo(self, collection: str, operation: str, site: str, seconds: float, *, failed: bool = False) -> None:
+        # called from the executor threads of motor
+        with self._lock:
+            key = (collection, operation, site)
+            if (count := self.mongo.get(key)) is None:
+                count = self.mongo[key] = OperationCount()
+            count.calls += 1
+            count.errors += failed
+            count.seconds += seconds
+
+    def count_http(self, host: str, seconds: float, *, failed: bool = False) -> None:
+        if (count := self.http.get(host)) is None:
+            count = self.http[host] = OperationCount()
+        count.calls += 1
+        count.errors += failed
+        count.seconds += seconds
+
+    def reset(self) -> None:
+        # the histograms are zeroed in place, instrumented loops hold on to theirs
+        for histograms in (self.listeners, self.commands, self.loops):
+            for histogram in histograms.values():
+                histogram.clear()
+        self.loop_lag.clear()
+        with self._lock:
+            self.mongo.clear()
+            self.http.clear()
+
+    def render_prometheus(self) -> str:
+        """Everything in the Prometheus text exposition format."""
+        lines: list[str] = []
+        histograms: Iterable[tuple[str, str, Iterable[tuple[dict[str, str], Histogram]]]] = (
+            (
+                "parrot_listener_seconds",
+                "Time spent in event listeners.",
+                (({"event": event, "listener": name}, histogram) for (event, name), histogram in self.listeners.items()),
+            ),
+            (
+                "parrot_command_seconds",
+                "Time spent invoking commands.",
+                (({"command": name}, histogram) for name, histogram in self.commands.items()),
+            ),
+            (
+                "parrot_loop_seconds",
+                "Time spent in one iteration of a background loop.",
+                (({"loop": name}, histogram) for name, histogram in self.loops.items()),
+            ),
+            ("parrot_event_loop_lag_seconds", "How late the event loop woke up.", (({}, self.loop_lag),)),
+        )
+        for metric, description, series in histograms:
+            series = list(series)
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in series:
+                for bound, count in zip((*map(str, BUCKETS), "+Inf"), histogram.cumulative(), strict=True):
+                    lines.append(f"{metric}_bucket{_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{metric}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+            errors = [(labels, histogram.errors) for labels, histogram in series if histogram is not self.loop_lag]
+            if errors:
+                name = metric.replace("_seconds", "_errors_total")
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in errors)
+
+        with self._lock:
+            mongo = list(self.mongo.items())
+        counters = (
+            (
+                "parrot_mongo",
+                (({"collection": c, "operation": o, "site": s}, count) for (c, o, s), count in mongo),
+            ),
+            ("parrot_http", (({"host": host}, count) for host, count in self.http.items())),
+        )
+        for prefix, series in counters:
+            series = list(series)
+            for suffix, attr in (("operations_total", "calls"), ("errors_total", "errors"), ("seconds_total", "seconds")):
+                lines.append(f"# TYPE {prefix}_{suffix} counter")
+                lines.extend(f"{prefix}_{suffix}{_labels(labels)} {getattr(count, attr)}" for labels, count in series)
+
+        if self.stage_timings is not None:
+            timings = self.stage_timings()
+            for suffix, attr in (("calls_total", "calls"), ("skipped_total", "skipped"), ("seconds_total", "seconds")):
+                metric = f"parrot_stage_{suffix}"
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(
+                    f"{metric}{_labels({'stage': name})} {getattr(timing, attr)}" for name, timing in timings.items()
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def instrument_loop(loop: tasks.Loop, metrics: Metrics) -> None:
+    """Times every iteration of ``loop``, it has to be the copy bound to its owner."""
+    coro = loop.coro
+    if getattr(coro, "__metrics__", None) is metrics:
+        return
+    histogram = metrics.loop(coro.__qualname__)
+    site = histogram.site
+
+    @functools.wraps(coro)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        current_site.set(site)
+        start = perf_counter()
+        try:
+            return await coro(*args, **kwargs)
+        except Exception:
+            histogram.errors += 1
+            raise
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    timed.__metrics__ = metrics  # type: ignore
+    loop.coro = timed
+
+
+def instrument_loops(obj: object, metrics: Metrics) -> None:
+    """:func:`instrument_loop` on every ``tasks.loop`` defined on the class of ``obj``."""
+    for cls in type(obj).__mro__:
+        for name, value in vars(cls).items():
+            if isinstance(value, tasks.Loop):
+                instrument_loop(getattr(obj, name), metrics)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts the commands sent to Mongo by collection, operation and :data:`current_site`."""
+
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self._started: dict[int, tuple[str, str, str]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        command = event.command
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.database_name
+        self._started[event.request_id] = (collection, event.command_name, current_site.get())
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        if (key := self._started.pop(event.request_id, None)) is not None:
+            self.metrics.count_mongo(*key, event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        if (key := self._started.pop(event.request_id, None)) is not None:
+            self.metrics.count_mongo(*key, event.duration_micros / 1e6, failed=True)
+
+
+class HttpTracer(TraceConfig):
+    """Counts the requests of a :class:`aiohttp.ClientSession` by host."""
+
+    def __init__(self, metrics: Metrics) -> None:
+        super().__init__()
+        self.metrics = metrics
+        self.on_request_start.append(self._start)
+        self.on_request_end.append(self._end)
+        self.on_request_exception.append(self._exception)
+
+    async def _start(self, session: ClientSession, context: SimpleNamespace, params: TraceRequestStartParams) -> None:
+        context.start = perf_counter()
+
+    async def _end(self, session: ClientSession, context: SimpleNamespace, params: TraceRequestEndParams) -> None:
+        self.metrics.count_http(params.url.host or "", perf_counter() - context.start, failed=params.response.status >= 500)
+
+    async def _exception(
+        self,
+        session: ClientSession,
+        context: SimpleNamespace,
+        params: TraceRequestExceptionParams,
+    ) -> None:
+        self.metrics.count_http(params.url.host or "", perf_counter() - context.start, failed=True)
+
+
+class LoopLagMonitor:
+    """Sleeps ``interval`` seconds over and over and records how late it wakes up.
+
+    Anything blocking the event loop, a slow regex or a sync request, shows
+    up here even if none of the listeners can be blamed for it.
+    """
+
+    def __init__(self, metrics: Metrics, *, interval: float = 0.5) -> None:
+        self.metrics = metrics
+        self.interval = interval
+        self.last = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="metrics:loop-lag")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last = max(perf_counter() - start - self.interval, 0.0)
+            self.metrics.loop_lag.observe(self.last)
+
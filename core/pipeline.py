@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from dataclasses import dataclass, field
+from functools import cached_property
+from time import perf_counter
+from typing import Any
+
+import discord
+import emojis
+
+from .metrics import current_site
+
+__all__ = ("HALT", "MessageFeatures", "MessagePipeline", "Stage", "StageTiming")
+
+log = logging.getLogger("core.pipeline")
+
+WORD_RE = re.compile(r"\w+")
+URL_RE = re.compile(r"https?://[^\s<>\"'`|]+", re.IGNORECASE)
+DOMAIN_RE = re.compile(r"(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z0-9][A-Za-z0-9-]{0,61}[A-Za-z0-9]")
+CUSTOM_EMOJI_RE = re.compile(r"<a?:[a-zA-Z0-9_]{2,32}:[0-9]{18,22}>")
+
+
+class _Halt:
+    def __repr__(self) -> str:
+        return "HALT"
+
+
+# returned by a stage to stop every stage that runs after it
+HALT: Any = _Halt()
+
+
+class MessageFeatures:
+    """What the message stages want to know about a message, worked out at most once.
+
+    Everything derived from the content is computed on first access and shared
+    by every stage after that. The object can't be changed, stages running at
+    the same time all see the same thing.
+    """
+
+    message: discord.Message
+    guild: discord.Guild | None
+    channel: discord.abc.MessageableChannel
+    author: discord.Member | discord.User
+    content: str
+    config: Mapping[str, Any] | None
+    is_bot: bool
+    is_self: bool
+    is_owner: bool
+    is_webhook: bool
+
+    def __init__(
+        self,
+        message: discord.Message,
+        *,
+        config: Mapping[str, Any] | None = None,
+        bot_id: int | None = None,
+        owner_ids: Collection[int] = (),
+    ) -> None:
+        set_ = object.__setattr__
+        author = message.author
+        set_(self, "message", message)
+        set_(self, "guild", message.guild)
+        set_(self, "channel", message.channel)
+        set_(self, "author", author)
+        set_(self, "content", message.content)
+        set_(self, "config", config)
+        set_(self, "is_bot", author.bot)
+        set_(self, "is_self", author.id == bot_id)
+        set_(self, "is_owner", author.id in owner_ids)
+        set_(self, "is_webhook", message.webhook_id is not None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        msg = f"{self.__class__.__name__} is immutable"
+        raise AttributeError(msg)
+
+    __delattr__ = __setattr__
+
+    def __repr__(self) -> str:
+        return f"<MessageFeatures message={self.message.id} guild={getattr(self.guild, 'id', None)} author={self.author.id}>"
+
+    @property
+    def guild_id(self) -> int | None:
+        return self.guild.id if self.guild is not None else None
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.content.lower()
+
+    @cached_property
+    def tokens(self) -> tuple[str, ...]:
+        """Lowercased words, in order."""
+        return tuple(WORD_RE.findall(self.lowered))
+
+    @cached_property
+    def words(self) -> frozenset[str]:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def lines(self) -> tuple[str, ...]:
+        return tuple(self.content.split("\n"))
+
+    @cached_property
+    def urls(self) -> tuple[str, ...]:
+        return tuple(URL_RE.findall(self.content)) if "://" in self.content else ()
+
+    @cached_property
+    def domains(self) -> frozenset[str]:
+        """Anything that looks like a domain, with or without a scheme, lowercased."""
+        if "." not in self.content:
+            return frozenset()
+        return frozenset(domain.lower() for domain in DOMAIN_RE.findall(self.content))
+
+    @cached_property
+    def mentions(self) -> frozenset[int]:
+        return frozenset(self.message.raw_mentions) if "<@" in self.content else frozenset()
+
+    @cached_property
+    def emoji_count(self) -> int:
+        custom = len(CUSTOM_EMOJI_RE.findall(self.content)) if "<" in self.content else 0
+        return emojis.count(self.content) + custom
+
+
+@dataclass
+class StageTiming:
+    calls: int = 0
+    skipped: int = 0
+    halted: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    slowest: float = 0.0
+
+    @property
+    def average(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+@dataclass(eq=False)
+class Stage:
+    """A coroutine run for every message that gets past its filters.
+
+    ``after`` names the stages that have to finish first, names of stages
+    that are not registered are ignored. Stages returning :data:`HALT` stop
+    everything after them.
+    """
+
+    name: str
+    callback: Callable[[MessageFeatures], Awaitable[Any]]
+    after: tuple[str, ...] = ()
+    guild_only: bool = True
+    ignore_bots: bool = True
+    ignore_self: bool = True
+    check: Callable[[MessageFeatures], Any] | None = None
+    timing: StageTiming = field(default_factory=StageTiming)
+
+    def accepts(self, features: MessageFeatures) -> bool:
+        if self.guild_only and features.guild is None:
+            return False
+        if (self.ignore_bots and features.is_bot) or (self.ignore_self and features.is_self):
+            return False
+        return self.check is None or bool(self.check(features))
+
+
+class MessagePipeline:
+    """Runs the registered stages of every message against one :class:`MessageFeatures`.
+
+    Filters are plain checks run in order before anything is scheduled, a
+    stage that doesn't want the message costs a function call instead of a
+    task. Stages that pass run as tasks of their own, as listeners do, so a
+    stage waiting on something never holds back the others, except those
+    declared to come after it.
+    """
+
+    def __init__(self, *, bot_id: int | None = None, owner_ids: Collection[int] = ()) -> None:
+        self.bot_id = bot_id
+        self.owner_ids = owner_ids
+        self._stages: dict[str, Stage] = {}
+        self._order: list[Stage] | None = None
+        # the callers drop the tasks run returns, the loop only keeps weak references to them
+        self._running: set[asyncio.Task[Any]] = set()
+        self.messages = 0
+
+    def __repr__(self) -> str:
+        return f"<MessagePipeline stages={len(self._stages)} messages={self.messages}>"
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._stages
+
+    @property
+    def stages(self) -> list[Stage]:
+        """Stages in the order they are scheduled."""
+        if self._order is None:
+            self._order = self._sort()
+        return self._order
+
+    def add(self, stage: Stage) -> None:
+        if stage.name in self._stages:
+            msg = f"Stage {stage.name!r} is already registered"
+            raise ValueError(msg)
+        self._stages[stage.name] = stage
+        try:
+            self._order = self._sort()
+        except ValueError:
+            del self._stages[stage.name]
+            self._order = None
+            raise
+
+    def remove(self, name: str) -> Stage | None:
+        stage = self._stages.pop(name, None)
+        self._order = None
+        return stage
+
+    def _sort(self) -> list[Stage]:
+        """Registration order, moved back only as far as ``after`` requires."""
+        order: list[Stage] = []
+        placed: set[str] = set()
+        visiting: set[str] = set()
+
+        def place(stage: Stage) -> None:
+            if stage.name in placed:
+                return
+            if stage.name in visiting:
+                msg = f"Stage {stage.name!r} depends on itself"
+                raise ValueError(msg)
+            visiting.add(stage.name)
+            for name in stage.after:
+                if (dependency := self._stages.get(name)) is not None:
+                    place(dependency)
+            visiting.discard(stage.name)
+            placed.add(stage.name)
+            order.append(stage)
+
+        for stage in self._stages.values():
+            place(stage)
+        return order
+
+    def features(self, message: discord.Message, *, config: Mapping[str, Any] | None = None) -> MessageFeatures:
+        return MessageFeatures(message, config=config, bot_id=self.bot_id, owner_ids=self.owner_ids)
+
+    def run(self, features: MessageFeatures) -> dict[str, asyncio.Task[Any]]:
+        """Schedules every stage that accepts the message, returns their tasks without waiting."""
+        self.messages += 1
+        tasks: dict[str, asyncio.Task[Any]] = {}
+        for stage in self.stages:
+            try:
+                accepted = stage.accepts(features)
+            except Exception:
+                stage.timing.errors += 1
+                log.exception("Check of stage %s failed", stage.name)
+                continue
+            if not accepted:
+                stage.timing.skipped += 1
+                continue
+            waiting = [tasks[name] for name in stage.after if name in tasks]
+            task = asyncio.create_task(self._run(stage, features, waiting), name=f"pipeline:{stage.name}")
+            tasks[stage.name] = task
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return tasks
+
+    async def _run(self, stage: Stage, features: MessageFeatures, waiting: list[asyncio.Task[Any]]) -> Any:
+        if waiting and any(result is HALT for result in await asyncio.gather(*waiting)):
+            stage.timing.halted += 1
+            return HALT
+
+        current_site.set(f"stage:{stage.name}")
+        start = perf_counter()
+        try:
+            return await stage.callback(features)
+        except Exception:
+            stage.timing.errors += 1
+            log.exception("Stage %s failed on message %s", stage.name, features.message.id)
+            return None
+        finally:
+            elapsed = perf_counter() - start
+            stage.timing.calls += 1
+            stage.timing.seconds += elapsed
+            stage.timing.slowest = max(stage.timing.slowest, elapsed)
+
+    def timings(self) -> dict[str, StageTiming]:
+        return {stage.name: stage.timing for stage in self.stages}
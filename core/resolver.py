@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("MemberResolver",)
+
+log = logging.getLogger("core.resolver")
+
+CHUNK_SIZE = 100  # most user ids a single gateway member request takes
+NEGATIVE_TTL = 300.0
+NEGATIVE_MAX = 10_000
+
+
+class MemberResolver:
+    """Resolves member ids to members in bulk.
+
+    The member cache is always looked at first, so someone who joins after a
+    miss was cached is found anyway.
+
+    Lookups missing from the cache are queued per guild and sent together as
+    gateway member requests of up to 100 ids, or as HTTP fetches while the
+    shard is rate limited. Everyone asking for an id already on its way waits
+    for the same answer, and ids that turned out not to be in the guild are
+    remembered for ``negative_ttl`` seconds.
+
+    Concurrent callers are batched when they ask within ``batch_delay``
+    seconds of each other, the default only gathers those of the same event
+    loop iteration.
+    """
+
+    def __init__(
+        self,
+        bot: Parrot,
+        *,
+        negative_ttl: float = NEGATIVE_TTL,
+        batch_delay: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.bot = bot
+        self.negative_ttl = negative_ttl
+        self.batch_delay = batch_delay
+        self.clock = clock
+
+        # guild id -> ids waiting for the next request
+        self._queued: dict[int, dict[int, asyncio.Future[discord.Member | None]]] = {}
+        # (guild id, member id) -> answer shared by every caller, until it arrives
+        self._inflight: dict[tuple[int, int], asyncio.Future[discord.Member | None]] = {}
+        self._users_inflight: dict[int, asyncio.Future[discord.User | None]] = {}
+        # the flushes waiting for their batch, the loop only keeps weak references to tasks
+        self._flushes: set[asyncio.Task[None]] = set()
+        # (guild id or 0 for users, id) -> expiry, in insertion order, which is expiry order
+        self._missing: dict[tuple[int, int], float] = {}
+
+        self.gateway_requests = 0
+        self.http_requests = 0
+        self.coalesced = 0
+        self.negative_hits = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<MemberResolver gateway_requests={self.gateway_requests} http_requests={self.http_requests} "
+            f"coalesced={self.coalesced} negative_hits={self.negative_hits} missing={len(self._missing)}>"
+        )
+
+    # negative cache
+
+    def _is_missing(self, key: tuple[int, int]) -> bool:
+        if (expires := self._missing.get(key)) is None:
+            return False
+        if expires <= self.clock():
+            del self._missing[key]
+            return False
+        self.negative_hits += 1
+        return True
+
+    def _remember_missing(self, key: tuple[int, int]) -> None:
+        now = self.clock()
+        self._missing.pop(key, None)
+        self._missing[key] = now + self.negative_ttl
+        while self._missing:
+            oldest, expires = next(iter(self._missing.items()))
+            if expires > now and len(self._missing) <= NEGATIVE_MAX:
+                break
+            del self._missing[oldest]
+
+    # members
+
+    async def resolve(self, guild: discord.Guild, member_id: int) -> discord.Member | None:
+        return (await self.resolve_many(guild, (member_id,)))[0]
+
+    async def resolve_many(self, guild: discord.Guild, member_ids: Iterable[int]) -> list[discord.Member | None]:
+        """The members of ``member_ids``, in the same order, ``None`` for those not in the guild."""
+        member_ids = [int(member_id) for member_id in member_ids]
+        results: list[discord.Member | None] = [None] * len(member_ids)
+        waiting: dict[int, asyncio.Future[discord.Member | None]] = {}
+        for member_id in member_ids:
+            if member_id in waiting or guild.get_member(member_id) is not None:
+                continue
+            if self._is_missing((guild.id, member_id)):
+                continue
+            waiting[member_id] = self._request(guild, member_id)
+
+        if waiting:
+            await asyncio.wait(waiting.values())
+
+        for index, member_id in enumerate(member_ids):
+            if (member := guild.get_member(member_id)) is not None:
+                results[index] = member
+            elif (future := waiting.get(member_id)) is not None and not future.cancelled():
+                results[index] = future.result()
+        return results
+
+    def _request(self, guild: discord.Guild, member_id: int) -> asyncio.Future[discord.Member | None]:
+        key = (guild.id, member_id)
+        if (future := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            return future
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        queue = self._queued.get(guild.id)
+        if queue is None:
+            queue = self._queued[guild.id] = {}
+            task = asyncio.create_task(self._flush(guild), name=f"member-resolver-{guild.id}")
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        queue[member_id] = future
+        return future
+
+    async def _flush(self, guild: discord.Guild) -> None:
+        await asyncio.sleep(self.batch_delay)
+        # anything queued from now on goes out with the next flush
+        queue = self._queued.pop(guild.id, {})
+        ids = list(queue)
+        try:
+            for index in range(0, len(ids), CHUNK_SIZE):
+                chunk = ids[index : index + CHUNK_SIZE]
+                for member_id, member in (await self._fetch(guild, chunk)).items():
+                    if member is None:
+                        self._remember_missing((guild.id, member_id))
+                    self._settle(guild.id, member_id, queue[member_id], member)
+        except (asyncio.TimeoutError, discord.HTTPException) as e:
+            log.warning("Could not resolve %s members of guild %s: %r", len(ids), guild.id, e)
+        finally:
+            # a failed request is not a miss, the next caller tries again
+            for member_id, future in queue.items():
+                self._settle(guild.id, member_id, future, None)
+
+    def _settle(
+        self,
+        guild_id: int,
+        member_id: int,
+        future: asyncio.Future[discord.Member | None],
+        member: discord.Member | None,
+    ) -> None:
+        if self._inflight.get((guild_id, member_id)) is future:
+            del self._inflight[(guild_id, member_id)]
+        if not future.done():
+            future.set_result(member)
+
+    async def _fetch(self, guild: discord.Guild, member_ids: list[int]) -> dict[int, discord.Member | None]:
+        """The answer for every id that got one, ``None`` when the member is not in the guild."""
+        shard = self.bot.get_shard(guild.shard_id)
+        if shard is not None and shard.is_ws_ratelimited():
+            self.http_requests += len(member_ids)
+            fetched = await asyncio.gather(
+                *(guild.fetch_member(member_id) for member_id in member_ids),
+                return_exceptions=True,
+            )
+            return {
+                member_id: None if isinstance(member, discord.NotFound) else member
+                for member_id, member in zip(member_ids, fetched, strict=True)
+                if not isinstance(member, BaseException) or isinstance(member, discord.NotFound)
+            }
+
+        self.gateway_requests += 1
+        members = await guild.query_members(limit=CHUNK_SIZE, user_ids=member_ids, cache=True)
+        found = {member.id: member for member in members}
+        return {member_id: found.get(member_id) for member_id in member_ids}
+
+    # users
+
+    async def resolve_user(self, user_id: int) -> discord.User | None:
+        """A user from the cache or the API, coalesced and remembered when missing like members."""
+        user_id = int(user_id)
+        if (user := self.bot.get_user(user_id)) is not None:
+            return user
+        if self._is_missing((0, user_id)):
+            return None
+        if (future := self._users_inflight.get(user_id)) is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._users_inflight[user_id] = future
+        user = None
+        try:
+            self.http_requests += 1
+            user = await self.bot.fetch_user(user_id)
+        except discord.NotFound:
+            self._remember_missing((0, user_id))
+        except discord.HTTPException:
+            pass
+        finally:
+            del self._users_inflight[user_id]
+            future.set_result(user)
+        return user
+
+    async def resolve_many_users(
+        self,
+        guild: discord.Guild | None,
+        user_ids: Iterable[int],
+    ) -> list[discord.Member | discord.User | None]:
+        """Members of ``guild`` where possible, users for the rest, in the order of ``user_ids``."""
+        user_ids = [int(user_id) for user_id in user_ids]
+        results: list[Any] = await self.resolve_many(guild, user_ids) if guild is not None else [None] * len(user_ids)
+        missing = {user_id for user_id, result in zip(user_ids, results, strict=True) if result is None}
+        users = dict(zip(missing, await asyncio.gather(*(self.resolve_user(user_id) for user_id in missing)), strict=True))
+        return [result if result is not None else users[user_id] for user_id, result in zip(user_ids, results, strict=True)]
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from tabulate import tabulate
+
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from .Cog import Cog
+
+__all__ = (
+    "ExtensionTiming",
+    "Startup",
+)
+
+log = logging.getLogger("core.startup")
+
+# the extension being loaded in the current task, for Cog._inject to charge its cog_load to
+loading: contextvars.ContextVar[ExtensionTiming | None] = contextvars.ContextVar("loading", default=None)
+
+
+@dataclass(slots=True)
+class ExtensionTiming:
+    name: str
+    # seconds since the startup began
+    started: float = 0.0
+    loaded: float = 0.0
+    # spent in cog_load of the cogs of the extension, part of the above
+    cog_load: float = 0.0
+    error: str | None = None
+
+    @property
+    def seconds(self) -> float:
+        return self.loaded - self.started
+
+
+def _check_requires(extensions: list[str], requires: Mapping[str, tuple[str, ...]]) -> None:
+    """Raises if an extension requires one that isn't loaded, or requires itself in the end."""
+    for name, required in requires.items():
+        if unknown := [other for other in required if other not in extensions]:
+            msg = f"{name} requires {unknown[0]}, which is not in the extensions to load"
+            raise ValueError(msg)
+
+    visited: set[str] = set()
+
+    def visit(name: str, path: tuple[str, ...]) -> None:
+        if name in path:
+            msg = f"extensions require each other: {' -> '.join((*path[path.index(name):], name))}"
+            raise ValueError(msg)
+        if name in visited:
+            return
+        for other in requires.get(name, ()):
+            visit(other, (*path, name))
+        visited.add(name)
+
+    for name in extensions:
+        visit(name, ())
+
+
+class Startup:
+    """Loads the extensions of the bot and keeps how long each one took.
+
+    An extension is loaded once the extensions it ``requires`` are, all the
+    others load concurrently, ``concurrency`` at a time. Imports and
+    ``setup`` still run one after the other on the event loop, in the
+    order given, what overlaps is the I/O the cogs await in ``cog_load``.
+    ``concurrency=1`` loads them strictly in order.
+
+    What a cog can fill in late belongs in :meth:`core.Cog.cog_warmup`,
+    those run concurrently once the bot is ready, right away for cogs
+    loaded after that.
+    """
+
+    def __init__(self, *, concurrency: int = 16) -> None:
+        self.concurrency = concurrency
+        self.extensions: dict[str, ExtensionTiming] = {}
+        self.warmups: dict[str, float] = {}
+        self.began = perf_counter()
+        # seconds since the startup began, None until it happened
+        self.loaded_at: float | None = None
+        self.ready_at: float | None = None
+        self.warmed_at: float | None = None
+        self._pending: list[Cog] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def failed(self) -> dict[str, str]:
+        return {name: timing.error for name, timing in self.extensions.items() if timing.error is not None}
+
+    def _elapsed(self) -> float:
+        return perf_counter() - self.began
+
+    async def load(
+        self,
+        bot: commands.Bot,
+        extensions: Iterable[str],
+        *,
+        requires: Mapping[str, Iterable[str]] | None = None,
+    ) -> None:
+        """Loads ``extensions``, an extension that fails is logged and kept in :attr:`failed`, so is one that requires it."""
+        names = list(dict.fromkeys(extensions))
+        required = {name: tuple(others) for name, others in (requires or {}).items() if name in names}
+        _check_requires(names, required)
+
+        self.began = perf_counter()
+        done = {name: asyncio.Event() for name in names}
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def load(name: str) -> None:
+            timing = self.extensions[name] = ExtensionTiming(name)
+            try:
+                for other in required.get(name, ()):
+                    await done[other].wait()
+                if failed := [other for other in required.get(name, ()) if self.extensions[other].error is not None]:
+                    timing.error = f"requires {failed[0]}, which failed to load"
+                    log.error("Not loading extension %s, %s", name, timing.error)
+                    return
+
+                async with semaphore:
+                    loading.set(timing)
+                    timing.started = self._elapsed()
+                    try:
+                        await bot.load_extension(name)
+                    except commands.ExtensionError as e:
+                        timing.error = str(e)
+                        log.error("Failed to load extension %s", name, exc_info=e)
+                    else:
+                        log.info("Loaded extension %s", name)
+                    timing.loaded = self._elapsed()
+            finally:
+                done[name].set()
+
+        await asyncio.gather(*(load(name) for name in names))
+        self.loaded_at = self._elapsed()
+        log.info(
+            "Loaded %s of %s extensions in %.2fs",
+            len(names) - len(self.failed),
+            len(names),
+            self.loaded_at,
+        )
+
+    def add_warmup(self, cog: Cog) -> None:
+        """Runs the warmup of ``cog`` once the bot is ready, right away if it is."""
+        if self.ready_at is None:
+            self._pending.append(cog)
+        else:
+            self._spawn(self._warmup(cog))
+
+    def ready(self) -> None:
+        """The bot is ready, the warmups of the cogs loaded so far are started."""
+        if self.ready_at is not None:
+            return
+        self.ready_at = self._elapsed()
+        pending, self._pending = self._pending, []
+        self._spawn(self._warmup_all(pending))
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro, name="startup:warmup")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _warmup_all(self, cogs: list[Cog]) -> None:
+        await asyncio.gather(*(self._warmup(cog) for cog in cogs))
+        self.warmed_at = self._elapsed()
+        log.info("Warmed up %s cogs %.2fs after being ready", len(cogs), self.warmed_at - (self.ready_at or 0))
+
+    async def _warmup(self, cog: Cog) -> None:
+        started = perf_counter()
+        try:
+            await cog.cog_warmup()
+        except Exception:
+            log.exception("Failed to warm up %s", cog.qualified_name)
+        self.warmups[cog.qualified_name] = perf_counter() - started
+
+    def report(self, *, top: int | None = None) -> str:
+        """The extensions and warmups as tables, slowest first, ``top`` rows of each at most.
+
+        Loads overlap, what an extension took includes whatever the others ran
+        on the event loop while its ``cog_load`` waited.
+        """
+        extensions = sorted(self.extensions.values(), key=lambda timing: timing.seconds, reverse=True)[:top]
+        rows = [
+            [
+                timing.name,
+                f"{timing.started * 1e3:.0f}ms",
+                f"{timing.seconds * 1e3:.1f}ms",
+                f"{timing.cog_load * 1e3:.1f}ms",
+                "failed" if timing.error is not None else "",
+            ]
+            for timing in extensions
+        ]
+        warmups = sorted(self.warmups.items(), key=lambda item: item[1], reverse=True)[:top]
+
+        def seconds(value: float | None) -> str:
+            return f"{value:.2f}s" if value is not None else "-"
+
+        lines = [
+            f"loaded {seconds(self.loaded_at)}, ready {seconds(self.ready_at)}, warmed up {seconds(self.warmed_at)}",
+            "",
+            tabulate(rows, headers=["extension", "at", "took", "cog_load", ""]),
+        ]
+        if warmups:
+            lines += ["", tabulate([[name, f"{value * 1e3:.1f}ms"] for name, value in warmups], headers=["cog", "warmup"])]
+        return "\n".join(lines)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import IO, Any
+
+__all__ = (
+    "Anonymizer",
+    "RecordedEvent",
+    "TrafficRecorder",
+    "read_recording",
+)
+
+log = logging.getLogger("core.traffic")
+
+FORMAT = 1
+DISPATCH = 0
+
+SNOWFLAKE = re.compile(r"\d{15,21}")
+# mentions, channel links and custom emojis carry ids inside of text
+TEXT = re.compile(r"<(@!?|@&|#|a?:\w*:)(\d{15,21})>|(https?://\S+)|(\w+)")
+WORD = re.compile(r"\w+")
+# a command at the start of a message: a mention or a short prefix ending in a symbol, then the command word
+COMMAND = re.compile(r"(<@!?\d{15,21}>\s*|[^\s<]{0,4}[^\w\s])(\w+)(?!\S)")
+
+# structural strings, nothing a user wrote
+_KEEP_KEYS = frozenset(
+    {
+        "allow",
+        "content_type",
+        "deny",
+        "discriminator",
+        "features",
+        "locale",
+        "permissions",
+        "preferred_locale",
+        "status",
+    },
+)
+_KEEP_SUFFIXES = ("_at", "_since", "_until", "timestamp")
+
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+_UPPER = _LOWER.upper()
+
+
+@dataclass(slots=True)
+class RecordedEvent:
+    # seconds since the recording started
+    at: float
+    event: str
+    data: Any
+
+
+class Anonymizer:
+    """Rewrites gateway payloads so that they can be kept and shared.
+
+    Snowflakes keep their timestamp bits, account and message ages still mean
+    something, the rest of them is a keyed hash. Every word of text becomes
+    a word of the same length and shape, the same word always the same one.
+    Only the first word after a prefix at the start of a message's content
+    stays as it is, if it is in ``keep`` (the command names of the bot, so
+    commands are still commands), the same word anywhere else is rewritten.
+    Mentions and links keep their form.
+
+    The key is random unless given, recordings made with different keys
+    can't be joined on their ids.
+    """
+
+    def __init__(self, *, key: bytes | None = None, keep: Collection[str] = ()) -> None:
+        self.key = key or os.urandom(16)
+        self.keep = keep
+        self.word = functools.lru_cache(maxsize=2**16)(self._word)
+        self.snowflake = functools.lru_cache(maxsize=2**16)(self._snowflake)
+
+    def _digest(self, value: str, size: int) -> bytes:
+        return hashlib.blake2b(value.encode(), key=self.key, digest_size=size).digest()
+
+    def _snowflake(self, value: str) -> str:
+        snowflake = int(value)
+        hashed = int.from_bytes(self._digest(value, 4), "big") & 0x3FFFFF
+        return str(snowflake >> 22 << 22 | hashed)
+
+    def _word(self, word: str) -> str:
+        digest = self._digest(word, 64)
+        chars = []
+        for index, char in enumerate(word):
+            byte = digest[index % 64]
+            if char.isdigit():
+                chars.append(str(byte % 10))
+            elif char.isupper():
+                chars.append(_UPPER[byte % 26])
+            else:
+                chars.append(_LOWER[byte % 26])
+        return "".join(chars)
+
+    def _text_match(self, match: re.Match[str]) -> str:
+        kind, snowflake, url, word = match.groups()
+        if snowflake is not None:
+            return f"<{WORD.sub(self._word_match, kind)}{self.snowflake(snowflake)}>"
+        if url is not None:
+            scheme, rest = url.split("://", 1)
+            return f"{scheme}://{WORD.sub(self._word_match, rest)}"
+        return self.word(word)
+
+    def _word_match(self, match: re.Match[str]) -> str:
+        return self.word(match[0])
+
+    def text(self, text: str) -> str:
+        return TEXT.sub(self._text_match, text)
+
+    def content(self, text: str) -> str:
+        """The content of a message, a command in ``keep`` right after the prefix stays readable."""
+        match = COMMAND.match(text)
+        if match is None or match[2].lower() not in self.keep:
+            return self.text(text)
+        prefix = self.text(match[1]) if match[1].startswith("<@") else match[1]
+        return f"{prefix}{match[2]}{self.text(text[match.end() :])}"
+
+    def payload(self, data: Any, key: str = "") -> Any:
+        """A copy of ``data`` with every id and every text rewritten, ``key`` is where ``data`` sits in its parent."""
+        if isinstance(data, dict):
+            return {
+                (self.snowflake(name) if SNOWFLAKE.fullmatch(name) else name): self.payload(value, name)
+                for name, value in data.items()
+            }
+        if isinstance(data, list):
+            return [self.payload(value, key) for value in data]
+        if not isinstance(data, str) or key in _KEEP_KEYS or key.endswith(_KEEP_SUFFIXES):
+            return data
+        if SNOWFLAKE.fullmatch(data):
+            return self.snowflake(data)
+        return self.content(data) if key == "content" else self.text(data)
+
+
+class TrafficRecorder:
+    """Writes the dispatch events of the gateway to gzipped JSON lines in ``directory``.
+
+    :meth:`record` only buffers what it gets, every ``flush_interval``
+    seconds the buffer is parsed, anonymized and written from a thread. A
+    new file is started every ``rotate_after`` events. The first line of a file is a
+    header, every other line is ``{"at": ..., "t": ..., "d": ...}`` with
+    ``at`` counted from the start of the recording, not of the file.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        anonymizer: Anonymizer | None = None,
+        flush_interval: float = 1.0,
+        rotate_after: int = 100_000,
+    ) -> None:
+        self.directory = Path(directory)
+        self.anonymizer = anonymizer or Anonymizer()
+        self.flush_interval = flush_interval
+        self.rotate_after = rotate_after
+
+        self.recorded = 0
+        self.files: list[Path] = []
+        self._started = perf_counter()
+        self._stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+        # (seconds since the start, the message as received)
+        self._buffer: list[tuple[float, str | bytes | dict[str, Any]]] = []
+        self._file: IO[str] | None = None
+        self._in_file = 0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="traffic:recorder")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        async with self._lock:
+            await asyncio.to_thread(self._close)
+
+    def record(self, raw: str | bytes | dict[str, Any]) -> None:
+        """Takes what ``on_socket_raw_receive`` gets, anything but dispatch events is dropped."""
+        self._buffer.append((perf_counter() - self._started, raw))
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer:
+                return
+            received, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write, received)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError:
+                log.exception("Failed to write the recorded traffic to %s", self.directory)
+
+    def _lines(self, received: list[tuple[float, str | bytes | dict[str, Any]]]) -> list[str]:
+        lines = []
+        for at, raw in received:
+            message = json.loads(raw) if isinstance(raw, str | bytes) else raw
+            if message.get("op") != DISPATCH or not message.get("t"):
+                continue
+            data = self.anonymizer.payload(message.get("d"))
+            lines.append(json.dumps({"at": round(at, 6), "t": message["t"], "d": data}, separators=(",", ":")))
+        self.recorded += len(lines)
+        return lines
+
+    def _open(self) -> IO[str]:
+        path = self.directory / f"gateway-{self._stamp}-{len(self.files):04}.jsonl.gz"
+        self.files.append(path)
+        self._in_file = 0
+        file = gzip.open(path, "wt", encoding="utf-8")
+        header = {"format": FORMAT, "started_at": self._stamp, "part": len(self.files) - 1}
+        file.write(json.dumps(header) + "\n")
+        return file
+
+    def _write(self, received: list[tuple[float, str | bytes | dict[str, Any]]]) -> None:
+        lines = self._lines(received)
+        if not lines:
+            return
+        for line in lines:
+            if self._file is None or self._in_file >= self.rotate_after:
+                self._close()
+                self._file = self._open()
+            self._file.write(line + "\n")
+            self._in_file += 1
+        self._file.flush()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(path: str | os.PathLike[str]) -> Iterator[RecordedEvent]:
+    """The events of a recording, ``path`` is one of its files or the directory of them.
+
+    Several recordings in one directory are played one after the other.
+    """
+    path = Path(path)
+    files = sorted(path.glob("gateway-*.jsonl.gz")) if path.is_dir() else [path]
+    offset = last = 0.0
+    for file in files:
+        with gzip.open(file, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "t" in entry:
+                    last = offset + entry["at"]
+                    yield RecordedEvent(last, entry["t"], entry["d"])
+                    continue
+                if entry.get("format", FORMAT) > FORMAT:
+                    msg = f"{file} is of a newer recording format ({entry['format']})"
+                    raise ValueError(msg)
+                if entry.get("part") == 0:
+                    # the clock of a new recording starts at 0 again
+                    offset = last
@@ -11,6 +11,7 @@ from weakref import WeakValueDictionary
 
 import discord
 from core import Cog, Parrot
+from core.pipeline import MessageFeatures
 from utilities.time import ShortTime
 
 OWO_BOT = 408785106942164992
@@ -96,12 +97,14 @@ class Sector17Listeners(Cog):
         except asyncio.TimeoutError:
             return None
 
-    @Cog.listener("on_message")
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
-        if message.guild is None:
-            return
-
+    @Cog.stage(
+        "sector_17_listeners",
+        ignore_bots=False,
+        ignore_self=False,
+        check=lambda self, f: f.guild.id in {self.bot.server.id, QUOTIENT_HQ},
+    )
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         if message.guild.id == self.bot.server.id:
             self.bot.dispatch("sector_17_19_message", message)
 
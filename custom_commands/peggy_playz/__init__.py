@@ -4,6 +4,7 @@ import asyncio
 
 import discord
 from core import Cog, Parrot
+from core.pipeline import MessageFeatures
 
 UPLOAD_CHANNEL_ID = 1021553838135713944
 RULES_CHANNEL_ID = 1021457186997682308
@@ -18,9 +19,13 @@ class PeggyPlayZ(Cog):
         self.bot = bot
         self.ON_TESTING = False
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
+    @Cog.stage(
+        "peggy_playz_upload",
+        ignore_bots=False,
+        check=lambda self, f: f.channel.id == UPLOAD_CHANNEL_ID and f.author.id == PINGCORD,
+    )
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         if message.channel.id == UPLOAD_CHANNEL_ID and message.author.id == PINGCORD:
             perms = message.channel.permissions_for(message.guild.me)  # type: ignore
             if perms.manage_messages and perms.send_messages:
@@ -37,9 +42,9 @@ class PeggyPlayZ(Cog):
                     return
                 await channel.send(member.mention, delete_after=1)
 
-    @Cog.listener("on_message")
-    async def on_announcement_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
+    @Cog.stage("peggy_playz_announcement", ignore_bots=False, check=lambda self, f: f.guild.id == PEGGY_PLAYZ)
+    async def on_announcement_message(self, features: MessageFeatures) -> None:
+        message = features.message
         await asyncio.sleep(5)
         if (
             message.guild is not None
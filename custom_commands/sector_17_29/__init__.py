@@ -15,6 +15,7 @@ from typing import TYPE_CHECKING
 
 import discord
 from core import Cog
+from core.pipeline import MessageFeatures
 from discord.ext import commands, tasks
 from utilities.checks import in_support_server
 from utilities.regex import LINKS_RE
@@ -284,12 +285,9 @@ class Sector1729(Cog):
             except discord.HTTPException:
                 pass
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
-        if message.guild is None or message.guild.id != SUPPORT_SERVER_ID:
-            return
-
+    @Cog.stage("support_server_role", ignore_bots=False, check=lambda self, f: f.guild.id == SUPPORT_SERVER_ID)
+    async def on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         created: datetime | None = getattr(message.author, "created_at", None)
         joined: datetime | None = getattr(message.author, "joined_at", None)
 
@@ -453,18 +451,20 @@ class Sector1729(Cog):
 
         await role.edit(color=clr, reason=f"{ctx.author} ({ctx.author.id}) changed the color of rainbow role")
 
-    @Cog.listener("on_message")
-    async def extra_parser_on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
-        if message.guild is not None and self.bot.server and message.guild.id != self.bot.server.id:
-            return
-
+    @Cog.stage(
+        "support_server_parser",
+        guild_only=False,
+        ignore_bots=False,
+        ignore_self=False,
+        check=lambda self, f: f.guild is None or not self.bot.server or f.guild.id == self.bot.server.id,
+    )
+    async def extra_parser_on_message(self, features: MessageFeatures) -> None:
+        message = features.message
         await self.nickname_parser(message)
 
-        if self.bot.owner_ids and message.author.id not in self.bot.owner_ids:
-            ls = message.content.split("\n")
+        if self.bot.owner_ids and not features.is_owner:
             inside_code_block = False
-            for line in ls:
+            for line in features.lines:
                 if line.startswith("```"):
                     inside_code_block = not inside_code_block
                 if line.startswith("# ") and not inside_code_block:  # dont let user use markdown syntax
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+from collections import defaultdict
+
 from . import db
 
+# every lookup is a dict access, the indexes are built once from the database
+_BY_CODE = {emoji.emoji: emoji for emoji in db.EMOJI_DB}
+# first emoji wins, as it did with a linear scan
+_BY_ALIAS = {alias: emoji for emoji in reversed(db.EMOJI_DB) for alias in emoji.aliases}
+_BY_TAG: defaultdict[str, list[db.Emoji]] = defaultdict(list)
+_BY_CATEGORY: defaultdict[str, list[db.Emoji]] = defaultdict(list)
+for _emoji in db.EMOJI_DB:
+    for _tag in _emoji.tags:
+        _BY_TAG[_tag].append(_emoji)
+    _BY_CATEGORY[_emoji.category.lower()].append(_emoji)
+
+_ALIASES = {f":{alias}:": emoji.emoji for emoji in db.EMOJI_DB for alias in emoji.aliases}
+_TAGS = frozenset(_BY_TAG)
+_CATEGORIES = frozenset(emoji.category for emoji in db.EMOJI_DB)
+
 
 def get_emoji_aliases():
     """Returns all Emojis as a dict (key = alias, value = unicode).
     :rtype: dict.
     """
-    emoji_aliases = {}
-
-    for emoji in db.EMOJI_DB:
-        for alias in emoji.aliases:
-            a = f":{alias}:"
-            emoji_aliases[a] = emoji.emoji
-
-    return emoji_aliases
+    return dict(_ALIASES)
 
 
 def get_emoji_by_code(code):
@@ -22,10 +32,7 @@ def get_emoji_by_code(code):
     :param code: Emoji Unicode code.
     :rtype: emojis.db.Emoji.
     """
-    try:
-        return next(filter(lambda emoji: code == emoji.emoji, db.EMOJI_DB))
-    except StopIteration:
-        return None
+    return _BY_CODE.get(code)
 
 
 def get_emoji_by_alias(alias):
@@ -33,10 +40,7 @@ def get_emoji_by_alias(alias):
     :param alias: Emoji alias.
     :rtype: emojis.db.Emoji.
     """
-    try:
-        return next(filter(lambda emoji: alias in emoji.aliases, db.EMOJI_DB))
-    except StopIteration:
-        return None
+    return _BY_ALIAS.get(alias)
 
 
 def get_emojis_by_tag(tag):
@@ -44,7 +48,7 @@ def get_emojis_by_tag(tag):
     :param tag: Tag name to filter (case-insensitive).
     :rtype: iter.
     """
-    return filter(lambda emoji: tag.lower() in emoji.tags, db.EMOJI_DB)
+    return iter(_BY_TAG.get(tag.lower(), ()))
 
 
 def get_emojis_by_category(category):
@@ -52,18 +56,18 @@ def get_emojis_by_category(category):
     :param tag: Category name to filter (case-insensitive).
     :rtype: iter.
     """
-    return filter(lambda emoji: category.lower() == emoji.category.lower(), db.EMOJI_DB)
+    return iter(_BY_CATEGORY.get(category.lower(), ()))
 
 
 def get_tags():
     """Returns all tags available.
     :rtype: set.
     """
-    return {tag for emoji in db.EMOJI_DB for tag in emoji.tags}
+    return set(_TAGS)
 
 
 def get_categories():
     """Returns all categories available.
     :rtype: set.
     """
-    return {emoji.category for emoji in db.EMOJI_DB}
+    return set(_CATEGORIES)
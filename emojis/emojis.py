@@ -1,16 +1,10 @@
-import re
-
 from . import db
+from .tokenizer import Tokenizer
 
 ALIAS_TO_EMOJI = db.get_emoji_aliases()
 EMOJI_TO_ALIAS = {v: k for k, v in ALIAS_TO_EMOJI.items()}
-EMOJI_TO_ALIAS_SORTED = sorted(ALIAS_TO_EMOJI.values(), key=len, reverse=True)
-
-RE_TEXT_TO_EMOJI_GROUP = "({})".format("|".join([re.escape(emoji) for emoji in ALIAS_TO_EMOJI]))
-RE_TEXT_TO_EMOJI = re.compile(RE_TEXT_TO_EMOJI_GROUP)
 
-RE_EMOJI_TO_TEXT_GROUP = "({})".format("|".join([re.escape(emoji) for emoji in EMOJI_TO_ALIAS_SORTED]))
-RE_EMOJI_TO_TEXT = re.compile(RE_EMOJI_TO_TEXT_GROUP)
+TOKENIZER = Tokenizer(EMOJI_TO_ALIAS)
 
 
 def encode(msg) -> str:
@@ -22,8 +16,20 @@ def encode(msg) -> str:
         >>> emojis.encode('This is a message with emojis :smile: :snake:')
         'This is a message with emojis 😄 🐍'.
     """
-    msg = RE_TEXT_TO_EMOJI.sub(lambda match: ALIAS_TO_EMOJI[match.group(0)], msg)
-    return msg
+    # an alias is ":name:" with no colon inside, so only the text up to the next colon can be one
+    parts = []
+    last = 0
+    start = msg.find(":")
+    while start >= 0 and (end := msg.find(":", start + 1)) >= 0:
+        if (emoji := ALIAS_TO_EMOJI.get(msg[start : end + 1])) is None:
+            start = end
+            continue
+        parts.append(msg[last:start])
+        parts.append(emoji)
+        last = end + 1
+        start = msg.find(":", last)
+    parts.append(msg[last:])
+    return "".join(parts)
 
 
 def decode(msg) -> str:
@@ -35,24 +41,31 @@ def decode(msg) -> str:
         >>> emojis.decode('This is a message with emojis 😄 🐍')
         'This is a message with emojis :smile: :snake:'.
     """
-    msg = RE_EMOJI_TO_TEXT.sub(lambda match: EMOJI_TO_ALIAS[match.group(0)], msg)
-    return msg
+    parts = []
+    last = 0
+    for start, end in TOKENIZER.spans(msg):
+        parts.append(msg[last:start])
+        parts.append(EMOJI_TO_ALIAS[msg[start:end]])
+        last = end
+    parts.append(msg[last:])
+    return "".join(parts)
 
 
 def get(msg) -> set:
     """Returns unique Emojis in the given string.
+    An Emoji with a skin tone, or a ZWJ sequence, is a single Emoji.
     :param msg: String to search for Emojis.
     :rtype: set.
     """
-    return {match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)}
+    return set(TOKENIZER.tokens(msg))
 
 
-def iter(msg):
+def iter(msg):  # noqa: A001
     """Iterates over all Emojis found in the message.
     :param msg: String to search for Emojis.
     :rtype: iterator.
     """
-    return (match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg))
+    return TOKENIZER.tokens(msg)
 
 
 def count(msg, unique=False):
@@ -62,5 +75,5 @@ def count(msg, unique=False):
     :rtype: int.
     """
     if unique:
-        return len({match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)})
-    return len([match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)])
+        return len(set(TOKENIZER.tokens(msg)))
+    return sum(1 for _ in TOKENIZER.tokens(msg))
@@ -0,0 +1,78 @@
+"""Emoji tokenizer: a trie of the database emojis, walked from candidate positions only."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+
+__all__ = ("SKIN_TONES", "ZWJ", "Tokenizer")
+
+# Fitzpatrick modifiers, they follow the emoji they color and none is in the database
+SKIN_TONES = frozenset(map(chr, range(0x1F3FB, 0x1F400)))
+ZWJ = "\u200d"
+
+_END = None
+
+
+class Tokenizer:
+    """Finds emojis in text in one pass.
+
+    ``spans`` yields every database emoji, longest match first, like a regex
+    alternation sorted by length would. ``tokens`` groups them the way they
+    are displayed: an emoji with its skin tone, and ZWJ sequences made of
+    database emojis, are a single token even when the sequence itself is not
+    in the database.
+    """
+
+    def __init__(self, codes: Iterable[str]) -> None:
+        self.trie: dict = {}
+        for code in codes:
+            node = self.trie
+            for char in code:
+                node = node.setdefault(char, {})
+            node[_END] = code
+        # plain text is skipped by the regex engine and Python only runs where an emoji may start.
+        # re turns a class of BMP characters into a bitmap but tests astral ones one by one, so
+        # those become a single range, the trie rejects the few in it that start no emoji
+        bmp = "".join(re.escape(char) for char in sorted(self.trie) if char <= "\uffff")
+        astral = sorted(char for char in self.trie if char > "\uffff")
+        self._start = re.compile(f"[{bmp}{astral[0]}-{astral[-1]}]" if astral else f"[{bmp}]")
+
+    def match(self, text: str, pos: int) -> int:
+        """End of the longest emoji starting at ``pos``, -1 if there is none."""
+        node = self.trie
+        end = -1
+        for i in range(pos, len(text)):
+            if (node := node.get(text[i])) is None:
+                break
+            if _END in node:
+                end = i + 1
+        return end
+
+    def spans(self, text: str) -> Iterator[tuple[int, int]]:
+        pos = 0
+        while candidate := self._start.search(text, pos):
+            start = candidate.start()
+            if (end := self.match(text, start)) < 0:
+                pos = start + 1
+                continue
+            yield start, end
+            pos = end
+
+    def tokens(self, text: str) -> Iterator[str]:
+        size = len(text)
+        pos = 0
+        while candidate := self._start.search(text, pos):
+            start = candidate.start()
+            if (end := self.match(text, start)) < 0:
+                pos = start + 1
+                continue
+            while True:
+                if end < size and text[end] in SKIN_TONES:
+                    end += 1
+                if end + 1 < size and text[end] == ZWJ and (joined := self.match(text, end + 1)) > 0:
+                    end = joined
+                else:
+                    break
+            yield text[start:end]
+            pos = end
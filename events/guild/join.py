@@ -27,6 +27,7 @@ class GuildJoin(Cog, command_attrs={"hidden": True}):
     @Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild):
         await self.bot.wait_until_ready()
+        await self.bot.game_leaderboards.remove_guild(guild.id)
         content = (
             "```diff\n"
             f"- Left {guild.name} ({guild.id})\n"
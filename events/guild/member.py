@@ -34,12 +34,16 @@ class Member(Cog, command_attrs={"hidden": True}):
                     reason=f"Action auto performed | Reason: {member} attempted to mute bypass, by rejoining the server",
                 )
 
+        await self.bot.game_leaderboards.add_member(member)
+
     @Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         pass
 
     @Cog.listener()
     async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        await self.bot.game_leaderboards.remove_member(payload.guild_id, payload.user.id)
+
         member = payload.user
         if isinstance(member, discord.User) or member.bot:
             return
@@ -192,7 +196,8 @@ class Member(Cog, command_attrs={"hidden": True}):
             for guild_id, set_member_muted in self.muted.items()
         ]
 
-        await self.bot.guild_configurations.write_bulk(operations)
+        if operations:
+            await self.bot.guild_configurations.bulk_write(operations)
 
 
 async def setup(bot: Parrot) -> None:
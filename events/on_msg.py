@@ -6,7 +6,7 @@ import os
 import re
 import textwrap
 import urllib.parse
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Collection, Coroutine
 from contextlib import suppress
 from re import Pattern
 from typing import TYPE_CHECKING, Any, Literal, overload
@@ -18,7 +18,10 @@ from aiohttp import ClientResponseError
 import discord
 import emojis
 from core import Cog
+from core.local_cache import LocalCache
+from core.pipeline import MessageFeatures
 from discord.ext import commands
+from utilities.profanity import ProfanityFilter
 from utilities.regex import EQUATION_REGEX, LINKS_NO_PROTOCOLS
 
 if TYPE_CHECKING:
@@ -26,8 +29,7 @@ if TYPE_CHECKING:
 
 from .on_msg_caching import OnMsgCaching
 
-with open("extra/profanity.json", encoding="utf-8", errors="ignore") as f:
-    bad_dict: dict[str, bool] = json.load(f)
+PROFANITY = ProfanityFilter.from_file("extra/profanity.json")
 
 TRIGGER: tuple = (
     "ok google,",
@@ -66,6 +68,10 @@ QUESTION_REGEX = re.compile(
     re.IGNORECASE,
 )
 
+SNIPPET_HOSTS = frozenset({"github.com", "gist.github.com", "gitlab.com", "bitbucket.org"})
+
+CUSTOM_EMOJI_RE = re.compile(r"<(?P<animated>a?):(?P<name>[a-zA-Z0-9_]{2,32}):(?P<id>[0-9]{18,22})>")
+
 GITHUB_HEADERS = {"Accept": "application/vnd.github.v3.raw", "Authorization": f"token {os.environ['GITHUB_TOKEN']}"}
 
 DISCORD_PY_ID = 336642139381301249
@@ -110,8 +116,8 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             (BITBUCKET_RE, self._fetch_bitbucket_snippet),
         ]
         self.message_append: list[discord.Message] = []
-        self.__scam_link_cache: dict[str, bool] = {}
-        self.__global_chat_cache: dict[int, dict] = {}
+        # domain -> whether it is a scam, 4096 domains for 6 hours, a failed check is retried after that
+        self.__scam_link_cache: LocalCache[str, bool] = bot.local_caches.cache("scam_links", maxsize=2**12, ttl=6 * 60 * 60)
 
     @overload
     async def _fetch_response(self, url: ..., response_format: ...) -> None:
@@ -338,10 +344,8 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             with suppress(discord.Forbidden):
                 return await message.channel.send(res)
 
-    def refrain_message(self, msg: str):
-        if "chod" in msg.replace(",", "").split(" "):
-            return False
-        return all(bad_word.lower() not in msg.replace(",", "").split(" ") for bad_word in bad_dict)
+    def refrain_message(self, msg: str) -> bool:
+        return not PROFANITY.contains(msg)
 
     def is_banned(self, member: discord.User | discord.Member) -> bool | None:
         # return True if member is banned else False
@@ -357,13 +361,8 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
 
     def get_emoji_count(self, message_content: str) -> int:
         str_count = emojis.count(message_content)
-        dis_count = len(
-            re.findall(
-                r"<(?P<animated>a?):(?P<name>[a-zA-Z0-9_]{2,32}):(?P<id>[0-9]{18,22})>",
-                message_content,
-            ),
-        )
-        return int(str_count + dis_count)
+        dis_count = len(CUSTOM_EMOJI_RE.findall(message_content))
+        return str_count + dis_count
 
     async def equation_solver(self, message: discord.Message):
         OP = [
@@ -420,46 +419,52 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
                     if text != "???":
                         return await message.reply(text)
 
-    @Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self.bot.wait_until_ready()
-
-        if message.guild is None:
-            return
-
-        await self.bot.ensure_guild_cache(message.guild)
-
-        if message.guild.me.id == message.author.id:
-            return
-
-        async def __internal_snippets_parser():
-            message_to_send = await self._parse_snippets(message.content)
-            if 0 < len(message_to_send) <= 2000 and self._check_gitlink_req(message):
-                view = Delete(message.author)
-                view.message = await message.channel.send(message_to_send, view=view)
-                try:
-                    await message.edit(suppress=True)
-                except discord.NotFound:
-                    pass
-                except discord.Forbidden:
-                    pass
-            if message.author.bot:
-                return
-
-        AWAITABLES: list[Coroutine] = [
-            __internal_snippets_parser(),
-            self._scam_detection(message),
-            self.equation_solver(message),
-            self.quick_answer(message),
-            self._on_message_passive(message),
-            self._global_chat_handler(message),
-        ]
-        await asyncio.gather(*AWAITABLES, return_exceptions=False)
+    @Cog.stage("snippets", ignore_bots=False, check=lambda self, f: f.domains & SNIPPET_HOSTS)
+    async def snippets_stage(self, features: MessageFeatures) -> None:
+        message = features.message
+        message_to_send = await self._parse_snippets(message.content)
+        if 0 < len(message_to_send) <= 2000 and self._check_gitlink_req(message):
+            view = Delete(message.author)
+            view.message = await message.channel.send(message_to_send, view=view)
+            with suppress(discord.NotFound, discord.Forbidden):
+                await message.edit(suppress=True)
+
+    @Cog.stage("scam_detection", ignore_bots=False, check=lambda self, f: f.domains)
+    async def scam_detection_stage(self, features: MessageFeatures) -> None:
+        await self._scam_detection(features.message, domains=features.domains)
+
+    @Cog.stage(
+        "equation_solver",
+        check=lambda self, f: len(f.content) >= 3 and (f.config or {}).get("opts", {}).get("equation_enabled"),
+    )
+    async def equation_solver_stage(self, features: MessageFeatures) -> None:
+        await self.equation_solver(features.message)
+
+    @Cog.stage("quick_answer", ignore_bots=False, check=lambda self, f: f.lowered.startswith(TRIGGER))
+    async def quick_answer_stage(self, features: MessageFeatures) -> None:
+        await self.quick_answer(features.message)
+
+    @Cog.stage("afk", ignore_bots=False, check=lambda self, f: self._is_afk_related(f))
+    async def afk_stage(self, features: MessageFeatures) -> None:
+        await self._on_message_passive(features.message, mentions=features.mentions)
+
+    @Cog.stage("global_chat", ignore_bots=False, check=lambda self, f: self._is_global_chat(f))
+    async def global_chat_stage(self, features: MessageFeatures) -> None:
+        await self._global_chat_handler(features)
+
+    def _is_afk_related(self, features: MessageFeatures) -> bool:
+        afk_users = self.bot.afk_users
+        if not afk_users:
+            return False
+        author = features.message.interaction.user if features.is_bot and features.message.interaction else features.author
+        return author.id in afk_users or not afk_users.isdisjoint(features.mentions)
 
-    async def _global_chat_handler(self, message: discord.Message) -> None:
-        if not message.content:
-            return
+    def _is_global_chat(self, features: MessageFeatures) -> bool:
+        data = (features.config or {}).get("global_chat") or {}
+        return bool(features.content and data.get("enable") and data.get("channel_id") == features.channel.id)
 
+    async def _global_chat_handler(self, features: MessageFeatures) -> None:
+        message = features.message
         if not hasattr(message.author, "guild"):
             return
         # this is equivalent to `if not message.guild: ...`
@@ -468,22 +473,7 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
         if self.is_banned(message.author):
             return
 
-        if message.guild.id not in self.__global_chat_cache:
-            # LRU?
-            data = await self.bot.guild_configurations.find_one(
-                {
-                    "_id": message.guild.id,
-                    "global_chat.channel_id": message.channel.id,
-                    "global_chat.enable": True,
-                },
-            )
-            if data is None:
-                return
-            self.__global_chat_cache[message.guild.id] = data
-        else:
-            data = self.__global_chat_cache[message.guild.id]
-
-        data = data["global_chat"]
+        data = features.config["global_chat"]
 
         bucket = self.cd_mapping.get_bucket(message)
         if bucket:
@@ -511,7 +501,7 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             await message.channel.send(f"{message.author.mention} | URLs aren't allowed.", delete_after=5)
             return
 
-        if len(message.content.split("\n")) > 4:
+        if len(features.lines) > 4:
             await message.delete(delay=0)
             await message.channel.send(
                 f"{message.author.mention} | Do not send message in 4-5 lines or above.",
@@ -519,7 +509,7 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             )
             return
 
-        to_send: bool = self.refrain_message(message.content.lower())
+        to_send: bool = self.refrain_message(features.lowered)
         if not to_send:
             await message.delete(delay=0)
             await message.channel.send(
@@ -528,7 +518,7 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             )
             return
 
-        if self.get_emoji_count(message.content) > 10:
+        if features.emoji_count > 10:
             await message.delete(delay=0)
             await message.channel.send(
                 f"{message.author.mention} | Do not send message with more than 10 emoji.",
@@ -569,7 +559,13 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             ]
             await asyncio.gather(*AWAITABLES, return_exceptions=False)
 
-    async def _scam_detection(self, message: discord.Message, *, to_send: bool = True) -> bool | None:
+    async def _scam_detection(
+        self,
+        message: discord.Message,
+        *,
+        to_send: bool = True,
+        domains: Collection[str] | None = None,
+    ) -> bool | None:
         if message.guild is None:
             return False
 
@@ -581,10 +577,13 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
 
         API = "https://anti-fish.bitflow.dev/check"
 
-        match_list = re.findall(
-            r"(?:[A-z0-9](?:[A-z0-9-]{0,61}[A-z0-9])?\.)+[A-z0-9][A-z0-9-]{0,61}[A-z0-9]",
-            message.content,
-        )
+        if domains is not None:
+            match_list = list(domains)
+        else:
+            match_list = re.findall(
+                r"(?:[A-z0-9](?:[A-z0-9-]{0,61}[A-z0-9])?\.)+[A-z0-9][A-z0-9-]{0,61}[A-z0-9]",
+                message.content,
+            )
 
         for i in match_list:
             cursor = await self.bot.sql.execute("""SELECT * FROM scam_links WHERE link = ?""", (i,))
@@ -640,13 +639,13 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
                     self.__scam_link_cache[match["domain"]] = True
                 return True
 
-    async def _on_message_passive(self, message: discord.Message):
+    async def _on_message_passive(self, message: discord.Message, *, mentions: Collection[int] | None = None):
         if message.guild is None:
             return
 
         await asyncio.gather(
             self._on_message_passive_afk_user_message(message),
-            self._on_message_passive_afk_user_mention(message),
+            self._on_message_passive_afk_user_mention(message, mentions=mentions),
         )
 
     async def _on_message_passive_afk_user_message(self, message: discord.Message):
@@ -690,11 +689,18 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
             pass
 
         await self.bot.delete_timer(**{"_id": data["_id"]})
-        self.bot.afk_users = set(await self.bot.afk_collection.distinct("messageAuthor"))
+        self.bot.afk_users.replace(await self.bot.afk_collection.distinct("messageAuthor"))
 
-    async def _on_message_passive_afk_user_mention(self, message: discord.Message):
+    async def _on_message_passive_afk_user_mention(
+        self,
+        message: discord.Message,
+        *,
+        mentions: Collection[int] | None = None,
+    ):
         if message.guild is None:
             return
+        if mentions is not None and self.bot.afk_users.isdisjoint(mentions):
+            return
         for user in message.mentions:
             if (user.id in self.bot.afk_users) and (
                 data := await self.bot.afk_collection.find_one(
@@ -716,7 +722,7 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
                     delete_after=5,
                     # Thanks `sourcandy_zz` (Sour Candy#8301 - 966599206880030760)
                 )
-        self.bot.afk_users = set(await self.bot.afk_collection.distinct("messageAuthor"))
+        self.bot.afk_users.replace(await self.bot.afk_collection.distinct("messageAuthor"))
 
     async def _what_is_this(self, message: discord.Message | str, *, channel: discord.TextChannel) -> None:
         try:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import discord
 from core import Cog, Context, Parrot
+from core.pipeline import MessageFeatures
 from discord.ext import commands
 
 
@@ -34,8 +35,9 @@ class OnMsgCaching(Cog):
             "type": str(message.type),
         }
 
-    @Cog.listener("on_message")
-    async def on_message_updater(self, message: discord.Message) -> None:
+    @Cog.stage("message_cache", guild_only=False, ignore_bots=False, ignore_self=False)
+    async def on_message_updater(self, features: MessageFeatures) -> None:
+        message = features.message
         if message.author.id in self.bot.message_cache:
             self.bot.message_cache[message.author.id] = message
 
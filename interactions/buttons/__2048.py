@@ -1,94 +1,65 @@
 from __future__ import annotations
 
-import itertools
-import random
+import asyncio
+import time
 from typing import Any
 
 import discord
 from core import Parrot
 
+from .__2048_engine import Direction, Engine2048
+
+# seconds of search per interaction, Discord wants an answer within 3
+HINT_BUDGET = 0.5
+AUTOPLAY_BUDGET = 2.0
+
+ARROWS: dict[Direction, str] = {
+    "up": "\N{UPWARDS BLACK ARROW}",
+    "down": "\N{DOWNWARDS BLACK ARROW}",
+    "left": "\N{LEFTWARDS BLACK ARROW}",
+    "right": "\N{BLACK RIGHTWARDS ARROW}",
+}
+
 
 class Twenty48:
     def __init__(self, number_to_display_dict, *, size: int = 4) -> None:
-        self.has_empty = True
-        self.board = [[0 for _ in range(size)] for _ in range(size)]
         self.size = size
+        self.engine = Engine2048(size)
+        # packed board, see `Engine2048`
+        self.state = 0
+        self.score = 0
+        self.has_empty = True
         self.message = None
         self._controls = ["w", "a", "s", "d"]
         self._conversion = number_to_display_dict
 
-    def reverse(self, board: list[list[int]]) -> list[list[int]]:
-        new_board: list[list[int]] = []
-        for i in range(self.size):
-            new_board.append([])
-            for j in range(self.size):
-                new_board[i].append(board[i][(self.size - 1) - j])
-        return new_board
-
-    def transp(self, board: list[list[int]]) -> list[list[int]]:
-        new_board = [[0 for _ in range(self.size)] for _ in range(self.size)]
-        for i, j in itertools.product(range(self.size), range(self.size)):
-            new_board[i][j] = board[j][i]
-        return new_board
-
-    def merge(self, board: list[list[int]]) -> list[list[int]]:
-        for i, j in itertools.product(range(self.size), range(self.size - 1)):
-            if board[i][j] == board[i][j + 1] and board[i][j] != 0:
-                board[i][j] += board[i][j]
-                board[i][j + 1] = 0
-        return board
-
-    def compress(self, board: list[list[int]]) -> list[list[int]]:
-        new_board = [[0 for _ in range(self.size)] for _ in range(self.size)]
-        for i in range(self.size):
-            pos = 0
-            for j in range(self.size):
-                if board[i][j] != 0:
-                    new_board[i][pos] = board[i][j]
-                    pos += 1
-        return new_board
+    @property
+    def board(self) -> list[list[int]]:
+        return self.engine.to_grid(self.state)
+
+    @board.setter
+    def board(self, board: list[list[int]]) -> None:
+        self.state = self.engine.from_grid(board)
+
+    def move(self, direction: Direction) -> None:
+        self.state, score = self.engine.move(self.state, direction)
+        self.score += score
 
     def move_left(self) -> None:
-        stage = self.compress(self.board)
-        stage = self.merge(stage)
-        stage = self.compress(stage)
-        self.board = stage
+        self.move("left")
 
     def move_right(self) -> None:
-        stage = self.reverse(self.board)
-        stage = self.compress(stage)
-        stage = self.merge(stage)
-        stage = self.compress(stage)
-        stage = self.reverse(stage)
-        self.board = stage
+        self.move("right")
 
     def move_up(self) -> None:
-        stage = self.transp(self.board)
-        stage = self.compress(stage)
-        stage = self.merge(stage)
-        stage = self.compress(stage)
-        stage = self.transp(stage)
-        self.board = stage
+        self.move("up")
 
     def move_down(self) -> None:
-        stage = self.transp(self.board)
-        stage = self.reverse(stage)
-        stage = self.compress(stage)
-        stage = self.merge(stage)
-        stage = self.compress(stage)
-        stage = self.reverse(stage)
-        stage = self.transp(stage)
-        self.board = stage
+        self.move("down")
 
     def spawn_new(self) -> None:
-        board = self.board
-        zeroes = [(j, i) for j, sub in enumerate(board) for i, el in enumerate(sub) if el == 0]
-        if not zeroes:
-            self.has_empty = False
-            return
-        i, j = random.choice(zeroes)
-        board[i][j] = 2
-        self.has_empty = 0 in itertools.chain(*self.board)
+        self.state = self.engine.spawn(self.state)
+        self.has_empty = bool(self.engine.empty_cells(self.state))
 
     def number_to_emoji(self) -> str:
         board = self.board
@@ -96,29 +67,28 @@ class Twenty48:
         return "".join("".join(row) + "\n" for row in emoji_array)
 
     def lost(self) -> bool | None:
-        if self.has_empty:
-            return None
-
-        board = [list(i) for i in self.board]
-
-        def restore():
-            return setattr(self, "board", board)
-
-        self.move_up()
-        if self.board != board:
-            return restore()
-        self.move_down()
-        if self.board != board:
-            return restore()
-        self.move_left()
-        if self.board != board:
-            return restore()
-        self.move_right()
-        return restore() if self.board != board else True
+        return True if self.engine.lost(self.state) else None
+
+    def hint(self, budget: float = HINT_BUDGET) -> Direction | None:
+        """The move an expectimax search picks within ``budget`` seconds."""
+        return self.engine.best_move(self.state, budget=budget)
+
+    def autoplay(self, budget: float = AUTOPLAY_BUDGET) -> int:
+        """Plays hinted moves until ``budget`` seconds are spent or the game is lost, returns the number of moves."""
+        deadline = time.perf_counter() + budget
+        moves = 0
+        while (remaining := deadline - time.perf_counter()) > 0:
+            direction = self.hint(min(HINT_BUDGET / 5, remaining))
+            if direction is None:
+                break
+            self.move(direction)
+            self.spawn_new()
+            moves += 1
+        return moves
 
     def start(self) -> None:
-        self.board[random.randrange(4)][random.randrange(4)] = 2
-        self.board[random.randrange(4)][random.randrange(4)] = 2
+        self.spawn_new()
+        self.spawn_new()
 
         self.number_to_emoji()
 
@@ -147,21 +117,25 @@ class Twenty48_Button(discord.ui.View):
         self.user = user
 
         self._moves = 0
+        # held while autoplay moves in a thread, no other button touches the game meanwhile
+        self._autoplaying = asyncio.Lock()
 
     def make_original_instance(self) -> Twenty48:
-        original_game = Twenty48(self.__conversion)
+        original_game = Twenty48(self.__conversion, size=self.__size)
         original_game.board = self.__board
         original_game.has_empty = self.__has_empty
-        original_game.size = self.__size
         original_game.message = self.__message
         original_game._controls = self.__controls
         return original_game
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user == self.user:
-            return True
-        await interaction.response.send_message(content="This isn't your game!", ephemeral=True)
-        return False
+        if interaction.user != self.user:
+            await interaction.response.send_message(content="This isn't your game!", ephemeral=True)
+            return False
+        if self._autoplaying.locked():
+            await interaction.response.send_message(content="Wait for the autoplay to finish!", ephemeral=True)
+            return False
+        return True
 
     async def update_to_db(self) -> None:
         col = self.bot.game_collections
@@ -172,6 +146,7 @@ class Twenty48_Button(discord.ui.View):
             },
             upsert=True,
         )
+        await self.bot.game_leaderboards.record(self.user.id, guild=getattr(self.user, "guild", None))
 
     async def on_timeout(self):
         await self.update_to_db()
@@ -271,6 +246,33 @@ class Twenty48_Button(discord.ui.View):
         await self._game_lost(embed)
         await interaction.response.edit_message(content=f"{interaction.user.mention}", embed=embed, view=self)
 
+    @discord.ui.button(
+        emoji="\N{ELECTRIC LIGHT BULB}",
+        label="\u200b",
+        style=discord.ButtonStyle.secondary,
+        disabled=False,
+    )
+    async def hint(self, interaction: discord.Interaction, _: discord.ui.Button):
+        direction = await asyncio.to_thread(self.game.hint)
+        content = "No move left!" if direction is None else f"Try going **{direction}** {ARROWS[direction]}"
+        await interaction.response.send_message(content=content, ephemeral=True)
+
+    @discord.ui.button(
+        emoji="\N{ROBOT FACE}",
+        label="\u200b",
+        style=discord.ButtonStyle.secondary,
+        disabled=False,
+        row=1,
+    )
+    async def autoplay(self, interaction: discord.Interaction, _: discord.ui.Button):
+        async with self._autoplaying:
+            # the search takes most of the 3 seconds Discord gives to answer
+            await interaction.response.defer()
+            self._moves += await asyncio.to_thread(self.game.autoplay)
+            embed = self.embed
+            await self._game_lost(embed)
+        await interaction.edit_original_response(content=f"{interaction.user.mention}", embed=embed, view=self)
+
     @property
     def embed(self) -> discord.Embed:
         return discord.Embed(
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import random
+import time
+from functools import lru_cache
+from typing import Literal
+
+import numpy as np
+
+Direction = Literal["up", "down", "left", "right"]
+DIRECTIONS: tuple[Direction, ...] = ("up", "down", "left", "right")
+
+# tiles are stored as exponents, one nibble per cell: 0 is empty, 1 is 2, 2 is 4...
+# two 32768 tiles don't merge, their sum wouldn't fit in a nibble
+MAX_EXPONENT = 15
+
+# weights of the position heuristic, per row and per column
+EMPTY_WEIGHT = 270.0
+MERGE_WEIGHT = 700.0
+MONOTONICITY_WEIGHT = 47.0
+MONOTONICITY_POWER = 4.0
+SUM_WEIGHT = 11.0
+SUM_POWER = 3.5
+LOST_PENALTY = 200_000.0
+
+
+def _unpack(row: int, size: int) -> list[int]:
+    return [(row >> (4 * i)) & 0xF for i in range(size)]
+
+
+def _pack(cells: list[int]) -> int:
+    return sum(cell << (4 * i) for i, cell in enumerate(cells))
+
+
+def _slide_left(cells: list[int]) -> tuple[list[int], int]:
+    """Slides a row towards index 0, returns the new row and the points scored."""
+    tiles = [cell for cell in cells if cell]
+    merged: list[int] = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] < MAX_EXPONENT:
+            exponent = tiles[i] + 1
+            merged.append(exponent)
+            score += 1 << exponent
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    return merged + [0] * (len(cells) - len(merged)), score
+
+
+def _heuristic(cells: list[int]) -> float:
+    empty = merges = 0
+    previous = counter = 0
+    for cell in cells:
+        if not cell:
+            empty += 1
+            continue
+        if previous == cell:
+            counter += 1
+        elif counter:
+            merges += 1 + counter
+            counter = 0
+        previous = cell
+    if counter:
+        merges += 1 + counter
+
+    left = right = 0.0
+    for a, b in zip(cells, cells[1:]):
+        if a > b:
+            left += a**MONOTONICITY_POWER - b**MONOTONICITY_POWER
+        else:
+            right += b**MONOTONICITY_POWER - a**MONOTONICITY_POWER
+
+    return (
+        EMPTY_WEIGHT * empty
+        + MERGE_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * min(left, right)
+        - SUM_WEIGHT * sum(cell**SUM_POWER for cell in cells)
+    )
+
+
+def _heuristic_array(cells: list[np.ndarray]) -> np.ndarray:
+    """`_heuristic` for every row at once, ``cells[i]`` holding cell ``i`` of each row."""
+    empty = sum((cell == 0).astype(np.int64) for cell in cells)
+    merges = np.zeros_like(cells[0])
+    previous = np.zeros_like(cells[0])
+    counter = np.zeros_like(cells[0])
+    for cell in cells:
+        filled = cell != 0
+        same = filled & (previous == cell)
+        counter = np.where(same, counter + 1, counter)
+        flush = filled & ~same & (counter > 0)
+        merges += np.where(flush, 1 + counter, 0)
+        counter = np.where(flush, 0, counter)
+        previous = np.where(filled, cell, previous)
+    merges += np.where(counter > 0, 1 + counter, 0)
+
+    powers = [cell.astype(np.float64) ** MONOTONICITY_POWER for cell in cells]
+    left = np.zeros(len(cells[0]))
+    right = np.zeros(len(cells[0]))
+    for a, b, power_a, power_b in zip(cells, cells[1:], powers, powers[1:]):
+        decreasing = a > b
+        left += np.where(decreasing, power_a - power_b, 0)
+        right += np.where(decreasing, 0, power_b - power_a)
+
+    return (
+        EMPTY_WEIGHT * empty
+        + MERGE_WEIGHT * merges
+        - MONOTONICITY_WEIGHT * np.minimum(left, right)
+        - SUM_WEIGHT * sum(cell.astype(np.float64) ** SUM_POWER for cell in cells)
+    )
+
+
+class RowTables:
+    """Transitions of a single packed row: slides in both directions, points scored and heuristic.
+
+    A row of ``size`` cells is a ``4 * size`` bit integer, cell ``i`` in bits
+    ``4 * i`` to ``4 * i + 3``. On the standard 4x4 board every one of the
+    65536 rows is computed up front into flat lists; bigger rows have too many
+    states for that and are filled in lazily, the first time they are seen.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.left: list[int] | dict[int, int]
+        self.right: list[int] | dict[int, int]
+        self.left_score: list[int] | dict[int, int]
+        self.right_score: list[int] | dict[int, int]
+        self.heuristic: list[float] | dict[int, float]
+        self.lazy = size > 4
+        if not self.lazy:
+            self._build()
+        else:
+            self.left, self.right, self.left_score, self.right_score, self.heuristic = {}, {}, {}, {}, {}
+
+    def _build(self) -> None:
+        """Fills the whole tables at once, only the left slides are computed row by row."""
+        size = self.size
+        rows = np.arange(1 << (4 * size), dtype=np.int64)
+        cells = [(rows >> (4 * i)) & 0xF for i in range(size)]
+        reversed_rows = sum(cell << (4 * (size - 1 - i)) for i, cell in enumerate(cells))
+
+        left, left_score = [], []
+        for row in range(len(rows)):
+            moved, score = _slide_left(_unpack(row, size))
+            left.append(_pack(moved))
+            left_score.append(score)
+        left_array = np.array(left, dtype=np.int64)
+        # sliding right is sliding the mirrored row left and mirroring back
+        mirrored = left_array[reversed_rows]
+        right_array = sum(((mirrored >> (4 * i)) & 0xF) << (4 * (size - 1 - i)) for i in range(size))
+
+        self.left = left
+        self.left_score = left_score
+        self.right = right_array.tolist()
+        self.right_score = np.array(left_score, dtype=np.int64)[reversed_rows].tolist()
+        self.heuristic = _heuristic_array(cells).tolist()
+
+    def _compute(self, row: int) -> None:
+        cells = _unpack(row, self.size)
+        left, left_score = _slide_left(cells)
+        right, right_score = _slide_left(cells[::-1])
+        self.left[row] = _pack(left)
+        self.right[row] = _pack(right[::-1])
+        self.left_score[row] = left_score
+        self.right_score[row] = right_score
+        self.heuristic[row] = _heuristic(cells)
+
+    def ensure(self, row: int) -> None:
+        if row not in self.heuristic:
+            self._compute(row)
+
+
+@lru_cache(maxsize=None)
+def get_tables(size: int) -> RowTables:
+    return RowTables(size)
+
+
+class Engine2048:
+    """2048 on a packed board, every cell a nibble, row ``r`` in bits ``4 * size * r`` onwards.
+
+    Moves, loss detection and spawning work on whole rows through `RowTables`,
+    columns are handled by transposing the board first.
+    """
+
+    def __init__(self, size: int = 4) -> None:
+        self.size = size
+        self.row_bits = 4 * size
+        self.row_mask = (1 << self.row_bits) - 1
+        self.tables = get_tables(size)
+
+    # packing
+
+    def rows(self, board: int) -> list[int]:
+        rows = [(board >> (self.row_bits * r)) & self.row_mask for r in range(self.size)]
+        if self.tables.lazy:
+            for row in rows:
+                self.tables.ensure(row)
+        return rows
+
+    def join(self, rows: list[int]) -> int:
+        board = 0
+        for r, row in enumerate(rows):
+            board |= row << (self.row_bits * r)
+        return board
+
+    def from_grid(self, grid: list[list[int]]) -> int:
+        """Packs a grid of tile values (0, 2, 4, ...) as shown to the players."""
+        return self.join([_pack([value.bit_length() - 1 if value else 0 for value in row]) for row in grid])
+
+    def to_grid(self, board: int) -> list[list[int]]:
+        return [[1 << cell if cell else 0 for cell in _unpack(row, self.size)] for row in self.rows(board)]
+
+    def transpose(self, board: int) -> int:
+        size = self.size
+        transposed = 0
+        for r in range(size):
+            for c in range(size):
+                transposed |= ((board >> (4 * (r * size + c))) & 0xF) << (4 * (c * size + r))
+        return transposed
+
+    # game
+
+    def move(self, board: int, direction: Direction) -> tuple[int, int]:
+        """Returns the board after the move and the points it scored."""
+        tables = self.tables
+        if direction in ("up", "down"):
+            board = self.transpose(board)
+        rows = self.rows(board)
+        if direction in ("left", "up"):
+            moved = self.join([tables.left[row] for row in rows])
+            score = sum(tables.left_score[row] for row in rows)
+        else:
+            moved = self.join([tables.right[row] for row in rows])
+            score = sum(tables.right_score[row] for row in rows)
+        if direction in ("up", "down"):
+            moved = self.transpose(moved)
+        return moved, score
+
+    def empty_cells(self, board: int) -> list[int]:
+        return [cell for cell in range(self.size * self.size) if not (board >> (4 * cell)) & 0xF]
+
+    def spawn(self, board: int, exponent: int = 1, rng: random.Random | None = None) -> int:
+        """Puts a tile (a 2 by default) on a random empty cell, the board is returned as is when full."""
+        if not (empty := self.empty_cells(board)):
+            return board
+        return board | exponent << (4 * (rng or random).choice(empty))
+
+    def lost(self, board: int) -> bool:
+        if self.empty_cells(board):
+            return False
+        left = self.tables.left
+        return all(left[row] == row for row in self.rows(board)) and all(
+            left[row] == row for row in self.rows(self.transpose(board))
+        )
+
+    def max_tile(self, board: int) -> int:
+        return 1 << max(_unpack(board, self.size * self.size))
+
+    # search
+
+    def evaluate(self, board: int) -> float:
+        heuristic = self.tables.heuristic
+        return sum(heuristic[row] for row in self.rows(board)) + sum(
+            heuristic[row] for row in self.rows(self.transpose(board))
+        )
+
+    def best_move(self, board: int, *, budget: float = 0.5, max_depth: int = 6) -> Direction | None:
+        """Expectimax over player moves and tile spawns, deepened until ``budget`` seconds ran out.
+
+        Returns ``None`` when no move changes the board.
+        """
+        moves = {direction: self.move(board, direction)[0] for direction in DIRECTIONS}
+        moves = {direction: moved for direction, moved in moves.items() if moved != board}
+        if len(moves) <= 1:
+            return next(iter(moves), None)
+
+        search = _Expectimax(self, time.perf_counter() + budget)
+        best: Direction = next(iter(moves))
+        for depth in range(1, max_depth + 1):
+            try:
+                scores = {direction: search.chance(moved, depth) for direction, moved in moves.items()}
+            except _Timeout:
+                break
+            best = max(scores, key=scores.__getitem__)
+        return best
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _Expectimax:
+    def __init__(self, engine: Engine2048, deadline: float) -> None:
+        self.engine = engine
+        self.deadline = deadline
+        self.nodes = 0
+        # (board, depth) -> value, shared by every iteration of the deepening
+        self.cache: dict[tuple[int, int], float] = {}
+
+    def chance(self, board: int, depth: int) -> float:
+        if (cached := self.cache.get((board, depth))) is not None:
+            return cached
+
+        self.nodes += 1
+        if not self.nodes & 255 and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        empty = self.engine.empty_cells(board)
+        if not empty:
+            value = self.player(board, depth)
+        else:
+            value = sum(self.player(board | 1 << (4 * cell), depth) for cell in empty) / len(empty)
+        self.cache[(board, depth)] = value
+        return value
+
+    def player(self, board: int, depth: int) -> float:
+        if depth <= 1:
+            return self.engine.evaluate(board)
+        best = -LOST_PENALTY
+        for direction in DIRECTIONS:
+            moved, _ = self.engine.move(board, direction)
+            if moved != board:
+                best = max(best, self.chance(moved, depth - 1))
+        return best
@@ -7,6 +7,7 @@ import random
 import re
 import string
 from collections.abc import Coroutine
+from functools import cached_property
 from io import BytesIO
 from typing import TYPE_CHECKING, Any, ClassVar, Final
 
@@ -14,6 +15,7 @@ from PIL import Image, ImageDraw
 
 import discord
 from core import Context, Parrot
+from utilities.assets import ASSETS
 
 from .__wordle import WordInputButton
 from .utils import BaseView
@@ -26,6 +28,10 @@ if TYPE_CHECKING:
 
 DEFAULT_COLOR: Final[discord.Color] = discord.Color(0x2F3136)
 
+BOARD_IMAGE = "extra/battleship.png"
+CELL_SIZE = 50
+SHIP_REACH = 25  # how far a ship square goes from the center of its cell
+
 SHIPS: dict[str, tuple[int, tuple[int, int, int]]] = {
     "carrier": (5, (52, 152, 219)),
     "battleship": (4, (246, 246, 112)),
@@ -65,11 +71,65 @@ class Ship:
 
         self.hits: list[bool] = [False] * self.size
 
+    @cached_property
+    def overlay(self) -> tuple[Image.Image, Coords]:
+        """The ship drawn once on a transparent patch, with where the patch goes on the board."""
+        centers = [cell_center(coord) for coord in self.span]
+        left = min(x for x, _ in centers) - SHIP_REACH
+        top = min(y for _, y in centers) - SHIP_REACH
+        width = max(x for x, _ in centers) + SHIP_REACH + 1 - left
+        height = max(y for _, y in centers) + SHIP_REACH + 1 - top
+
+        patch = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        cur = ImageDraw.Draw(patch, "RGBA")
+        for coord, (x, y) in zip(self.span, centers, strict=True):
+            draw_ship_square(cur, x - left, y - top, coord=coord, ship=self)
+        return patch, (left, top)
+
+
+def cell_center(coord: Coords) -> tuple[int, int]:
+    """Pixel center of a cell on the board image, coordinates go from 1 to 10."""
+    row, column = coord
+    return 75 + (column - 1) * CELL_SIZE, 75 + (row - 1) * CELL_SIZE
+
+
+def draw_ship_square(
+    cur: ImageDraw.ImageDraw,
+    x: int,
+    y: int,
+    *,
+    coord: Coords,
+    ship: Ship,
+) -> None:
+    vertical = ship.vertical
+    left_end = ship.span.index(coord) == 0
+    right_end = ship.span.index(coord) == ship.size - 1
+
+    if vertical and left_end:
+        diffs = (18, 18, 25, 18)
+    elif vertical and right_end:
+        diffs = (25, 18, 18, 18)
+    elif not vertical and left_end:
+        diffs = (18, 18, 18, 25)
+    elif not vertical and right_end:
+        diffs = (18, 25, 18, 18)
+    elif vertical:
+        diffs = (25, 18, 25, 18)
+    else:
+        diffs = (18, 25, 18, 25)
+
+    d1, d2, d3, d4 = diffs
+    x1, y1 = x - d1, y - d2
+    x2, y2 = x + d3, y + d4
+    cur.rounded_rectangle((x1, y1, x2, y2), radius=5, fill=ship.color)
+
 
 class Board:
     def __init__(self, player: discord.User | discord.Member, random: bool = True) -> None:
         self.player: discord.User | discord.Member = player
         self.ships: list[Ship] = []
+        # every cell covered by a ship, to the ship
+        self._ship_at: dict[Coords, Ship] = {}
 
         self.my_hits: list[Coords] = []
         self.my_misses: list[Coords] = []
@@ -88,7 +148,12 @@ class Board:
         if ship.end[0] > 10 or ship.end[1] > 10:
             return False
 
-        return not any(any(c in existing.span for c in ship.span) for existing in self.ships)
+        return not any(c in self._ship_at for c in ship.span)
+
+    def add_ship(self, ship: Ship) -> None:
+        self.ships.append(ship)
+        for coord in ship.span:
+            self._ship_at[coord] = ship
 
     def _place_ships(self) -> None:
         def place_ship(ship: str, size: int, color: tuple[int, int, int]) -> None:
@@ -104,7 +169,7 @@ class Board:
             )
 
             if self._is_valid(new_ship):
-                self.ships.append(new_ship)
+                self.add_ship(new_ship)
             else:
                 place_ship(ship, size, color)
 
@@ -135,61 +200,41 @@ class Board:
         coord: Coords,
         ship: Ship,
     ) -> None:
-        vertical = ship.vertical
-        left_end = ship.span.index(coord) == 0
-        right_end = ship.span.index(coord) == ship.size - 1
-
-        if vertical and left_end:
-            diffs = (18, 18, 25, 18)
-        elif vertical and right_end:
-            diffs = (25, 18, 18, 18)
-        elif not vertical and left_end:
-            diffs = (18, 18, 18, 25)
-        elif not vertical and right_end:
-            diffs = (18, 25, 18, 18)
-        elif vertical:
-            diffs = (25, 18, 25, 18)
-        else:
-            diffs = (18, 25, 18, 25)
+        draw_ship_square(cur, x, y, coord=coord, ship=ship)
 
-        d1, d2, d3, d4 = diffs
-        x1, y1 = x - d1, y - d2
-        x2, y2 = x + d3, y + d4
-        cur.rounded_rectangle((x1, y1, x2, y2), radius=5, fill=ship.color)
-
-    def get_ship(self, coord: Coords) -> Ship:
-        if s := [ship for ship in self.ships if coord in ship.span]:
-            return s[0]
+    def get_ship(self, coord: Coords) -> Ship | None:
+        return self._ship_at.get(coord)
 
     def to_image(self, hide: bool = False) -> BytesIO:
         RED = (255, 0, 0)
         GRAY = (128, 128, 128)
 
-        with Image.open("extra/battleship.png") as img:
-            _img = img.convert("RGBA")
-            cur = ImageDraw.Draw(_img, "RGBA")
-
-            for i, y in zip(range(1, 11), range(75, 530, 50), strict=False):
-                for j, x in zip(range(1, 11), range(75, 530, 50), strict=False):
-                    coord = (i, j)
-                    if coord in self.op_misses:
-                        self.draw_dot(cur, x, y, fill=GRAY)
-
-                    elif coord in self.op_hits:
-                        if not hide:
-                            ship = self.get_ship(coord)
-                            self.draw_sq(cur, x, y, coord=coord, ship=ship)
-                        self.draw_dot(cur, x, y, fill=RED)
-                    elif ship := self.get_ship(coord):
-                        if not hide:
-                            self.draw_sq(cur, x, y, coord=coord, ship=ship)
-            buffer = BytesIO()
-            _img.save(buffer, "PNG")
-
+        # the decoded board is shared, ships are pasted from their own cached patches
+        img = ASSETS.image(BOARD_IMAGE, "RGBA").copy()
+        if not hide:
+            for ship in self.ships:
+                patch, position = ship.overlay
+                img.alpha_composite(patch, position)
+
+        cur = ImageDraw.Draw(img, "RGBA")
+        for coord in self.op_misses:
+            if xy := self._pixel(coord):
+                self.draw_dot(cur, *xy, fill=GRAY)
+        for coord in self.op_hits:
+            if coord not in self.op_misses and (xy := self._pixel(coord)):
+                self.draw_dot(cur, *xy, fill=RED)
+
+        buffer = BytesIO()
+        img.save(buffer, "PNG")
         buffer.seek(0)
-        del _img
         return buffer
 
+    @staticmethod
+    def _pixel(coord: Coords) -> tuple[int, int] | None:
+        if all(1 <= value <= 10 for value in coord):
+            return cell_center(coord)
+        return None
+
 
 class BattleShip:
     """BattleShip Game."""
@@ -228,13 +273,11 @@ class BattleShip:
         board = self.get_board(player)
         op_board = self.get_board(player, other=True)
 
-        for i, ship in enumerate(op_board.ships):
-            for j, coord in enumerate(ship.span):
-                if coords == coord:
-                    op_board.ships[i].hits[j] = True
-                    board.my_hits.append(coords)
-                    op_board.op_hits.append(coords)
-                    return all(op_board.ships[i].hits), True
+        if ship := op_board.get_ship(coords):
+            ship.hits[ship.span.index(coords)] = True
+            board.my_hits.append(coords)
+            op_board.op_hits.append(coords)
+            return all(ship.hits), True
 
         board.my_misses.append(coords)
         op_board.op_misses.append(coords)
@@ -329,7 +372,7 @@ class BattleShip:
             )
 
             if board._is_valid(new_ship):
-                board.ships.append(new_ship)
+                board.add_ship(new_ship)
             else:
                 await user.send("That is a not a valid location, please try again")
                 await place_ship(ship, size, color)
@@ -667,7 +710,7 @@ class SetupInput(discord.ui.Modal):
 
         if board._is_valid(new_ship):
             self.button.disabled = True
-            board.ships.append(new_ship)
+            board.add_ship(new_ship)
 
             embed, file, _, _ = await game.get_file(interaction.user, hide=False)
 
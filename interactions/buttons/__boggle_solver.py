@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import Iterable, Sequence
+
+from .__constants import DIAGRAPHS
+
+DICTIONARY_PATH = "extra/boggle.txt"
+MIN_WORD_LENGTH = 3
+
+
+class _Node:
+    __slots__ = ("edges", "final", "id")
+
+    def __init__(self) -> None:
+        self.edges: dict[str, _Node] = {}
+        self.final = False
+        self.id = 0
+
+    def signature(self) -> tuple:
+        return (self.final, tuple((letter, child.id) for letter, child in sorted(self.edges.items())))
+
+
+class Lexicon:
+    """A word list compiled into a DAWG (a trie with shared suffixes merged).
+
+    The graph is built with Daciuk's incremental algorithm, then frozen into flat
+    arrays: the outgoing edges of node ``n`` are ``labels[starts[n]:starts[n + 1]]``
+    pointing at ``targets[starts[n]:starts[n + 1]]``. Node ``0`` is the root.
+    """
+
+    __slots__ = ("starts", "labels", "targets", "final", "size")
+
+    def __init__(self, words: Iterable[str]) -> None:
+        root = self._build(sorted(set(words)))
+        self._freeze(root)
+
+    @classmethod
+    def from_file(cls, path: str = DICTIONARY_PATH) -> Lexicon:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return cls(word.strip().upper() for word in f if word.strip())
+
+    @staticmethod
+    def _build(words: list[str]) -> _Node:
+        register: dict[tuple, _Node] = {}
+        root = _Node()
+        # path of the previous word whose nodes are not minimized yet: (parent, letter, child)
+        unchecked: list[tuple[_Node, str, _Node]] = []
+
+        def minimize(down_to: int) -> None:
+            while len(unchecked) > down_to:
+                parent, letter, child = unchecked.pop()
+                signature = child.signature()
+                if signature in register:
+                    parent.edges[letter] = register[signature]
+                else:
+                    child.id = len(register) + 1
+                    register[signature] = child
+
+        previous = ""
+        for word in words:
+            common = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                common += 1
+
+            minimize(common)
+            node = unchecked[-1][2] if unchecked else root
+            for letter in word[common:]:
+                child = _Node()
+                node.edges[letter] = child
+                unchecked.append((node, letter, child))
+                node = child
+            node.final = True
+            previous = word
+
+        minimize(0)
+        return root
+
+    def _freeze(self, root: _Node) -> None:
+        order: list[_Node] = [root]
+        index: dict[int, int] = {id(root): 0}
+        for node in order:
+            for child in node.edges.values():
+                if id(child) not in index:
+                    index[id(child)] = len(order)
+                    order.append(child)
+
+        self.size = len(order)
+        self.starts = array("i", [0])
+        self.targets = array("i")
+        self.final = bytearray(self.size)
+        labels: list[str] = []
+        for number, node in enumerate(order):
+            self.final[number] = node.final
+            for letter, child in sorted(node.edges.items()):
+                labels.append(letter)
+                self.targets.append(index[id(child)])
+            self.starts.append(len(labels))
+        self.labels = "".join(labels)
+
+    def child(self, node: int, letters: str) -> int:
+        """Follow ``letters`` from ``node``, returns ``-1`` when there is no such path."""
+        for letter in letters:
+            edge = self.labels.find(letter, self.starts[node], self.starts[node + 1])
+            if edge == -1:
+                return -1
+            node = self.targets[edge]
+        return node
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        node = self.child(0, word)
+        return node != -1 and bool(self.final[node])
+
+    def solve(self, columns: Sequence[Sequence[str]], *, min_length: int = MIN_WORD_LENGTH) -> set[str]:
+        """Every dictionary word that can be traced on the board, in one pruned traversal.
+
+        ``columns`` is indexed ``[col][row]`` like `BoardBoogle.columns`, digits stand for `DIAGRAPHS`.
+        """
+        size = len(columns)
+        cells = [(col, row) for col in range(size) for row in range(size)]
+        letters = [DIAGRAPHS.get(columns[col][row], columns[col][row]) for col, row in cells]
+        neighbours = [
+            [
+                other
+                for other, (c, r) in enumerate(cells)
+                if other != number and abs(c - col) <= 1 and abs(r - row) <= 1
+            ]
+            for number, (col, row) in enumerate(cells)
+        ]
+
+        found: set[str] = set()
+
+        def visit(cell: int, node: int, prefix: str, visited: int) -> None:
+            node = self.child(node, letters[cell])
+            if node == -1:
+                return
+            prefix += letters[cell]
+            visited |= 1 << cell
+            if self.final[node] and len(prefix) >= min_length:
+                found.add(prefix)
+            for other in neighbours[cell]:
+                if not visited >> other & 1:
+                    visit(other, node, prefix, visited)
+
+        for cell in range(len(cells)):
+            visit(cell, 0, "", 0)
+        return found
+
+
+_lexicon: Lexicon | None = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Lexicon:
+    """The shared lexicon, compiled on first use (takes a few seconds, call it off the event loop)."""
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            _lexicon = Lexicon.from_file()
+    return _lexicon
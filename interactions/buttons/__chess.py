@@ -3,7 +3,6 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
-import chess
 from pymongo import UpdateOne
 
 import discord
@@ -74,6 +73,9 @@ class Chess:
         self.timeout = timeout
         self.react_on_success = react_on_success
 
+        # a tenth of a second to import, paid by the first game rather than by every startup
+        import chess
+
         self.board = chess.Board(custom) if custom else chess.Board()
         self.turn = white
         self.alternate_turn = black
@@ -212,6 +214,7 @@ Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
                         for _id in (self.white.id, self.black.id)
                     ],
                 )
+                await self.bot.game_leaderboards.record((self.white.id, self.black.id), guild=self.ctx.guild)
                 return
 
             if msg.content.lower() == "draw":
@@ -262,3 +265,4 @@ Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
                 for _id in (self.white.id, self.black.id)
             ],
         )
+        await self.bot.game_leaderboards.record((self.white.id, self.black.id), guild=self.ctx.guild)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Literal, NamedTuple
+
+Difficulty = Literal["easy", "medium", "hard", "impossible"]
+
+
+class Level(NamedTuple):
+    depth: int
+    budget: float  # seconds per move
+    blunder: float  # chance of playing a random non-losing move
+
+
+DIFFICULTIES: dict[str, Level] = {
+    "easy": Level(depth=2, budget=0.2, blunder=0.3),
+    "medium": Level(depth=5, budget=0.5, blunder=0.0),
+    "hard": Level(depth=10, budget=1.5, blunder=0.0),
+    "impossible": Level(depth=64, budget=3.0, blunder=0.0),
+}
+
+WIN_SCORE = 10_000
+TABLE_LIMIT = 1 << 20
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Bitboard:
+    """Connect Four position encoded as two integers.
+
+    Every column takes ``height + 1`` bits (the extra one is a sentinel so shifts
+    never wrap between columns), bit ``col * (height + 1) + row`` counts rows from
+    the bottom. ``current`` holds the stones of the player to move, ``mask`` all
+    the stones. Boards larger than 7x8 simply use wider Python ints.
+    """
+
+    __slots__ = ("width", "height", "h1", "bottom", "board", "current", "mask", "moves")
+
+    def __init__(self, width: int = 7, height: int = 6) -> None:
+        self.width = width
+        self.height = height
+        self.h1 = height + 1
+        self.bottom = sum(1 << (col * self.h1) for col in range(width))
+        self.board = self.bottom * ((1 << height) - 1)
+        self.current = 0
+        self.mask = 0
+        self.moves = 0
+
+    @classmethod
+    def from_grid(cls, grid: list[list[int]], player: int) -> Bitboard:
+        """Build from a row-major grid (row 0 at the top, 0 empty) with ``player`` to move."""
+        height, width = len(grid), len(grid[0])
+        position = cls(width, height)
+        for r, row in enumerate(grid):
+            for c, square in enumerate(row):
+                if not square:
+                    continue
+                bit = 1 << (c * position.h1 + height - 1 - r)
+                position.mask |= bit
+                position.moves += 1
+                if square == player:
+                    position.current |= bit
+        return position
+
+    def column_bit(self, col: int) -> int:
+        return 1 << (col * self.h1)
+
+    def top_bit(self, col: int) -> int:
+        return 1 << (self.height - 1 + col * self.h1)
+
+    def column_mask(self, col: int) -> int:
+        return ((1 << self.height) - 1) << (col * self.h1)
+
+    def move_bit(self, col: int) -> int:
+        """The cell a stone dropped in ``col`` would take."""
+        return (self.mask + self.column_bit(col)) & self.column_mask(col)
+
+    def can_play(self, col: int) -> bool:
+        return not self.mask & self.top_bit(col)
+
+    def row_of(self, col: int) -> int:
+        """Row (from the top, grid style) a stone dropped in ``col`` lands on."""
+        column = (self.mask >> (col * self.h1)) & ((1 << self.height) - 1)
+        return self.height - 1 - column.bit_length()
+
+    def play(self, col: int) -> None:
+        self.current ^= self.mask
+        self.mask |= self.mask + self.column_bit(col)
+        self.moves += 1
+
+    def is_winning_move(self, col: int) -> bool:
+        return bool(self.winning_cells(self.current, self.mask) & self.move_bit(col))
+
+    def aligned(self, stones: int) -> bool:
+        for shift in (1, self.h1 - 1, self.h1, self.h1 + 1):
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    def winning_cells(self, stones: int, mask: int) -> int:
+        """Empty cells that would complete a four for ``stones``."""
+        # vertical
+        cells = (stones << 1) & (stones << 2) & (stones << 3)
+        for shift in (self.h1, self.h1 - 1, self.h1 + 1):
+            pair = (stones << shift) & (stones << (2 * shift))
+            cells |= pair & (stones << (3 * shift))
+            cells |= pair & (stones >> shift)
+            pair = (stones >> shift) & (stones >> (2 * shift))
+            cells |= pair & (stones << shift)
+            cells |= pair & (stones >> (3 * shift))
+        return cells & (self.board ^ mask)
+
+
+class Engine:
+    """Negamax with alpha-beta pruning, a transposition table and iterative deepening."""
+
+    def __init__(self, width: int = 7, height: int = 6) -> None:
+        self.shape = Bitboard(width, height)
+        self.size = width * height
+        self.table: dict[int, tuple[int, int, int, int]] = {}
+        self.nodes = 0
+        # center columns first
+        self.order = sorted(range(width), key=lambda col: abs(width // 2 - col))
+        self.columns = [self.shape.column_mask(col) for col in range(width)]
+        self._deadline = float("inf")
+
+    def _evaluate(self, current: int, mask: int) -> int:
+        shape = self.shape
+        return (shape.winning_cells(current, mask).bit_count() - shape.winning_cells(current ^ mask, mask).bit_count()) * 4
+
+    def _negamax(self, current: int, mask: int, moves: int, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _Timeout
+
+        shape = self.shape
+        if moves >= self.size:
+            return 0
+
+        possible = (mask + shape.bottom) & shape.board
+        if possible & shape.winning_cells(current, mask):
+            return WIN_SCORE - moves
+
+        opponent_wins = shape.winning_cells(current ^ mask, mask)
+        if forced := possible & opponent_wins:
+            if forced & (forced - 1):
+                return -(WIN_SCORE - moves - 1)
+            possible = forced
+
+        # never play right below a cell the opponent would win on
+        possible &= ~(opponent_wins >> 1)
+        if not possible:
+            return -(WIN_SCORE - moves - 1)
+
+        if depth == 0:
+            return self._evaluate(current, mask)
+
+        key = current + mask
+        original_alpha = alpha
+        best_col = -1
+        if entry := self.table.get(key):
+            entry_depth, flag, value, best_col = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        candidates: list[tuple[int, int, int]] = []
+        columns = self.columns
+        for col in self.order:
+            if move := possible & columns[col]:
+                threats = shape.winning_cells(current | move, mask | move).bit_count()
+                candidates.append((col == best_col, threats, col))
+        candidates.sort(key=lambda item: (item[0], item[1]), reverse=True)
+
+        best = -WIN_SCORE * 2
+        for _, _, col in candidates:
+            move = possible & columns[col]
+            score = -self._negamax(current ^ mask, mask | move, moves + 1, depth - 1, -beta, -alpha)
+            if score > best:
+                best, best_col = score, col
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if len(self.table) > TABLE_LIMIT:
+            self.table.clear()
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        self.table[key] = (depth, flag, best, best_col)
+        return best
+
+    def _root(self, position: Bitboard, depth: int) -> tuple[int, int]:
+        best_col, best = -1, -WIN_SCORE * 2
+        alpha, beta = -WIN_SCORE * 2, WIN_SCORE * 2
+
+        previous = self.table.get(position.current + position.mask)
+        order = sorted(self.order, key=lambda col: previous is not None and col == previous[3], reverse=True)
+        for col in order:
+            if not position.can_play(col):
+                continue
+            if position.is_winning_move(col):
+                return col, WIN_SCORE - position.moves
+            move = position.move_bit(col)
+            score = -self._negamax(
+                position.current ^ position.mask,
+                position.mask | move,
+                position.moves + 1,
+                depth - 1,
+                -beta,
+                -alpha,
+            )
+            if score > best:
+                best, best_col = score, col
+            alpha = max(alpha, score)
+        self.table[position.current + position.mask] = (depth, EXACT, best, best_col)
+        return best_col, best
+
+    def best_move(self, position: Bitboard, *, depth: int = 8, budget: float | None = None) -> tuple[int, int]:
+        """Search with iterative deepening, returns ``(column, score)``.
+
+        Stops at ``depth`` or when ``budget`` seconds ran out, keeping the result
+        of the last fully searched depth.
+        """
+        self._deadline = float("inf") if budget is None else time.perf_counter() + budget
+        playable = [col for col in self.order if position.can_play(col)]
+        if not playable:
+            msg = "The board is full"
+            raise ValueError(msg)
+
+        result = (playable[0], 0)
+        for current_depth in range(1, min(depth, self.size - position.moves) + 1):
+            try:
+                result = self._root(position, current_depth)
+            except _Timeout:
+                break
+            if abs(result[1]) >= WIN_SCORE - self.size:
+                # forced win or loss found, deeper search won't change it
+                break
+        self._deadline = float("inf")
+        return result
+
+    def play(self, position: Bitboard, difficulty: Difficulty = "medium") -> int:
+        level = DIFFICULTIES[difficulty]
+        if level.blunder and random.random() < level.blunder:
+            threats = position.winning_cells(position.current ^ position.mask, position.mask)
+            safe = [
+                col
+                for col in range(position.width)
+                if position.can_play(col) and not threats & (position.move_bit(col) << 1)
+            ]
+            if safe:
+                return random.choice(safe)
+        return self.best_move(position, depth=level.depth, budget=level.budget)[0]
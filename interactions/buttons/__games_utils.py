@@ -7,7 +7,7 @@ import re
 from collections import defaultdict
 from collections.abc import Iterable, Iterator, Sequence
 from functools import cached_property, wraps
-from typing import TYPE_CHECKING, Literal, NamedTuple, TypedDict, overload
+from typing import TYPE_CHECKING, NamedTuple, TypedDict
 
 from discord.utils import MISSING
 
@@ -16,10 +16,11 @@ import emojis
 from core import Context, Parrot
 from discord.ext import boardgames, commands, old_menus as menus
 
+from .__boggle_solver import get_lexicon
+from .__connect_four import Bitboard, Difficulty, Engine
 from .__constants import (
     BIG,
     CROSS_EMOJI,
-    DIAGRAPHS,
     DIE,
     LETTERS_EMOJI,
     NUMBERS,
@@ -31,9 +32,10 @@ from .__constants import (
     BoardState,
     Coordinate,
 )
+from .__tictactoe import DEFAULT_BUDGET, get_engine
 
-with open("extra/boggle.txt", encoding="utf-8", errors="ignore") as f:
-    DICTIONARY = set(f.read().splitlines())
+# boards below this many words are re-rolled when a game starts
+MIN_BOARD_WORDS = {SMALL: 15, ORIGINAL: 40, BIG: 80, SUPER_BIG: 120}
 
 
 class Position(NamedTuple):
@@ -66,51 +68,43 @@ class BoardBoogle:
 
         self.columns = board
 
-    def board_contains(self, word: str, pos: Position = None, passed: list[Position] = None) -> bool:
-        if passed is None:
-            passed = []
-        # Empty words
-        if not word:
-            return True
+    @classmethod
+    def generate(cls, size: int = ORIGINAL, *, min_words: int | None = None, attempts: int = 25) -> BoardBoogle:
+        """Roll boards until one has at least ``min_words`` words, blocking, run it in a thread."""
+        if min_words is None:
+            min_words = MIN_BOARD_WORDS[size]
+
+        best = cls(size=size)
+        for _ in range(attempts):
+            if len(best.legal_words) >= min_words:
+                break
+            board = cls(size=size)
+            if len(board.legal_words) > len(best.legal_words):
+                best = board
+        return best
 
-        # When starting out
-        if pos is None:
-            # Check all positions
-            for col in range(self.size):
-                for row in range(self.size):
-                    if self.board_contains(word, Position(col, row)):
-                        return True
-
-        elif pos not in passed:
-            # Check if letter matches current start of word
-            letter = self.columns[pos.col][pos.row]
-            if letter.isdigit():
-                letter = DIAGRAPHS[letter]
-
-            if word[: len(letter)] == letter:
-                # Check adjacent for next letter
-                for x, y in itertools.product(range(-1, 2), range(-1, 2)):
-                    # don't check yourself
-                    if x == 0 and y == 0:
-                        continue
-
-                    new_pos = Position(pos.col + x, pos.row + y)
-
-                    # don't check out of bounds
-                    if new_pos.col < 0 or new_pos.col >= self.size or new_pos.row < 0 or new_pos.row >= self.size:
-                        continue
-
-                    if self.board_contains(word[len(letter) :], new_pos, [*passed, pos]):
-                        return True
-
-        # Otherwise cannot find word
-        return False
+    @cached_property
+    def legal_words(self) -> frozenset[str]:
+        """Every valid word on this board."""
+        return frozenset(get_lexicon().solve(self.columns))
+
+    @cached_property
+    def max_points(self) -> int:
+        return self.total_points(self.legal_words)
+
+    def hint(self, found: Iterable[str] = ()) -> str | None:
+        """The start of a word nobody found yet, longer words first."""
+        remaining = sorted(self.legal_words.difference(found), key=lambda word: (-len(word), word))
+        if not remaining:
+            return None
+        word = random.choice(remaining[:5])
+        shown = max(1, len(word) // 3)
+        return word[:shown] + "\N{BLACK SMALL SQUARE}" * (len(word) - shown)
 
     def is_legal(self, word: str) -> bool:
         if len(word) < 3:
             return False
-        word = word.upper()
-        return False if word not in DICTIONARY else self.board_contains(word)
+        return word.upper() in self.legal_words
 
     def points(self, word: str) -> int:
         return POINTS[len(word)] if self.is_legal(word) else 0
@@ -123,8 +117,8 @@ class GameBoogle(menus.Menu):
     name: str | None = "Boggle"
     footer: str | None = None
 
-    def __init__(self, *, size=ORIGINAL, **kwargs):
-        self.board = BoardBoogle(size=size)
+    def __init__(self, *, size=ORIGINAL, board: BoardBoogle | None = None, **kwargs):
+        self.board = board or BoardBoogle(size=size)
         self.setup()
         super().__init__(**kwargs)
 
@@ -137,7 +131,13 @@ class GameBoogle(menus.Menu):
 
             state = " ".join(emoji) + "\n" + state
 
-        return discord.Embed(title=self.name, description=state).set_footer(text=self.footer)
+        embed = discord.Embed(title=self.name, description=state).set_footer(text=self.footer)
+        embed.add_field(name="Words on board", value=f"**{len(self.board.legal_words)}** words, **{self.board.max_points}** points max")
+        return embed
+
+    @property
+    def found_words(self) -> set[str]:
+        return set()
 
     def setup(self):
         raise NotImplementedError
@@ -146,8 +146,9 @@ class GameBoogle(menus.Menu):
         return await channel.send(content="Boggle game started, you have 3 minutes!", embed=self.state)
 
     async def start(self, *args, **kwargs):
+        # solve the board before it is shown, so every submission is a set lookup
+        await asyncio.to_thread(lambda: self.board.max_points)
         await super().start(*args, **kwargs)
-        # await self.bot.loop.run_in_executor(None, lambda: self.board.legal_words)
 
     async def finalize(self, timed_out):
         self.bot.dispatch("boggle_game_complete", self.message.channel)
@@ -161,6 +162,11 @@ class GameBoogle(menus.Menu):
     async def check_message(self, message: discord.Message):
         raise NotImplementedError
 
+    @menus.button("\N{ELECTRIC LIGHT BULB}", position=menus.Last(1))
+    async def hint(self, payload):
+        hint = self.board.hint(self.found_words)
+        await self.message.channel.send(f"Hint: `{hint}`" if hint else "Every word on this board has been found!")
+
     @menus.button("\N{BLACK SQUARE FOR STOP}\ufe0f", position=menus.Last(0))
     async def cancel(self, payload):
         await self.message.edit(content="Game Cancelled.")
@@ -183,6 +189,7 @@ class ShuffflingGame(GameBoogle):
 
             # Shuffle board
             self.shuffle()
+            await asyncio.to_thread(lambda: self.board.max_points)
             self.boards.append(self.board)
 
             # Note Board Updated
@@ -239,6 +246,10 @@ class DiscordGame(GameBoogle):
 
         return embed
 
+    @property
+    def found_words(self) -> set[str]:
+        return self.all_words
+
     def setup(self):
         self.all_words: set[str] = set()
         self.words: dict[discord.Member | discord.User, set[str]] = defaultdict(set)
@@ -415,7 +426,11 @@ def boggle_game(game_type: type[Game]):
                 raise commands.CheckFailure(msg)
 
             # Start the game
-            self.games_boogle[ctx.channel] = game = game_type(size=check_size(ctx))
+            board = await asyncio.to_thread(BoardBoogle.generate, check_size(ctx))
+            if ctx.channel in self.games_boogle:
+                msg = "There is already a game running in this channel."
+                raise commands.CheckFailure(msg)
+            self.games_boogle[ctx.channel] = game = game_type(size=board.size, board=board)
             await game.start(ctx, wait=False)
 
             # Wait for game to end
@@ -492,11 +507,12 @@ class GameC4:
         player2: discord.Member | discord.User | None,
         tokens: list,
         size: int = 7,
+        difficulty: Difficulty = "medium",
     ):
         self.bot = bot
         self.channel = channel
         self.player1 = player1
-        self.player2 = player2 or AI_C4(self.bot, game=self)
+        self.player2 = player2 or AI_C4(self.bot, game=self, difficulty=difficulty)
         self.tokens = tokens
 
         self.grid = self.generate_board(size)
@@ -555,7 +571,8 @@ class GameC4:
             await self.print_grid()
 
             if isinstance(self.player_active, AI_C4):
-                coords = self.player_active.play()
+                # the search takes up to a few seconds, keep the event loop free meanwhile
+                coords = await asyncio.to_thread(self.player_active.play)
                 if not coords:
                     await self.game_over(
                         "draw",
@@ -651,75 +668,26 @@ class AI_C4:
     if TYPE_CHECKING:
         from .__constants import Coordinate
 
-    def __init__(self, bot: Parrot, game: GameC4):
+    def __init__(self, bot: Parrot, game: GameC4, difficulty: Difficulty = "medium"):
         self.game = game
         self.mention = bot.user.mention
-
-    def get_possible_places(self) -> list[Coordinate]:
-        """Gets all the coordinates where the AI_C4 could possibly place a counter."""
-        possible_coords = []
-        for column_num in range(self.game.grid_size):
-            column = [row[column_num] for row in self.game.grid]
-            for row_num, square in reversed(list(enumerate(column))):
-                if not square:
-                    possible_coords.append((row_num, column_num))
-                    break
-        return possible_coords
-
-    def check_ai_win(self, coord_list: list[Coordinate]) -> Coordinate | None:
-        """
-        Check AI_C4 win.
-        Check if placing a counter in any possible coordinate would cause the AI_C4 to win
-        with 10% chance of not winning and returning None
-        """
-        if random.randint(1, 10) == 1:
-            return None
-        return next(
-            (coords for coords in coord_list if self.game.check_win(coords, 2)),
-            None,
-        )
-
-    def check_player_win(self, coord_list: list[Coordinate]) -> Coordinate | None:
-        """
-        Check Player win.
-        Check if placing a counter in possible coordinates would stop the player
-        from winning with 25% of not blocking them  and returning None.
-        """
-        if random.randint(1, 4) == 1:
-            return None
-        return next(
-            (coords for coords in coord_list if self.game.check_win(coords, 1)),
-            None,
-        )
-
-    @staticmethod
-    def random_coords(coord_list: list[Coordinate]) -> Coordinate:
-        """Picks a random coordinate from the possible ones."""
-        return random.choice(coord_list)
+        self.difficulty = difficulty
+        self.engine = Engine(game.grid_size, game.grid_size)
 
     def play(self) -> Coordinate | bool:
         """
         Plays for the AI_C4.
-        Gets all possible coords, and determins the move:
-        1. coords where it can win.
-        2. coords where the player can win.
-        3. Random coord
-        The first possible value is choosen.
+        The grid is converted to a bitboard and searched by the engine,
+        how deep depends on the difficulty.
         """
-        possible_coords = self.get_possible_places()
-
-        if not possible_coords:
+        position = Bitboard.from_grid(self.game.grid, player=2)
+        if not any(position.can_play(col) for col in range(position.width)):
             return False
 
-        coords = (
-            self.check_ai_win(possible_coords)
-            or self.check_player_win(possible_coords)
-            or self.random_coords(possible_coords)
-        )
-
-        row, column = coords
+        column = self.engine.play(position, self.difficulty)
+        row = position.row_of(column)
         self.game.grid[row][column] = 2
-        return coords
+        return row, column
 
 
 class Board:
@@ -727,74 +695,56 @@ class Board:
         self,
         state: BoardState,
         current_player: bool = False,
+        *,
+        k: int | None = None,
     ) -> None:
         self.state = state
         self.current_player = current_player
         self.winner: bool | None = MISSING
 
+        self.size = len(state)
+        # 3 in a row on the classic board, 4 on the bigger ones
+        self.k = k or min(self.size, 4)
+        self.engine = get_engine(self.size, self.size, self.k)
+        # bitboards of both players, indexed by `current_player`
+        self.bits = [
+            sum(1 << (r * self.size + c) for r, c in itertools.product(range(self.size), repeat=2) if state[r][c] is player)
+            for player in (False, True)
+        ]
+
     @property
     def legal_moves(self) -> Iterator[tuple[int, int]]:
-        for c, r in itertools.product(range(3), range(3)):
+        for c, r in itertools.product(range(self.size), range(self.size)):
             if self.state[r][c] is None:
                 yield (r, c)
 
     @cached_property
     def over(self) -> bool:
-        # vertical
-        for c in range(3):
-            token = self.state[0][c]
-            if token is None:
-                continue
-            if self.state[1][c] == token and self.state[2][c] == token:
-                self.winner = token
-                return True
-
-        # horizontal
-        for r in range(3):
-            token = self.state[r][0]
-            if token is None:
-                continue
-            if self.state[r][1] == token and self.state[r][2] == token:
-                self.winner = token
-                return True
-
-        # descending diag
-        if self.state[0][0] is not None:
-            token = self.state[0][0]
-            if self.state[1][1] == token and self.state[2][2] == token:
-                self.winner = token
+        for player in (False, True):
+            if self.engine.has_line(self.bits[player]):
+                self.winner = player
                 return True
 
-        # ascending diag
-        if self.state[0][2] is not None:
-            token = self.state[0][2]
-            if self.state[1][1] == token and self.state[2][0] == token:
-                self.winner = token
-                return True
-
-        # Check if board is empty
-        for _ in self.legal_moves:
-            break
-        else:
+        if self.bits[False] | self.bits[True] == self.engine.full:
             self.winner = None
             return True
 
         return False
 
     def move(self, r: int, c: int) -> Board:
-        if (r, c) not in self.legal_moves:
+        if self.state[r][c] is not None:
             msg = "Illegal Move"
             raise ValueError(msg)
 
-        new_state = [[self.state[r][c] for c in range(3)] for r in range(3)]
+        new_state = [row[:] for row in self.state]
         new_state[r][c] = self.current_player
 
-        return Board(new_state, not self.current_player)
+        return Board(new_state, not self.current_player, k=self.k)
 
     @classmethod
-    def new_game(cls) -> Board:
-        state: BoardState = [[None for _ in range(3)] for _ in range(3)]
-        return cls(state)
+    def new_game(cls, size: int = 3, k: int | None = None) -> Board:
+        state: BoardState = [[None for _ in range(size)] for _ in range(size)]
+        return cls(state, k=k)
 
 
 class AI:
@@ -807,68 +757,15 @@ class AI:
 
 
 class NegamaxAI(AI):
-    def __init__(self, player: bool) -> None:
-        super().__init__(player)
-
-    def heuristic(self, game: Board, sign: int) -> float:
-        player = not self.player if sign == -1 else self.player
-        if game.over:
-            if game.winner is None:
-                return 0
-            return 1_000_000 if game.winner == player else -1_000_000
-        return random.randint(-10, 10)
+    """Perfect play on the classic board, a time bounded search on bigger ones."""
 
-    @overload
-    def negamax(
-        self,
-        game: Board,
-        depth: Literal[0] = ...,
-        alpha: float = ...,
-        beta: float = ...,
-        sign: int = ...,
-    ) -> tuple[int, int]:
-        ...
-
-    @overload
-    def negamax(
-        self,
-        game: Board,
-        depth: int = ...,
-        alpha: float = ...,
-        beta: float = ...,
-        sign: int = ...,
-    ) -> float:
-        ...
-
-    def negamax(
-        self,
-        game: Board,
-        depth: int = 0,
-        alpha: float = float("-inf"),
-        beta: float = float("inf"),
-        sign: int = 1,
-    ) -> float | tuple[int, int]:
-        if game.over:
-            return sign * self.heuristic(game, sign)
-
-        move = MISSING
-
-        score = float("-inf")
-        for c in game.legal_moves:
-            move_score = -self.negamax(game.move(*c), depth + 1, -beta, -alpha, -sign)
-
-            if move_score > score:
-                score = move_score
-                move = c
-
-            alpha = max(alpha, score)
-            if alpha >= beta:
-                break
-
-        return move if depth == 0 else score
+    def __init__(self, player: bool, budget: float = DEFAULT_BUDGET) -> None:
+        super().__init__(player)
+        self.budget = budget
 
     def move(self, game: Board) -> Board:
-        return game.move(*self.negamax(game))
+        cell, _ = game.engine.best_move(game.bits[self.player], game.bits[not self.player], budget=self.budget)
+        return game.move(*divmod(cell, game.size))
 
 
 class ButtonTicTacToe(discord.ui.Button["GameTicTacToe"]):
@@ -901,8 +798,7 @@ class ButtonTicTacToe(discord.ui.Button["GameTicTacToe"]):
             return
 
         if self.view.current_player.bot:
-            self.view.make_ai_move()
-            self.view.update()
+            await self.view.make_ai_move()
 
         if self.view.board.over:
             await self.view.game_over(interaction)
@@ -917,14 +813,12 @@ class ButtonTicTacToe(discord.ui.Button["GameTicTacToe"]):
 class GameTicTacToe(discord.ui.View):
     children: Sequence[ButtonTicTacToe]
 
-    def __init__(self, players: tuple[discord.Member, discord.Member]):
+    def __init__(self, players: tuple[discord.Member, discord.Member], size: int = 3):
         self.players = list(players)
         random.shuffle(self.players)
         super().__init__(timeout=None)
-        self.board = Board.new_game()
-        if self.current_player.bot:
-            self.make_ai_move()
-        for r, c in itertools.product(range(3), range(3)):
+        self.board = Board.new_game(size)
+        for r, c in itertools.product(range(size), range(size)):
             self.add_item(ButtonTicTacToe(r, c))
         self.update()
 
@@ -953,9 +847,11 @@ class GameTicTacToe(discord.ui.View):
             return False
         return True
 
-    def make_ai_move(self):
+    async def make_ai_move(self):
         ai = NegamaxAI(self.board.current_player)
-        self.board = ai.move(self.board)
+        # bigger boards search for up to a second, don't block the event loop meanwhile
+        self.board = await asyncio.to_thread(ai.move, self.board)
+        self.update()
 
     @property
     def current_player(self) -> discord.Member:
@@ -89,6 +89,7 @@ class MemoryButton(discord.ui.Button["MemoryView"]):
                 "$inc": {"game_memory_test_played": 1},
             },
         )
+        await bot.game_leaderboards.record(self.view.ctx.author.id, guild=self.view.ctx.guild)
 
 
 class MemoryView(BaseView):
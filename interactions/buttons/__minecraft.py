@@ -2,67 +2,215 @@ from __future__ import annotations
 
 import asyncio
 import re
+import threading
+from collections.abc import Iterable
 from io import BytesIO
+from typing import NamedTuple, TypeAlias
 
 import numpy as np
 from PIL import Image
 
 import discord
 from core import Context
+from utilities.assets import ASSETS
 
-from .__constants import code_dict, codes, selector_back, selector_front
+from .__constants import MINECRAFT_ASSETS, SELECTOR_BACK, SELECTOR_FRONT, TILE_FILES
 
 
-def isometric_func(shape, selector_pos=None):
-    """Creates static isometric drawing."""
-    t = 4
-    resx = resy = 1024 * 5
-    canvas = Image.new("RGBA", (resx, resy), (25, 25, 25, 0))
+TILE_STEP = 4
+STEP_X = TILE_STEP * 7
+STEP_Y = TILE_STEP * 4
+STEP_Z = TILE_STEP * 7
 
-    shape = list(shape)
-    mid = round(resx / 2)
+BACKGROUND = (25, 25, 25, 0)
 
-    i = j = lvl = count = 0
-    for row in shape:
-        for val in row:
-            fx = mid + j * t * 7 - i * t * 7
-            fy = mid + j * t * 4 + i * t * 4 - lvl * t * 7
-            # fx = mid + j*t*7 - i*t*7
-            # fy = mid + j*t*6 + i*t*6 - lvl*t*7
+# (level, row, column)
+Cell: TypeAlias = tuple[int, int, int]
+# (block code or None, is the selector on this cell)
+Layer: TypeAlias = tuple[str | None, bool]
+Rect: TypeAlias = tuple[int, int, int, int]
 
-            selected = False
-            if [lvl, i, j] == selector_pos:
-                canvas.paste(selector_back, (fx, fy), selector_back)
-                selected = True
 
-            if img := code_dict.get(val):
-                canvas.paste(img, (fx, fy), img)
+class Sprite(NamedTuple):
+    image: Image.Image
+    dx: int
+    dy: int
 
-            if selected:
-                canvas.paste(selector_front, (fx, fy), selector_front)
+
+class TileAtlas:
+    """Every block sprite packed into one sheet.
+
+    Sprites are cropped to their visible pixels once, and keep the offset of that
+    crop inside the original 64x64 tile, so pasting never touches transparent pixels
+    and the bounding box of a world can be computed without drawing it.
+    """
+
+    def __init__(self, files: dict[str, str]) -> None:
+        tiles: dict[str, tuple[Image.Image, Rect]] = {}
+        for key, file in files.items():
+            img = ASSETS.image(f"{MINECRAFT_ASSETS}/{file}", "RGBA")
+            if box := img.getbbox():
+                tiles[key] = (img.crop(box), box)
+
+        width = sum(img.width for img, _ in tiles.values())
+        height = max(img.height for img, _ in tiles.values())
+        self.sheet = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+
+        self.sprites: dict[str, Sprite] = {}
+        x = 0
+        for key, (img, (left, top, _, _)) in tiles.items():
+            self.sheet.paste(img, (x, 0))
+            self.sprites[key] = Sprite(self.sheet.crop((x, 0, x + img.width, img.height)), left, top)
+            x += img.width
+
+    def rect(self, key: str, x: int, y: int) -> Rect | None:
+        if sprite := self.sprites.get(key):
+            return (x + sprite.dx, y + sprite.dy, x + sprite.dx + sprite.image.width, y + sprite.dy + sprite.image.height)
+        return None
+
+    def paste(self, canvas: Image.Image, key: str, x: int, y: int) -> None:
+        if sprite := self.sprites.get(key):
+            canvas.paste(sprite.image, (x + sprite.dx, y + sprite.dy), sprite.image)
+
+
+_atlas: TileAtlas | None = None
+_atlas_lock = threading.Lock()
+
+
+def get_atlas() -> TileAtlas:
+    global _atlas
+    with _atlas_lock:
+        if _atlas is None:
+            _atlas = TileAtlas({**TILE_FILES, SELECTOR_BACK: SELECTOR_BACK, SELECTOR_FRONT: SELECTOR_FRONT})
+    return _atlas
+
+
+def _union(first: Rect | None, second: Rect | None) -> Rect | None:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return (min(first[0], second[0]), min(first[1], second[1]), max(first[2], second[2]), max(first[3], second[3]))
+
+
+def _intersects(first: Rect, second: Rect) -> bool:
+    return first[0] < second[2] and second[0] < first[2] and first[1] < second[3] and second[1] < first[3]
+
+
+def parse_shape(shape: Iterable[str]) -> dict[Cell, str]:
+    """Parse the block code (rows separated by spaces, levels by `-`) into placed blocks."""
+    cells: dict[Cell, str] = {}
+    i = lvl = 0
+    for row in shape:
+        j = 0
+        for val in row:
+            if val in TILE_FILES:
+                cells[(lvl, i, j)] = val
 
             j += 1
             if val == "-":
                 i = -1
                 j = 0
                 lvl += 1
-
-            if val in codes or selected:
-                count += 1
-        j = 0
         i += 1
+    return cells
+
+
+class IsometricRenderer:
+    """Renders a world isometrically onto a canvas sized to its exact bounding box.
+
+    The last frame is kept, so when the bounding box did not change only the tiles
+    overlapping the cells that changed since the previous render are re-composited.
+    """
+
+    def __init__(self) -> None:
+        self.atlas = get_atlas()
+
+        self._frame: Image.Image | None = None
+        self._bbox: Rect | None = None
+        self._layers: dict[Cell, Layer] = {}
+        self._rects: dict[Cell, Rect | None] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def position(cell: Cell) -> tuple[int, int]:
+        lvl, i, j = cell
+        return (j - i) * STEP_X, (j + i) * STEP_Y - lvl * STEP_Z
+
+    def _rect(self, cell: Cell, layer: Layer) -> Rect | None:
+        x, y = self.position(cell)
+        code, selected = layer
+        rect = self.atlas.rect(code, x, y) if code else None
+        if selected:
+            rect = _union(rect, self.atlas.rect(SELECTOR_BACK, x, y))
+            rect = _union(rect, self.atlas.rect(SELECTOR_FRONT, x, y))
+        return rect
+
+    def _draw(self, canvas: Image.Image, cells: Iterable[Cell], layers: dict[Cell, Layer], origin: tuple[int, int]) -> None:
+        for cell in cells:
+            code, selected = layers[cell]
+            x, y = self.position(cell)
+            x -= origin[0]
+            y -= origin[1]
+
+            if selected:
+                self.atlas.paste(canvas, SELECTOR_BACK, x, y)
+            if code:
+                self.atlas.paste(canvas, code, x, y)
+            if selected:
+                self.atlas.paste(canvas, SELECTOR_FRONT, x, y)
+
+    def render(self, cells: dict[Cell, str], selector_pos: list[int] | None = None) -> tuple[BytesIO, int]:
+        layers: dict[Cell, Layer] = {cell: (code, False) for cell, code in cells.items()}
+        if selector_pos is not None:
+            selector = tuple(selector_pos)
+            layers[selector] = (cells.get(selector), True)  # type: ignore
+
+        if not layers:
+            msg = "Did not detect any blocks. Do `j;iso blocks` or `j;help iso` to see available blocks"
+            raise Exception(msg)
+
+        with self._lock:
+            frame = self._composite(layers)
+            buf = BytesIO()
+            frame.save(buf, "PNG")
+
+        buf.seek(0)
+        return buf, len(layers)
 
-    if count == 0:
-        msg = "Did not detect any blocks. Do `j;iso blocks` or `j;help iso` to see available blocks"
-        raise Exception(msg)
+    def _composite(self, layers: dict[Cell, Layer]) -> Image.Image:
+        rects = {cell: self._rect(cell, layer) for cell, layer in layers.items()}
 
-    canvasBox = canvas.getbbox()
-    crop = canvas.crop(canvasBox)
-    buf = BytesIO()
-    crop.save(buf, "PNG")
-    buf.seek(0)
+        bbox: Rect | None = None
+        for rect in rects.values():
+            bbox = _union(bbox, rect)
+        bbox = bbox or (0, 0, 1, 1)
 
-    return buf, count
+        order = sorted(layers)
+        if self._frame is None or bbox != self._bbox:
+            frame = Image.new("RGBA", (bbox[2] - bbox[0], bbox[3] - bbox[1]), BACKGROUND)
+            self._draw(frame, order, layers, bbox[:2])
+        else:
+            frame = self._frame
+
+            dirty: Rect | None = None
+            for cell in layers.keys() | self._layers.keys():
+                if layers.get(cell) != self._layers.get(cell):
+                    dirty = _union(dirty, _union(rects.get(cell), self._rects.get(cell)))
+
+            if dirty is not None:
+                patch = Image.new("RGBA", (dirty[2] - dirty[0], dirty[3] - dirty[1]), BACKGROUND)
+                affected = [cell for cell in order if (rect := rects[cell]) and _intersects(rect, dirty)]
+                self._draw(patch, affected, layers, dirty[:2])
+                frame.paste(patch, (dirty[0] - bbox[0], dirty[1] - bbox[1]))
+
+        self._frame, self._bbox, self._layers, self._rects = frame, bbox, layers, rects
+        return frame
+
+
+def isometric_func(shape: Iterable[str], selector_pos: list[int] | None = None) -> tuple[BytesIO, int]:
+    """Creates static isometric drawing."""
+    return IsometricRenderer().render(parse_shape(shape), selector_pos)
 
 
 def liquid(blocks: str) -> str:
@@ -211,6 +359,7 @@ class Minecraft(discord.ui.View):
         self.message = None
         self.block_selector = BlockSelector(self.selector_pos)
         self.n_blocks = 0
+        self.renderer = IsometricRenderer()
         self.add_item(self.block_selector)
 
         self.selatan_btn = discord.ui.Button(
@@ -282,6 +431,13 @@ class Minecraft(discord.ui.View):
         self.utara_btn.callback = self.utara_arrow
         self.add_item(self.utara_btn)
 
+    def cells(self) -> dict[Cell, str]:
+        if np.isin(self.box, ("2", "v")).any():
+            code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in self.box])
+            return parse_shape(liquid(code).split())
+
+        return {tuple(map(int, idx)): str(self.box[tuple(idx)]) for idx in np.argwhere(self.box != "0")}  # type: ignore
+
     async def interaction_check(self, interaction: discord.Interaction):
         if interaction.user != self.ctx.author:
             await interaction.response.send_message("You can't use this button!", ephemeral=True)
@@ -293,11 +449,7 @@ class Minecraft(discord.ui.View):
         self.destroy_btn.disabled = self.box[tuple(self.selector_pos)] == "0"
         self.finish_btn.disabled = np.all(self.box == "0")
 
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in self.box])
-        if "2" in code or "v" in code:
-            code = liquid(code)
-
-        buf, c = await asyncio.to_thread(isometric_func, code.split(), self.selector_pos)
+        buf, c = await asyncio.to_thread(self.renderer.render, self.cells(), self.selector_pos)
         c -= 1
         buf_file = discord.File(buf, "interactive_iso.png")
 
@@ -345,12 +497,7 @@ class Minecraft(discord.ui.View):
         await self.update(interaction)
 
     async def finish(self, interaction: discord.Interaction):
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in self.box])
-
-        if "2" in code or "v" in code:
-            code = liquid(code)
-
-        buf, _ = await asyncio.to_thread(isometric_func, code.split())
+        buf, _ = await asyncio.to_thread(self.renderer.render, self.cells())
         await self.ctx.reply(file=discord.File(buf, "interactive_iso.png"), mention_author=False)
 
         for child in self.children[:]:
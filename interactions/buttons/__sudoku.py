@@ -1,40 +1,41 @@
 from __future__ import annotations
 
 import itertools
-import random
-from typing import TYPE_CHECKING, TypeVar
+from typing import TYPE_CHECKING
 
 import discord
 
+from .__sudoku_solver import Difficulty, Puzzle, generate, is_solved
+
 if TYPE_CHECKING:
     from core import Context
 
-T = TypeVar("T")
-
 
 class Sudoku:
-    def __init__(self, base: int = 3) -> None:
+    def __init__(self, base: int = 3, *, puzzle: Puzzle | None = None) -> None:
+        if base != 3:
+            msg = "Only 9x9 boards are supported"
+            raise ValueError(msg)
         self.base: int = base
         self.side = base**2
 
-        self.rows = [g * base + r for g in self.suffle(list(range(base))) for r in self.suffle(list(range(base)))]
-        self.cols = [g * base + c for g in self.suffle(list(range(base))) for c in self.suffle(list(range(base)))]
-
-        self.nums = self.suffle(list(range(1, base**2 + 1)))
-
-        self.board = [[self.nums[self.pattern(r, c)] for c in self.cols] for r in self.rows]
-        self.original_board = self.board.copy()
-
         self._current_row = 0
         self._current_col = 0
 
-        self._changeable_positions = []
+        self.load(puzzle or generate())
 
-    def pattern(self, r: int, c: int) -> int:
-        return (self.base * (r % self.base) + r // self.base + c) % self.side
+    def load(self, puzzle: Puzzle) -> None:
+        """Sets up the board of ``puzzle``, its empty cells are the ones the player may fill."""
+        self.puzzle = puzzle
+        self.board = [list(puzzle.clues[r * self.side : (r + 1) * self.side]) for r in range(self.side)]
+        self.original_board = [row[:] for row in self.board]
+        self._changeable_positions = [
+            (r, c) for r, c in itertools.product(range(self.side), repeat=2) if not self.board[r][c]
+        ]
 
-    def suffle(self, s: list[T]) -> list[T]:
-        return random.sample(s, len(s))
+    @property
+    def difficulty(self) -> str:
+        return self.puzzle.difficulty
 
     def expand_line(self, line: str) -> str:
         return line[0] + line[5:9].join([line[1:5] * (self.base - 1)] * self.base) + line[9:]
@@ -76,7 +77,7 @@ class Sudoku:
 
         if view == "discord":
             head = "- - - - - - - - S U D O K U - - - - - - - -"
-            board = f"```css\n{head}\n\n{board}\n``` Location: `{self._current_row + 1}, {self._current_col + 1}`"
+            board = f"```css\n{head}\n\n{board}\n``` Location: `{self._current_row + 1}, {self._current_col + 1}` Difficulty: `{self.difficulty}`"
 
         if view == "pretty":
             print(*lines, sep="\n")
@@ -84,12 +85,9 @@ class Sudoku:
 
         return str(board)
 
-    def generate_board(self) -> None:
-        squares = self.side * self.side
-        empties = squares * 3 // 4
-        for p in random.sample(range(squares), empties):
-            self.board[p // self.side][p % self.side] = 0
-            self._changeable_positions.append((p // self.side, p % self.side))
+    def generate_board(self, difficulty: Difficulty = "easy") -> None:
+        """Replaces the board with a new puzzle, it always has exactly one solution."""
+        self.load(generate(difficulty))
 
     def place_number_at(self, row: int, col: int, number: int) -> None:
         self.board[row][col] = number
@@ -100,24 +98,8 @@ class Sudoku:
         self.board[self._current_row][self._current_col] = number
 
     def checker(self) -> bool:
-        def line_ok(e):
-            if len(set(e)) != 9:
-                return False
-            for i, item in enumerate(e):
-                if item not in range(1, 10):
-                    return False
-            return True
-
-        bad_rows = [False for row in self.board if not line_ok(row)]
-        grid = list(zip(*self.board, strict=False))
-        bad_cols = [False for col in grid if not line_ok(col)]
-        squares = []
-        for i in range(0, 9, 3):
-            for j in range(0, 9, 3):
-                square = list(itertools.chain.from_iterable(row[j : j + 3] for row in grid[i : i + 3]))
-                squares.append(square)
-        bad_squares = [False for sq in squares if not line_ok(sq)]
-        return not any([bad_rows, bad_cols, bad_squares])
+        # the puzzle has a single solution, any valid grid keeping the clues is that one
+        return is_solved(list(itertools.chain.from_iterable(self.board)))
 
     def move_cursor_at(self, row: int, col: int) -> None:
         if row < 0 or row > self.side - 1:
@@ -181,7 +163,7 @@ class Sudoku:
         self.board[self._current_row][self._current_col] = 0
 
     def reset(self) -> None:
-        self.board = self.original_board.copy()
+        self.board = [row[:] for row in self.original_board]
         self._current_row = 0
         self._current_col = 0
 
@@ -213,11 +195,10 @@ class SudokuView(discord.ui.View):
     message: discord.Message
     ctx: Context
 
-    def __init__(self, timeout: float | None = 300) -> None:
+    def __init__(self, timeout: float | None = 300, *, puzzle: Puzzle | None = None) -> None:
         super().__init__(timeout=timeout)
 
-        self.game = Sudoku()
-        self.game.generate_board()
+        self.game = Sudoku(puzzle=puzzle)
 
     def init(self):
         for i in range(1, 5 + 1):
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import itertools
+import random
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from typing import Any, Literal, NamedTuple
+
+from utilities.pregenerated import PregeneratedPool
+
+Difficulty = Literal["easy", "medium", "hard", "expert"]
+# from the easiest to the hardest, a puzzle gets the grade of the hardest technique it needs
+DIFFICULTIES: tuple[Difficulty, ...] = ("easy", "medium", "hard", "expert")
+
+SIDE = 9
+CELLS = SIDE * SIDE
+ALL = (1 << SIDE) - 1  # bit d - 1 is the candidate d
+
+ROW = [cell // SIDE for cell in range(CELLS)]
+COL = [cell % SIDE for cell in range(CELLS)]
+BOX = [(cell // 27) * 3 + (cell % SIDE) // 3 for cell in range(CELLS)]
+
+ROWS = [[r * SIDE + c for c in range(SIDE)] for r in range(SIDE)]
+COLS = [[r * SIDE + c for r in range(SIDE)] for c in range(SIDE)]
+BOXES = [[cell for cell in range(CELLS) if BOX[cell] == b] for b in range(SIDE)]
+UNITS = ROWS + COLS + BOXES
+# where a box crosses a line: (shared cells, rest of the box, rest of the line)
+INTERSECTIONS = [
+    (shared, [cell for cell in box if cell not in shared], [cell for cell in line if cell not in shared])
+    for box in BOXES
+    for line in ROWS + COLS
+    if (shared := [cell for cell in box if cell in line])
+]
+DIGIT_BITS = [1 << d for d in range(SIDE)]
+PEERS = [sorted({*ROWS[ROW[cell]], *COLS[COL[cell]], *BOXES[BOX[cell]]} - {cell}) for cell in range(CELLS)]
+
+Grid = Sequence[int]  # 81 cells, row by row, 0 when empty
+
+
+class Puzzle(NamedTuple):
+    clues: tuple[int, ...]
+    solution: tuple[int, ...]
+    difficulty: Difficulty
+
+
+def _digits(mask: int) -> list[int]:
+    return [d for d in range(1, SIDE + 1) if mask >> (d - 1) & 1]
+
+
+# search
+
+
+def _search(grid: list[int], limit: int, rng: random.Random | None, found: list[list[int]]) -> None:
+    """Bitmask backtracker, always branching on the cell with the fewest candidates."""
+    rows = [0] * SIDE
+    cols = [0] * SIDE
+    boxes = [0] * SIDE
+    empty = []
+    for cell, value in enumerate(grid):
+        if value:
+            bit = 1 << (value - 1)
+            if (rows[ROW[cell]] | cols[COL[cell]] | boxes[BOX[cell]]) & bit:
+                return  # the givens already clash
+            rows[ROW[cell]] |= bit
+            cols[COL[cell]] |= bit
+            boxes[BOX[cell]] |= bit
+        else:
+            empty.append(cell)
+
+    def backtrack() -> bool:
+        if not empty:
+            found.append(grid[:])
+            return len(found) >= limit
+
+        best_index, best_mask, best_count = -1, 0, SIDE + 1
+        for index, cell in enumerate(empty):
+            mask = ALL & ~(rows[ROW[cell]] | cols[COL[cell]] | boxes[BOX[cell]])
+            count = mask.bit_count()
+            if count < best_count:
+                best_index, best_mask, best_count = index, mask, count
+                if count <= 1:
+                    break
+        if not best_mask:
+            return False
+
+        cell = empty[best_index]
+        empty[best_index] = empty[-1]
+        empty.pop()
+        r, c, b = ROW[cell], COL[cell], BOX[cell]
+
+        digits = _digits(best_mask)
+        if rng is not None:
+            rng.shuffle(digits)
+        for digit in digits:
+            bit = 1 << (digit - 1)
+            grid[cell] = digit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+            done = backtrack()
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[b] ^= bit
+            if done:
+                grid[cell] = 0
+                empty.append(cell)
+                return True
+        grid[cell] = 0
+        empty.append(cell)
+        empty[best_index], empty[-1] = empty[-1], empty[best_index]
+        return False
+
+    backtrack()
+
+
+def count_solutions(grid: Grid, limit: int = 2) -> int:
+    """Number of solutions of ``grid``, counting stops at ``limit``."""
+    found: list[list[int]] = []
+    _search(list(grid), limit, None, found)
+    return len(found)
+
+
+def solve(grid: Grid) -> list[int] | None:
+    found: list[list[int]] = []
+    _search(list(grid), 1, None, found)
+    return found[0] if found else None
+
+
+def is_solved(grid: Grid) -> bool:
+    """Every row, column and box holds each digit exactly once."""
+    return all(sorted(grid[cell] for cell in unit) == list(range(1, SIDE + 1)) for unit in UNITS)
+
+
+# grading
+
+
+def _eliminate(candidates: list[int], grid: list[int], cell: int, digit: int) -> None:
+    grid[cell] = digit
+    candidates[cell] = 0
+    bit = ~(1 << (digit - 1))
+    for peer in PEERS[cell]:
+        candidates[peer] &= bit
+
+
+def _singles(candidates: list[int], grid: list[int]) -> bool:
+    for cell in range(CELLS):
+        if candidates[cell] and candidates[cell].bit_count() == 1:
+            _eliminate(candidates, grid, cell, candidates[cell].bit_length())
+            return True
+    for unit in UNITS:
+        for digit in range(1, SIDE + 1):
+            bit = 1 << (digit - 1)
+            places = [cell for cell in unit if candidates[cell] & bit]
+            if len(places) == 1:
+                _eliminate(candidates, grid, places[0], digit)
+                return True
+    return False
+
+
+def _locked_candidates(candidates: list[int]) -> bool:
+    """Pointing and claiming: a digit confined to where a box and a line cross is removed from the rest of both."""
+    progress = False
+    for inside, box_rest, line_rest in INTERSECTIONS:
+        for bit in DIGIT_BITS:
+            if not any(candidates[cell] & bit for cell in inside):
+                continue
+            in_box = [cell for cell in box_rest if candidates[cell] & bit]
+            in_line = [cell for cell in line_rest if candidates[cell] & bit]
+            if in_box and in_line:
+                continue
+            for cell in in_box or in_line:
+                candidates[cell] &= ~bit
+                progress = True
+    return progress
+
+
+def _pairs(candidates: list[int]) -> bool:
+    """Naked and hidden pairs."""
+    progress = False
+    for unit in UNITS:
+        # naked: two cells with the same two candidates
+        seen: dict[int, int] = {}
+        for cell in unit:
+            mask = candidates[cell]
+            if mask.bit_count() != 2:
+                continue
+            if mask in seen:
+                for other in unit:
+                    if other not in (cell, seen[mask]) and candidates[other] & mask:
+                        candidates[other] &= ~mask
+                        progress = True
+            else:
+                seen[mask] = cell
+
+        # hidden: two digits that only fit in the same two cells
+        places: dict[tuple[int, ...], int] = {}
+        for digit_bit in DIGIT_BITS:
+            cells = tuple(cell for cell in unit if candidates[cell] & digit_bit)
+            if len(cells) == 2:
+                places[cells] = places.get(cells, 0) | digit_bit
+        for cells, mask in places.items():
+            if mask.bit_count() == 2:
+                for cell in cells:
+                    if candidates[cell] & ~mask:
+                        candidates[cell] &= mask
+                        progress = True
+    return progress
+
+
+def grade(grid: Grid) -> Difficulty:
+    """The difficulty of a (uniquely solvable) puzzle, after the techniques a human needs to solve it.
+
+    Only singles: ``easy``; locked candidates: ``medium``; naked or hidden pairs: ``hard``;
+    anything beyond, where a solver would have to guess: ``expert``.
+    """
+    work = list(grid)
+    candidates = [0] * CELLS
+    for cell in range(CELLS):
+        if not work[cell]:
+            taken = 0
+            for peer in PEERS[cell]:
+                if work[peer]:
+                    taken |= 1 << (work[peer] - 1)
+            candidates[cell] = ALL & ~taken
+
+    level = 0
+    while not all(work):
+        if _singles(candidates, work):
+            continue
+        if _locked_candidates(candidates):
+            level = max(level, 1)
+            continue
+        if _pairs(candidates):
+            level = max(level, 2)
+            continue
+        return "expert"
+    return DIFFICULTIES[level]
+
+
+# generation
+
+
+def full_grid(rng: random.Random | None = None) -> list[int]:
+    found: list[list[int]] = []
+    _search([0] * CELLS, 1, rng or random.Random(), found)
+    return found[0]
+
+
+def generate(difficulty: Difficulty = "easy", *, rng: random.Random | None = None, attempts: int | None = None) -> Puzzle:
+    """A puzzle with exactly one solution, graded ``difficulty``.
+
+    Clues are removed from a random full grid, symmetric pairs at a time, as
+    long as the solution stays unique. Puzzles coming out harder than asked
+    get clues back until they are easy enough, too easy ones are rerolled
+    until one is hard enough, ``attempts`` times at most if given.
+    """
+    rng = rng or random.Random()
+    target = DIFFICULTIES.index(difficulty)
+    for _ in itertools.count() if attempts is None else range(attempts):
+        solution = full_grid(rng)
+        clues = solution[:]
+        order = list(range(CELLS // 2 + 1))
+        rng.shuffle(order)
+        for cell in order:
+            pair = {cell, CELLS - 1 - cell}
+            for c in pair:
+                clues[c] = 0
+            if count_solutions(clues) != 1:
+                for c in pair:
+                    clues[c] = solution[c]
+
+        level = DIFFICULTIES.index(grade(clues))
+        missing = [cell for cell in range(CELLS) if not clues[cell]]
+        rng.shuffle(missing)
+        while level > target and missing:
+            cell = missing.pop()
+            clues[cell] = solution[cell]
+            level = DIFFICULTIES.index(grade(clues))
+
+        if level == target:
+            return Puzzle(tuple(clues), tuple(solution), difficulty)
+    msg = f"no {difficulty} puzzle in {attempts} attempts"
+    raise ValueError(msg)
+
+
+# pool
+
+
+def _generate_batch(difficulty: Difficulty, amount: int) -> list[Puzzle]:
+    return [generate(difficulty) for _ in range(amount)]
+
+
+class SudokuPool(PregeneratedPool[Difficulty, Puzzle]):
+    """Pregenerated puzzles for every difficulty, refilled in a worker process.
+
+    :param size: how many puzzles to keep ready per difficulty.
+    :param executor: executor to generate in, a single worker process by default.
+    """
+
+    def __init__(self, *, size: int = 5, executor: Executor | None = None) -> None:
+        # one puzzle per round trip, they take up to half a second each
+        super().__init__(DIFFICULTIES, size=size, executor=executor, name="sudoku-pool")
+
+    def _job(self, key: Difficulty, amount: int) -> tuple[Callable[..., list[Puzzle]], tuple[Any, ...]]:
+        return _generate_batch, (key, amount)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+
+WIN_SCORE = 1_000_000
+TABLE_LIMIT = 1 << 20
+DEFAULT_BUDGET = 1.0  # seconds per move on boards that can't be solved outright
+SOLVE_LIMIT = 9  # boards up to this many cells are always searched to the end
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _Timeout(Exception):
+    pass
+
+
+class MNKEngine:
+    """Alpha-beta negamax for the m,n,k-game (``k`` in a row on a ``rows`` x ``cols`` board).
+
+    A position is two bitboards, the stones of the player to move and of the
+    opponent, cell ``r * cols + c`` being bit ``r * cols + c``. Positions are
+    reduced to a canonical form over the symmetries of the board before they
+    are looked up in the transposition table, which lives on the engine and
+    is therefore shared by every game played with the same rules.
+    """
+
+    def __init__(self, rows: int = 3, cols: int = 3, k: int = 3) -> None:
+        if k > max(rows, cols):
+            msg = f"Cannot get {k} in a row on a {rows}x{cols} board"
+            raise ValueError(msg)
+
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+
+        self.lines = self._lines()
+        self.cell_lines = [[line for line in self.lines if line >> cell & 1] for cell in range(self.cells)]
+        self._symmetry_tables = [self._chunk_table(perm) for perm in self._symmetries()]
+
+        center_r, center_c = (rows - 1) / 2, (cols - 1) / 2
+        self.order = sorted(range(self.cells), key=lambda cell: abs(cell // cols - center_r) + abs(cell % cols - center_c))
+
+        self.table: dict[int, tuple[int, int, int]] = {}
+        # of the last search, each search counts its own
+        self.nodes = 0
+
+    def _lines(self) -> list[int]:
+        lines = []
+        for r in range(self.rows):
+            for c in range(self.cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (self.k - 1), c + dc * (self.k - 1)
+                    if 0 <= end_r < self.rows and 0 <= end_c < self.cols:
+                        lines.append(sum(1 << ((r + dr * i) * self.cols + c + dc * i) for i in range(self.k)))
+        return lines
+
+    def _symmetries(self) -> list[list[int]]:
+        rows, cols = self.rows, self.cols
+        maps = [
+            lambda r, c: (r, c),
+            lambda r, c: (r, cols - 1 - c),
+            lambda r, c: (rows - 1 - r, c),
+            lambda r, c: (rows - 1 - r, cols - 1 - c),
+        ]
+        if rows == cols:
+            maps += [
+                lambda r, c: (c, r),
+                lambda r, c: (c, rows - 1 - r),
+                lambda r, c: (rows - 1 - c, r),
+                lambda r, c: (rows - 1 - c, rows - 1 - r),
+            ]
+        perms = []
+        for mapping in maps:
+            perm = []
+            for cell in range(self.cells):
+                r, c = mapping(*divmod(cell, cols))
+                perm.append(r * cols + c)
+            perms.append(perm)
+        return perms
+
+    def _chunk_table(self, perm: list[int]) -> list[list[int]]:
+        """Byte-wise lookup tables applying ``perm`` to a key of both bitboards."""
+        # bit i of the key is cell i of the player to move, bit cells + i the opponent's
+        targets = perm + [self.cells + target for target in perm]
+        tables = []
+        for start in range(0, len(targets), 8):
+            chunk = targets[start : start + 8]
+            table = [0] * (1 << len(chunk))
+            for value in range(1, len(table)):
+                low = value & -value
+                table[value] = table[value ^ low] | 1 << chunk[low.bit_length() - 1]
+            tables.append(table)
+        return tables
+
+    def canonical(self, me: int, opp: int) -> int:
+        """The smallest key of the position over all the symmetries of the board."""
+        key = me | (opp << self.cells)
+        best = key
+        for tables in self._symmetry_tables[1:]:
+            mapped = 0
+            shifted = key
+            for table in tables:
+                mapped |= table[shifted & 255]
+                shifted >>= 8
+            if mapped < best:
+                best = mapped
+        return best
+
+    def completes_line(self, stones: int, cell: int) -> bool:
+        return any(stones & line == line for line in self.cell_lines[cell])
+
+    def has_line(self, stones: int) -> bool:
+        return any(stones & line == line for line in self.lines)
+
+    def _evaluate(self, me: int, opp: int) -> int:
+        score = 0
+        for line in self.lines:
+            mine, theirs = me & line, opp & line
+            if mine and not theirs:
+                score += 1 << (2 * mine.bit_count())
+            elif theirs and not mine:
+                score -= 1 << (2 * theirs.bit_count())
+        return score
+
+    def best_move(self, me: int, opp: int, *, budget: float | None = DEFAULT_BUDGET) -> tuple[int, int]:
+        """Returns ``(cell, score)`` for the player owning ``me``.
+
+        Boards up to `SOLVE_LIMIT` cells are searched to the end whatever the
+        budget, which makes the play perfect and, the move order being fixed,
+        deterministic. Larger ones are deepened iteratively until ``budget``
+        seconds ran out.
+        """
+        if self.cells <= SOLVE_LIMIT:
+            budget = None
+        remaining = self.cells - (me | opp).bit_count()
+        if not remaining:
+            msg = "The board is full"
+            raise ValueError(msg)
+
+        # games search concurrently in threads, sharing the engine
+        search = _Search(self, float("inf") if budget is None else time.perf_counter() + budget)
+        result = next(cell for cell in self.order if not (me | opp) >> cell & 1), 0
+        try:
+            # without a deadline there is nothing to deepen iteratively for
+            for depth in range(1, remaining + 1) if budget is not None else (remaining,):
+                result = search.root(me, opp, depth)
+                if abs(result[1]) > WIN_SCORE - self.cells - 2:
+                    break
+        except _Timeout:
+            pass
+        finally:
+            self.nodes = search.nodes
+        return result
+
+
+class _Search:
+    """One search, its deadline and node count, the transposition table being the engine's."""
+
+    def __init__(self, engine: MNKEngine, deadline: float) -> None:
+        self.engine = engine
+        self.deadline = deadline
+        self.nodes = 0
+
+    def negamax(self, me: int, opp: int, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        engine = self.engine
+        stones = me | opp
+        if stones == engine.full:
+            return 0
+        placed = stones.bit_count()
+
+        empty = [cell for cell in engine.order if not stones >> cell & 1]
+        for cell in empty:
+            if engine.completes_line(me | 1 << cell, cell):
+                return WIN_SCORE - placed - 1
+
+        threats = [cell for cell in empty if engine.completes_line(opp | 1 << cell, cell)]
+        if len(threats) > 1:
+            # can only block one of them
+            return -(WIN_SCORE - placed - 2)
+        if depth == 0:
+            return engine._evaluate(me, opp)
+
+        key = engine.canonical(me, opp)
+        original_alpha = alpha
+        if entry := engine.table.get(key):
+            entry_depth, flag, value = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best = -WIN_SCORE * 2
+        for cell in threats or empty:
+            score = -self.negamax(opp, me | 1 << cell, depth - 1, -beta, -alpha)
+            if score > best:
+                best = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if len(engine.table) > TABLE_LIMIT:
+            engine.table.clear()
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        # once the search reaches the end of the game the value holds at any depth
+        engine.table[key] = (engine.cells if depth >= engine.cells - placed else depth, flag, best)
+        return best
+
+    def root(self, me: int, opp: int, depth: int) -> tuple[int, int]:
+        engine = self.engine
+        stones = me | opp
+        alpha, beta = -WIN_SCORE * 2, WIN_SCORE * 2
+        best_cell, best = -1, -WIN_SCORE * 2
+        for cell in engine.order:
+            if stones >> cell & 1:
+                continue
+            if engine.completes_line(me | 1 << cell, cell):
+                return cell, WIN_SCORE - stones.bit_count() - 1
+            score = -self.negamax(opp, me | 1 << cell, depth - 1, -beta, -alpha)
+            if score > best:
+                best_cell, best = cell, score
+            alpha = max(alpha, score)
+        return best_cell, best
+
+
+@lru_cache(maxsize=None)
+def get_engine(rows: int = 3, cols: int = 3, k: int = 3) -> MNKEngine:
+    """One engine, hence one transposition table, per set of rules."""
+    return MNKEngine(rows, cols, k)
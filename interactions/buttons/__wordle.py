@@ -11,10 +11,11 @@ if TYPE_CHECKING:
 import random
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 import discord
 from core import Context, Parrot
+from utilities.assets import ASSETS
 
 from .utils import DEFAULT_COLOR, BaseView
 
@@ -33,17 +34,17 @@ ORANGE = (200, 179, 87)
 GREEN = (105, 169, 99)
 LGRAY = (198, 201, 205)
 
-with open(r"extra/5_words.txt", encoding="utf-8", errors="ignore") as f:
-    VALID_WORDS = tuple(f.read().splitlines())
+WORDS_PATH = "extra/5_words.txt"
+FONT_PATH = "extra/HelveticaNeuBold.ttf"
 
 
 class Wordle:
     def __init__(self, *, text_size: int = 55) -> None:
         self.embed_color: DiscordColor | None = None
 
-        self._valid_words = VALID_WORDS
+        self._valid_words = ASSETS.lines(WORDS_PATH)
         self._text_size = text_size
-        self._font = ImageFont.truetype(r"extra/HelveticaNeuBold.ttf", self._text_size)
+        self._font = ASSETS.font(FONT_PATH, self._text_size)
 
         self.guesses: list[list[dict[str, str]]] = []
         self.word: str = random.choice(self._valid_words)
@@ -32,6 +32,7 @@ from .__battleship import BetaBattleShip
 from .__black_jack import BlackJackView
 from .__chess import Chess
 from .__chimp import ChimpTest
+from .__connect_four import Difficulty
 from .__constants import _2048_GAME, CHOICES, CROSS_EMOJI, EMOJI_CHECK, HAND_RAISED_EMOJI, SHORT_CHOICES, WINNER_DICT, Emojis
 from .__country_guess import BetaCountryGuesser
 from .__duckgame import (
@@ -66,10 +67,12 @@ from .__games_utils import (
 )
 from .__light_out import LightsOut
 from .__memory_game import MemoryGame
-from .__minecraft import Minecraft, isometric_func
+from .__minecraft import Minecraft
 from .__number_memory import NumberMemory
 from .__number_slider import NumberSlider
 from .__sokoban import SokobanGame, SokobanGameView
+from .__sudoku import SudokuView
+from .__sudoku_solver import SudokuPool
 from .__verbal_memory import VerbalMemory
 from .__wordle import BetaWordle
 from .secret_hitler.ui.join import JoinUI
@@ -100,6 +103,13 @@ class Games(Cog):
         self.checks: set[Callable] = set()
         self.current_games: dict[int, DuckGame] = {}
         self.uno_games: dict[int, UNO] = {}
+        self.sudoku_pool = SudokuPool()
+
+    async def cog_load(self) -> None:
+        await self.sudoku_pool.start()
+
+    async def cog_unload(self) -> None:
+        await self.sudoku_pool.close()
 
     @staticmethod
     def _load_templates() -> list[MadlibsTemplate]:
@@ -265,13 +275,22 @@ class Games(Cog):
         board_size: int,
         emoji1: Any,
         emoji2: Any,
+        difficulty: Difficulty = "medium",
     ) -> None:
         """Helper for playing a game of connect four."""
         self.tokens = [":white_circle:", emoji1, emoji2]
         game = None  # if game fails to intialize in try...except
 
         try:
-            game = GameC4(self.bot, ctx.channel, ctx.author, user, self.tokens, size=board_size)
+            game = GameC4(
+                self.bot,
+                ctx.channel,
+                ctx.author,
+                user,
+                self.tokens,
+                size=board_size,
+                difficulty=difficulty,
+            )
             self.games_c4.append(game)
             await game.start_game()
             self.games_c4.remove(game)
@@ -358,8 +377,11 @@ class Games(Cog):
         board_size: int = 7,
         emoji1: EMOJI_CHECK = "\N{LARGE BLUE CIRCLE}",
         emoji2: EMOJI_CHECK = "\N{LARGE RED CIRCLE}",
+        difficulty: Literal["easy", "medium", "hard", "impossible"] = "medium",
     ) -> None:
-        """Play Connect Four against a computer player."""
+        """Play Connect Four against a computer player.
+        `difficulty`: one of `easy`, `medium`, `hard` or `impossible`.
+        """
         check, emoji = self.check_emojis(emoji1, emoji2)
         if not check:
             raise commands.EmojiNotFound(emoji)
@@ -368,7 +390,7 @@ class Games(Cog):
         if not check_author_result:
             return
 
-        await self._play_game(ctx, None, board_size, emoji1, emoji2)
+        await self._play_game(ctx, None, board_size, emoji1, emoji2, difficulty)
 
     @commands.command(aliases=["akinator"])
     @commands.bot_has_permissions(embed_links=True, add_reactions=True)
@@ -380,9 +402,15 @@ class Games(Cog):
     @commands.command(aliases=["tic", "tic_tac_toe", "ttt"])
     @commands.max_concurrency(1, commands.BucketType.user)
     @Context.with_type
-    async def tictactoe(self, ctx: Context, *, opponent: discord.Member | None = None):
+    async def tictactoe(
+        self,
+        ctx: Context,
+        opponent: discord.Member | None = None,
+        size: Literal[3, 4, 5] = 3,
+    ):
         """Start a Tic-Tac-Toe game!
         `opponent`: Another member of the server to play against. If not is set an open challenge is started.
+        `size`: Size of the board, 3 in a row wins on 3x3, 4 in a row on bigger boards.
         """
         if opponent is None:
             opponent = await self._get_opponent(ctx)
@@ -402,7 +430,9 @@ class Games(Cog):
             msg = "Challenge cancelled."
             raise commands.BadArgument(msg)
 
-        game = GameTicTacToe((ctx.author, opponent))
+        game = GameTicTacToe((ctx.author, opponent), size=size)
+        if game.current_player.bot:
+            await game.make_ai_move()
 
         await ctx.send(f"{game.current_player.mention}'s (X) turn!", view=game)  # flake8: noqa
 
@@ -555,7 +585,8 @@ class Games(Cog):
         if boardsize > 10:
             return await ctx.send(f"{ctx.author.mention} board size must less than 10")
 
-        game = Twenty48(_2048_GAME, size=boardsize)
+        # the first game of a size builds its row tables, which takes a moment
+        game = await asyncio.to_thread(Twenty48, _2048_GAME, size=boardsize)
         game.start()
         BoardString = game.number_to_emoji()
         embed = discord.Embed(
@@ -568,6 +599,15 @@ class Games(Cog):
             view=Twenty48_Button(game, ctx.author, bot=self.bot),
         )
 
+    @commands.command(name="sudoku")
+    @commands.max_concurrency(1, commands.BucketType.user)
+    async def sudoku(self, ctx: Context, difficulty: Literal["easy", "medium", "hard", "expert"] = "easy"):
+        """Solve a Sudoku puzzle. Every puzzle has exactly one solution.
+        `difficulty`: one of `easy`, `medium`, `hard` or `expert`.
+        """
+        puzzle = await self.sudoku_pool.get(difficulty)
+        await SudokuView(puzzle=puzzle).start(ctx)
+
     @commands.group(name="chess", invoke_without_command=True)
     @commands.max_concurrency(1, commands.BucketType.user)
     @commands.bot_has_permissions(embed_links=True, add_reactions=True)
@@ -1066,9 +1106,11 @@ class Games(Cog):
     async def minecraft(self, ctx: Context):
         """Minecraft game."""
         interactive_view = Minecraft(ctx, [50, 50, 50])
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in interactive_view.box])
-
-        buf, c = await asyncio.to_thread(isometric_func, code.split(), interactive_view.selector_pos)
+        buf, c = await asyncio.to_thread(
+            interactive_view.renderer.render,
+            interactive_view.cells(),
+            interactive_view.selector_pos,
+        )
         c -= 1
         buf_file = discord.File(buf, "interactive_iso.png")
         # link = await ctx.upload_bytes(buf.getvalue(), 'image/png', 'interactive_iso')
@@ -0,0 +1,60 @@
+"""Runs the bot as several processes, each connecting a range of the shards.
+
+Run with `python launcher.py --clusters 4`, see ``--help``. Every cluster is
+``main.py`` with ``CLUSTER_ID``, ``CLUSTER_COUNT`` and ``SHARD_COUNT`` set,
+they share their caches and talk to each other over Redis (core/cluster.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+
+from aiohttp import ClientSession
+
+from core.cluster import Launcher
+from utilities.config import CLUSTER_COUNT, SHARD_COUNT, TOKEN
+
+log = logging.getLogger("launcher")
+
+
+async def recommended_shards() -> int:
+    async with ClientSession() as session, session.get(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {TOKEN}"},
+    ) as response:
+        response.raise_for_status()
+        data = await response.json()
+    return data["shards"]
+
+
+async def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=CLUSTER_COUNT, help="processes to run")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=SHARD_COUNT if SHARD_COUNT > 1 else 0,
+        help="shards across all clusters, 0 for as many as Discord recommends",
+    )
+    parser.add_argument("--stagger", type=float, default=5.0, help="seconds between starting two clusters")
+    args = parser.parse_args(argv)
+
+    shards = args.shards or await recommended_shards()
+    # a cluster connects one shard at least
+    shards = max(shards, args.clusters)
+    log.info("Running %s shards in %s clusters", shards, args.clusters)
+
+    launcher = Launcher([sys.executable, "main.py"], clusters=args.clusters, shard_count=shards, stagger=args.stagger)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(launcher.stop()))
+    await launcher.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
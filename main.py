@@ -10,6 +10,7 @@ from aiohttp import AsyncResolver, ClientSession, TCPConnector
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from core import Parrot
+from core.metrics import HttpTracer, MongoCommandListener
 from updater import init
 from utilities.config import DATABASE_KEY, DATABASE_URI, REDIS_URI, TOKEN, VERSION
 
@@ -25,7 +26,10 @@ else:
 
 
 async def main() -> None:
-    async with ClientSession(connector=TCPConnector(resolver=AsyncResolver(), family=socket.AF_INET)) as http_session:
+    async with ClientSession(
+        connector=TCPConnector(resolver=AsyncResolver(), family=socket.AF_INET),
+        trace_configs=[HttpTracer(bot.metrics)],
+    ) as http_session:
         async with bot:
             bot.http_session = http_session
             bot.sql = await init()
@@ -33,7 +37,10 @@ async def main() -> None:
             if not hasattr(bot, "__version__"):
                 bot.__version__ = VERSION
 
-            bot.mongo = AsyncIOMotorClient(DATABASE_URI.format(DATABASE_KEY))
+            bot.mongo = AsyncIOMotorClient(
+                DATABASE_URI.format(DATABASE_KEY),
+                event_listeners=[MongoCommandListener(bot.metrics)],
+            )
             redis = await aioredis.from_url(REDIS_URI, encoding="utf-8", decode_responses=True, max_connections=1000)
             bot.redis = redis
 
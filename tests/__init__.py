@@ -1,4 +1,29 @@
 # sourcery skip: dont-import-test-modules
+from .test_2048 import *
+from .test_assets import *
+from .test_bench_database import *
+from .test_boggle import *
+from .test_cache import *
+from .test_captcha_audio import *
+from .test_captcha_pool import *
+from .test_cluster import *
+from .test_connect_four import *
+from .test_emojis import *
+from .test_gateway import *
+from .test_graphing import *
+from .test_leaderboard import *
+from .test_local_cache import *
+from .test_logsink import *
+from .test_member_resolver import *
+from .test_message_pipeline import *
+from .test_metrics import *
+from .test_minecraft import *
+from .test_profanity import *
+from .test_startup import *
 from .test_time import *
+from .test_sudoku import *
+from .test_tictactoe import *
+from .test_traffic import *
+from .test_ttg import *
 from .test_wikihow import *
 from .test_youtube_search import *
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import random
+import time
+from unittest import TestCase
+
+from interactions.buttons.__2048 import Twenty48
+from interactions.buttons.__2048_engine import DIRECTIONS, Engine2048, get_tables
+from interactions.buttons.__constants import _2048_GAME
+
+
+def reference_left(row: list[int]) -> list[int]:
+    """The list based compress, merge, compress of the original game."""
+    tiles = [tile for tile in row if tile]
+    for i in range(len(tiles) - 1):
+        if tiles[i] and tiles[i] == tiles[i + 1]:
+            tiles[i] *= 2
+            tiles[i + 1] = 0
+    tiles = [tile for tile in tiles if tile]
+    return tiles + [0] * (len(row) - len(tiles))
+
+
+def reference_move(grid: list[list[int]], direction: str) -> list[list[int]]:
+    if direction in ("up", "down"):
+        grid = [list(column) for column in zip(*grid)]
+    if direction in ("right", "down"):
+        grid = [reference_left(row[::-1])[::-1] for row in grid]
+    else:
+        grid = [reference_left(row) for row in grid]
+    if direction in ("up", "down"):
+        grid = [list(column) for column in zip(*grid)]
+    return grid
+
+
+def random_grid(rng: random.Random, size: int) -> list[list[int]]:
+    return [[rng.choice([0, 0, 2, 2, 4, 8, 16, 32]) for _ in range(size)] for _ in range(size)]
+
+
+class TestEngine2048(TestCase):
+    def test_row_tables(self):
+        tables = get_tables(4)
+        self.assertEqual(len(tables.left), 65536)
+        # 2 2 2 2 -> 4 4 0 0, scoring 8
+        row = 0x1111
+        self.assertEqual(tables.left[row], 0x0022)
+        self.assertEqual(tables.left_score[row], 8)
+        self.assertEqual(tables.right[row], 0x2200)
+
+    def test_largest_tiles_dont_merge(self):
+        tables = get_tables(4)
+        # 32768 32768 -> unchanged, nothing is lost
+        self.assertEqual(tables.left[0xFF], 0xFF)
+        self.assertEqual(tables.left[0xEE], 0xF)
+
+    def test_moves_match_reference(self):
+        # sourcery skip: no-loop-in-tests
+        rng = random.Random(0)
+        for size in (4, 5, 7):
+            engine = Engine2048(size)
+            for _ in range(50):
+                grid = random_grid(rng, size)
+                for direction in DIRECTIONS:
+                    with self.subTest(size=size, direction=direction):
+                        moved, _ = engine.move(engine.from_grid(grid), direction)
+                        self.assertEqual(engine.to_grid(moved), reference_move(grid, direction))
+
+    def test_lost(self):
+        engine = Engine2048()
+        stuck = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        self.assertTrue(engine.lost(engine.from_grid(stuck)))
+
+        stuck[3][3] = 4  # can merge with the tile above
+        stuck[2][3] = 4
+        self.assertFalse(engine.lost(engine.from_grid(stuck)))
+        stuck[0][0] = 0
+        self.assertFalse(engine.lost(engine.from_grid(stuck)))
+
+    def test_spawn(self):
+        engine = Engine2048()
+        board = engine.spawn(0, rng=random.Random(1))
+        self.assertEqual(len(engine.empty_cells(board)), 15)
+        self.assertEqual(sum(map(sum, engine.to_grid(board))), 2)
+
+    def test_best_move_budget(self):
+        engine = Engine2048()
+        board = engine.from_grid([[2, 4, 8, 16], [0, 2, 4, 8], [0, 0, 2, 4], [0, 0, 0, 2]])
+        start = time.perf_counter()
+        direction = engine.best_move(board, budget=0.2)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertNotEqual(engine.move(board, direction)[0], board)
+
+    def test_best_move_when_stuck(self):
+        engine = Engine2048()
+        stuck = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]]
+        self.assertIsNone(engine.best_move(engine.from_grid(stuck)))
+
+
+class TestTwenty48(TestCase):
+    def test_board_round_trip(self):
+        game = Twenty48(_2048_GAME)
+        grid = [[0, 2, 0, 0], [4, 0, 0, 0], [0, 0, 2048, 0], [0, 0, 0, 8]]
+        game.board = grid
+        self.assertEqual(game.board, grid)
+        self.assertEqual(game.number_to_emoji().count("\n"), 4)
+
+    def test_start(self):
+        game = Twenty48(_2048_GAME, size=6)
+        game.start()
+        self.assertEqual(sum(map(sum, game.board)), 4)
+        self.assertIsNone(game.lost())
+
+    def test_autoplay(self):
+        game = Twenty48(_2048_GAME)
+        game.start()
+        moves = game.autoplay(budget=0.5)
+        self.assertGreater(moves, 0)
+        self.assertGreater(game.score, 0)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
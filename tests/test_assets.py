@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+from io import BytesIO
+from unittest import TestCase
+
+from PIL import Image, ImageChops, ImageDraw
+
+from interactions.buttons.__battleship import BOARD_IMAGE, Board, Ship, draw_ship_square
+from utilities.assets import AssetRegistry, ImageCache
+
+
+def legacy_to_image(board: Board, hide: bool = False) -> Image.Image:
+    """The previous rendering: decode the board and scan every cell for ships and shots."""
+    with Image.open(BOARD_IMAGE) as img:
+        img = img.convert("RGBA")
+    cur = ImageDraw.Draw(img, "RGBA")
+    for i, y in zip(range(1, 11), range(75, 530, 50), strict=False):
+        for j, x in zip(range(1, 11), range(75, 530, 50), strict=False):
+            coord = (i, j)
+            ship = next((ship for ship in board.ships if coord in ship.span), None)
+            if coord in board.op_misses:
+                board.draw_dot(cur, x, y, fill=(128, 128, 128))
+            elif coord in board.op_hits:
+                if not hide:
+                    draw_ship_square(cur, x, y, coord=coord, ship=ship)
+                board.draw_dot(cur, x, y, fill=(255, 0, 0))
+            elif ship and not hide:
+                draw_ship_square(cur, x, y, coord=coord, ship=ship)
+    return img
+
+
+class TestImageCache(TestCase):
+    def test_bounded_by_bytes(self):
+        cache = ImageCache(max_bytes=3 * 10 * 10 * 4)
+        for key in range(4):  # sourcery skip: no-loop-in-tests
+            cache.put(key, Image.new("RGBA", (10, 10)))
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.current_bytes, 1200)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(0))
+
+    def test_least_recently_used_goes_first(self):
+        cache = ImageCache(max_bytes=2 * 100)
+        cache.put("a", Image.new("L", (10, 10)))
+        cache.put("b", Image.new("L", (10, 10)))
+        cache.get("a")
+        cache.put("c", Image.new("L", (10, 10)))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+
+    def test_too_big(self):
+        cache = ImageCache(max_bytes=10)
+        cache.put("big", Image.new("L", (10, 10)))
+        self.assertEqual(len(cache), 0)
+
+
+class TestAssetRegistry(TestCase):
+    def test_image_loaded_once(self):
+        assets = AssetRegistry()
+        first = assets.image(BOARD_IMAGE, "RGBA")
+        self.assertIs(assets.image(BOARD_IMAGE, "RGBA"), first)
+        self.assertEqual(first.mode, "RGBA")
+        self.assertEqual(assets.timings[BOARD_IMAGE].loads, 1)
+
+    def test_reloaded_after_eviction(self):
+        assets = AssetRegistry(ImageCache(max_bytes=1))
+        assets.image(BOARD_IMAGE)
+        assets.image(BOARD_IMAGE)
+        self.assertEqual(assets.timings[BOARD_IMAGE].loads, 2)
+
+    def test_lines(self):
+        assets = AssetRegistry()
+        words = assets.lines("extra/5_words.txt")
+        self.assertIs(assets.lines("extra/5_words.txt"), words)
+        self.assertTrue(all(len(word) == 5 for word in words[:100]))
+        self.assertIn("extra/5_words.txt", assets.stats()["timings"])
+
+
+class TestBattleshipBoard(TestCase):
+    def setUp(self) -> None:
+        random.seed(0)
+        self.board = Board(player=None)
+        self.board.op_misses = [(1, 1), (10, 10), (5, 5)]
+        ship = self.board.ships[0]
+        self.board.op_hits = [ship.span[0], ship.span[-1]]
+        self.board.op_misses = [coord for coord in self.board.op_misses if not self.board.get_ship(coord)]
+
+    def test_index(self):
+        # sourcery skip: no-loop-in-tests
+        for ship in self.board.ships:
+            for coord in ship.span:
+                self.assertIs(self.board.get_ship(coord), ship)
+        covered = {coord for ship in self.board.ships for coord in ship.span}
+        free = next((i, j) for i in range(1, 11) for j in range(1, 11) if (i, j) not in covered)
+        self.assertIsNone(self.board.get_ship(free))
+        self.assertFalse(self.board._is_valid(Ship("x", 2, self.board.ships[0].start, (0, 0, 0))))
+
+    def test_render_matches_legacy(self):
+        # sourcery skip: no-loop-in-tests
+        for hide in (False, True):
+            with self.subTest(hide=hide):
+                rendered = Image.open(BytesIO(self.board.to_image(hide=hide).getvalue())).convert("RGBA")
+                expected = legacy_to_image(self.board, hide=hide)
+                self.assertIsNone(ImageChops.difference(rendered, expected).getbbox())
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
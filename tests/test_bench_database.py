@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from benchmarks.bot.database import InMemoryMongo, InMemoryRedis, matches
+from core.metrics import Metrics, current_site
+
+
+class TestMatches(TestCase):
+    document = {
+        "_id": 1,
+        "name": "parrot",
+        "level": 12,
+        "roles": [1, 2, 3],
+        "warns": [{"by": 10, "count": 2}, {"by": 11, "count": 5}],
+        "config": {"prefix": "$", "nested": {"enabled": True}},
+    }
+
+    def test_equality_and_paths(self):
+        self.assertTrue(matches(self.document, {}))
+        self.assertTrue(matches(self.document, {"name": "parrot", "config.prefix": "$"}))
+        self.assertTrue(matches(self.document, {"config.nested.enabled": True}))
+        self.assertTrue(matches(self.document, {"roles": 2}))
+        self.assertTrue(matches(self.document, {"warns.by": 11}))
+        self.assertFalse(matches(self.document, {"name": "duck"}))
+        self.assertFalse(matches(self.document, {"missing": 1}))
+        self.assertTrue(matches(self.document, {"missing": None}))
+
+    def test_operators(self):
+        self.assertTrue(matches(self.document, {"level": {"$gt": 10, "$lte": 12}}))
+        self.assertFalse(matches(self.document, {"level": {"$lt": 12}}))
+        self.assertTrue(matches(self.document, {"roles": {"$in": [3, 4]}}))
+        self.assertTrue(matches(self.document, {"roles": {"$nin": [4, 5]}}))
+        self.assertTrue(matches(self.document, {"roles": {"$size": 3}}))
+        self.assertTrue(matches(self.document, {"missing": {"$exists": False}}))
+        self.assertTrue(matches(self.document, {"name": {"$regex": "^par"}}))
+        self.assertTrue(matches(self.document, {"name": {"$not": {"$regex": "^duck"}}}))
+        self.assertTrue(matches(self.document, {"warns": {"$elemMatch": {"by": 11, "count": {"$gte": 5}}}}))
+        self.assertFalse(matches(self.document, {"warns": {"$elemMatch": {"by": 10, "count": 5}}}))
+        self.assertTrue(matches(self.document, {"$or": [{"name": "duck"}, {"level": 12}]}))
+        self.assertFalse(matches(self.document, {"$and": [{"name": "parrot"}, {"level": 13}]}))
+        self.assertTrue(matches(self.document, {"$nor": [{"name": "duck"}]}))
+
+
+class TestInMemoryMongo(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.collection = InMemoryMongo(self.metrics).mainDB.guildConfigurations
+
+    async def test_insert_and_find(self):
+        await self.collection.insert_many([{"_id": index, "level": index % 3} for index in range(6)])
+        with self.assertRaises(DuplicateKeyError):
+            await self.collection.insert_one({"_id": 0})
+
+        documents = await self.collection.find({"level": {"$gte": 1}}, {"level": 0}).sort("_id", -1).limit(2).to_list(None)
+        self.assertEqual(documents, [{"_id": 5}, {"_id": 4}])
+        self.assertEqual([document["_id"] async for document in self.collection.find({"level": 0})], [0, 3])
+        self.assertEqual(await self.collection.count_documents({"level": 2}), 2)
+        self.assertEqual(sorted(await self.collection.distinct("level")), [0, 1, 2])
+
+    async def test_updates(self):
+        await self.collection.insert_one({"_id": 1, "muted": [1], "count": 1})
+        await self.collection.update_one(
+            {"_id": 1},
+            {"$inc": {"count": 2}, "$addToSet": {"muted": {"$each": [1, 2]}}, "$set": {"config.prefix": "!"}},
+        )
+        self.assertEqual(
+            await self.collection.find_one({"_id": 1}),
+            {"_id": 1, "muted": [1, 2], "count": 3, "config": {"prefix": "!"}},
+        )
+
+        result = await self.collection.update_one({"_id": 2}, {"$setOnInsert": {"muted": []}}, upsert=True)
+        self.assertEqual(result.upserted_id, 2)
+        self.assertEqual(await self.collection.find_one({"_id": 2}), {"_id": 2, "muted": []})
+
+        document = await self.collection.find_one_and_update(
+            {"_id": 1},
+            {"$pull": {"muted": 1}, "$unset": {"config": ""}},
+            return_document=ReturnDocument.AFTER,
+        )
+        self.assertEqual(document, {"_id": 1, "muted": [2], "count": 3})
+
+    async def test_bulk_write(self):
+        result = await self.collection.bulk_write(
+            [
+                InsertOne({"_id": 1}),
+                UpdateOne({"_id": 2}, {"$set": {"muted": [3]}}, upsert=True),
+                UpdateOne({"_id": 1}, {"$set": {"muted": []}}),
+                DeleteOne({"_id": 1}),
+            ],
+        )
+        self.assertEqual((result.inserted_count, result.upserted_count, result.modified_count), (1, 1, 1))
+        self.assertEqual(result.deleted_count, 1)
+        self.assertEqual(await self.collection.find({}).to_list(None), [{"_id": 2, "muted": [3]}])
+
+    async def test_metrics(self):
+        token = current_site.set("listener:Test.on_message")
+        try:
+            await self.collection.find_one({"_id": 1})
+            await self.collection.find_one({"_id": 2})
+        finally:
+            current_site.reset(token)
+
+        count = self.metrics.mongo["guildConfigurations", "find", "listener:Test.on_message"]
+        self.assertEqual(count.calls, 2)
+        self.assertEqual(count.errors, 0)
+
+
+class TestInMemoryRedis(IsolatedAsyncioTestCase):
+    async def test_keys(self):
+        redis = InMemoryRedis()
+        self.assertTrue(await redis.set("a", 1))
+        self.assertIsNone(await redis.set("a", 2, nx=True))
+        self.assertEqual(await redis.get("a"), 1)
+        self.assertEqual(await redis.incr("counter"), 1)
+        self.assertTrue(await redis.set("b", 1, px=1))
+        self.assertEqual(await redis.ttl("missing"), -2)
+        self.assertEqual(await redis.delete("a", "missing"), 1)
+        self.assertEqual(redis.calls["SET"], 3)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
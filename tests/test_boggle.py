@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+from interactions.buttons.__boggle_solver import Lexicon
+
+
+class TestLexicon(TestCase):
+    def setUp(self) -> None:
+        self.words = ["CAT", "CATS", "CAR", "CARS", "CART", "SCAT", "ACT", "TACT", "QUIT", "QUITS", "TAR", "STAR", "AT"]
+        self.lexicon = Lexicon(self.words)
+        # indexed [col][row]
+        self.board = [
+            ["C", "A", "T"],
+            ["S", "R", "5"],
+            ["X", "I", "T"],
+        ]
+
+    def test_contains(self):
+        # sourcery skip: no-loop-in-tests
+        for word in self.words:
+            with self.subTest(word=word):
+                self.assertIn(word, self.lexicon)
+
+        self.assertNotIn("CA", self.lexicon)
+        self.assertNotIn("CATSS", self.lexicon)
+        self.assertNotIn("DOG", self.lexicon)
+
+    def test_suffixes_are_shared(self):
+        # a plain trie would need one node per letter of every word
+        self.assertLess(self.lexicon.size, sum(map(len, self.words)))
+
+    def test_solve(self):
+        found = self.lexicon.solve(self.board)
+        # "5" is the QU digraph, words shorter than 3 letters never count
+        self.assertEqual(found, {"CAT", "CAR", "CARS", "CART", "SCAT", "TAR", "QUIT"})
+
+    def test_cells_are_used_once(self):
+        self.assertNotIn("TACT", self.lexicon.solve(self.board))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import aioredis
+from bson import ObjectId
+
+from benchmarks.bot.database import InMemoryRedis
+from core.cache import CacheBus
+
+
+class DownRedis(InMemoryRedis):
+    async def _command(self, name: str) -> None:
+        raise aioredis.ConnectionError("Connection refused")
+
+
+async def settle() -> None:
+    # the background writes, the publish and the delivery to the other bus
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class TestSharedCache(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = InMemoryRedis()
+        # two processes sharing a Redis
+        self.first, self.second = CacheBus(namespace="test"), CacheBus(namespace="test")
+        for bus in (self.first, self.second):
+            await bus.start(self.redis)
+            self.addAsyncCleanup(bus.stop)
+        await settle()
+
+    async def test_read_through(self):
+        loaded: list[int] = []
+
+        async def loader(key: int) -> dict | None:
+            loaded.append(key)
+            return {"prefix": "!"} if key == 1 else None
+
+        first = self.first.cache("configs", ttl=60, loader=loader)
+        second = self.second.cache("configs", ttl=60, loader=loader)
+
+        self.assertEqual(await first.fetch(1), {"prefix": "!"})
+        self.assertEqual(await first.fetch(1), {"prefix": "!"})
+        self.assertGreater(await self.redis.ttl("test:configs:1"), 0)
+        # from Redis, the loader isn't called again
+        self.assertEqual(await second.fetch(1), {"prefix": "!"})
+        self.assertEqual((first.loads, second.loads, second.remote_hits), (1, 0, 1))
+        self.assertEqual(second[1], {"prefix": "!"})
+
+        # nothing is kept for what the loader doesn't have
+        self.assertIsNone(await first.fetch(2))
+        self.assertNotIn(2, first)
+        self.assertEqual(loaded, [1, 2])
+
+    async def test_invalidation(self):
+        first = self.first.cache("configs")
+        second = self.second.cache("configs")
+        refreshed = self.second.cache("refreshed", refresh=True)
+        writer = self.first.cache("refreshed")
+
+        await first.set(1, "old")
+        await writer.set(1, "old")
+        await second.fetch(1)
+        await refreshed.fetch(1)
+        self.assertEqual(second[1], "old")
+
+        first[1] = "new"
+        writer[1] = "new"
+        await settle()
+        self.assertNotIn(1, second)
+        self.assertEqual(refreshed[1], "new")
+        self.assertEqual(await second.fetch(1), "new")
+        # its own writes don't evict what the writer holds
+        self.assertEqual(first[1], "new")
+
+        await first.invalidate(1)
+        await writer.invalidate(1)
+        await settle()
+        self.assertIsNone(await second.fetch(1))
+        self.assertNotIn(1, refreshed)
+
+    async def test_clear(self):
+        first = self.first.cache("configs")
+        second = self.second.cache("configs")
+        for key in range(3):
+            await first.set(key, key)
+            await second.fetch(key)
+        self.first.cache("other")[0] = "kept"
+
+        # two SCAN steps, KEYS isn't used
+        with patch("core.cache.SCAN_COUNT", 2):
+            first.clear()
+            await settle()
+        self.assertEqual((self.redis.calls["SCAN"], self.redis.calls["KEYS"]), (2, 0))
+        self.assertEqual(len(second), 0)
+        self.assertEqual(await self.redis.keys("test:configs:*"), [])
+        self.assertEqual(await self.redis.keys("test:other:*"), ["test:other:0"])
+
+    async def test_listeners(self):
+        first = self.first.cache("rules")
+        second = self.second.cache("rules", refresh=True)
+        seen: list[tuple[int, str | None]] = []
+
+        async def listener(key: int) -> None:
+            # called once the value was read again
+            seen.append((key, second.get(key)))
+
+        second.listeners.append(listener)
+        await first.set(7, "rule")
+        await settle()
+        self.assertEqual(seen, [(7, "rule")])
+
+    async def test_serialization(self):
+        first = self.first.cache("documents")
+        second = self.second.cache("documents")
+        document = {
+            "_id": ObjectId(),
+            "created_at": datetime.datetime(2024, 1, 2, 3, 4, 5, 678000),
+            "owners": [123456789012345678],
+            "nested": {"enabled": True, "ratio": 0.5},
+        }
+        await first.set(1, document)
+        self.assertEqual(await second.fetch(1), document)
+        self.assertIsNot(second[1], document)
+
+    async def test_local_size(self):
+        cache = self.first.cache("small", size=2)
+        for key in range(3):
+            cache.fill(key, key)
+        self.assertEqual(sorted(cache), [1, 2])
+        self.assertEqual(await self.redis.keys("test:small:*"), [])
+
+    async def test_shared_set(self):
+        first, second = self.first.set("afk"), self.second.set("afk")
+        first.add(1)
+        first.add(2)
+        await settle()
+        self.assertEqual(set(second), {1, 2})
+        self.assertFalse(second.isdisjoint([2, 3]))
+
+        second.discard(1)
+        await settle()
+        self.assertNotIn(1, first)
+
+        first.replace([3, 4])
+        await settle()
+        self.assertEqual(set(second), {3, 4})
+        second.replace([5], publish=False)
+        await settle()
+        self.assertEqual(set(first), {3, 4})
+
+    async def test_redis_down(self):
+        bus = CacheBus(retry_after=60)
+        await bus.start(DownRedis())
+        self.addAsyncCleanup(bus.stop)
+
+        async def loader(key: int) -> str:
+            return f"loaded {key}"
+
+        cache = bus.cache("configs", loader=loader)
+        self.assertEqual(await cache.fetch(1), "loaded 1")
+        await cache.set(2, "set")
+        self.assertEqual(cache[2], "set")
+        self.assertEqual(await cache.fetch(2), "set")
+        await settle()
+        # the subscription and the first command failed, Redis isn't tried again before retry_after
+        self.assertFalse(bus.available)
+        self.assertEqual(bus.errors, 2)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
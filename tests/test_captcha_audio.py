@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import io
+import random
+import wave
+from unittest import TestCase
+
+import numpy as np
+
+from benchmarks.captcha_audio import LegacyAudioCaptcha, legacy_change_sound, legacy_change_speed, legacy_mix_wave
+from utilities.captcha.audio import WAVE_SAMPLE_RATE, AudioCaptcha, change_sound, change_speed, create_noise, mix_wave
+
+
+class TestAudioCaptcha(TestCase):
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(0)
+        self.body = self.rng.integers(0, 256, 4000, dtype=np.uint8)
+
+    def test_change_sound(self):
+        # sourcery skip: no-loop-in-tests
+        for level in (0.2, 0.8, 1.19):
+            with self.subTest(level=level):
+                expected = legacy_change_sound(bytearray(self.body.tobytes()), level)
+                self.assertEqual(change_sound(self.body, level).tobytes(), bytes(expected))
+
+    def test_mix_wave(self):
+        dst = self.rng.integers(0, 256, 5000, dtype=np.uint8)
+        expected = legacy_mix_wave(bytearray(self.body.tobytes()), bytearray(dst.tobytes()))
+        self.assertEqual(mix_wave(self.body, dst).tobytes(), bytes(expected))
+
+    def test_change_speed(self):
+        # sourcery skip: no-loop-in-tests
+        for speed in (0.9, 1.19, 1.4, 0.8):
+            with self.subTest(speed=speed):
+                expected = np.frombuffer(legacy_change_speed(bytearray(self.body.tobytes()), speed), dtype=np.uint8)
+                result = change_speed(self.body, speed)
+                self.assertEqual(len(result), len(expected))
+                # identical except the tail the old loop left zeroed
+                self.assertGreater(np.mean(result == expected), 0.999)
+
+    def test_create_noise(self):
+        noise = create_noise(100_000, 4)
+        self.assertEqual(noise.dtype, np.uint8)
+        self.assertEqual(set(np.unique(noise).tolist()), {126, 127, 128, 129})
+
+    def test_wave_format(self):
+        captcha = AudioCaptcha()
+        data = captcha.generate("1234")
+        self.assertIsInstance(data, bytearray)
+
+        with wave.open(io.BytesIO(bytes(data))) as w:
+            self.assertEqual(w.getnchannels(), 1)
+            self.assertEqual(w.getsampwidth(), 1)
+            self.assertEqual(w.getframerate(), WAVE_SAMPLE_RATE)
+            self.assertGreater(w.getnframes(), WAVE_SAMPLE_RATE * 4)
+
+    def test_statistically_equivalent(self):
+        random.seed(1)
+        np.random.seed(1)
+        new = np.frombuffer(bytes(AudioCaptcha().generate("123456")[44:]), dtype=np.uint8).astype(float)
+        random.seed(1)
+        old = np.frombuffer(bytes(LegacyAudioCaptcha().generate("123456")[44:]), dtype=np.uint8).astype(float)
+
+        self.assertAlmostEqual(len(new) / len(old), 1, delta=0.01)
+        self.assertAlmostEqual(new.mean(), old.mean(), delta=1)
+        self.assertAlmostEqual(new.std(), old.std(), delta=max(old.std() * 0.1, 1))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
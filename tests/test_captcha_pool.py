@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase
+
+from utilities.captcha.pool import CaptchaPool
+
+
+def _fake_captcha() -> tuple[str, bytes]:
+    answer = uuid.uuid4().hex[:6]
+    return answer, answer.encode()
+
+
+class _Flaky:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+
+    def __call__(self) -> tuple[str, bytes]:
+        if self.failures:
+            self.failures -= 1
+            msg = "renderer crashed"
+            raise RuntimeError(msg)
+        return _fake_captcha()
+
+
+class TestCaptchaPool(IsolatedAsyncioTestCase):
+    async def test_concurrent_verifications(self):
+        async with CaptchaPool(size=500, batch_size=100, factory=_fake_captcha) as pool:
+            await asyncio.wait_for(pool.wait_until_full(), timeout=30)
+
+            items = await asyncio.gather(*(pool.get() for _ in range(1000)))
+
+            self.assertEqual(len(items), 1000)
+            # every captcha is handed out exactly once
+            self.assertEqual(len({item.answer for item in items}), 1000)
+            self.assertEqual(pool.served + pool.misses, 1000)
+            self.assertGreaterEqual(pool.served, 500)
+
+            for item in items:
+                self.assertEqual(item.data, item.answer.encode())
+
+            # consumption wakes the worker up again
+            await asyncio.wait_for(pool.wait_until_full(), timeout=30)
+
+    async def test_expired_items_are_skipped(self):
+        pool = CaptchaPool(size=3, ttl=0.05, factory=_fake_captcha)
+        await pool.start()
+        await asyncio.wait_for(pool.wait_until_full(), timeout=30)
+
+        pool._task.cancel()  # type: ignore
+        await asyncio.sleep(0.1)
+
+        self.assertIsNone(pool.get_nowait())
+        self.assertEqual(pool.expired, 3)
+        await pool.close()
+
+    async def test_refill_survives_errors(self):
+        with ThreadPoolExecutor(1) as executor:
+            pool = CaptchaPool(size=3, factory=_Flaky(2), executor=executor, retry_delay=0.01)
+            async with pool:
+                await asyncio.wait_for(pool.wait_until_full(), timeout=5)
+            self.assertEqual(pool.failures, 2)
+
+    async def test_audio_captcha(self):
+        async with CaptchaPool("audio", size=2, length=4) as pool:
+            await asyncio.wait_for(pool.wait_until_full(), timeout=60)
+            item = await pool.get()
+
+        self.assertEqual(len(item.answer), 4)
+        self.assertTrue(item.data.startswith(b"RIFF"))
+
+    async def test_image_captcha(self):
+        async with CaptchaPool("image", size=2) as pool:
+            await asyncio.wait_for(pool.wait_until_full(), timeout=60)
+            first, second = pool.get_nowait(), pool.get_nowait()
+
+        assert first is not None and second is not None
+        self.assertNotEqual(first.answer, second.answer)
+        self.assertTrue(first.data.startswith(b"\x89PNG"))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+from time import monotonic
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from benchmarks.bot.database import InMemoryRedis
+from core.cache import CacheBus
+from core.cluster import Cluster, ClusterIPC, Launcher, shard_ranges
+
+
+async def settle() -> None:
+    # the publish, the delivery to the other buses and what their handlers publish back
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestShards(TestCase):
+    def test_ranges(self):
+        self.assertEqual(shard_ranges(10, 3), [range(0, 4), range(4, 7), range(7, 10)])
+        self.assertEqual(shard_ranges(2, 2), [range(0, 1), range(1, 2)])
+        with self.assertRaises(ValueError):
+            shard_ranges(2, 3)
+        with self.assertRaises(ValueError):
+            Cluster(2, 2, 4)
+
+    def test_guilds(self):
+        cluster = Cluster(1, 2, 4)
+        self.assertEqual(cluster.shard_ids, [2, 3])
+        # shard 3 of 4
+        self.assertEqual(cluster.cluster_of_guild(3 << 22 | 12345), 1)
+        self.assertEqual(cluster.cluster_of_guild(5 << 22), 0)
+
+
+class TestClusterIPC(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = InMemoryRedis()
+        self.clusters: list[ClusterIPC] = []
+        for index in range(3):
+            bus = CacheBus(namespace="test")
+            await bus.start(self.redis)
+            ipc = ClusterIPC(bus, Cluster(index, 3, 6), lease=1, timeout=0.2)
+            self.clusters.append(ipc)
+            self.addAsyncCleanup(bus.stop)
+            self.addAsyncCleanup(ipc.stop)
+        await settle()
+
+    async def test_broadcast(self):
+        seen: list[tuple[int, str]] = []
+        for ipc in self.clusters:
+
+            async def handler(payload: str, cluster: int = ipc.cluster.id) -> None:
+                seen.append((cluster, payload))
+
+            ipc.handlers["hello"] = handler
+
+        await self.clusters[0].broadcast("hello", "all")
+        await self.clusters[0].send(2, "hello", "one")
+        await self.clusters[1].broadcast("hello", "others", include_self=False)
+        await settle()
+        self.assertEqual(
+            sorted(seen),
+            [(0, "all"), (0, "others"), (1, "all"), (2, "all"), (2, "one"), (2, "others")],
+        )
+
+    async def test_request(self):
+        for ipc in self.clusters:
+
+            async def stats(payload: dict, cluster: int = ipc.cluster.id) -> dict:
+                return {"guilds": cluster * payload["factor"]}
+
+            ipc.handlers["stats"] = stats
+
+        self.assertEqual(
+            await self.clusters[1].request("stats", {"factor": 10}),
+            {0: {"guilds": 0}, 1: {"guilds": 10}, 2: {"guilds": 20}},
+        )
+        self.assertEqual(await self.clusters[0].request("stats", {"factor": 1}, to=2), {2: {"guilds": 2}})
+
+        # a cluster that doesn't answer is left out once the timeout passed
+        self.clusters[2].bus.channels.clear()
+        started = monotonic()
+        answers = await self.clusters[0].request("stats", {"factor": 1})
+        self.assertEqual(set(answers), {0, 1})
+        self.assertGreaterEqual(monotonic() - started, 0.2)
+
+    async def test_election(self):
+        changes: list[tuple[int, bool]] = []
+        for ipc in self.clusters:
+
+            async def listener(leader: bool, cluster: int = ipc.cluster.id) -> None:
+                changes.append((cluster, leader))
+
+            ipc.leader_listeners.append(listener)
+
+        results = [await ipc.campaign() for ipc in self.clusters]
+        self.assertEqual(results, [True, False, False])
+        # renewing keeps it
+        self.assertTrue(await self.clusters[0].campaign())
+        # -1 without an expiry
+        self.assertGreaterEqual(await self.redis.ttl("test:cluster:leader"), 0)
+
+        await self.clusters[0].stop()
+        self.assertTrue(await self.clusters[2].campaign())
+        self.assertFalse(await self.clusters[1].campaign())
+        self.assertEqual(changes, [(0, True), (0, False), (2, True)])
+
+    async def test_lease_changed_hands(self):
+        self.assertTrue(await self.clusters[0].campaign())
+        # the lease ran out and another process took it meanwhile, without an expiry
+        await self.redis.set("test:cluster:leader", "someone else")
+        self.assertFalse(await self.clusters[0].campaign())
+        self.assertEqual(await self.redis.ttl("test:cluster:leader"), -1)
+
+        await self.clusters[0].stop()
+        self.assertEqual(await self.redis.get("test:cluster:leader"), "someone else")
+
+    async def test_failover(self):
+        for ipc in self.clusters:
+            await ipc.start()
+        await asyncio.sleep(0.05)
+        self.assertEqual([ipc.leader for ipc in self.clusters].count(True), 1)
+
+        leader = next(ipc for ipc in self.clusters if ipc.leader)
+        # gone without giving the lead up, the others wait for the lease to run out
+        leader._task.cancel()
+        leader.leader = False
+        deadline = monotonic() + 3
+        while not any(ipc.leader for ipc in self.clusters) and monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self.assertTrue(any(ipc.leader for ipc in self.clusters if ipc is not leader))
+
+    async def test_single_cluster(self):
+        bus = CacheBus()
+        ipc = ClusterIPC(bus, Cluster())
+        await ipc.start()
+        self.addAsyncCleanup(ipc.stop)
+        # no Redis needed
+        self.assertTrue(ipc.leader)
+
+        async def ping(payload: None) -> str:
+            return "pong"
+
+        ipc.handlers["ping"] = ping
+        self.assertEqual(await ipc.request("ping"), {0: "pong"})
+
+
+class TestLauncher(IsolatedAsyncioTestCase):
+    def launcher(self, code: str, **kwargs) -> Launcher:
+        options = {"backoff": 0.05, "max_backoff": 0.2, "stable_after": 60.0, "stagger": 0.0, **kwargs}
+        return Launcher([sys.executable, "-c", code], clusters=2, shard_count=4, **options)
+
+    async def test_restarts(self):
+        # cluster 0 crashes three times, cluster 1 shuts down cleanly
+        code = (
+            "import os, sys, pathlib\n"
+            "if os.environ['CLUSTER_ID'] == '1' and os.environ['SHARD_COUNT'] == '4': sys.exit(0)\n"
+            "path = pathlib.Path(os.environ['RUNS'])\n"
+            "runs = int(path.read_text() or 0) + 1 if path.exists() else 1\n"
+            "path.write_text(str(runs))\n"
+            "sys.exit(1 if runs < 4 else 0)\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            launcher = self.launcher(code, env={"RUNS": f"{directory}/runs"})
+            await asyncio.wait_for(launcher.run(), 10)
+
+        crashing, clean = launcher.workers[0], launcher.workers[1]
+        self.assertEqual(crashing.exit_codes, [1, 1, 1, 0])
+        self.assertEqual(crashing.restarts, 3)
+        # doubled every time it crashed right after starting, up to max_backoff
+        self.assertEqual(crashing.delay, 0.2)
+        self.assertEqual((clean.exit_codes, clean.restarts), ([0], 0))
+
+    async def test_stop(self):
+        launcher = self.launcher("import time; time.sleep(60)")
+        running = asyncio.create_task(launcher.run())
+        while not all(worker.process for worker in launcher.workers.values()):
+            await asyncio.sleep(0.01)
+        await launcher.stop(timeout=5)
+        await asyncio.wait_for(running, 5)
+        self.assertTrue(all(worker.restarts == 0 for worker in launcher.workers.values()))
+        self.assertTrue(all(worker.process.returncode is not None for worker in launcher.workers.values()))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+from interactions.buttons.__connect_four import WIN_SCORE, Bitboard, Engine
+
+
+def position_from(moves: str, width: int = 7, height: int = 6) -> Bitboard:
+    """Position after playing the (1-based) columns in ``moves``."""
+    position = Bitboard(width, height)
+    for column in moves:
+        position.play(int(column) - 1)
+    return position
+
+
+class TestBitboard(TestCase):
+    def test_from_grid(self):
+        grid = [[0] * 7 for _ in range(7)]
+        grid[6][3] = 1
+        grid[5][3] = 2
+        grid[6][0] = 1
+        position = Bitboard.from_grid(grid, player=2)
+
+        self.assertEqual(position.moves, 3)
+        self.assertEqual(position.row_of(3), 4)
+        self.assertEqual(position.row_of(0), 5)
+        self.assertEqual(position.row_of(6), 6)
+        # stones of the player to move
+        self.assertEqual(position.current, 1 << (3 * 8 + 1))
+
+    def test_alignments(self):
+        # sourcery skip: no-loop-in-tests
+        cases = {
+            "vertical": "1212121",
+            "horizontal": "1122334",
+            "diagonal": "12233434454",
+            "anti diagonal": "76655454434",
+        }
+        for name, moves in cases.items():
+            with self.subTest(name):
+                before = position_from(moves[:-1])
+                self.assertTrue(before.is_winning_move(int(moves[-1]) - 1))
+                # the player who just moved is the one not to move
+                after = position_from(moves)
+                self.assertTrue(after.aligned(after.current ^ after.mask))
+
+    def test_no_wrap_between_columns(self):
+        # three on top of column 1 and one at the bottom of column 2 are not a line
+        position = position_from("2111141")
+        self.assertFalse(position.aligned(position.current ^ position.mask))
+        self.assertFalse(position.aligned(position.current))
+
+    def test_full_column(self):
+        position = position_from("111111")
+        self.assertFalse(position.can_play(0))
+        self.assertTrue(position.can_play(1))
+
+    def test_large_board(self):
+        position = position_from("9898989", width=9, height=9)
+        self.assertTrue(position.aligned(position.current ^ position.mask))
+
+
+class TestEngine(TestCase):
+    def test_takes_immediate_win(self):
+        column, score = Engine().best_move(position_from("121212"), depth=4)
+        self.assertEqual(column, 0)
+        self.assertGreaterEqual(score, WIN_SCORE - 42)
+
+    def test_blocks_threat(self):
+        # the opponent threatens to complete the bottom row in column 4
+        column, _ = Engine().best_move(position_from("1727"), depth=4)
+        self.assertEqual(column, 3)
+
+    def test_finds_forced_win(self):
+        # two open ends on the bottom row, the player to move wins in two
+        _, score = Engine().best_move(position_from("3344"), depth=4)
+        self.assertGreaterEqual(score, WIN_SCORE - 42)
+
+    def test_budget_is_respected(self):
+        engine = Engine(9, 9)
+        column, _ = engine.best_move(Bitboard(9, 9), depth=81, budget=0.2)
+        self.assertIn(column, range(9))
+
+    def test_difficulties(self):
+        # sourcery skip: no-loop-in-tests
+        for difficulty in ("easy", "medium", "hard", "impossible"):
+            with self.subTest(difficulty):
+                position = position_from("4455")
+                self.assertIn(Engine().play(position, difficulty), range(7))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
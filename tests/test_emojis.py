@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import random
+import re
+from unittest import TestCase
+
+import emojis
+from emojis import db
+from emojis.db.db import EMOJI_DB
+from emojis.emojis import ALIAS_TO_EMOJI, EMOJI_TO_ALIAS, TOKENIZER
+
+# the previous implementation, a regex alternation of every emoji, longest first
+LEGACY_EMOJI_RE = re.compile(
+    "({})".format("|".join(re.escape(emoji) for emoji in sorted(ALIAS_TO_EMOJI.values(), key=len, reverse=True))),
+)
+LEGACY_ALIAS_RE = re.compile("({})".format("|".join(re.escape(alias) for alias in ALIAS_TO_EMOJI)))
+
+
+class TestDatabase(TestCase):
+    def test_lookups(self):
+        smile = db.get_emoji_by_alias("smile")
+        self.assertEqual(smile.emoji, "😄")
+        self.assertIs(db.get_emoji_by_code("😄"), smile)
+        self.assertIsNone(db.get_emoji_by_code("x"))
+        self.assertIsNone(db.get_emoji_by_alias("not an alias"))
+        self.assertEqual(db.get_emoji_by_alias("satisfied").emoji, "😆")
+
+    def test_filters_match_a_scan(self):
+        self.assertEqual(
+            list(db.get_emojis_by_tag("HAPPY")),
+            [emoji for emoji in EMOJI_DB if "happy" in emoji.tags],
+        )
+        self.assertEqual(
+            list(db.get_emojis_by_category("smileys & emotion")),
+            [emoji for emoji in EMOJI_DB if emoji.category == "Smileys & Emotion"],
+        )
+        self.assertEqual(list(db.get_emojis_by_tag("no such tag")), [])
+        self.assertIn("Flags", db.get_categories())
+        self.assertIn("happy", db.get_tags())
+
+
+class TestTokenizer(TestCase):
+    def test_same_as_legacy(self):
+        # sourcery skip: no-loop-in-tests
+        rng = random.Random(0)
+        pieces = [emoji.emoji for emoji in EMOJI_DB] + [f":{emoji.aliases[0]}:" for emoji in EMOJI_DB]
+        pieces += [*"abc 1#", ":", "::", ":foo", "‍", "🏽"]
+        for _ in range(100):
+            text = "".join(rng.choice(pieces) for _ in range(40))
+            with self.subTest(text=text):
+                self.assertEqual(
+                    list(TOKENIZER.spans(text)),
+                    [match.span() for match in LEGACY_EMOJI_RE.finditer(text)],
+                )
+                self.assertEqual(
+                    emojis.decode(text),
+                    LEGACY_EMOJI_RE.sub(lambda match: EMOJI_TO_ALIAS[match.group()], text),
+                )
+                self.assertEqual(
+                    emojis.encode(text),
+                    LEGACY_ALIAS_RE.sub(lambda match: ALIAS_TO_EMOJI[match.group()], text),
+                )
+
+    def test_encode_decode(self):
+        self.assertEqual(emojis.encode("hi :smile: :snake: :nope: ::smile:"), "hi 😄 🐍 :nope: :😄")
+        self.assertEqual(emojis.encode(":foo:smile:"), ":foo😄")
+        self.assertEqual(emojis.decode("hi 😄 🐍 1️⃣ 1"), "hi :smile: :snake: :one: 1")
+
+    def test_sequences_are_one_emoji(self):
+        text = "👍🏽 👩🏽‍💻 👨‍👩‍👧 ❤️ a‍b 😄‍"
+        self.assertEqual(list(emojis.iter(text)), ["👍🏽", "👩🏽‍💻", "👨‍👩‍👧", "❤️", "😄"])
+        self.assertEqual(emojis.count(text), 5)
+        self.assertEqual(emojis.count("😄😄🐍", unique=True), 2)
+        self.assertEqual(emojis.get("😄😄🐍"), {"😄", "🐍"})
+        self.assertEqual(emojis.count("no emoji here, 123 #"), 0)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from discord.gateway import DiscordWebSocket
+
+from core.gateway import GatewayEventRing
+
+
+class TestGatewayEventRing(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.parsed = []
+        self.parsers = {"MESSAGE_CREATE": self.parsed.append, "TYPING_START": self.parsed.append}
+
+    def websocket(self, shard_id: int = 0) -> DiscordWebSocket:
+        # what DiscordWebSocket.from_client sets, without a socket
+        websocket = DiscordWebSocket(None, loop=asyncio.get_running_loop())  # type: ignore
+        websocket._discord_parsers = self.parsers
+        websocket._dispatch = lambda *args: None
+        websocket.shard_id = shard_id
+        websocket.sequence = None
+        return websocket
+
+    async def receive(self, websocket: DiscordWebSocket, event: str | None, sequence: int | None = None) -> str:
+        raw = json.dumps({"op": 0 if event else 11, "t": event, "s": sequence, "d": {"content": "hello"}})
+        await websocket.received_message(raw)
+        return raw
+
+    async def test_disabled_by_default(self):
+        ring = GatewayEventRing()
+        websocket = self.websocket()
+        ring.attach(websocket)
+        await self.receive(websocket, "MESSAGE_CREATE", 1)
+
+        self.assertIs(websocket._discord_parsers, self.parsers)
+        self.assertEqual(len(ring), 0)
+        self.assertEqual(len(self.parsed), 1)
+
+    async def test_trace(self):
+        ring = GatewayEventRing(size=2)
+        websocket = self.websocket()
+        ring.enable(0, websocket=websocket)
+
+        raw = await self.receive(websocket, "MESSAGE_CREATE", 1)
+        await self.receive(websocket, None)
+        await self.receive(websocket, "TYPING_START", 2)
+        await self.receive(websocket, "MESSAGE_CREATE", 3)
+
+        self.assertEqual(len(self.parsed), 3)
+        self.assertEqual([(entry.event, entry.sequence) for entry in ring.entries], [("TYPING_START", 2), ("MESSAGE_CREATE", 3)])
+        self.assertEqual(ring.entries[-1].size, len(raw))
+        self.assertIsNone(ring.entries[-1].payload)
+        self.assertEqual(ring.counts, {"MESSAGE_CREATE": 2, "TYPING_START": 1})
+        self.assertEqual(set(ring.rates()), {"MESSAGE_CREATE", "TYPING_START"})
+        self.assertEqual(set(ring.rates(60)), {"MESSAGE_CREATE", "TYPING_START"})
+
+        ring.disable(0)
+        await self.receive(websocket, "MESSAGE_CREATE", 4)
+        self.assertIs(websocket._discord_parsers, self.parsers)
+        self.assertEqual(ring.counts["MESSAGE_CREATE"], 2)
+
+    async def test_capture_and_reconnect(self):
+        ring = GatewayEventRing()
+        ring.enable(1, capture=True)
+
+        other = self.websocket(shard_id=0)
+        ring.attach(other)
+        await self.receive(other, "MESSAGE_CREATE", 1)
+        self.assertEqual(len(ring), 0)
+
+        # a new websocket of the shard, as on a reconnect
+        for _ in range(2):  # sourcery skip: no-loop-in-tests
+            websocket = self.websocket(shard_id=1)
+            ring.attach(websocket)
+            raw = await self.receive(websocket, "MESSAGE_CREATE", 7)
+
+        self.assertEqual(len(ring), 2)
+        self.assertEqual(ring.entries[-1].payload, raw)
+        self.assertEqual(ring.shards, {1: True})
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
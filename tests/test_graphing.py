@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import numpy as np
+
+from utilities.imaging.graphing import _clean_implicit_mul, _compile, _sample, render_boxplot, render_plot
+
+
+class TestGraphing(TestCase):
+    def setUp(self) -> None:
+        self.equations: list[str] = ["2x+1", "x**2", "sin(x)", "1/x", "sqrt(x)", "tan(x)"]
+        self.datasets: list[list[float]] = [[1, 2, 3, 4, 5], [2.5, 2.5, 7, 9], [10, -3, 4, 4, 8, 1]]
+
+    def test_compile_cache(self):
+        _compile.cache_clear()
+        render_plot("2x + 1")
+        render_plot("2*x+1")
+        self.assertEqual(_compile.cache_info().misses, 1)
+        self.assertEqual(_compile.cache_info().hits, 1)
+
+    def test_adaptive_sampling(self):
+        x_vals, y_vals = _sample(_compile(_clean_implicit_mul("2x+1")), (-20, 20))
+        # a straight line needs no refinement
+        self.assertEqual(x_vals.size, 129)
+
+        x_vals, y_vals = _sample(_compile("sin(x)"), (-20, 20))
+        self.assertGreater(x_vals.size, 129)
+        self.assertTrue(np.all(np.diff(x_vals) > 0))
+        np.testing.assert_allclose(y_vals, np.sin(x_vals))
+
+    def test_concurrent_rendering(self):
+        # sourcery skip: no-loop-in-tests
+        expected_plots = {equation: render_plot(equation).getvalue() for equation in self.equations}
+        expected_boxes = [render_boxplot(data).getvalue() for data in self.datasets]
+
+        jobs = self.equations * 8
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            plots = list(pool.map(lambda eq: render_plot(eq).getvalue(), jobs))
+            boxes = list(pool.map(lambda data: render_boxplot(data).getvalue(), self.datasets * 8))
+
+        for equation, image in zip(jobs, plots):
+            with self.subTest(equation=equation):
+                self.assertEqual(image, expected_plots[equation])
+
+        for index, image in enumerate(boxes):
+            with self.subTest(dataset=index):
+                self.assertEqual(image, expected_boxes[index % len(self.datasets)])
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
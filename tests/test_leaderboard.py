@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+from pymongo import DeleteOne, UpdateOne
+
+from core.leaderboard import BACKFILL_MARKER, GameLeaderboards
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        value = document.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$exists" and (key in document) != operand:
+                return False
+            if key not in document and op != "$exists":
+                return False
+            if (op == "$in" and value not in operand) or (op == "$gt" and not value > operand):
+                return False
+            if op == "$lt" and not value < operand:
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, collection: FakeCollection, documents: list[dict]) -> None:
+        self.collection = collection
+        self.documents = documents
+
+    def sort(self, key: str, direction: int) -> FakeCursor:
+        self.documents.sort(key=lambda document: document[key], reverse=direction < 0)
+        return self
+
+    def limit(self, limit: int) -> FakeCursor:
+        self.documents = self.documents[:limit]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            self.collection.read += 1
+            yield dict(document)
+
+
+class FakeCollection:
+    """Just enough of a motor collection, ``read`` counts the documents handed out."""
+
+    def __init__(self, documents: list[dict] | None = None) -> None:
+        self.documents = documents or []
+        self.read = 0
+
+    def find(self, query: dict, projection: dict | None = None) -> FakeCursor:
+        return FakeCursor(self, [document for document in self.documents if matches(document, query)])
+
+    async def find_one(self, query: dict, projection: dict | None = None) -> dict | None:
+        return next((dict(document) for document in self.documents if matches(document, query)), None)
+
+    async def count_documents(self, query: dict) -> int:
+        return sum(matches(document, query) for document in self.documents)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> None:
+        for document in self.documents:
+            if matches(document, query):
+                document.update(update["$set"])
+                return
+        if upsert:
+            self.documents.append({**query, **update["$set"]})
+
+    async def delete_one(self, query: dict) -> None:
+        self.documents = [document for document in self.documents if not matches(document, query)]
+
+    async def delete_many(self, query: dict) -> None:
+        self.documents = [document for document in self.documents if not matches(document, query)]
+
+    async def bulk_write(self, operations: list, ordered: bool = True) -> None:
+        for operation in operations:
+            if isinstance(operation, UpdateOne):
+                await self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            elif isinstance(operation, DeleteOne):
+                await self.delete_one(operation._filter)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, member_ids: set[int]) -> None:
+        self.id = guild_id
+        self.member_ids = member_ids
+        self.chunked = False
+
+    @property
+    def members(self) -> list[SimpleNamespace]:
+        return [SimpleNamespace(id=member_id, bot=False) for member_id in self.member_ids]
+
+    def get_member(self, member_id: int) -> SimpleNamespace | None:
+        return SimpleNamespace(id=member_id, guild=self, bot=False) if member_id in self.member_ids else None
+
+    async def chunk(self, *, cache: bool) -> None:
+        self.chunked = True
+
+
+class FakeBot:
+    def __init__(self, guilds: list[FakeGuild]) -> None:
+        self.guilds = guilds
+
+    def get_user(self, user_id: int) -> SimpleNamespace:
+        return SimpleNamespace(id=user_id, mutual_guilds=[guild for guild in self.guilds if user_id in guild.member_ids])
+
+
+class TestGameLeaderboards(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        # 1000 players everywhere, of which the guild has every tenth
+        self.stats = FakeCollection(
+            [{"_id": user_id, "game_twenty48_played": user_id, "game_chess_stat": []} for user_id in range(1, 1001)],
+        )
+        self.guild = FakeGuild(10, set(range(10, 1001, 10)))
+        self.other = FakeGuild(20, {5, 10})
+        self.projection = FakeCollection()
+        self.leaderboards = GameLeaderboards(FakeBot([self.guild, self.other]), self.projection, self.stats)
+
+    async def test_top_of_guild(self):
+        top = await self.leaderboards.top("game_twenty48_played", guild=self.guild, limit=3)
+        self.assertEqual([data["_id"] for data in top], [1000, 990, 980])
+        self.assertTrue(self.guild.chunked)
+        self.assertNotIn("game_chess_stat", top[0])
+
+        self.stats.read = self.projection.read = 0
+        top = await self.leaderboards.top("game_twenty48_played", guild=self.guild, ascending=True, limit=2)
+        self.assertEqual([data["_id"] for data in top], [10, 20])
+        # backfilled once, then only the requested rows are read
+        self.assertEqual((self.stats.read, self.projection.read), (0, 2))
+
+    async def test_backfill_marker(self):
+        await self.leaderboards.backfill(self.guild)
+        self.assertIsNotNone(await self.projection.find_one({"guild_id": 10, "user_id": BACKFILL_MARKER}))
+        # another process already did it
+        fresh = GameLeaderboards(self.leaderboards.bot, self.projection, self.stats)
+        self.stats.read = 0
+        await fresh.backfill(self.guild)
+        self.assertEqual(self.stats.read, 0)
+
+    async def test_global_top(self):
+        top = await self.leaderboards.top("game_twenty48_played", limit=2)
+        self.assertEqual([data["_id"] for data in top], [1000, 999])
+        self.assertEqual(self.projection.documents, [])
+
+    async def test_rank(self):
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 980, guild=self.guild), (3, 980))
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 980), (21, 980))
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 10, guild=self.guild, ascending=True), (1, 10))
+        self.assertIsNone(await self.leaderboards.rank("game_twenty48_played", 5, guild=self.guild))
+        self.assertIsNone(await self.leaderboards.rank("game_twenty48_moves", 10, guild=self.guild))
+
+    async def test_record_updates_every_mutual_guild(self):
+        await self.leaderboards.backfill(self.guild)
+        await self.leaderboards.backfill(self.other)
+        await self.stats.update_one({"_id": 10}, {"$set": {"game_twenty48_played": 5000}})
+        await self.leaderboards.record(10, guild=self.guild)
+
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 10, guild=self.guild), (1, 5000))
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 10, guild=self.other), (1, 5000))
+
+    async def test_members_joining_and_leaving(self):
+        await self.leaderboards.backfill(self.guild)
+        self.guild.member_ids.add(1)
+        await self.leaderboards.add_member(self.guild.get_member(1))
+        self.assertEqual(await self.leaderboards.rank("game_twenty48_played", 1, guild=self.guild), (101, 1))
+
+        await self.leaderboards.remove_member(10, 1000)
+        top = await self.leaderboards.top("game_twenty48_played", guild=self.guild, limit=1)
+        self.assertEqual(top[0]["_id"], 990)
+
+    async def test_prune_left_members(self):
+        await self.leaderboards.backfill(self.guild)
+        self.guild.member_ids.discard(1000)
+        await self.leaderboards.prune(self.guild, [1000, 990])
+        top = await self.leaderboards.top("game_twenty48_played", guild=self.guild, limit=1)
+        self.assertEqual(top[0]["_id"], 990)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import deque
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.local_cache import CacheRegistry, LocalCache, sizeof
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalCache(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch("core.local_cache.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lru(self):
+        cache: LocalCache[int, str] = LocalCache("lru", maxsize=2)
+        cache[1] = "one"
+        cache[2] = "two"
+        # 1 is the most recently used now, 2 goes
+        self.assertEqual(cache[1], "one")
+        cache[3] = "three"
+        self.assertEqual(sorted(cache), [1, 3])
+        self.assertEqual(cache.stats.evictions, 1)
+
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+        self.assertEqual(cache.stats.hit_ratio, 0.5)
+
+    def test_ttl(self):
+        cache: LocalCache[int, str] = LocalCache("ttl", ttl=10)
+        cache[1] = "one"
+        self.clock.now += 5
+        cache[2] = "two"
+        self.assertIn(1, cache)
+
+        self.clock.now += 6
+        self.assertNotIn(1, cache)
+        self.assertEqual(cache.items(), [(2, "two")])
+        self.clock.now += 5
+        # nothing read it, the sweep drops it
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.sweep(), 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.expirations, 2)
+
+    def test_bytes(self):
+        cache: LocalCache[int, str] = LocalCache("bytes", maxsize=None, max_bytes=100, sizeof=len)
+        cache[1] = "a" * 40
+        cache[2] = "b" * 40
+        self.assertEqual(cache.footprint(), 80)
+        cache[3] = "c" * 40
+        self.assertEqual(sorted(cache), [2, 3])
+        # replacing one doesn't count it twice
+        cache[3] = "c" * 10
+        self.assertEqual(cache.footprint(), 50)
+        del cache[2]
+        self.assertEqual(cache.footprint(), 10)
+
+        with self.assertRaises(ValueError):
+            LocalCache("unbounded", maxsize=None)
+
+    def test_setdefault(self):
+        cache: LocalCache[int, deque[int]] = LocalCache("pings", maxsize=4)
+        cache.setdefault(1, deque(maxlen=2)).append(1)
+        cache.setdefault(1, deque(maxlen=2)).append(2)
+        self.assertEqual(list(cache[1]), [1, 2])
+
+    def test_iteration(self):
+        cache: LocalCache[int, int] = LocalCache("iteration", maxsize=8)
+        cache.update({key: key for key in range(4)})
+        # dropping while iterating is fine
+        for key in cache:
+            if key % 2:
+                del cache[key]
+        self.assertEqual(cache.keys(), [0, 2])
+        self.assertEqual(cache.stats.hits, 0)
+
+    def test_sizeof(self):
+        self.assertGreater(sizeof({"a": ["x" * 100]}), sizeof({"a": []}) + 100)
+        self.assertGreater(sizeof(deque(["x" * 100])), 100)
+
+
+class TestCacheRegistry(TestCase):
+    def test_registry(self):
+        registry = CacheRegistry()
+        first = registry.cache("messages", maxsize=4, ttl=0)
+        first[1] = "one"
+        registry.cache("pings", maxsize=4)["me"] = "x" * 1000
+
+        self.assertEqual(registry.sweep(), 1)
+        report = registry.report()
+        self.assertLess(report.index("pings"), report.index("messages"))
+
+        # a reloaded cog gets a new one
+        second = registry.cache("messages", maxsize=4)
+        self.assertIs(registry.caches["messages"], second)
+        self.assertIsNot(first, second)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
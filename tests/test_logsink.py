@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import tempfile
+from pathlib import Path
+from time import time
+from unittest import IsolatedAsyncioTestCase
+
+import aiosqlite
+
+from core.logsink import LogSink, LogSinkHandler
+
+
+class TestLogSink(IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name, "logs.sqlite")
+
+    def sink(self, **kwargs) -> LogSink:
+        sink = LogSink(self.path, **kwargs)
+        self.addAsyncCleanup(sink.close)
+        return sink
+
+    async def count(self) -> int:
+        # what another connection sees is what was committed
+        async with aiosqlite.connect(self.path) as db, db.execute("SELECT COUNT(*) FROM log_entries") as cursor:
+            (count,) = await cursor.fetchone()
+        return count
+
+    async def test_written_once(self):
+        sink = self.sink(batch_size=100, flush_interval=60)
+        await sink.start()
+        at = time()
+        for _ in range(250):
+            # the same line at the same time, none of them may be lost or doubled
+            sink.put(logging.INFO, "same", created_at=at)
+        await asyncio.sleep(0)
+        await sink.stop()
+
+        self.assertEqual(sink.written, 250)
+        self.assertEqual(await self.count(), 250)
+        await sink.stop()
+        self.assertEqual(await self.count(), 250)
+        await sink.close()
+        self.assertIsNone(sink.db)
+
+    async def test_flushes_after_interval(self):
+        sink = self.sink(flush_interval=0.05)
+        await sink.start()
+        sink.put(logging.INFO, "one")
+        sink.put(logging.INFO, "two")
+        await asyncio.sleep(0.2)
+        self.assertEqual(await self.count(), 2)
+        self.assertEqual(len(sink), 0)
+        await sink.stop()
+
+    async def test_bounded(self):
+        sink = self.sink(max_queue=2)
+        self.assertTrue(sink.put(logging.INFO, "one"))
+        self.assertTrue(sink.put(logging.INFO, "two"))
+        self.assertFalse(sink.put(logging.INFO, "three"))
+        self.assertEqual(sink.dropped, 1)
+
+        await sink.start()
+        await sink.stop()
+        self.assertEqual(await self.count(), 2)
+
+    async def test_retention(self):
+        sink = self.sink(max_age=60, max_rows=5)
+        await sink.start()
+        now = time()
+        sink.put(logging.INFO, "old", created_at=now - 120)
+        for index in range(8):
+            sink.put(logging.INFO, f"line {index}", created_at=now + index)
+        await sink.stop()
+
+        self.assertEqual(await sink.prune(), 4)
+        entries = await sink.query()
+        self.assertEqual([entry.message for entry in entries], [f"line {index}" for index in range(7, 2, -1)])
+
+    async def test_query(self):
+        sink = self.sink()
+        await sink.start()
+        now = time()
+        sink.put(logging.DEBUG, "shard 0 connected", created_at=now - 7200)
+        sink.put(logging.WARNING, "shard 1 lagging by 50% now", logger="discord.gateway", created_at=now - 60)
+        sink.put(logging.ERROR, "Ignoring exception in command", extra={"command": "ping"}, created_at=now)
+        await sink.stop()
+
+        [entry] = await sink.query(level=logging.ERROR)
+        self.assertEqual(entry.extra, {"command": "ping"})
+        self.assertEqual(entry.level_name, "ERROR")
+
+        hour_ago = datetime.datetime.fromtimestamp(now - 3600, tz=datetime.timezone.utc)
+        self.assertEqual(len(await sink.query(since=hour_ago)), 2)
+        self.assertEqual(len(await sink.query(until=hour_ago)), 1)
+        self.assertEqual([entry.logger for entry in await sink.query(text="SHARD 1")], ["discord.gateway"])
+        # LIKE wildcards are matched as they are
+        self.assertEqual(len(await sink.query(text="50%")), 1)
+        self.assertEqual(len(await sink.query(text="_")), 0)
+        self.assertEqual(len(await sink.query(limit=2)), 2)
+
+    async def test_handler(self):
+        sink = self.sink()
+        await sink.start()
+        logger = logging.getLogger("tests.logsink")
+        handler = LogSinkHandler(sink, logging.WARNING)
+        logger.addHandler(handler)
+        try:
+            logger.info("not kept")
+            logger.warning("kept %s", "this")
+            await asyncio.to_thread(logger.error, "from a thread")
+            await asyncio.sleep(0)
+        finally:
+            logger.removeHandler(handler)
+        await sink.stop()
+
+        entries = await sink.query()
+        self.assertEqual({entry.message for entry in entries}, {"kept this", "from a thread"})
+        self.assertTrue(all(entry.logger == "tests.logsink" for entry in entries))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+import discord
+from core.resolver import MemberResolver
+
+
+def not_found() -> discord.NotFound:
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Member")
+
+
+class FakeGuild:
+    """Members are the ids in ``existing``, ``cached`` ones are in the member cache from the start."""
+
+    def __init__(self, existing: set[int], cached: set[int] = frozenset()) -> None:
+        self.id = 1
+        self.shard_id = 0
+        self.existing = existing
+        self.cache = {member_id: SimpleNamespace(id=member_id) for member_id in cached}
+        self.queries: list[list[int]] = []
+        self.fetches: list[int] = []
+
+    def get_member(self, member_id: int):
+        return self.cache.get(member_id)
+
+    async def query_members(self, *, limit: int, user_ids: list[int], cache: bool):
+        assert len(user_ids) <= limit <= 100
+        self.queries.append(list(user_ids))
+        await asyncio.sleep(0.01)
+        members = [SimpleNamespace(id=member_id) for member_id in user_ids if member_id in self.existing]
+        if cache:
+            self.cache.update((member.id, member) for member in members)
+        return members
+
+    async def fetch_member(self, member_id: int):
+        self.fetches.append(member_id)
+        await asyncio.sleep(0)
+        if member_id not in self.existing:
+            raise not_found()
+        return SimpleNamespace(id=member_id)
+
+
+class FakeBot:
+    def __init__(self, users: set[int] = frozenset()) -> None:
+        self.ratelimited = False
+        self.users = users
+        self.user_fetches: list[int] = []
+
+    def get_shard(self, shard_id: int):
+        return SimpleNamespace(is_ws_ratelimited=lambda: self.ratelimited)
+
+    def get_user(self, user_id: int):
+        return None
+
+    async def fetch_user(self, user_id: int):
+        self.user_fetches.append(user_id)
+        await asyncio.sleep(0.01)
+        if user_id not in self.users:
+            raise not_found()
+        return SimpleNamespace(id=user_id, user=True)
+
+
+class TestMemberResolver(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.bot = FakeBot()
+        self.resolver = MemberResolver(self.bot, negative_ttl=60, clock=lambda: self.now)
+
+    async def test_order_and_batching(self):
+        guild = FakeGuild(existing=set(range(0, 250, 2)), cached={0, 2})
+        ids = list(range(249, -1, -1))
+
+        members = await self.resolver.resolve_many(guild, ids)
+
+        self.assertEqual([member and member.id for member in members], [i if i % 2 == 0 else None for i in ids])
+        # 248 ids not in cache, in chunks of 100
+        self.assertEqual([len(query) for query in guild.queries], [100, 100, 48])
+        self.assertEqual(self.resolver.gateway_requests, 3)
+
+    async def test_concurrent_callers(self):
+        guild = FakeGuild(existing=set(range(20)))
+        results = await asyncio.gather(
+            *(self.resolver.resolve(guild, 5) for _ in range(10)),
+            *(self.resolver.resolve(guild, member_id) for member_id in range(10, 20)),
+        )
+
+        self.assertEqual([member.id for member in results], [5] * 10 + list(range(10, 20)))
+        # one request for everyone, the same id asked once
+        self.assertEqual(guild.queries, [[5, *range(10, 20)]])
+        self.assertEqual(self.resolver.coalesced, 9)
+
+    async def test_in_flight_is_shared(self):
+        guild = FakeGuild(existing={1, 2})
+        first = asyncio.create_task(self.resolver.resolve_many(guild, [1, 2]))
+        await asyncio.sleep(0.005)  # the first request is on its way
+        second = await self.resolver.resolve_many(guild, [2, 1])
+
+        self.assertEqual([member.id for member in second], [2, 1])
+        self.assertEqual([member.id for member in await first], [1, 2])
+        self.assertEqual(len(guild.queries), 1)
+
+    async def test_negative_cache(self):
+        guild = FakeGuild(existing=set())
+        self.assertIsNone(await self.resolver.resolve(guild, 7))
+        self.assertIsNone(await self.resolver.resolve(guild, 7))
+        self.assertEqual(len(guild.queries), 1)
+        self.assertEqual(self.resolver.negative_hits, 1)
+
+        self.now += 61
+        self.assertIsNone(await self.resolver.resolve(guild, 7))
+        self.assertEqual(len(guild.queries), 2)
+
+        # a member who joined since is in the cache, which is looked at first
+        self.now -= 30
+        guild.cache[7] = SimpleNamespace(id=7)
+        self.assertEqual((await self.resolver.resolve(guild, 7)).id, 7)
+
+    async def test_ratelimited_uses_http(self):
+        self.bot.ratelimited = True
+        guild = FakeGuild(existing={1})
+        members = await self.resolver.resolve_many(guild, [1, 2])
+
+        self.assertEqual([member and member.id for member in members], [1, None])
+        self.assertEqual(guild.queries, [])
+        self.assertEqual(sorted(guild.fetches), [1, 2])
+        self.assertEqual(self.resolver.http_requests, 2)
+
+    async def test_failed_request_is_not_cached(self):
+        guild = FakeGuild(existing={1})
+
+        async def timeout(**kwargs):
+            raise asyncio.TimeoutError
+
+        guild.query_members = timeout
+        self.assertIsNone(await self.resolver.resolve(guild, 1))
+        del guild.query_members
+        self.assertEqual((await self.resolver.resolve(guild, 1)).id, 1)
+
+    async def test_users(self):
+        self.bot.users = {3, 4}
+        guild = FakeGuild(existing={1})
+        users = await self.resolver.resolve_many_users(guild, [1, 3, 9, 3])
+        self.assertEqual([user and user.id for user in users], [1, 3, None, 3])
+        # members first, users only for the rest
+        self.assertEqual(guild.queries, [[1, 3, 9]])
+        self.assertEqual(sorted(self.bot.user_fetches), [3, 9])
+
+        self.bot.user_fetches.clear()
+        users = await asyncio.gather(*(self.resolver.resolve_user(4) for _ in range(5)))
+        self.assertEqual({user.id for user in users}, {4})
+        self.assertEqual(self.bot.user_fetches, [4])
+
+        self.assertIsNone(await self.resolver.resolve_user(9))
+        self.assertEqual(self.bot.user_fetches, [4])
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from core import Cog
+from core.pipeline import HALT, MessageFeatures, MessagePipeline, Stage
+
+
+def message(content: str = "hello", *, author_id: int = 5, bot: bool = False, guild: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=1,
+        content=content,
+        author=SimpleNamespace(id=author_id, bot=bot),
+        guild=SimpleNamespace(id=10) if guild else None,
+        channel=SimpleNamespace(id=20),
+        webhook_id=None,
+        raw_mentions=[123456789012345678] if "<@" in content else [],
+    )
+
+
+class TestMessageFeatures(TestCase):
+    def test_features(self):
+        features = MessageFeatures(
+            message("Check https://Example.com/x and <@123456789012345678> \N{GRINNING FACE} <:pog:123456789012345678>"),
+            config={"prefix": "$"},
+            bot_id=1,
+            owner_ids={5},
+        )
+        self.assertEqual(features.tokens[:2], ("check", "https"))
+        self.assertIn("pog", features.words)
+        self.assertEqual(features.urls, ("https://Example.com/x",))
+        self.assertEqual(features.domains, {"example.com"})
+        self.assertEqual(features.mentions, {123456789012345678})
+        self.assertEqual(features.emoji_count, 2)
+        self.assertTrue(features.is_owner)
+        self.assertFalse(features.is_self)
+        self.assertEqual(features.config["prefix"], "$")
+
+    def test_computed_once(self):
+        features = MessageFeatures(message("Hello World"))
+        self.assertIs(features.tokens, features.tokens)
+
+    def test_immutable(self):
+        features = MessageFeatures(message())
+        with self.assertRaises(AttributeError):
+            features.content = "changed"  # type: ignore
+
+    def test_plain_text(self):
+        features = MessageFeatures(message("nothing to see here"))
+        self.assertEqual((features.urls, features.domains, features.mentions), ((), frozenset(), frozenset()))
+
+
+class TestMessagePipeline(IsolatedAsyncioTestCase):
+    async def run_pipeline(self, pipeline: MessagePipeline, msg: SimpleNamespace) -> dict:
+        tasks = pipeline.run(pipeline.features(msg))
+        await asyncio.gather(*tasks.values())
+        return tasks
+
+    async def test_filters(self):
+        seen = []
+
+        async def callback(features):
+            seen.append(features.content)
+
+        pipeline = MessagePipeline(bot_id=1)
+        pipeline.add(Stage("humans", callback))
+        pipeline.add(Stage("everyone", callback, ignore_bots=False, guild_only=False))
+        pipeline.add(Stage("links", callback, check=lambda f: f.urls))
+
+        self.assertEqual(set(await self.run_pipeline(pipeline, message())), {"humans", "everyone"})
+        self.assertEqual(set(await self.run_pipeline(pipeline, message(bot=True))), {"everyone"})
+        self.assertEqual(set(await self.run_pipeline(pipeline, message(guild=False))), {"everyone"})
+        self.assertEqual(set(await self.run_pipeline(pipeline, message(author_id=1))), set())
+        self.assertEqual(set(await self.run_pipeline(pipeline, message("https://a.b"))), {"humans", "everyone", "links"})
+        self.assertEqual(pipeline.timings()["links"].skipped, 4)
+        self.assertEqual(pipeline.messages, 5)
+
+    async def test_after_and_halt(self):
+        order = []
+
+        async def slow(features):
+            await asyncio.sleep(0.01)
+            order.append("slow")
+            return HALT if "spam" in features.content else None
+
+        async def fast(features):
+            order.append("fast")
+
+        async def dependent(features):
+            order.append("dependent")
+
+        pipeline = MessagePipeline()
+        pipeline.add(Stage("dependent", dependent, after=("slow",)))
+        pipeline.add(Stage("slow", slow))
+        pipeline.add(Stage("fast", fast))
+        self.assertEqual([stage.name for stage in pipeline.stages], ["slow", "dependent", "fast"])
+
+        await self.run_pipeline(pipeline, message())
+        self.assertEqual(order, ["fast", "slow", "dependent"])
+
+        order.clear()
+        tasks = await self.run_pipeline(pipeline, message("spam"))
+        self.assertEqual(order, ["fast", "slow"])
+        self.assertIs(tasks["dependent"].result(), HALT)
+        self.assertEqual(pipeline.timings()["dependent"].halted, 1)
+
+    async def test_errors_are_contained(self):
+        async def broken(features):
+            raise RuntimeError
+
+        async def fine(features):
+            return "ok"
+
+        pipeline = MessagePipeline()
+        pipeline.add(Stage("broken", broken))
+        pipeline.add(Stage("fine", fine, after=("broken",)))
+        with self.assertLogs("core.pipeline"):
+            tasks = await self.run_pipeline(pipeline, message())
+        self.assertEqual(tasks["fine"].result(), "ok")
+        self.assertEqual(pipeline.timings()["broken"].errors, 1)
+        self.assertEqual(pipeline.timings()["broken"].calls, 1)
+
+    async def test_tasks_kept_until_done(self):
+        async def callback(features):
+            await asyncio.sleep(0)
+
+        pipeline = MessagePipeline()
+        pipeline.add(Stage("a", callback))
+        pipeline.add(Stage("b", callback))
+        # nothing holds on to what run returns, as in on_message
+        pipeline.run(pipeline.features(message()))
+        self.assertEqual(len(pipeline._running), 2)
+        await asyncio.gather(*pipeline._running)
+        self.assertEqual(len(pipeline._running), 0)
+
+    def test_registration(self):
+        async def callback(features):
+            pass
+
+        pipeline = MessagePipeline()
+        pipeline.add(Stage("a", callback, after=("b",)))
+        with self.assertRaises(ValueError):
+            pipeline.add(Stage("a", callback))
+        with self.assertRaises(ValueError):
+            pipeline.add(Stage("b", callback, after=("a",)))
+        self.assertNotIn("b", pipeline)
+        self.assertIsNotNone(pipeline.remove("a"))
+        self.assertEqual(pipeline.stages, [])
+
+
+class TestCogStages(IsolatedAsyncioTestCase):
+    async def test_cog_stages(self):
+        class Games(Cog):
+            def __init__(self) -> None:
+                super().__init__()
+                self.channels = {20}
+                self.seen = []
+
+            @Cog.stage(check=lambda self, f: f.channel.id in self.channels)
+            async def guess(self, features):
+                self.seen.append(features.content)
+
+            @Cog.stage("games_log", after=("Games.guess",), ignore_bots=False)
+            async def log(self, features):
+                pass
+
+        cog = Games()
+        bot = SimpleNamespace(message_pipeline=MessagePipeline())
+        for stage in cog._message_stages():  # sourcery skip: no-loop-in-tests
+            bot.message_pipeline.add(stage)
+        self.assertEqual([stage.name for stage in bot.message_pipeline.stages], ["Games.guess", "games_log"])
+
+        tasks = bot.message_pipeline.run(bot.message_pipeline.features(message("guess")))
+        await asyncio.gather(*tasks.values())
+        self.assertEqual(cog.seen, ["guess"])
+
+        cog.channels.clear()
+        tasks = bot.message_pipeline.run(bot.message_pipeline.features(message("guess")))
+        self.assertEqual(set(tasks), {"games_log"})
+        await asyncio.gather(*tasks.values())
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
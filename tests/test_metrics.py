@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from discord.ext import tasks
+
+from core import Parrot
+from core.metrics import Histogram, LoopLagMonitor, Metrics, MongoCommandListener, current_site, instrument_loops
+
+
+class TestHistogram(TestCase):
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram("test")
+        for _ in range(90):  # sourcery skip: no-loop-in-tests
+            histogram.observe(0.0008)
+        for _ in range(10):  # sourcery skip: no-loop-in-tests
+            histogram.observe(0.2)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.sum, 2.072)
+        self.assertTrue(0.0005 <= histogram.quantile(0.5) <= 0.001)
+        self.assertTrue(0.1 <= histogram.quantile(0.99) <= 0.25)
+        self.assertEqual(histogram.cumulative()[-1], 100)
+        self.assertEqual(histogram.slowest, 0.2)
+
+    def test_beyond_the_last_bucket(self):
+        histogram = Histogram("test")
+        histogram.observe(30)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertAlmostEqual(histogram.quantile(0.99), 29.8)
+        self.assertEqual(Histogram("empty").quantile(0.5), 0.0)
+
+    def test_quantile_within_slowest(self):
+        histogram = Histogram("test")
+        histogram.observe(0.0011)
+        histogram.observe(0.0012)
+        self.assertLessEqual(histogram.quantile(0.99), 0.0012)
+
+
+class TestPrometheus(TestCase):
+    def test_render(self):
+        metrics = Metrics()
+        metrics.listener("message", 'Weird."Cog\\.on_message').observe(0.003)
+        metrics.command("ban").errors += 1
+        metrics.count_mongo("timers", "find", "loop:Parrot.global_write_data", 0.01)
+        metrics.count_http("api.example.com", 0.2, failed=True)
+        metrics.stage_timings = lambda: {"automod": SimpleNamespace(calls=3, skipped=4, seconds=0.5)}
+
+        text = metrics.render_prometheus()
+        labels = 'event="message",listener="Weird.\\"Cog\\\\.on_message"'
+        self.assertIn(f'parrot_listener_seconds_bucket{{{labels},le="0.005"}} 1', text)
+        self.assertIn(f"parrot_listener_seconds_count{{{labels}}} 1", text)
+        self.assertIn('parrot_command_errors_total{command="ban"} 1', text)
+        self.assertIn(
+            'parrot_mongo_operations_total{collection="timers",operation="find",site="loop:Parrot.global_write_data"} 1',
+            text,
+        )
+        self.assertIn('parrot_http_errors_total{host="api.example.com"} 1', text)
+        self.assertIn('parrot_stage_skipped_total{stage="automod"} 4', text)
+        self.assertIn("parrot_event_loop_lag_seconds_count 0", text)
+
+    def test_reset_keeps_histograms(self):
+        metrics = Metrics()
+        histogram = metrics.loop("Cog.loop")
+        histogram.observe(1)
+        metrics.count_http("example.com", 0.1)
+        metrics.reset()
+        self.assertIs(metrics.loop("Cog.loop"), histogram)
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(metrics.http, {})
+
+
+class TestMongoListener(TestCase):
+    def test_counts_by_collection_and_site(self):
+        metrics = Metrics()
+        listener = MongoCommandListener(metrics)
+        token = current_site.set("listener:Automod.on_message")
+        try:
+            event = SimpleNamespace(command_name="find", command={"find": "automodLogs"}, database_name="db", request_id=1)
+            listener.started(event)
+        finally:
+            current_site.reset(token)
+        listener.started(
+            SimpleNamespace(command_name="getMore", command={"collection": "timers"}, database_name="main", request_id=2),
+        )
+        listener.succeeded(SimpleNamespace(request_id=1, duration_micros=1500))
+        listener.failed(SimpleNamespace(request_id=2, duration_micros=100))
+
+        count = metrics.mongo["automodLogs", "find", "listener:Automod.on_message"]
+        self.assertEqual((count.calls, count.errors, count.seconds), (1, 0, 0.0015))
+        self.assertEqual(metrics.mongo["timers", "getMore", "unknown"].errors, 1)
+
+
+class TestInstrumentation(IsolatedAsyncioTestCase):
+    async def test_run_event(self):
+        errors = []
+
+        async def on_error(event, *args, **kwargs):
+            errors.append(event)
+
+        bot = SimpleNamespace(metrics=Metrics(), on_error=on_error)
+
+        class Listeners:
+            async def on_message(self, message):
+                self.site = current_site.get()
+
+            async def on_member_join(self, member):
+                raise RuntimeError
+
+        listeners = Listeners()
+        await Parrot._run_event(bot, listeners.on_message, "message", "hello")
+        await Parrot._run_event(bot, listeners.on_member_join, "member_join", None)
+
+        self.assertEqual(listeners.site, "listener:TestInstrumentation.test_run_event.<locals>.Listeners.on_message")
+        self.assertEqual(errors, ["member_join"])
+        histograms = {event: histogram for (event, _), histogram in bot.metrics.listeners.items()}
+        self.assertEqual((histograms["message"].count, histograms["message"].errors), (1, 0))
+        self.assertEqual((histograms["member_join"].count, histograms["member_join"].errors), (1, 1))
+
+    async def test_loops(self):
+        class Worker:
+            def __init__(self) -> None:
+                self.sites = []
+
+            @tasks.loop(count=3)
+            async def work(self):
+                self.sites.append(current_site.get())
+                if len(self.sites) == 3:
+                    raise ValueError
+
+        metrics = Metrics()
+        worker = Worker()
+        instrument_loops(worker, metrics)
+        instrument_loops(worker, metrics)
+        with self.assertRaises(ValueError):
+            await worker.work.start()
+
+        histogram = metrics.loops["TestInstrumentation.test_loops.<locals>.Worker.work"]
+        self.assertEqual(worker.sites, ["loop:TestInstrumentation.test_loops.<locals>.Worker.work"] * 3)
+        self.assertEqual((histogram.count, histogram.errors), (3, 1))
+        # the class keeps the plain coroutine
+        self.assertFalse(hasattr(Worker.work.coro, "__metrics__"))
+
+    async def test_loop_lag(self):
+        metrics = Metrics()
+        monitor = LoopLagMonitor(metrics, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.015)
+        # a callback that blocks the loop, as a slow handler would, while this test waits
+        asyncio.get_running_loop().call_soon(time.sleep, 0.05)
+        await asyncio.sleep(0.08)
+        monitor.stop()
+        self.assertGreaterEqual(metrics.loop_lag.slowest, 0.03)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
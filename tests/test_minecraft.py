@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import random
+from unittest import TestCase
+
+from PIL import Image, ImageChops
+
+from benchmarks.minecraft import legacy_render
+from interactions.buttons.__constants import TILE_FILES
+from interactions.buttons.__minecraft import IsometricRenderer, parse_shape
+
+
+def _image(buf) -> Image.Image:
+    return Image.open(buf).convert("RGBA")
+
+
+class TestIsometricRenderer(TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        self.blocks = list(TILE_FILES)
+        self.cells = {(0, i, j): rng.choice(self.blocks) for i in range(6) for j in range(6)}
+        self.rng = rng
+
+    def assertSameImage(self, first, second) -> None:
+        first, second = _image(first), _image(second)
+        self.assertEqual(first.size, second.size)
+        self.assertIsNone(ImageChops.difference(first, second).getbbox())
+
+    def test_parse_shape(self):
+        self.assertEqual(parse_shape("12 0g- 34".split()), {(0, 0, 0): "1", (0, 0, 1): "2", (0, 1, 1): "g", (1, 0, 0): "3", (1, 0, 1): "4"})
+
+    def test_matches_legacy(self):
+        buf, count = IsometricRenderer().render(self.cells, [1, 2, 2])
+        self.assertEqual(count, len(self.cells) + 1)
+        self.assertSameImage(buf, legacy_render(self.cells, (1, 2, 2))[0])
+
+    def test_incremental_redraw(self):
+        # sourcery skip: no-loop-in-tests
+        renderer = IsometricRenderer()
+        cells = dict(self.cells)
+        selector = [1, 2, 2]
+        renderer.render(cells, selector)
+
+        for _ in range(25):
+            cell = (self.rng.randrange(0, 3), self.rng.randrange(1, 5), self.rng.randrange(1, 5))
+            if cell in cells and self.rng.random() < 0.5:
+                del cells[cell]
+            else:
+                cells[cell] = self.rng.choice(self.blocks)
+            selector = [self.rng.randrange(0, 3), self.rng.randrange(1, 5), self.rng.randrange(1, 5)]
+
+            with self.subTest(cell=cell, selector=selector):
+                self.assertSameImage(renderer.render(cells, selector)[0], IsometricRenderer().render(cells, selector)[0])
+
+    def test_empty_world(self):
+        with self.assertRaises(Exception):
+            IsometricRenderer().render({})
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
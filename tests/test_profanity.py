@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from unittest import TestCase
+
+from utilities.profanity import ProfanityFilter, get_filter, normalize
+
+
+class TestNormalize(TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize("ＳＨÏＴ"), "shit")
+        self.assertEqual(normalize("ѕhіt"), "shit")  # cyrillic lookalikes
+        self.assertEqual(normalize("sh\u200bit"), "shit")
+        self.assertEqual(normalize("Straße"), "strasse")
+        # symbols are letters, runs are cut to two, digits stay
+        self.assertEqual(normalize("a$$$$hole"), "asshole")
+        self.assertEqual(normalize("fuuuuck 1999"), "fuuck 199")
+
+
+class TestProfanityFilter(TestCase):
+    def setUp(self) -> None:
+        self.filter = ProfanityFilter(["ass", "ＳＨＩＴ", "boob", "hell", "ass hole"])
+
+    def test_words_list(self):
+        self.assertEqual(self.filter.words, {"ass", "shit", "boob", "hell", "ass hole"})
+        # digits in a word are digits, not letters
+        numbers = ProfanityFilter(["69", "b1tch"])
+        self.assertEqual(numbers.words, {"69", "b1tch"})
+        self.assertTrue(numbers.contains("69"))
+        self.assertFalse(numbers.contains("bitch"))
+
+    def test_variants(self):
+        # sourcery skip: no-loop-in-tests
+        for text in ("shit", "SHIT!", "sh!t", "$h1t", "shiiiiit", "ѕhіt", "sh\u200bit", "a$$", "b00b", "he11", "ass  hole"):
+            with self.subTest(text=text):
+                self.assertTrue(self.filter.contains(text))
+
+    def test_whole_words(self):
+        # sourcery skip: no-loop-in-tests
+        for text in ("as", "class", "bass", "hello", "shitake", "bob"):
+            with self.subTest(text=text):
+                self.assertFalse(self.filter.contains(text))
+        substring = ProfanityFilter(["ass"], whole_words=False)
+        self.assertTrue(substring.contains("class"))
+        self.assertFalse(substring.contains("as"))
+
+    def test_spans_and_mask(self):
+        text = "Well ＳＨＩＴ, that ass"
+        matches = list(self.filter.finditer(text))
+        self.assertEqual([match.text for match in matches], ["ＳＨＩＴ", "ass"])
+        self.assertEqual(self.filter.mask(text, "#"), "Well ####, that ###")
+        # folding "ß" to "ss" shifts the normalized text, spans still point into the original
+        self.assertEqual(ProfanityFilter(["ass"]).mask("aß ok", "#"), "## ok")
+        # a run cut short while normalizing is masked whole
+        self.assertEqual(ProfanityFilter(["ass"]).mask("asssss ok", "#"), "###### ok")
+
+    def test_adversarial_input(self):
+        # sourcery skip: no-loop-in-tests
+        profanity = ProfanityFilter.from_file("extra/profanity.json")
+        for text in ("$" * 4000, "+" * 4000, "@" * 4000, "1|" * 2000, "as" * 2000, "f" + "u" * 4000 + "c"):
+            with self.subTest(text=text[:4]):
+                start = time.perf_counter()
+                profanity.contains(text)
+                profanity.mask(text)
+                # a quadratic pattern took about a second for these
+                self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_empty(self):
+        self.assertFalse(ProfanityFilter([]).contains("anything"))
+
+    def test_shared(self):
+        self.assertIs(get_filter(("a", "b"), whole_words=False), get_filter(("a", "b"), whole_words=False))
+
+    def test_word_list_file(self):
+        profanity = ProfanityFilter.from_file("extra/profanity.json")
+        self.assertTrue(profanity.contains("what the fvck"))
+        self.assertFalse(profanity.contains("a classic assassin said hello"))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
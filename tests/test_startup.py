@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from time import perf_counter
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+import discord
+from core.startup import Startup, _check_requires
+from discord.ext import commands
+
+EXTENSION = """
+import asyncio
+
+from core import Cog
+
+
+class {name}(Cog):
+    warmed = False
+
+    async def cog_load(self):
+        await asyncio.sleep({sleep})
+
+    async def cog_warmup(self):
+        type(self).warmed = True
+
+
+async def setup(bot):
+    if {fail}:
+        raise RuntimeError("no")
+    await bot.add_cog({name}())
+"""
+
+
+class Bot(commands.Bot):
+    def __init__(self, startup: Startup) -> None:
+        super().__init__(command_prefix="!", intents=discord.Intents.none())
+        self.startup = startup
+
+
+class TestStartup(IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.package = f"startup_extensions_{id(self)}"
+        root = Path(directory.name) / self.package
+        root.mkdir()
+        (root / "__init__.py").touch()
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+
+        def write(name: str, *, sleep: float = 0.0, fail: bool = False) -> str:
+            (root / f"{name.lower()}.py").write_text(textwrap.dedent(EXTENSION.format(name=name, sleep=sleep, fail=fail)))
+            return f"{self.package}.{name.lower()}"
+
+        self.write = write
+
+    def tearDown(self):
+        for name in [name for name in sys.modules if name.startswith(self.package)]:
+            del sys.modules[name]
+
+    async def boot(self, extensions: list[str], *, concurrency: int = 16, requires=None) -> tuple[Bot, float]:
+        bot = Bot(Startup(concurrency=concurrency))
+        started = perf_counter()
+        await bot.startup.load(bot, extensions, requires=requires)
+        return bot, perf_counter() - started
+
+    async def test_cog_load_overlaps(self):
+        extensions = [self.write(f"Slow{index}", sleep=0.1) for index in range(4)]
+        bot, elapsed = await self.boot(extensions)
+        self.assertEqual(len(bot.cogs), 4)
+        self.assertLess(elapsed, 0.3)
+        self.assertTrue(all(timing.cog_load >= 0.1 for timing in bot.startup.extensions.values()))
+
+        for extension in extensions:
+            await bot.unload_extension(extension)
+        bot, elapsed = await self.boot(extensions, concurrency=1)
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    async def test_requires(self):
+        first, second, third = self.write("First", sleep=0.05), self.write("Second"), self.write("Third")
+        bot, _ = await self.boot([third, second, first], requires={third: [second], second: [first]})
+        timings = bot.startup.extensions
+        self.assertGreaterEqual(timings[second].started, timings[first].loaded)
+        self.assertGreaterEqual(timings[third].started, timings[second].loaded)
+        self.assertEqual(list(bot.cogs), ["First", "Second", "Third"])
+
+    async def test_failures(self):
+        broken, dependent, fine = self.write("Broken", fail=True), self.write("Dependent"), self.write("Fine")
+        bot, _ = await self.boot([broken, dependent, fine], requires={dependent: [broken]})
+        self.assertEqual(set(bot.startup.failed), {broken, dependent})
+        self.assertIn("requires", bot.startup.failed[dependent])
+        self.assertEqual(list(bot.cogs), ["Fine"])
+        self.assertIn("failed", bot.startup.report())
+
+    async def test_warmup_after_ready(self):
+        early, late = self.write("Early"), self.write("Late")
+        bot, _ = await self.boot([early])
+        cog = bot.get_cog("Early")
+        await asyncio.sleep(0)
+        self.assertFalse(cog.warmed)
+
+        bot.startup.ready()
+        await asyncio.sleep(0.01)
+        self.assertTrue(cog.warmed)
+        self.assertIn("Early", bot.startup.warmups)
+
+        # loaded after ready, warmed up right away
+        await bot.load_extension(late)
+        await asyncio.sleep(0.01)
+        self.assertTrue(bot.get_cog("Late").warmed)
+
+
+class TestRequires(TestCase):
+    def test_unknown(self):
+        with self.assertRaisesRegex(ValueError, "not in the extensions"):
+            _check_requires(["a"], {"a": ("b",)})
+
+    def test_cycle(self):
+        with self.assertRaisesRegex(ValueError, "a -> b -> a"):
+            _check_requires(["a", "b", "c"], {"a": ("b",), "b": ("a",)})
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
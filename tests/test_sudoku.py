@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from interactions.buttons.__sudoku import Sudoku
+from interactions.buttons.__sudoku_solver import (
+    DIFFICULTIES,
+    SudokuPool,
+    count_solutions,
+    generate,
+    grade,
+    is_solved,
+    solve,
+)
+
+
+def parse(text: str) -> list[int]:
+    return [int(char) if char.isdigit() else 0 for char in text if char.isdigit() or char == "."]
+
+
+# a well known puzzle that falls to naked and hidden singles
+EASY = parse(
+    "003020600900305001001806400008102900700000008006708200002609500800203009005010300",
+)
+EASY_SOLUTION = parse(
+    "483921657967345821251876493548132976729564138136798245372689514814253769695417382",
+)
+
+
+class TestSolver(TestCase):
+    def test_solve(self):
+        self.assertEqual(solve(EASY), EASY_SOLUTION)
+        self.assertTrue(is_solved(EASY_SOLUTION))
+
+    def test_count_solutions(self):
+        self.assertEqual(count_solutions(EASY), 1)
+        self.assertEqual(count_solutions(EASY_SOLUTION), 1)
+        # an empty grid has plenty, counting stops at the limit
+        self.assertEqual(count_solutions([0] * 81), 2)
+        self.assertEqual(count_solutions([0] * 81, limit=5), 5)
+
+    def test_contradiction(self):
+        grid = EASY[:]
+        grid[0] = grid[2]  # two 3s on the first row
+        self.assertEqual(count_solutions(grid), 0)
+        self.assertIsNone(solve(grid))
+
+    def test_grade(self):
+        self.assertEqual(grade(EASY), "easy")
+
+    def test_generate(self):
+        # sourcery skip: no-loop-in-tests
+        rng = random.Random(0)
+        for difficulty in DIFFICULTIES:
+            with self.subTest(difficulty):
+                puzzle = generate(difficulty, rng=rng)
+                self.assertEqual(puzzle.difficulty, difficulty)
+                self.assertEqual(grade(puzzle.clues), difficulty)
+                self.assertEqual(count_solutions(puzzle.clues), 1)
+                self.assertEqual(solve(puzzle.clues), list(puzzle.solution))
+        # never another difficulty than asked
+        with self.assertRaises(ValueError):
+            generate("expert", rng=rng, attempts=0)
+
+
+class TestSudoku(TestCase):
+    def test_checker(self):
+        game = Sudoku(puzzle=generate(rng=random.Random(1)))
+        self.assertFalse(game.checker())
+
+        for r, c in game._changeable_positions:  # sourcery skip: no-loop-in-tests
+            game.place_number_at(r, c, game.puzzle.solution[r * 9 + c])
+        self.assertTrue(game.is_board_full)
+        self.assertTrue(game.checker())
+
+        r, c = game._changeable_positions[0]
+        game.place_number_at(r, c, game.board[r][c] % 9 + 1)
+        self.assertFalse(game.checker())
+
+    def test_reset(self):
+        game = Sudoku(puzzle=generate(rng=random.Random(2)))
+        r, c = game.cursor_position = game._changeable_positions[0]
+        game.place_number(5)
+        game.reset()
+        self.assertEqual(game.board, game.original_board)
+        self.assertEqual(game.board[r][c], 0)
+        # the original board is not touched by playing
+        game.place_number_at(r, c, 5)
+        self.assertEqual(game.original_board[r][c], 0)
+
+
+class TestSudokuPool(IsolatedAsyncioTestCase):
+    async def test_pool(self):
+        with ThreadPoolExecutor(1) as executor:
+            pool = SudokuPool(size=1, executor=executor)
+            await pool.start()
+            await pool.wait_until_full()
+            self.assertEqual(len(pool), len(DIFFICULTIES))
+
+            puzzle = await pool.get("medium")
+            self.assertEqual(puzzle.difficulty, "medium")
+            self.assertEqual(pool.misses, 0)
+            await pool.close()
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from interactions.buttons.__games_utils import Board, NegamaxAI
+from interactions.buttons.__tictactoe import WIN_SCORE, MNKEngine, get_engine
+
+
+def bits(*cells: int) -> int:
+    return sum(1 << cell for cell in cells)
+
+
+class TestMNKEngine(TestCase):
+    def test_lines(self):
+        self.assertEqual(len(MNKEngine(3, 3, 3).lines), 8)
+        # 2 per row, 2 per column, 4 per diagonal direction
+        self.assertEqual(len(MNKEngine(5, 5, 4).lines), 28)
+
+    def test_canonical_symmetries(self):
+        engine = MNKEngine(3, 3, 3)
+        # X in a corner, O on an adjacent edge, in every orientation
+        corners = [(0, 1), (0, 3), (2, 1), (2, 5), (6, 3), (6, 7), (8, 5), (8, 7)]
+        keys = {engine.canonical(bits(x), bits(o)) for x, o in corners}
+        self.assertEqual(len(keys), 1)
+        self.assertNotEqual(engine.canonical(bits(0), bits(1)), engine.canonical(bits(0), bits(4)))
+
+    def test_empty_board_is_a_draw(self):
+        _, score = MNKEngine(3, 3, 3).best_move(0, 0)
+        self.assertEqual(score, 0)
+
+    def test_takes_win(self):
+        # X: 0 1, O: 3 4, X to move
+        cell, score = MNKEngine(3, 3, 3).best_move(bits(0, 1), bits(3, 4))
+        self.assertEqual(cell, 2)
+        self.assertGreater(score, WIN_SCORE - 9)
+
+    def test_blocks(self):
+        # O: 0 1, X: 4, X to move
+        cell, _ = MNKEngine(3, 3, 3).best_move(bits(4), bits(0, 1))
+        self.assertEqual(cell, 2)
+
+    def test_deterministic(self):
+        moves = {MNKEngine(3, 3, 3).best_move(bits(0), bits(4))[0] for _ in range(5)}
+        self.assertEqual(len(moves), 1)
+
+    def test_table_is_shared(self):
+        engine = get_engine(3, 3, 3)
+        self.assertIs(engine, get_engine(3, 3, 3))
+        engine.best_move(0, 0)
+        self.assertTrue(engine.table)
+
+        engine.best_move(0, 0)
+        # the second search is answered from the table
+        self.assertLessEqual(engine.nodes, 9)
+
+    def test_budget(self):
+        engine = MNKEngine(5, 5, 4)
+        start = time.perf_counter()
+        cell, _ = engine.best_move(bits(12), bits(6), budget=0.3)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertIn(cell, range(25))
+
+    def test_concurrent_budgets(self):
+        # games share the engine and search at the same time in threads
+        engine = MNKEngine(5, 5, 4)
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(1)
+        # not waited for, a search without a deadline would never end
+        self.addCleanup(executor.shutdown, wait=False)
+        searching = executor.submit(engine.best_move, bits(12), bits(6), budget=0.5)
+        time.sleep(0.05)
+        # done right away, a win in one
+        self.assertEqual(engine.best_move(bits(0, 1, 2), bits(5, 6, 7), budget=0.5)[0], 3)
+        searching.result(timeout=5)
+        # the search that finished first left the deadline of the other alone
+        self.assertLess(time.perf_counter() - start, 2)
+
+
+class TestBoard(TestCase):
+    def test_self_play_is_a_draw(self):
+        board = Board.new_game()
+        while not board.over:  # sourcery skip: no-loop-in-tests
+            board = NegamaxAI(board.current_player).move(board)
+        self.assertIsNone(board.winner)
+
+    def test_winner(self):
+        board = Board.new_game(5)
+        self.assertEqual(board.k, 4)
+        for col in range(4):  # sourcery skip: no-loop-in-tests
+            board = board.move(2, col)
+            if not board.over:
+                board = board.move(0, col)
+        self.assertTrue(board.over)
+        self.assertIs(board.winner, False)
+
+    def test_illegal_move(self):
+        board = Board.new_game().move(1, 1)
+        with self.assertRaises(ValueError):
+            board.move(1, 1)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
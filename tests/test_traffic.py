@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from core.traffic import Anonymizer, TrafficRecorder, read_recording
+
+USER_ID = "1561633702442084648"
+CHANNEL_ID = "1161633702444719151"
+
+
+def message(content: str, *, message_id: str = "1261633702442482882") -> dict:
+    return {
+        "id": message_id,
+        "channel_id": CHANNEL_ID,
+        "author": {"id": USER_ID, "username": "SomeOne", "discriminator": "0", "avatar": None},
+        "content": content,
+        "timestamp": "2024-01-01T00:00:00.000000+00:00",
+        "member": {"roles": [], "joined_at": "2023-05-01T00:00:00+00:00", "permissions": "104324673"},
+    }
+
+
+class TestAnonymizer(TestCase):
+    def setUp(self):
+        self.anonymizer = Anonymizer(key=b"test", keep={"ping"})
+
+    def test_snowflakes(self):
+        hashed = self.anonymizer.snowflake(USER_ID)
+        self.assertNotEqual(hashed, USER_ID)
+        self.assertEqual(hashed, self.anonymizer.snowflake(USER_ID))
+        # same creation time, so account and message ages survive
+        self.assertEqual(int(hashed) >> 22, int(USER_ID) >> 22)
+        self.assertNotEqual(hashed, Anonymizer(key=b"other").snowflake(USER_ID))
+
+    def test_text(self):
+        text = self.anonymizer.text("Hello there, 42 times")
+        self.assertEqual(len(text), len("Hello there, 42 times"))
+        self.assertRegex(text, r"^[A-Z][a-z]{4} [a-z]{5}, \d\d [a-z]{5}$")
+        self.assertNotIn("Hello", text)
+        self.assertEqual(self.anonymizer.text("hello"), self.anonymizer.text("hello"))
+
+    def test_commands(self):
+        content = self.anonymizer.content
+        self.assertEqual(content("$ping"), "$ping")
+        self.assertEqual(content("p!Ping now"), f"p!Ping {self.anonymizer.text('now')}")
+        mention = f"<@{USER_ID}> ping"
+        self.assertEqual(content(mention), f"<@{self.anonymizer.snowflake(USER_ID)}> ping")
+        # a command name anywhere else is a word like any other
+        self.assertEqual(content("$ping ping").count("ping"), 1)
+        self.assertNotIn("ping", content("say ping"))
+        self.assertNotIn("ping", content("$helping"))
+        self.assertNotIn("ping", self.anonymizer.text("$ping"))
+        self.assertEqual(self.anonymizer.payload(message("$ping"))["content"], "$ping")
+
+    def test_mentions_and_links(self):
+        text = self.anonymizer.text(f"hey <@{USER_ID}> <#{CHANNEL_ID}> see https://example.com/path")
+        self.assertIn(f"<@{self.anonymizer.snowflake(USER_ID)}>", text)
+        self.assertIn(f"<#{self.anonymizer.snowflake(CHANNEL_ID)}>", text)
+        self.assertRegex(text, r"https://[a-z]{7}\.[a-z]{3}/[a-z]{4}$")
+
+    def test_payload(self):
+        data = self.anonymizer.payload(message("my secret password"))
+        self.assertEqual(data["author"]["id"], self.anonymizer.snowflake(USER_ID))
+        self.assertEqual(data["channel_id"], self.anonymizer.snowflake(CHANNEL_ID))
+        self.assertNotEqual(data["author"]["username"], "SomeOne")
+        self.assertEqual(len(data["content"]), len("my secret password"))
+        self.assertEqual(data["timestamp"], "2024-01-01T00:00:00.000000+00:00")
+        self.assertEqual(data["member"]["joined_at"], "2023-05-01T00:00:00+00:00")
+        self.assertEqual(data["member"]["permissions"], "104324673")
+        self.assertIsNone(data["author"]["avatar"])
+
+
+class TestTrafficRecorder(IsolatedAsyncioTestCase):
+    async def test_record_and_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrafficRecorder(directory, anonymizer=Anonymizer(key=b"test"), rotate_after=2)
+            recorder.start()
+            recorder.record(json.dumps({"op": 11, "d": None}))
+            recorder.record(json.dumps({"op": 0, "t": "MESSAGE_CREATE", "s": 1, "d": message("one")}))
+            recorder.record(json.dumps({"op": 0, "t": "MESSAGE_CREATE", "s": 2, "d": message("two")}))
+            recorder.record({"op": 0, "t": "TYPING_START", "s": 3, "d": {"user_id": USER_ID}})
+            await recorder.stop()
+
+            self.assertEqual(recorder.recorded, 3)
+            self.assertEqual(len(recorder.files), 2)
+
+            events = list(read_recording(directory))
+            self.assertEqual([event.event for event in events], ["MESSAGE_CREATE", "MESSAGE_CREATE", "TYPING_START"])
+            self.assertEqual(events, list(read_recording(directory)))
+            self.assertTrue(all(first.at <= second.at for first, second in zip(events, events[1:])))
+            self.assertNotEqual(events[0].data["content"], "one")
+            self.assertEqual(len(events[1].data["content"]), 3)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
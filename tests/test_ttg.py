@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import itertools
+import time
+from unittest import TestCase
+
+from utilities.ttg import Truths
+
+
+class TestTruths(TestCase):
+    def setUp(self) -> None:
+        self.phrases: list[tuple[str, object]] = [
+            ("p and q", lambda p, q, r: p and q),
+            ("p nand q", lambda p, q, r: not (p and q)),
+            ("p or q and r", lambda p, q, r: p or (q and r)),
+            ("not p or q", lambda p, q, r: (not p) or q),
+            ("~(p xor q) nor r", lambda p, q, r: not ((p == q) or r)),
+            ("p => q = r", lambda p, q, r: ((not p) or q) == r),
+            ("p implies (q != r)", lambda p, q, r: (not p) or (q != r)),
+            ("p => q => r", lambda p, q, r: (not p) or ((not q) or r)),
+            ("q = p implies r", lambda p, q, r: q == ((not p) or r)),
+            ("-p and True", lambda p, q, r: not p),
+        ]
+
+    def test_calculate(self):
+        # sourcery skip: no-loop-in-tests
+        for ascending in (False, True):
+            table = Truths(["p", "q", "r"], [phrase for phrase, _ in self.phrases], ascending=ascending)
+            order = [False, True] if ascending else [True, False]
+            df = table.as_pandas()
+
+            for row, (p, q, r) in enumerate(itertools.product(order, repeat=3), start=1):
+                expected = [int(p), int(q), int(r)] + [int(func(p, q, r)) for _, func in self.phrases]
+                with self.subTest(ascending=ascending, row=row):
+                    self.assertEqual(df.loc[row].tolist(), expected)
+                    self.assertEqual(table.calculate(p, q, r), expected)
+
+    def test_valuation(self):
+        table = Truths(["p", "q"], ["p or not p", "p and not p", "p => q"])
+        self.assertEqual(table.valuation(3), "Tautology")
+        self.assertEqual(table.valuation(4), "Contradiction")
+        self.assertEqual(table.valuation(), "Contingency")
+
+    def test_invalid_phrase(self):
+        with self.assertRaises(ValueError):
+            Truths(["p"], ["p and x"])
+        with self.assertRaises(ValueError):
+            Truths(["p"], ["(p and p"])
+
+    def test_large_table(self):
+        bases = [f"v{i}" for i in range(20)]
+        start = time.perf_counter()
+        table = Truths(bases, ["v0 and v1 or not v19", "v3 xor v4 nand v5"])
+        self.assertEqual(table.valuation(), "Contingency")
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(table.as_pandas().shape, (2**20, 22))
+        # the frame is built once and shared between the output formats
+        self.assertIs(table._table(), table._table())
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -33,8 +33,8 @@ async def init():
         CREATE TABLE IF NOT EXISTS nsfw_links (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL, UNIQUE(link));
         CREATE TABLE IF NOT EXISTS nsfw_links_grouped (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL UNIQUE, type TEXT);
 
-        CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY AUTOINCREMENT, level INT NOT NULL, message TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, extra TEXT, UNIQUE(message, created_at));
-        DELETE FROM logs;
+        -- superseded by log_entries, see core/logsink.py
+        DROP TABLE IF EXISTS logs;
 
         COMMIT;
     """
@@ -0,0 +1,174 @@
+"""assets
+~~~~~~
+Game assets (images, fonts, word lists) loaded on first use instead of at import.
+
+Decoded images are kept in a cache bounded by their size in memory, so assets of
+games nobody plays never take room and rarely used ones get evicted. Every load
+is timed, see :attr:`AssetRegistry.timings`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from os import PathLike
+from typing import Any
+
+from PIL import Image, ImageFont
+
+__all__ = ("ASSETS", "AssetRegistry", "ImageCache", "LoadTiming")
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+StrPath = str | PathLike[str]
+
+
+def image_size(image: Image.Image) -> int:
+    """Approximate memory taken by the decoded pixels."""
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """Thread safe LRU of decoded images, bounded by the total bytes of their pixels.
+
+    An image bigger than the whole cache is handed out but never kept.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._images: OrderedDict[Any, tuple[Image.Image, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._images
+
+    def __repr__(self) -> str:
+        return (
+            f"<ImageCache images={len(self)} bytes={self.current_bytes}/{self.max_bytes} "
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+        )
+
+    def get(self, key: Any) -> Image.Image | None:
+        with self._lock:
+            if (entry := self._images.get(key)) is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Any, image: Image.Image) -> None:
+        size = image_size(image)
+        with self._lock:
+            if key in self._images:
+                self.current_bytes -= self._images.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._images[key] = (image, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = self._images.popitem(last=False)
+                self.current_bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self.current_bytes = 0
+
+
+@dataclass
+class LoadTiming:
+    loads: int = 0
+    seconds: float = 0.0
+
+    @property
+    def average(self) -> float:
+        return self.seconds / self.loads if self.loads else 0.0
+
+
+class AssetRegistry:
+    """Loads assets lazily, once, and remembers how long it took.
+
+    Images go through the shared :class:`ImageCache` and may be loaded again
+    after an eviction; text and fonts are small and kept for good. Returned
+    images are shared, ``copy()`` them before drawing.
+    """
+
+    def __init__(self, cache: ImageCache | None = None) -> None:
+        self.cache = cache if cache is not None else ImageCache()
+        self.timings: dict[str, LoadTiming] = {}
+        self._kept: dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def _timed(self, name: str, loader: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        value = loader()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            timing = self.timings.setdefault(name, LoadTiming())
+            timing.loads += 1
+            timing.seconds += elapsed
+        return value
+
+    def _keep(self, key: tuple, name: str, loader: Callable[[], Any]) -> Any:
+        try:
+            return self._kept[key]
+        except KeyError:
+            pass
+        value = self._timed(name, loader)
+        return self._kept.setdefault(key, value)
+
+    def image(self, path: StrPath, mode: str | None = None) -> Image.Image:
+        """The decoded image at ``path``, converted to ``mode`` if given."""
+        key = (str(path), mode)
+        if (image := self.cache.get(key)) is not None:
+            return image
+
+        def load() -> Image.Image:
+            with Image.open(path) as img:
+                img.load()
+                return img.convert(mode) if mode else img.copy()
+
+        image = self._timed(str(path), load)
+        self.cache.put(key, image)
+        return image
+
+    def lines(self, path: StrPath) -> tuple[str, ...]:
+        """The lines of a text file."""
+
+        def load() -> tuple[str, ...]:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                return tuple(f.read().splitlines())
+
+        return self._keep(("lines", str(path)), str(path), load)
+
+    def font(self, path: StrPath, size: int) -> ImageFont.FreeTypeFont:
+        return self._keep(("font", str(path), size), str(path), lambda: ImageFont.truetype(str(path), size))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "cache": {
+                "images": len(self.cache),
+                "bytes": self.cache.current_bytes,
+                "max_bytes": self.cache.max_bytes,
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+                "evictions": self.cache.evictions,
+            },
+            "timings": {name: (timing.loads, timing.seconds) for name, timing in self.timings.items()},
+        }
+
+
+ASSETS = AssetRegistry()
@@ -2,21 +2,16 @@
 ~~~~~~~~~~~~~
 Generate Audio CAPTCHAs, with built-in digits CAPTCHA.
 This module is totally inspired by https://github.com/dchest/captcha.
+
+Wave bodies are 8 bit unsigned mono PCM, handled as ``numpy.uint8`` arrays.
 """
 
-import copy
-import operator
 import os
 import random
 import struct
-import sys
 import wave
 
-if sys.version_info[0] != 2:
-    import functools
-
-    reduce = functools.reduce
-
+import numpy as np
 
 __all__ = ["AudioCaptcha"]
 
@@ -29,91 +24,72 @@ DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data")
 
 
 def _read_wave_file(filepath):
-    w = wave.open(filepath)
-    data = w.readframes(-1)
-    w.close()
-    return bytearray(data)
+    with wave.open(filepath) as w:
+        data = w.readframes(-1)
+    array = np.frombuffer(data, dtype=np.uint8)
+    # cached voices are shared between captchas, they must never be written to
+    array.flags.writeable = False
+    return array
 
 
 def change_speed(body, speed=1):
-    """Change the voice speed of the wave body."""
+    """Change the voice speed of the wave body by nearest-sample resampling."""
     if speed == 1:
         return body
 
     length = int(len(body) * speed)
-    rv = bytearray(length)
-
-    step = 0
-    for v in body:
-        i = int(step)
-        while i < int(step + speed) and i < length:
-            rv[i] = v
-            i += 1
-        step += speed
-    return rv
+    # input sample k fills output [int(step), int(step + speed)), with step accumulated
+    # the same way as the original loop, so the spans tile the output exactly
+    ends = np.cumsum(np.full(len(body), speed)).astype(np.intp)
+    index = np.searchsorted(ends, np.arange(length), side="right")
+    np.minimum(index, len(body) - 1, out=index)
+    return body[index]
 
 
 def patch_wave_header(body):
     """Patch header to the given wave body.
-    :param body: the wave content body, it should be bytearray.
+    :param body: the wave content body, a uint8 array or bytes-like.
     """
+    body = np.asarray(body, dtype=np.uint8).tobytes()
     length = len(body)
 
     padded = length + length % 2
     total = WAVE_HEADER_LENGTH + padded
 
-    header = copy.copy(WAVE_HEADER)
+    header = bytearray(WAVE_HEADER)
     # fill the total length position
-    header[4:8] = bytearray(struct.pack("<I", total))
-    header += bytearray(struct.pack("<I", length))
+    header[4:8] = struct.pack("<I", total)
+    header += struct.pack("<I", length)
 
     data = header + body
 
     # the total length is even
     if length != padded:
-        data = data + bytearray([0])
+        data += b"\x00"
 
     return data
 
 
 def create_noise(length, level=4):
     """Create white noise for background."""
-    noise = bytearray(length)
     adjust = 128 - int(level / 2)
-    i = 0
-    while i < length:
-        v = random.randint(0, 256)
-        noise[i] = v % level + adjust
-        i += 1
-    return noise
+    return (np.random.randint(0, level, length) + adjust).astype(np.uint8)
 
 
 def create_silence(length):
     """Create a piece of silence."""
-    data = bytearray(length)
-    i = 0
-    while i < length:
-        data[i] = 128
-        i += 1
-    return data
+    return np.full(length, 128, dtype=np.uint8)
 
 
 def change_sound(body, level=1):
+    """Scale the amplitude of the wave body around the 128 midpoint."""
     if level == 1:
         return body
 
-    body = copy.copy(body)
-    for i, v in enumerate(body):
-        if v > 128:
-            v = (v - 128) * level + 128
-            v = max(int(v), 128)
-            v = min(v, 255)
-        elif v < 128:
-            v = 128 - (128 - v) * level
-            v = min(int(v), 128)
-            v = max(v, 0)
-        body[i] = v
-    return body
+    v = body.astype(np.float64)
+    louder = np.clip(np.trunc((v - 128) * level + 128), 128, 255)
+    quieter = np.clip(np.trunc(128 - (128 - v) * level), 0, 128)
+    return np.where(v > 128, louder, np.where(v < 128, quieter, 128)).astype(np.uint8)
 
 
 def mix_wave(src, dst):
@@ -122,13 +98,26 @@ def mix_wave(src, dst):
         # output should be longer
         dst, src = src, dst
 
-    for i, sv in enumerate(src):
-        dv = dst[i]
-        if sv < 128 and dv < 128:
-            dst[i] = int(sv * dv / 128)
-        else:
-            dst[i] = int(2 * (sv + dv) - sv * dv / 128 - 256)
-    return dst
+    n = len(src)
+    sv = src.astype(np.float64)
+    dv = dst[:n].astype(np.float64)
+
+    mixed = np.where(
+        (sv < 128) & (dv < 128),
+        sv * dv / 128,
+        2 * (sv + dv) - sv * dv / 128 - 256,
+    )
+
+    out = np.array(dst, dtype=np.uint8)
+    out[:n] = np.clip(np.trunc(mixed), 0, 255)
+    return out
+
+
+def _mix_into(buffer, pos, sound):
+    """Mix ``sound`` into ``buffer`` in place starting at ``pos``, clipped to the buffer."""
+    end = min(pos + len(sound), len(buffer))
+    if end > pos:
+        buffer[pos:end] = mix_wave(sound[: end - pos], buffer[pos:end])
 
 
 BEEP = _read_wave_file(os.path.join(DATA_DIR, "beep.wav"))
@@ -153,6 +142,7 @@ class AudioCaptcha:
     AudioCaptcha will randomly choose one of them.
     You should always use your own voice library::
         captcha = AudioCaptcha(voicedir='/path/to/voices').
+    Voice files are decoded once into read-only arrays and kept in ``_cache``.
     """
 
     def __init__(self, voicedir=None) -> None:
@@ -207,9 +197,7 @@ class AudioCaptcha:
 
     def _noise_pick(self):
         key = random.choice(self.choices)
-        voice = random.choice(self._cache[key])
-        voice = copy.copy(voice)
-        voice.reverse()
+        voice = random.choice(self._cache[key])[::-1]
 
         speed = random.randrange(8, 16) / 10.0
         voice = change_speed(voice, speed)
@@ -223,9 +211,8 @@ class AudioCaptcha:
         pos = 0
         while pos < length:
             sound = self._noise_pick()
-            end = pos + len(sound) + 1
-            noise[pos:end] = mix_wave(sound, noise[pos:end])
-            pos = end + random.randint(0, int(WAVE_SAMPLE_RATE / 10))
+            _mix_into(noise, pos, sound)
+            pos += len(sound) + 1 + random.randint(0, int(WAVE_SAMPLE_RATE / 10))
         return noise
 
     def create_wave_body(self, chars):
@@ -236,18 +223,16 @@ class AudioCaptcha:
             v = random.randint(WAVE_SAMPLE_RATE, WAVE_SAMPLE_RATE * 3)
             inters.append(v)
 
-        durations = (len(a) for a in voices)
-        length = max(durations) * len(chars) + reduce(operator.add, inters)
+        length = max(len(a) for a in voices) * len(chars) + sum(inters)
         bg = self.create_background_noise(length, chars)
 
         # begin
         pos = inters[0]
         for i, v in enumerate(voices):
-            end = pos + len(v) + 1
-            bg[pos:end] = mix_wave(v, bg[pos:end])
-            pos = end + inters[i]
+            _mix_into(bg, pos, v)
+            pos += len(v) + 1 + inters[i]
 
-        return BEEP + SILENCE + BEEP + SILENCE + BEEP + bg + END_BEEP
+        return np.concatenate((BEEP, SILENCE, BEEP, SILENCE, BEEP, bg, END_BEEP))
 
     def generate(self, chars):
         """Generate audio CAPTCHA data. The return data is a bytearray.
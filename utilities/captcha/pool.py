@@ -0,0 +1,128 @@
+"""captcha.pool
+~~~~~~~~~~~~
+Keep ready-made CAPTCHAs around so verification does not have to render them
+on demand. Generation happens in a worker process, serving is a deque pop.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import string
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Any, Literal, NamedTuple
+
+import numpy as np
+
+from utilities.pregenerated import PregeneratedPool
+
+__all__ = ("CaptchaItem", "CaptchaPool", "generate_captcha")
+
+CaptchaKind = Literal["image", "wheezy", "audio"]
+CaptchaFactory = Callable[[], tuple[str, bytes]]
+
+IMAGE_CHARACTERS = string.ascii_uppercase + string.digits
+
+# generators are created lazily, once per (worker) process
+_generators: dict[str, object] = {}
+
+
+def _get_generator(kind: CaptchaKind):
+    if kind not in _generators:
+        if kind == "audio":
+            from .audio import AudioCaptcha
+
+            _generators[kind] = AudioCaptcha()
+        elif kind == "wheezy":
+            from .image import WheezyCaptcha
+
+            _generators[kind] = WheezyCaptcha()
+        else:
+            from .image import ImageCaptcha
+
+            _generators[kind] = ImageCaptcha()
+    return _generators[kind]
+
+
+def generate_captcha(kind: CaptchaKind = "image", length: int = 6) -> tuple[str, bytes]:
+    """Generate a single (answer, data) pair.
+    :param kind: ``image``, ``wheezy`` or ``audio``.
+    :param length: number of characters of the answer.
+    """
+    captcha = _get_generator(kind)
+    if kind == "audio":
+        answer = "".join(captcha.random(length))
+        return answer, bytes(captcha.generate(answer))
+
+    answer = "".join(random.choices(IMAGE_CHARACTERS, k=length))
+    return answer, captcha.generate(answer).getvalue()
+
+
+def _generate_batch(kind: CaptchaKind, length: int, amount: int, factory: CaptchaFactory | None) -> list[tuple[str, bytes]]:
+    if factory is not None:
+        return [factory() for _ in range(amount)]
+    return [generate_captcha(kind, length) for _ in range(amount)]
+
+
+def _seed_worker() -> None:
+    # forked workers inherit the parent's random state, every worker would produce the same captchas
+    seed = int.from_bytes(os.urandom(8), "little")
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+
+
+class CaptchaItem(NamedTuple):
+    answer: str
+    data: bytes
+    created_at: float
+
+
+class CaptchaPool(PregeneratedPool[str, CaptchaItem]):
+    """A pool of pregenerated CAPTCHAs, refilled in the background.
+
+    Items are handed out once and discarded when they are older than ``ttl``.
+    When the pool runs dry, :meth:`get` generates one in the worker process.
+
+    :param kind: ``image``, ``wheezy`` or ``audio``.
+    :param size: how many items to keep ready.
+    :param ttl: seconds an item stays valid.
+    :param length: number of characters of every answer.
+    :param batch_size: items generated per round trip to the worker process.
+    :param factory: picklable callable returning ``(answer, data)``, overrides ``kind``.
+    :param executor: executor to generate in, a single worker process by default.
+    :param retry_delay: seconds waited after a failed batch, doubled on every failure in a row, up to a minute.
+    """
+
+    def __init__(
+        self,
+        kind: CaptchaKind = "image",
+        *,
+        size: int = 50,
+        ttl: float = 300,
+        length: int = 6,
+        batch_size: int = 10,
+        factory: CaptchaFactory | None = None,
+        executor: Executor | None = None,
+        retry_delay: float = 1.0,
+    ) -> None:
+        super().__init__(
+            (kind,),
+            size=size,
+            ttl=ttl,
+            batch_size=batch_size,
+            executor=executor,
+            initializer=_seed_worker,
+            retry_delay=retry_delay,
+            name=f"captcha-pool-{kind}",
+        )
+        self.kind = kind
+        self.length = length
+        self.factory = factory
+
+    def _job(self, key: str, amount: int) -> tuple[Callable[..., list[Any]], tuple[Any, ...]]:
+        return _generate_batch, (self.kind, self.length, amount, self.factory)
+
+    def _wrap(self, key: str, made: tuple[str, bytes], created_at: float) -> CaptchaItem:
+        answer, data = made
+        return CaptchaItem(answer, data, created_at)
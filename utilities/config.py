@@ -55,6 +55,8 @@ STRIP_AFTER_PREFIX: bool = parse_env_var("STRIP_AFTER_PREFIX")
 SUPER_USER: int = parse_env_var("OWNER_ID")
 MASTER_OWNER: int = SUPER_USER
 EXTENSIONS: list[str] = data["all_extensions"]
+# extension: [extensions it needs loaded first], the others load concurrently
+EXTENSION_REQUIRES: dict[str, list[str]] = data.get("extension_requires") or {}
 UNLOAD_EXTENSIONS: list[str] = data.get("unload_extensions", [])
 DEV_LOGO: str = data["dev_logo"]
 TOKEN: str = parse_env_var("TOKEN")
@@ -86,3 +88,23 @@ if MINIMAL_BOOT:
     EXTENSIONS = ["jishaku"]
 
 REDIS_URI: str = parse_env_var("REDIS_URI")
+
+# prefix of the keys of the shared caches and of their invalidation channel, processes sharing it share the caches
+CACHE_NAMESPACE: str = parse_env_var("CACHE_NAMESPACE", "parrot")
+
+# set by launcher.py for every process it starts, this one connects the shards of cluster CLUSTER_ID of CLUSTER_COUNT
+CLUSTER_ID: int = parse_env_var("CLUSTER_ID", "0")
+CLUSTER_COUNT: int = parse_env_var("CLUSTER_COUNT", "1")
+SHARD_COUNT: int = parse_env_var("SHARD_COUNT", "1")
+
+# Prometheus text endpoint on 127.0.0.1, 0 to turn it off
+METRICS_PORT: int = parse_env_var("METRICS_PORT", "0")
+
+# directory the anonymized gateway traffic is recorded to, empty to not record
+RECORD_TRAFFIC: str = parse_env_var("RECORD_TRAFFIC", "")
+
+# log lines in the sqlite database older than this many days or beyond this many rows are deleted, 0 to keep them
+LOG_RETENTION_DAYS: int = parse_env_var("LOG_RETENTION_DAYS", "14")
+LOG_RETENTION_ROWS: int = parse_env_var("LOG_RETENTION_ROWS", "500000")
+# the log lines are written through a connection of their own, to this sqlite database
+LOG_DATABASE: str = parse_env_var("LOG_DATABASE", "cached.sqlite")
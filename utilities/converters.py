@@ -2,12 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import re
-from collections.abc import Callable, Iterator
 from io import BytesIO
-from typing import TYPE_CHECKING, Any, ClassVar, Generic, TypeVar, Union
+from typing import TYPE_CHECKING, Any, ClassVar, Union
 
 from aiohttp import ClientResponse, ClientSession
-from lru import LRU
 
 import discord
 
@@ -16,13 +14,9 @@ if TYPE_CHECKING:
 
 from discord.ext import commands
 
-from .config import LRU_CACHE
 from .exceptions import ImageTooLarge
 from .regex import IMGUR_PAGE_REGEX, TENOR_GIF_REGEX, TENOR_PAGE_REGEX
 
-KT = TypeVar("KT", bound=Any)
-VT = TypeVar("VT", bound=Any)
-
 
 def convert_bool(text: Any) -> bool:
     """True/False converter."""
@@ -144,66 +138,6 @@ class UserID(commands.Converter):
         return u
 
 
-def lru_callback(k, v) -> None:
-    pass
-
-
-class Cache(Generic[KT, VT]):
-    def __init__(
-        self,
-        bot: Parrot | None = None,
-        cache_size: int | None = 2**5,
-        *,
-        callback: Callable[[KT, VT], None] | None = None,
-    ) -> None:
-        self.cache_size: int = cache_size or LRU_CACHE
-        self.bot = bot
-        self.__internal_cache: LRU = LRU(self.cache_size, callback=callback or lru_callback)
-
-        self.items: Callable[[], list[tuple[int, Any]]] = self.__internal_cache.items
-        self.peek_first_item: Callable[[], tuple[int, Any] | None] = self.__internal_cache.peek_first_item
-        self.peek_last_item: Callable[[], tuple[int, Any] | None] = self.__internal_cache.peek_last_item
-        self.get_size: Callable[[], int] = self.__internal_cache.get_size
-        self.set_size: Callable[[int], None] = self.__internal_cache.set_size
-        self.has_key: Callable[[object], bool] = self.__internal_cache.has_key
-        self.values: Callable[[], list[Any]] = self.__internal_cache.values
-        self.keys: Callable[[], list[Any]] = self.__internal_cache.keys
-        self.get: Callable[[object], Any] = self.__internal_cache.get
-        self.pop: Callable[[object], Any] = self.__internal_cache.pop
-        self.get_stats: Callable[[], tuple[int, int]] = self.__internal_cache.get_stats
-        self.set_callback: Callable[[Callable[[KT, VT], Any]], None] = self.__internal_cache.set_callback
-
-    def __repr__(self) -> str:
-        return repr(self.__internal_cache)
-
-    def __len__(self) -> int:
-        return len(self.__internal_cache)
-
-    def __getitem__(self, __k: KT) -> VT:
-        return self.__internal_cache[__k]
-
-    def __delitem__(self, __v: KT) -> None:
-        del self.__internal_cache[__v]
-
-    def __contains__(self, __o: object) -> bool:
-        return self.has_key(__o)
-
-    def __setitem__(self, __k: KT, __v: VT) -> None:
-        self.__internal_cache[__k] = __v
-
-    def clear(self) -> None:
-        return self.__internal_cache.clear()
-
-    def update(self, *args, **kwargs) -> None:
-        return self.__internal_cache.update(*args, **kwargs)
-
-    def setdefault(self, *args, **kwargs) -> None:
-        return self.__internal_cache.setdefault(*args, **kwargs)
-
-    def __iter__(self) -> Iterator:
-        return iter(self.__internal_cache)
-
-
 def text_to_list(text: str, *, number_of_lines: int, prefix: str = "```\n", suffix: str = "\n```") -> list[str]:
     texts = text.split("\n")
     ls = []
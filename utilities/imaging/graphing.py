@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from io import BytesIO
 from statistics import StatisticsError, mean, mode, quantiles
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-import matplotlib
 import numpy as np
-from matplotlib import pyplot as plt
+from matplotlib import style as mpl_style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.font_manager import FontProperties
 from sympy import lambdify, symbols, sympify
 
@@ -15,28 +17,50 @@ import discord
 from core import Context
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from matplotlib.axes import Axes
-    from matplotlib.figure import Figure
 
-matplotlib.use("agg")
-plt.style.use(("bmh", "ggplot"))
-__all__: tuple[str, ...] = ("boxplot", "plotfn")
+# The style is applied once at import time, rendering itself never touches the
+# global pyplot state so figures can be drawn from several threads at once.
+mpl_style.use(("bmh", "ggplot"))
+__all__: tuple[str, ...] = ("boxplot", "plotfn", "render_boxplot", "render_plot")
 
 CODEFONT: FontProperties = FontProperties(fname="extra/Monaco-Linux.ttf")
 
+INITIAL_SAMPLES = 129
+MAX_SAMPLES = 4097
+MAX_REFINEMENTS = 6
+# turning angle (in radians, in normalized axes space) above which a segment is subdivided
+CURVATURE_TOLERANCE = 0.05
 
-def boxplot(_: Context, data: list[float], *, fill_boxes: bool = True) -> discord.File:
-    fig: Figure = plt.figure()
+
+def _new_figure() -> tuple[Figure, Axes]:
+    fig = Figure()
+    FigureCanvasAgg(fig)
     ax: Axes = fig.add_subplot()
+    return fig, ax
+
+
+def _save(fig: Figure) -> BytesIO:
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    buffer.seek(0)
+    return buffer
+
+
+def render_boxplot(data: list[float], *, fill_boxes: bool = True) -> BytesIO:
+    fig, ax = _new_figure()
     ax.set_title("Box & Whisker Plot", pad=15)
 
     out = ax.boxplot(
         x=data,
         vert=False,
         showmeans=True,
-        labels=["A"],
         patch_artist=fill_boxes,
     )
+    # set on the axis, boxplot's labels= is gone in matplotlib 3.11 and tick_labels= is new in 3.9
+    ax.set_yticks([1], ["A"])
 
     for cap in out.get("caps", ()):
         cap.set(color="#8B008B", linewidth=2)
@@ -69,11 +93,11 @@ def boxplot(_: Context, data: list[float], *, fill_boxes: bool = True) -> discor
     ax.text(x, 0.68, f"Q3: {q3}", fontproperties=CODEFONT)
     ax.text(x, 0.62, f"IQR: {q3 - q1}", fontproperties=CODEFONT)
 
-    buffer = BytesIO()
-    plt.savefig(buffer)
-    plt.close()
-    buffer.seek(0)
-    return discord.File(buffer, "graph.png")
+    return _save(fig)
+
+
+def boxplot(_: Context, data: list[float], *, fill_boxes: bool = True) -> discord.File:
+    return discord.File(render_boxplot(data, fill_boxes=fill_boxes), "graph.png")
 
 
 def _clean_implicit_mul(equation: str) -> str:
@@ -88,24 +112,90 @@ def _clean_implicit_mul(equation: str) -> str:
     return equation
 
 
-def plotfn(_, equation: str, *, xrange: tuple[int, int] = (-20, 20)) -> discord.File:
+@lru_cache(maxsize=256)
+def _compile(equation: str) -> Callable[[np.ndarray], Any]:
+    """Compile a normalized equation into a numpy function.
+
+    The key is the output of `_clean_implicit_mul`, so `2x + 1` and `2*x+1` share an entry.
+    """
     x = symbols("x")
-    equation = _clean_implicit_mul(equation)
     expr = sympify(equation)  # Convert equation string to a Sympy expression
-    func = lambdify(x, expr)  # Create a function from the Sympy expression
+    return lambdify(x, expr, modules="numpy")  # Create a function from the Sympy expression
+
+
+def _evaluate(func: Callable[[np.ndarray], Any], x_vals: np.ndarray) -> np.ndarray:
+    with np.errstate(all="ignore"):
+        y_vals = np.asarray(func(x_vals))
+
+    if np.iscomplexobj(y_vals):
+        y_vals = np.where(np.isclose(y_vals.imag, 0), y_vals.real, np.nan)
+
+    # constant expressions evaluate to a scalar
+    return np.broadcast_to(y_vals, x_vals.shape).astype(float)
+
+
+def _refine_mask(x_vals: np.ndarray, y_vals: np.ndarray) -> np.ndarray:
+    """Return a mask over the segments of the polyline that should be subdivided."""
+    finite = np.isfinite(y_vals)
+    # a segment crossing a discontinuity (one end undefined) is always refined
+    mask = finite[:-1] != finite[1:]
+
+    if finite.sum() < 3:
+        return mask
+
+    span_y = np.ptp(y_vals[finite]) or 1.0
+    span_x = (x_vals[-1] - x_vals[0]) or 1.0
+
+    dx = np.diff(x_vals) / span_x
+    dy = np.diff(y_vals) / span_y
+    with np.errstate(invalid="ignore"):
+        angles = np.arctan2(dy, dx)
+        turning = np.abs(np.diff(angles))
+
+    bent = np.nan_to_num(turning, nan=0.0) > CURVATURE_TOLERANCE
+    # the segments on both sides of a bent vertex are refined
+    mask[:-1] |= bent
+    mask[1:] |= bent
+    return mask
+
+
+def _sample(func: Callable[[np.ndarray], Any], xrange: tuple[float, float]) -> tuple[np.ndarray, np.ndarray]:
+    """Adaptively sample `func`, subdividing only where the curve bends."""
+    x_vals = np.linspace(*xrange, INITIAL_SAMPLES)
+    y_vals = _evaluate(func, x_vals)
+
+    for _ in range(MAX_REFINEMENTS):
+        mask = _refine_mask(x_vals, y_vals)
+        budget = MAX_SAMPLES - x_vals.size
+        if not mask.any() or budget <= 0:
+            break
+
+        idx = np.flatnonzero(mask)[:budget]
+        mid_x = (x_vals[idx] + x_vals[idx + 1]) / 2
+        mid_y = _evaluate(func, mid_x)
+
+        x_vals = np.insert(x_vals, idx + 1, mid_x)
+        y_vals = np.insert(y_vals, idx + 1, mid_y)
+
+    return x_vals, y_vals
+
+
+def render_plot(equation: str, *, xrange: tuple[int, int] = (-20, 20)) -> BytesIO:
+    equation = _clean_implicit_mul(equation)
+    func = _compile(equation)
 
-    x_vals = np.linspace(*xrange, 500)
-    y_vals = func(x_vals)  # Evaluate the function for the x-values
+    x_vals, y_vals = _sample(func, xrange)
 
-    plt.plot(x_vals, y_vals)
-    plt.xlabel("X - Axis")
-    plt.ylabel("Y - Axis")
-    plt.title(f"Graph of {equation}")
-    plt.grid(True)
-    plt.axhline(0, color="black", linewidth=0.5)
-    plt.axvline(0, color="black", linewidth=0.5)
+    fig, ax = _new_figure()
+    ax.plot(x_vals, y_vals)
+    ax.set_xlabel("X - Axis")
+    ax.set_ylabel("Y - Axis")
+    ax.set_title(f"Graph of {equation}")
+    ax.grid(True)
+    ax.axhline(0, color="black", linewidth=0.5)
+    ax.axvline(0, color="black", linewidth=0.5)
 
-    plt.annotate(
+    ax.annotate(
         "Created by Parrot Bot",
         xy=(0.999, 0.01),
         xycoords="axes fraction",
@@ -114,10 +204,8 @@ def plotfn(_, equation: str, *, xrange: tuple[int, int] = (-20, 20)) -> discord.
         verticalalignment="bottom",
         bbox={"facecolor": "orange", "alpha": 0.5, "pad": 5},
     )
-    image_buffer = BytesIO()
-    plt.savefig(image_buffer, format="png")
-    image_buffer.seek(0)
+    return _save(fig)
 
-    plt.close()
 
-    return discord.File(image_buffer, "graph.png")
+def plotfn(_: Context, equation: str, *, xrange: tuple[int, int] = (-20, 20)) -> discord.File:
+    return discord.File(render_plot(equation, xrange=xrange), "graph.png")
@@ -0,0 +1,194 @@
+"""Things made ahead of time in a worker process, so that handing one out is a deque pop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Generic, TypeVar
+
+__all__ = ("PregeneratedPool", "seed_worker")
+
+log = logging.getLogger("utilities.pregenerated")
+
+KT = TypeVar("KT")
+T = TypeVar("T")
+
+MAX_RETRY_DELAY = 60.0
+
+
+def seed_worker() -> None:
+    # forked workers inherit the parent's random state, every worker would produce the same items
+    random.seed(int.from_bytes(os.urandom(8), "little"))
+
+
+class PregeneratedPool(Generic[KT, T]):
+    """``size`` items ready for each of ``keys``, refilled in the background.
+
+    Subclasses say how to make items with :meth:`_job`, a picklable function
+    and its arguments returning ``amount`` items for a key, run in
+    ``executor``, a single worker process by default. The emptiest key is
+    refilled first, ``batch_size`` items per round trip at most. Items older
+    than ``ttl`` seconds are dropped. When a key runs dry, :meth:`get` makes
+    one item in the executor.
+
+    A failed batch is logged and retried after ``retry_delay`` seconds,
+    doubled on every failure in a row, a minute at most. A broken worker
+    process of the pool's own executor is replaced.
+
+    Methods taking a ``key`` default to the first of ``keys``.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[KT],
+        *,
+        size: int,
+        ttl: float | None = None,
+        batch_size: int = 1,
+        executor: Executor | None = None,
+        initializer: Callable[[], None] = seed_worker,
+        retry_delay: float = 1.0,
+        name: str = "pregenerated-pool",
+    ) -> None:
+        self.keys: tuple[KT, ...] = tuple(keys)
+        self.size = size
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.name = name
+
+        # key -> (created at, item), oldest on the left
+        self._items: dict[KT, deque[tuple[float, T]]] = {key: deque() for key in self.keys}
+        self._executor = executor
+        self._own_executor = executor is None
+        self._initializer = initializer
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+        self.served = 0
+        self.misses = 0
+        self.expired = 0
+        self.failures = 0
+
+    def _job(self, key: KT, amount: int) -> tuple[Callable[..., list[Any]], tuple[Any, ...]]:
+        raise NotImplementedError
+
+    def _wrap(self, key: KT, made: Any, created_at: float) -> T:
+        """The item handed out for what the job made."""
+        return made
+
+    def __len__(self) -> int:
+        return sum(map(len, self._items.values()))
+
+    def __repr__(self) -> str:
+        ready = " ".join(f"{key}={len(items)}/{self.size}" for key, items in self._items.items())
+        return f"<{type(self).__name__} {ready} served={self.served} misses={self.misses}>"
+
+    def _new_executor(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=1, initializer=self._initializer)
+
+    async def start(self) -> None:
+        """Start the refill worker."""
+        if self._task is not None:
+            return
+        if self._executor is None:
+            self._executor = self._new_executor()
+        self._task = asyncio.create_task(self._refill_loop(), name=self.name)
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for items in self._items.values():
+            items.clear()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    def _is_full(self) -> bool:
+        return all(len(items) >= self.size for items in self._items.values())
+
+    async def wait_until_full(self) -> None:
+        while not self._is_full():
+            self._full.clear()
+            await self._full.wait()
+
+    def _drop_expired(self, key: KT, now: float) -> None:
+        items = self._items[key]
+        while items and self.ttl is not None and now - items[0][0] > self.ttl:
+            items.popleft()
+            self.expired += 1
+
+    def get_nowait(self, key: KT | None = None) -> T | None:
+        """Take a ready item out of the pool, or ``None`` if there is none."""
+        key = self.keys[0] if key is None else key
+        self._drop_expired(key, time.monotonic())
+        self._wakeup.set()
+        if not self._items[key]:
+            return None
+        self.served += 1
+        return self._items[key].popleft()[1]
+
+    async def get(self, key: KT | None = None) -> T:
+        """Take a ready item, making one in the executor if there is none."""
+        key = self.keys[0] if key is None else key
+        if (item := self.get_nowait(key)) is not None:
+            return item
+
+        self.misses += 1
+        function, args = self._job(key, 1)
+        made = await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        return self._wrap(key, made[0], time.monotonic())
+
+    async def _refill_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = self.retry_delay
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            now = time.monotonic()
+            for key in self.keys:
+                self._drop_expired(key, now)
+            while True:
+                # the emptiest key first, so none starves
+                key = min(self.keys, key=lambda k: len(self._items[k]))
+                if (missing := self.size - len(self._items[key])) <= 0:
+                    break
+                function, args = self._job(key, min(missing, self.batch_size))
+                try:
+                    made = await loop.run_in_executor(self._executor, function, *args)
+                except Exception as e:
+                    self.failures += 1
+                    log.exception("%s failed to make %s, retrying in %.1fs", self.name, key, delay)
+                    if isinstance(e, BrokenProcessPool) and self._own_executor:
+                        # a worker died, the executor refuses everything from now on
+                        self._executor.shutdown(wait=False, cancel_futures=True)
+                        self._executor = self._new_executor()
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                delay = self.retry_delay
+                now = time.monotonic()
+                self._items[key].extend((now, self._wrap(key, item, now)) for item in made)
+            self._full.set()
@@ -0,0 +1,266 @@
+"""profanity
+~~~~~~~~~
+A word list compiled once into a single matcher.
+
+Text is normalized before matching: case folded, accents and compatibility
+forms stripped, lookalike letters from other scripts mapped to latin ones,
+zero-width characters removed, symbols standing for a letter (``a$$``) mapped
+to it and runs of a letter (``fuuuck``) cut to two. The words are normalized
+the same way. Digits stay digits, in the pattern every letter of a word also
+matches the digits written for it (``sh1t``), a single letter matches one or
+two, a double letter two, so ``ass`` does not match ``as``.
+
+The words go into a trie first, so the compiled pattern tries one branch per
+character instead of every word at every position. There is no unbounded
+repeat in it, a match attempt never reads more than twice the longest word,
+so matching takes time linear in the text.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from typing import NamedTuple
+
+__all__ = ("ProfanityFilter", "ProfanityMatch", "get_filter", "normalize")
+
+ZERO_WIDTH = frozenset("\u00ad\u180e\u200b\u200c\u200d\u2060\ufeff")
+
+# latin lookalikes from other scripts that NFKD leaves alone
+CONFUSABLES = {
+    "а": "a",
+    "в": "b",
+    "е": "e",
+    "ё": "e",
+    "к": "k",
+    "м": "m",
+    "н": "h",
+    "о": "o",
+    "р": "p",
+    "с": "c",
+    "т": "t",
+    "у": "y",
+    "х": "x",
+    "і": "i",
+    "ј": "j",
+    "ѕ": "s",
+    "ԁ": "d",
+    "ɡ": "g",
+    "α": "a",
+    "β": "b",
+    "ε": "e",
+    "ι": "i",
+    "κ": "k",
+    "ν": "v",
+    "ο": "o",
+    "ρ": "p",
+    "τ": "t",
+    "υ": "u",
+    "χ": "x",
+}
+
+# what each letter may be written as, besides the symbols below
+LEET = {
+    "a": "4",
+    "b": "8",
+    "e": "3",
+    "g": "9",
+    "i": "1!|",
+    "l": "1|",
+    "o": "0",
+    "s": "5",
+    "t": "7",
+}
+# symbols that are a letter wherever they are written, mapped to it while normalizing
+SYMBOLS = str.maketrans({"@": "a", "$": "s", "+": "t"})
+# leet substitutes of exactly one letter count as that letter in a run, "s5s" is a run of three
+_RUN_KEY = str.maketrans(
+    {
+        char: letter
+        for letter, chars in LEET.items()
+        for char in chars
+        if sum(char in other for other in LEET.values()) == 1
+    },
+)
+MAX_RUN = 2
+_LONG_RUN = re.compile(rf"(.)\1{{{MAX_RUN},}}", re.DOTALL)
+
+NOT_BEFORE = r"(?<![^\W_].)"  # placed after the first character
+NOT_AFTER = r"(?![^\W_])"
+
+
+class _FoldTable(dict):
+    """`str.translate` table filled on first sight of each character."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        # characters that do not fold to exactly one character, they shift offsets
+        self.irregular: set[str] = set()
+
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        if char in ZERO_WIDTH:
+            folded = ""
+        else:
+            decomposed = unicodedata.normalize("NFKD", char.casefold())
+            folded = "".join(CONFUSABLES.get(c, c) for c in decomposed if not unicodedata.combining(c))
+        if len(folded) != 1:
+            self.irregular.add(char)
+        self[code] = folded
+        return folded
+
+
+_FOLD = _FoldTable()
+
+
+def normalize(text: str) -> str:
+    """Case folded text without accents, zero-width characters or lookalike letters, symbols as letters, runs cut."""
+    return _normalize_with_offsets(text, offsets=False)[0]
+
+
+def _normalize_with_offsets(text: str, *, offsets: bool = True) -> tuple[str, list[int] | None]:
+    """The normalized text and where each of its characters came from, ``None`` when nothing moved."""
+    folded = text.translate(_FOLD).translate(SYMBOLS)
+    origins: list[int] | None = None
+    if offsets and _FOLD.irregular.intersection(text):
+        origins = []
+        for i, char in enumerate(text):
+            origins.extend([i] * len(_FOLD[ord(char)]))
+
+    runs = list(_LONG_RUN.finditer(folded.translate(_RUN_KEY)))
+    if not runs:
+        return folded, origins
+    parts = []
+    kept: list[int] = []
+    last = 0
+    for run in runs:
+        cut = run.start() + MAX_RUN
+        parts.append(folded[last:cut])
+        if offsets:
+            kept.extend(range(last, cut))
+        last = run.end()
+    parts.append(folded[last:])
+    if not offsets:
+        return "".join(parts), None
+    kept.extend(range(last, len(folded)))
+    return "".join(parts), kept if origins is None else [origins[i] for i in kept]
+
+
+def _runs(word: str) -> list[tuple[str, int]]:
+    """``"boob"`` -> ``[("b", 1), ("o", 2), ("b", 1)]``"""
+    return [(match[1], len(match.group())) for match in re.finditer(r"(.)\1*", word, re.DOTALL)]
+
+
+class ProfanityMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+
+
+class ProfanityFilter:
+    """Finds any of ``words`` in a text.
+
+    With ``whole_words`` a match has to be surrounded by anything but letters
+    and digits, so ``ass`` is not found in ``class``. Otherwise words are
+    found anywhere.
+    """
+
+    def __init__(self, words: Iterable[str], *, whole_words: bool = True) -> None:
+        self.whole_words = whole_words
+        # only the text is read as leetspeak, a word is matched as it is spelled
+        self.words = frozenset(filter(None, map(normalize, words)))
+        self.pattern = re.compile(self._build())
+
+    def __repr__(self) -> str:
+        return f"<ProfanityFilter words={len(self.words)} whole_words={self.whole_words}>"
+
+    @classmethod
+    def from_file(cls, path: str = "extra/profanity.json", *, whole_words: bool = True) -> ProfanityFilter:
+        """From a json list, or object whose keys are the words."""
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return cls(json.load(f), whole_words=whole_words)
+
+    def _build(self) -> str:
+        trie: dict = {}
+        for word in self.words:
+            node = trie
+            for run in _runs(word):
+                node = node.setdefault(run, {})
+            node[None] = {}
+        if not trie:
+            return "(?!)"
+
+        def char_class(char: str) -> str:
+            return f"[{re.escape(char + LEET[char])}]" if char in LEET else re.escape(char)
+
+        def repeat(char: str, times: int) -> str:
+            # runs of the text are MAX_RUN long at most, a single letter may be one of them
+            one = char_class(char)
+            return one * MAX_RUN if times > 1 else f"(?:{one * MAX_RUN}|{one})"
+
+        def branches(node: dict) -> str:
+            # the longest run of a letter is tried first, a word ending here last
+            alternatives = [repeat(*run) + branches(child) for run, child in sorted(node.items(), key=_order) if run]
+            if None in node:
+                alternatives.append(NOT_AFTER if self.whole_words else "")
+            return alternatives[0] if len(alternatives) == 1 else "(?:{})".format("|".join(alternatives))
+
+        # the top level starts every branch with a plain character, which lets
+        # re skip ahead to the characters that can start a word
+        top = []
+        for (char, times), child in sorted(trie.items(), key=_order):
+            rest = char_class(char) * (MAX_RUN - 1) if times > 1 else f"(?:{char_class(char) * (MAX_RUN - 1)}|)"
+            for variant in char + LEET.get(char, ""):
+                head = re.escape(variant) + (NOT_BEFORE if self.whole_words else "")
+                top.append(head + rest + branches(child))
+        return "|".join(top)
+
+    def finditer(self, text: str) -> Iterator[ProfanityMatch]:
+        """Every match, with its span in ``text`` as given (not normalized), ready for masking."""
+        folded, offsets = _normalize_with_offsets(text)
+        for match in self.pattern.finditer(folded):
+            start, end = match.span()
+            if offsets is not None:
+                # up to what the next character came from, a run cut short is masked whole
+                if end == len(offsets):
+                    end = len(text)
+                elif offsets[end] == offsets[end - 1]:
+                    end = offsets[end - 1] + 1
+                else:
+                    end = offsets[end]
+                start = offsets[start]
+            yield ProfanityMatch(start, end, text[start:end])
+
+    def search(self, text: str) -> ProfanityMatch | None:
+        return next(self.finditer(text), None)
+
+    def contains(self, text: str) -> bool:
+        return self.pattern.search(normalize(text)) is not None
+
+    def mask(self, text: str, char: str = "\\*") -> str:
+        """``text`` with every match replaced by ``char``, once per character."""
+        parts = []
+        last = 0
+        for start, end, _ in self.finditer(text):
+            if end <= last:
+                continue
+            start = max(start, last)
+            parts.append(text[last:start])
+            parts.append(char * (end - start))
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+
+def _order(item: tuple) -> tuple:
+    run = item[0]
+    return (1, "", 0) if run is None else (0, run[0], -run[1])
+
+
+@lru_cache(maxsize=256)
+def get_filter(words: tuple[str, ...], *, whole_words: bool = True) -> ProfanityFilter:
+    """A filter shared by everyone using the same word list, compiled once."""
+    return ProfanityFilter(words, whole_words=whole_words)
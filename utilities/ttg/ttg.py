@@ -1,101 +1,137 @@
 from __future__ import annotations
 
-import itertools
 import re
-from distutils.util import strtobool
+from collections.abc import Callable
 
 import numpy as np
 import pandas as pd
-import pyparsing
 from prettytable import PrettyTable
 from tabulate import tabulate
 
-# dict of boolean operations
+# dict of boolean operations, all of them work elementwise on numpy boolean arrays
 # fmt: off
-OPERATIONS = {
-    "not"    : (lambda x: not x),
-    "-"      : (lambda x: not x),
-    "~"      : (lambda x: not x),
-    "or"     : (lambda x, y: x or y),
-    "nor"    : (lambda x, y: not (x or y)),
-    "xor"    : (lambda x, y: x != y),
-    "and"    : (lambda x, y: x and y),
-    "nand"   : (lambda x, y: not (x and y)),
-    "=>"     : (lambda x, y: (not x) or y),
-    "implies": (lambda x, y: (not x) or y),
-    "="      : (lambda x, y: x == y),
-    "!="     : (lambda x, y: x != y),
+OPERATIONS: dict[str, Callable[..., np.ndarray]] = {
+    "not"    : np.logical_not,
+    "-"      : np.logical_not,
+    "~"      : np.logical_not,
+    "or"     : np.logical_or,
+    "nor"    : (lambda x, y: ~(x | y)),
+    "xor"    : np.logical_xor,
+    "and"    : np.logical_and,
+    "nand"   : (lambda x, y: ~(x & y)),
+    "=>"     : (lambda x, y: ~x | y),
+    "implies": (lambda x, y: ~x | y),
+    "="      : np.equal,
+    "!="     : np.not_equal,
 }
 # fmt: on
 
-
-def recursive_map(func, data):
-    """Recursively applies a map function to a list and all sublists."""
-    if isinstance(data, list):
-        return [recursive_map(func, elem) for elem in data]
-    return func(data)
-
-
-def string_to_bool(string):
-    """Converts a string to boolean if string is either 'True' or 'False'
-    otherwise returns it unchanged.
+UNARY = ("not", "-", "~")
+# binary operators from the tightest to the loosest binding, left associative but for implication
+PRECEDENCE = (
+    ("and", "nand"),
+    ("or", "nor", "xor"),
+    ("=>", "implies"),
+    ("=", "!="),
+)
+RIGHT_ASSOCIATIVE = ("=>", "implies")
+LITERALS = {"true": True, "t": True, "1": True, "false": False, "f": False, "0": False}
+
+TOKEN_RE = re.compile(r"\s*(=>|!=|[()=~-]|\w+)")
+
+# ("var", index) | ("const", value) | (operator, operand) | (operator, left, right)
+Node = tuple
+
+
+def tokenize(phrase: str) -> list[str]:
+    tokens: list[str] = []
+    pos = 0
+    phrase = phrase.rstrip()
+    while pos < len(phrase):
+        match = TOKEN_RE.match(phrase, pos)
+        if match is None:
+            msg = f"Unexpected character {phrase[pos:].strip()[0]!r} in {phrase!r}"
+            raise ValueError(msg)
+        tokens.append(match.group(1))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser turning a phrase into an AST.
+
+    Order of operations is: not, and, or, implication, equivalence.
     """
-    try:
-        string = bool(strtobool(string))
-    except ValueError:
-        pass
-    return string
-
 
-def solve_phrase(phrase):
-    """Recursively evaluates a logical phrase that has been grouped into
-    sublists where each list is one operation.
-    """
-    if isinstance(phrase, bool):
-        return phrase
-    if isinstance(phrase, list):
-        # list with just a list in it
-        if len(phrase) == 1:
-            return solve_phrase(phrase[0])
-        # single operand operation
-        if len(phrase) == 2:
-            return OPERATIONS[phrase[0]](solve_phrase(phrase[1]))
-        return OPERATIONS[phrase[1]](solve_phrase(phrase[0]), solve_phrase([phrase[2]]))
-
-
-def group_operations(phrase):
-    """Recursively groups logical operations into separate lists based on
-    the order of operations such that each list is one operation.
-    Order of operations is:
-        not, and, or, implication.
-    """
-    if isinstance(phrase, list):
-        for operator in ["not", "~", "-"]:
-            while operator in phrase:
-                index = phrase.index(operator)
-                phrase[index] = [operator, group_operations(phrase[index + 1])]
-                phrase.pop(index + 1)
-        for operator in ["and", "nand"]:
-            while operator in phrase:
-                index = phrase.index(operator)
-                phrase[index] = [
-                    group_operations(phrase[index - 1]),
-                    operator,
-                    group_operations(phrase[index + 1]),
-                ]
-                phrase.pop(index + 1)
-                phrase.pop(index - 1)
-        for operator in ["or", "nor", "xor"]:
-            while operator in phrase:
-                index = phrase.index(operator)
-                phrase[index] = [
-                    group_operations(phrase[index - 1]),
-                    operator,
-                    group_operations(phrase[index + 1]),
-                ]
-                phrase.pop(index + 1)
-                phrase.pop(index - 1)
-    return phrase
+    def __init__(self, tokens: list[str], bases: dict[str, int]) -> None:
+        self.tokens = tokens
+        self.bases = bases
+        self.pos = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            msg = "Unexpected end of expression"
+            raise ValueError(msg)
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.binary(len(PRECEDENCE) - 1)
+        if self.peek() is not None:
+            msg = f"Unexpected token {self.peek()!r}"
+            raise ValueError(msg)
+        return node
+
+    def binary(self, level: int) -> Node:
+        if level < 0:
+            return self.unary()
+
+        node = self.binary(level - 1)
+        while (token := self.peek()) is not None and (operator := token.lower()) in PRECEDENCE[level]:
+            self.pos += 1
+            if operator in RIGHT_ASSOCIATIVE:
+                # p => q => r is p => (q => r)
+                return (operator, node, self.binary(level))
+            node = (operator, node, self.binary(level - 1))
+        return node
+
+    def unary(self) -> Node:
+        token = self.take()
+        if token.lower() in UNARY:
+            return (token.lower(), self.unary())
+        if token == "(":
+            node = self.binary(len(PRECEDENCE) - 1)
+            if self.take() != ")":
+                msg = "Unbalanced parenthesis"
+                raise ValueError(msg)
+            return node
+        if token in self.bases:
+            return ("var", self.bases[token])
+        if token.lower() in LITERALS:
+            return ("const", LITERALS[token.lower()])
+        msg = f"Unknown variable {token!r}"
+        raise ValueError(msg)
+
+
+def parse_phrase(phrase: str, bases: list[str]) -> Node:
+    """Parses a logical phrase once into an AST over the given bases."""
+    return _Parser(tokenize(phrase), {base: index for index, base in enumerate(bases)}).parse()
+
+
+def evaluate(node: Node, columns: list[np.ndarray]) -> np.ndarray:
+    """Evaluates an AST over boolean arrays, one array per base, all rows at once."""
+    kind = node[0]
+    if kind == "var":
+        return columns[node[1]]
+    if kind == "const":
+        return np.full(len(columns[0]), node[1], dtype=bool)
+    if len(node) == 2:
+        return OPERATIONS[kind](evaluate(node[1], columns))
+    return OPERATIONS[kind](evaluate(node[1], columns), evaluate(node[2], columns))
 
 
 class Truths:
@@ -108,77 +144,70 @@ class Truths:
         self.bases = bases
         self.phrases = phrases or []
         self.ints = ints
+        self.ascending = ascending
 
-        # generate the sets of booleans for the bases
-        order = [False, True] if ascending else [True, False]
-        self.base_conditions = list(itertools.product(order, repeat=len(bases)))
+        # every phrase is parsed exactly once, whatever the size of the table
+        self.trees = [parse_phrase(phrase, self.bases) for phrase in self.phrases]
+        self._df: pd.DataFrame | None = None
 
-        # regex to match whole words defined in self.bases
-        # used to add object context to variables in self.phrases
-        self.p = re.compile(r"(?<!\w)(" + "|".join(self.bases) + r")(?!\w)")
+    def base_columns(self) -> list[np.ndarray]:
+        """Boolean columns of all the 2^n assignments, in `itertools.product` order."""
+        n = len(self.bases)
+        rows = np.arange(1 << n, dtype=np.int64)
+        # the first base changes the slowest, like the leftmost digit of a counter
+        first = 1 if self.ascending else 0
+        return [((rows >> (n - 1 - i)) & 1) == first for i in range(n)]
 
-        # used for parsing logical operations and parenthesis
-        self.to_match = pyparsing.Word(pyparsing.alphanums)
-        for item in itertools.chain(self.bases, [key for key, val in OPERATIONS.items()]):
-            self.to_match |= item
-        self.parens = pyparsing.nestedExpr("(", ")", content=self.to_match)
+    @property
+    def base_conditions(self) -> list[tuple[bool, ...]]:
+        return list(zip(*(column.tolist() for column in self.base_columns()), strict=True))
 
     def calculate(self, *args):
         """Evaluates the logical value for each expression."""
-        bools = dict(zip(self.bases, args, strict=False))
-
-        eval_phrases = []
-        for phrase in self.phrases:
-            # substitute bases in phrase with boolean values as strings
-            phrase = self.p.sub(lambda match: str(bools[match.group(0)]), phrase)  # NOQA long line
-            # wrap phrase in parens
-            phrase = "(" + phrase + ")"
-            # parse the expression using pyparsing
-            interpreted = self.parens.parseString(phrase).asList()[0]
-            # convert any 'True' or 'False' to boolean values
-            interpreted = recursive_map(string_to_bool, interpreted)
-            # group operations
-            interpreted = group_operations(interpreted)
-            # evaluate the phrase
-            eval_phrases.append(solve_phrase(interpreted))
-
-        # add the bases and evaluated phrases to create a single row
-        row = [val for key, val in bools.items()] + eval_phrases
+        columns = [np.array([bool(arg)]) for arg in args]
+        row = list(args) + [bool(evaluate(tree, columns)[0]) for tree in self.trees]
         if self.ints:
             row = [int(c) for c in row]
         return row
 
+    def _table(self) -> pd.DataFrame:
+        if self._df is None:
+            columns = self.base_columns()
+            values = columns + [evaluate(tree, columns) for tree in self.trees]
+            data = np.column_stack(values)
+            if self.ints:
+                data = data.astype(np.int8)
+            df = pd.DataFrame(data, columns=self.bases + self.phrases)
+            df.index = np.arange(1, len(df) + 1)  # index starting in one
+            self._df = df
+        return self._df
+
     def as_prettytable(self):
         """Returns table using PrettyTable package."""
         table = PrettyTable(self.bases + self.phrases)
-        for conditions_set in self.base_conditions:
-            table.add_row(self.calculate(*conditions_set))
+        table.add_rows(self._table().values.tolist())
         return table
 
     def as_pandas(self):
         """Table as Pandas DataFrame."""
-        df_columns = self.bases + self.phrases
-        df = pd.DataFrame(columns=df_columns)
-        for conditions_set in self.base_conditions:
-            df.loc[len(df)] = self.calculate(*conditions_set)
-        df.index = np.arange(1, len(df) + 1)  # index starting in one
-        return df
+        return self._table().copy()
 
     def as_tabulate(self, index=True, table_format="psql", align="center"):
         """Returns table using tabulate package."""
+        df = self._table()
         return tabulate(
-            Truths.as_pandas(self),
+            df,
             headers="keys",
             tablefmt=table_format,
             showindex=index,
-            colalign=[align] * (len(Truths.as_pandas(self).columns) + index),  # NOQA long
+            colalign=[align] * (len(df.columns) + index),  # NOQA long
         )
 
     def valuation(self, col_number=-1):
         """Evaluates an expression in a table column as a tautology, a
         contradiction or a contingency.
         """
-        df = Truths.as_pandas(self)
+        df = self._table()
         if col_number == -1:
             pass
         elif col_number not in range(1, len(df.columns) + 1):
@@ -187,12 +216,13 @@ class Truths:
         else:
             col_number = col_number - 1
 
-        if sum(df.iloc[:, col_number]) == len(df):
+        column = df.iloc[:, col_number].to_numpy()
+        if column.all():
             return "Tautology"
-        if sum(df.iloc[:, col_number]) == 0:
+        if not column.any():
             return "Contradiction"
         return "Contingency"
 
     def __str__(self) -> str:
-        table = Truths.as_tabulate(self, index=False)
+        table = self.as_tabulate(index=False)
         return str(table)